@@ -4,6 +4,7 @@ from __future__ import absolute_import
 import logging
 import re
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict, deque, namedtuple
 from datetime import timedelta
 
 from django.conf import settings
@@ -20,6 +21,7 @@ from openedx.core.lib.courses import course_image_url
 from xmodule.annotator_mixin import html_to_text
 from xmodule.library_tools import normalize_key_for_search
 from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.split_mongo import BlockKey
 
 # REINDEX_AGE is the default amount of time that we look back for changes
 # that might have happened. If we are provided with a time at which the
@@ -58,6 +60,136 @@ class SearchIndexingError(Exception):
         self.error_list = error_list
 
 
+# The changes to a structure since the version of it that was last indexed:
+# changed_blocks - BlockKeys of the blocks whose index needs to be updated
+# walk_roots - usage keys of the items to walk in order to update the index of those blocks
+# deleted_ids - index ids of the blocks that are no longer in the structure
+StructureChanges = namedtuple('StructureChanges', ['changed_blocks', 'walk_roots', 'deleted_ids'])
+
+
+def get_split_modulestore(modulestore, course_key):
+    """
+    Returns the split modulestore holding the given course, or None if it is
+    held by another type of modulestore
+    """
+    if hasattr(modulestore, '_get_modulestore_for_courselike'):
+        modulestore = modulestore._get_modulestore_for_courselike(course_key)  # pylint: disable=protected-access
+    if modulestore.get_modulestore_type() != ModuleStoreEnum.Type.split:
+        return None
+    return modulestore
+
+
+def diff_structures(old_structure, new_structure):
+    """
+    Compares two versions of a split structure
+
+    Blocks whose edit_info.update_version is unchanged are known to be unchanged.
+    Publishing sets a new update_version on every published block though, so the
+    others are compared by their settings and definition: blocks that are new,
+    moved, or whose settings changed need their whole subtree indexed again, since
+    their descendants inherit settings and are located by their display names;
+    blocks whose definition only changed need only themselves indexed again.
+
+    Returns:
+    None if the settings of the root changed, as every block inherits them;
+    otherwise a tuple of
+        changed_blocks - set of the BlockKeys of the blocks whose index needs updating
+        walk_roots - list of the BlockKeys of the topmost blocks to walk to update those,
+            each the topmost changed or split_test block of its ancestry
+        deleted_blocks - list of the BlockKeys of the blocks no longer reachable from the root
+    """
+    new_blocks = new_structure['blocks']
+    root = new_structure['root']
+    if old_structure['root'] != root or _settings_changed(old_structure['blocks'][root], new_blocks[root]):
+        return None
+
+    old_parents = _reachable_parents(old_structure)
+    new_parents = _reachable_parents(new_structure)
+
+    changed_blocks = set()
+    for block_key, parent_key in new_parents.iteritems():
+        if block_key == root or block_key in changed_blocks:
+            continue
+        new_block = new_blocks[block_key]
+        if old_parents.get(block_key) == parent_key:
+            old_block = old_structure['blocks'][block_key]
+            if old_block.edit_info.update_version == new_block.edit_info.update_version:
+                continue
+            if not _settings_changed(old_block, new_block):
+                if old_block.definition != new_block.definition:
+                    changed_blocks.add(block_key)
+                continue
+        changed_blocks.update(_subtree(new_blocks, block_key))
+
+    walk_roots = set()
+    for block_key in changed_blocks:
+        walk_root = block_key
+        ancestor = new_parents[block_key]
+        while ancestor != root:
+            if ancestor in changed_blocks or new_blocks[ancestor].block_type == 'split_test':
+                walk_root = ancestor
+            ancestor = new_parents[ancestor]
+        walk_roots.add(walk_root)
+
+    return (
+        changed_blocks,
+        [block_key for block_key in new_parents if block_key in walk_roots],
+        [block_key for block_key in old_parents if block_key not in new_parents],
+    )
+
+
+def _reachable_parents(structure):
+    """
+    Returns an OrderedDict of the BlockKey of each block reachable from the
+    root of the split structure to the BlockKey of its parent, in breadth-first order
+    """
+    blocks = structure['blocks']
+    parents = OrderedDict([(structure['root'], None)])
+    queue = deque([structure['root']])
+    while queue:
+        block_key = queue.popleft()
+        for child in blocks[block_key].fields.get('children', []):
+            child_key = BlockKey(*child)
+            if child_key in blocks and child_key not in parents:
+                parents[child_key] = block_key
+                queue.append(child_key)
+    return parents
+
+
+def _subtree(blocks, block_key):
+    """
+    Returns the set of the BlockKeys of the given block and its descendants
+    """
+    subtree = set()
+    stack = [block_key]
+    while stack:
+        block_key = stack.pop()
+        if block_key not in subtree:
+            subtree.add(block_key)
+            stack.extend(
+                BlockKey(*child) for child in blocks[block_key].fields.get('children', [])
+                if BlockKey(*child) in blocks
+            )
+    return subtree
+
+
+def _settings_changed(old_block, new_block):
+    """
+    Whether the settings of the block, which its descendants inherit, differ
+    between the two versions of it
+    """
+    return (
+        old_block.block_type != new_block.block_type or
+        old_block.defaults != new_block.defaults or
+        _settings_fields(old_block) != _settings_fields(new_block)
+    )
+
+
+def _settings_fields(block):
+    """ Returns the settings fields of the block, without its children """
+    return {name: value for name, value in block.fields.iteritems() if name != 'children'}
+
+
 @add_metaclass(ABCMeta)
 class SearchIndexerBase(object):
     """
@@ -69,6 +201,9 @@ class SearchIndexerBase(object):
     DOCUMENT_TYPE = None
     ENABLE_INDEXING_KEY = None
 
+    # Document type recording the version of each structure that was last indexed
+    STRUCTURE_VERSION_DOCUMENT_TYPE = None
+
     INDEX_EVENT = {
         'name': None,
         'category': None
@@ -88,7 +223,7 @@ class SearchIndexerBase(object):
 
     @classmethod
     @abstractmethod
-    def _fetch_top_level(cls, modulestore, structure_key):
+    def _fetch_top_level(cls, modulestore, structure_key, depth=None):
         """ Fetch the item from the modulestore location """
 
     @classmethod
@@ -130,6 +265,8 @@ class SearchIndexerBase(object):
             (within REINDEX_AGE above ^^) will have their index updated, others skip
             updating their index but are still walked through in order to identify
             which items may need to be removed from the index
+            If the version of the structure that was last indexed is known, only the
+            blocks changed since that version are indexed and the deleted ones removed
             If None, then a full reindex takes place
 
         Returns:
@@ -159,6 +296,12 @@ class SearchIndexerBase(object):
         # instead of per item index API call.
         items_index = []
 
+        # structure_version is the version of the structure being indexed, if the
+        # changes to it can be indexed incrementally; structure_changes are the
+        # changes since the version last indexed, or None to walk the whole structure
+        structure_version = None
+        structure_changes = None
+
         def get_item_location(item):
             """
             Gets the version agnostic item location
@@ -210,6 +353,9 @@ class SearchIndexerBase(object):
 
             item_id = unicode(cls._id_modifier(item.scope_ids.usage_id))
             indexed_items.add(item_id)
+            if structure_changes is not None:
+                # unchanged items are only walked for the content groups of their ancestors
+                skip_index = BlockKey.from_usage_key(item.location) not in structure_changes.changed_blocks
             if item.has_children:
                 # determine if it's okay to skip adding the children herein based upon how recently any may have changed
                 skip_child_index = skip_index or \
@@ -227,8 +373,11 @@ class SearchIndexerBase(object):
                 if None in children_groups_usage:
                     item_content_groups = None
 
-            if skip_index or not item_index_dictionary:
+            if not item_index_dictionary:
                 return
+            if skip_index:
+                # unchanged items still give their changed ancestors their content groups
+                return item_content_groups if structure_changes is not None else None
 
             item_index = {}
             # if it has something to add to the index, then add it
@@ -249,18 +398,41 @@ class SearchIndexerBase(object):
                 error_list.append(_('Could not index item: {}').format(item.location))
 
         try:
+            structure_version = cls._get_structure_version(modulestore, structure_key)
+            if triggered_at is not None and structure_version is not None:
+                indexed_version = cls._get_indexed_version(searcher, structure_key)
+                if indexed_version is not None:
+                    structure_changes = cls._get_structure_changes(
+                        modulestore, structure_key, indexed_version, structure_version
+                    )
+
             with modulestore.branch_setting(ModuleStoreEnum.RevisionOption.published_only):
-                structure = cls._fetch_top_level(modulestore, structure_key)
+                structure = cls._fetch_top_level(
+                    modulestore, structure_key, depth=None if structure_changes is None else 0
+                )
                 groups_usage_info = cls.fetch_group_usage(modulestore, structure)
 
                 # First perform any additional indexing from the structure object
                 cls.supplemental_index_information(modulestore, structure)
 
                 # Now index the content
-                for item in structure.get_children():
-                    prepare_item_index(item, groups_usage_info=groups_usage_info)
-                searcher.index(cls.DOCUMENT_TYPE, items_index)
-                cls.remove_deleted_items(searcher, structure_key, indexed_items)
+                if structure_changes is None:
+                    for item in structure.get_children():
+                        prepare_item_index(item, groups_usage_info=groups_usage_info)
+                    searcher.index(cls.DOCUMENT_TYPE, items_index)
+                    cls.remove_deleted_items(searcher, structure_key, indexed_items)
+                else:
+                    for usage_key in structure_changes.walk_roots:
+                        prepare_item_index(
+                            modulestore.get_item(usage_key, depth=None),
+                            groups_usage_info=groups_usage_info
+                        )
+                    searcher.index(cls.DOCUMENT_TYPE, items_index)
+                    if structure_changes.deleted_ids:
+                        searcher.remove(cls.DOCUMENT_TYPE, structure_changes.deleted_ids)
+
+            if structure_version is not None and not error_list:
+                cls._set_indexed_version(searcher, structure_key, structure_version)
         except Exception as err:  # pylint: disable=broad-except
             # broad exception so that index operation does not prevent the rest of the application from working
             log.exception(
@@ -308,6 +480,48 @@ class SearchIndexerBase(object):
             data
         )
 
+    @classmethod
+    def _get_structure_version(cls, modulestore, structure_key):  # pylint: disable=unused-argument
+        """
+        Returns the version of the structure that is about to be indexed, or None
+        if changes to the structure cannot be indexed incrementally. Base
+        implementation returns None
+        """
+        return None
+
+    @classmethod
+    def _get_structure_changes(cls, modulestore, structure_key, indexed_version, structure_version):
+        # pylint: disable=unused-argument
+        """
+        Returns the StructureChanges from the indexed version of the structure to
+        the given version, or None if the whole structure needs to be walked.
+        Base implementation returns None
+        """
+        return None
+
+    @classmethod
+    def _get_indexed_version(cls, searcher, structure_key):
+        """
+        Returns the version of the structure that was last indexed, or None if not known
+        """
+        response = searcher.search(
+            doc_type=cls.STRUCTURE_VERSION_DOCUMENT_TYPE,
+            field_dictionary={"id": unicode(structure_key)}
+        )
+        results = response["results"]
+        return results[0]["data"]["structure_version"] if results else None
+
+    @classmethod
+    def _set_indexed_version(cls, searcher, structure_key, structure_version):
+        """
+        Records the version of the structure that has been indexed. It is kept in
+        the index itself, so that a new or cleared index is fully indexed
+        """
+        searcher.index(cls.STRUCTURE_VERSION_DOCUMENT_TYPE, [{
+            "id": unicode(structure_key),
+            "structure_version": unicode(structure_version),
+        }])
+
     @classmethod
     def fetch_group_usage(cls, modulestore, structure):  # pylint: disable=unused-argument
         """
@@ -346,6 +560,7 @@ class CoursewareSearchIndexer(SearchIndexerBase):
     INDEX_NAME = "courseware_index"
     DOCUMENT_TYPE = "courseware_content"
     ENABLE_INDEXING_KEY = 'ENABLE_COURSEWARE_INDEX'
+    STRUCTURE_VERSION_DOCUMENT_TYPE = "courseware_structure_version"
 
     INDEX_EVENT = {
         'name': 'edx.course.index.reindexed',
@@ -360,9 +575,9 @@ class CoursewareSearchIndexer(SearchIndexerBase):
         return structure_key
 
     @classmethod
-    def _fetch_top_level(cls, modulestore, structure_key):
+    def _fetch_top_level(cls, modulestore, structure_key, depth=None):
         """ Fetch the item from the modulestore location """
-        return modulestore.get_course(structure_key, depth=None)
+        return modulestore.get_course(structure_key, depth=depth)
 
     @classmethod
     def _get_location_info(cls, normalized_structure_key):
@@ -376,6 +591,40 @@ class CoursewareSearchIndexer(SearchIndexerBase):
         """
         return cls._do_reindex(modulestore, course_key)
 
+    @classmethod
+    def _get_structure_version(cls, modulestore, structure_key):
+        """
+        Returns the version of the published branch of courses in split modulestores
+        """
+        split_modulestore = get_split_modulestore(modulestore, structure_key)
+        if split_modulestore is None:
+            return None
+        course_index = split_modulestore.get_course_index_info(structure_key)
+        if course_index is None:
+            return None
+        return course_index['versions'].get(ModuleStoreEnum.BranchName.published)
+
+    @classmethod
+    def _get_structure_changes(cls, modulestore, structure_key, indexed_version, structure_version):
+        """
+        Diffs the indexed and given versions of the published branch of the course
+        """
+        split_modulestore = get_split_modulestore(modulestore, structure_key)
+        old_structure = split_modulestore.get_structure(structure_key, indexed_version)
+        new_structure = split_modulestore.get_structure(structure_key, structure_version)
+        if old_structure is None or new_structure is None:
+            return None
+
+        structure_diff = diff_structures(old_structure, new_structure)
+        if structure_diff is None:
+            return None
+        changed_blocks, walk_roots, deleted_blocks = structure_diff
+        return StructureChanges(
+            changed_blocks,
+            [structure_key.make_usage_key(*block_key) for block_key in walk_roots],
+            [unicode(cls._id_modifier(structure_key.make_usage_key(*block_key))) for block_key in deleted_blocks],
+        )
+
     @classmethod
     def fetch_group_usage(cls, modulestore, structure):
         groups_usage_dict = {}
@@ -448,9 +697,9 @@ class LibrarySearchIndexer(SearchIndexerBase):
         return normalize_key_for_search(structure_key)
 
     @classmethod
-    def _fetch_top_level(cls, modulestore, structure_key):
+    def _fetch_top_level(cls, modulestore, structure_key, depth=None):
         """ Fetch the item from the modulestore location """
-        return modulestore.get_library(structure_key, depth=None)
+        return modulestore.get_library(structure_key, depth=depth)
 
     @classmethod
     def _get_location_info(cls, normalized_structure_key):
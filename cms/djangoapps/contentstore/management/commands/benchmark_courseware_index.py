@@ -0,0 +1,144 @@
+"""
+Command to benchmark the latency from publishing a change to a course to the
+change being in the courseware search index.
+"""
+from datetime import datetime
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from pytz import UTC
+from search.search_engine_base import SearchEngine
+
+from contentstore.courseware_index import CoursewareSearchIndexer
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+
+# Number of chapters, and of sequentials in each chapter, of the synthetic course;
+# its units are spread evenly across the sequentials.
+NUM_CHAPTERS = 10
+NUM_SEQUENTIALS = 10
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py cms benchmark_courseware_index --settings=devstack
+        $ ./manage.py cms benchmark_courseware_index --num_units 3000 --iterations 5 --settings=devstack
+    """
+    help = u'Measures the publish-to-indexed latency of full and incremental indexing of a synthetic course.'
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            '--num_units',
+            help=u'Number of units, each with an html component, in the synthetic course.',
+            default=3000,
+            type=int,
+        )
+        parser.add_argument(
+            '--iterations',
+            help=u'Number of timed publishes per type of indexing.',
+            default=3,
+            type=int,
+        )
+        parser.add_argument(
+            '--keep',
+            help=u'Keep the synthetic course rather than deleting it afterwards.',
+            action='store_true',
+        )
+
+    def handle(self, *args, **options):
+        if not SearchEngine.get_search_engine(CoursewareSearchIndexer.INDEX_NAME):
+            raise CommandError(u'A SEARCH_ENGINE must be configured to benchmark indexing.')
+
+        store = modulestore()
+        course_key, html_keys = create_synthetic_course(store, options['num_units'])
+        self.stdout.write(u'Synthetic course {} with {} units:'.format(course_key, len(html_keys)))
+        try:
+            # Index the whole course once, so that incremental indexing has a version to start from
+            CoursewareSearchIndexer.index(store, course_key)
+
+            for index_name, triggered in ((u'full', False), (u'incremental', True)):
+                latencies = []
+                for iteration in range(options['iterations']):
+                    html_key = random.choice(html_keys)
+                    start = time.time()
+                    indexed_count = _publish_and_index(store, html_key, iteration, triggered)
+                    latencies.append((time.time() - start) * 1000.0)
+                self.stdout.write(u'  {:<12} indexed: {:>5}  mean: {:9.1f} ms  max: {:9.1f} ms'.format(
+                    index_name,
+                    indexed_count,
+                    sum(latencies) / len(latencies),
+                    max(latencies),
+                ))
+        finally:
+            if not options['keep']:
+                store.delete_course(course_key, ModuleStoreEnum.UserID.mgmt_command)
+
+
+def create_synthetic_course(store, num_units):
+    """
+    Creates and publishes a split course of num_units units, each with an
+    html component, in NUM_CHAPTERS chapters of NUM_SEQUENTIALS sequentials.
+
+    Returns the course key and the usage keys of the html components.
+    """
+    user_id = ModuleStoreEnum.UserID.mgmt_command
+    units_per_sequential = max(1, num_units // (NUM_CHAPTERS * NUM_SEQUENTIALS))
+    html_keys = []
+    with store.default_store(ModuleStoreEnum.Type.split):
+        course = store.create_course(
+            'BenchmarkX', 'Indexing', 'run_{}'.format(int(time.time())), user_id,
+            fields={'display_name': u'Indexing Benchmark'},
+        )
+        with store.bulk_operations(course.id):
+            for chapter_index in range(NUM_CHAPTERS):
+                chapter = store.create_child(
+                    user_id, course.location, 'chapter',
+                    fields={'display_name': u'Chapter {}'.format(chapter_index)},
+                )
+                for sequential_index in range(NUM_SEQUENTIALS):
+                    sequential = store.create_child(
+                        user_id, chapter.location, 'sequential',
+                        fields={'display_name': u'Sequential {}'.format(sequential_index)},
+                    )
+                    for unit_index in range(units_per_sequential):
+                        vertical = store.create_child(
+                            user_id, sequential.location, 'vertical',
+                            fields={'display_name': u'Unit {}'.format(unit_index)},
+                        )
+                        html = store.create_child(
+                            user_id, vertical.location, 'html',
+                            fields={'display_name': u'Html {}'.format(unit_index), 'data': _html_data(unit_index)},
+                        )
+                        html_keys.append(html.location)
+            store.publish(course.location, user_id)
+    return course.id, html_keys
+
+
+def _publish_and_index(store, html_key, iteration, triggered):
+    """
+    Edits the content of the given html component, publishes its unit and
+    indexes the course, as a publish signal would if triggered, or fully.
+
+    Returns the number of items indexed.
+    """
+    user_id = ModuleStoreEnum.UserID.mgmt_command
+    with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+        html = store.get_item(html_key)
+        html.data = _html_data(iteration)
+        store.update_item(html, user_id)
+        store.publish(html.parent, user_id)
+    return CoursewareSearchIndexer.index(
+        store, html_key.course_key, triggered_at=datetime.now(UTC) if triggered else None,
+    )
+
+
+def _html_data(index):
+    """
+    Returns synthetic html content.
+    """
+    return u'<p>Synthetic content {} of the indexing benchmark.</p>'.format(index)
@@ -89,11 +89,20 @@ def rerun_course(source_course_key_string, destination_course_key_string, user_i
         # deserialize the payload
         fields = deserialize_fields(fields) if fields else None
 
+        def asset_progress_callback(num_copied, num_assets):
+            """
+            Records the progress of copying the course's assets in the rerun state.
+            """
+            CourseRerunState.objects.assets_copied(destination_course_key, num_copied, num_assets)
+
         # use the split modulestore as the store for the rerun course,
         # as the Mongo modulestore doesn't support multiple runs of the same course.
         store = modulestore()
         with store.default_store('split'):
-            store.clone_course(source_course_key, destination_course_key, user_id, fields=fields)
+            store.clone_course(
+                source_course_key, destination_course_key, user_id, fields=fields,
+                asset_progress_callback=asset_progress_callback,
+            )
 
         # set initial permissions for the user to access the course.
         initialize_permissions(destination_course_key, User.objects.get(id=user_id))
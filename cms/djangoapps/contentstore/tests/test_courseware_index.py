@@ -431,16 +431,59 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
 
         before_time = datetime.now(UTC)
         self.publish_item(store, vertical2.location)
-        # index based on time, will include an index of the origin sequential
-        # because it is in a common subtree but not of the original vertical
-        # because the original sequential's subtree is too old
+        if store.get_modulestore_type(self.course.id) == ModuleStoreEnum.Type.split:
+            # index based on the changes to the published structure since it was
+            # last indexed, which are the new sequential, vertical and html
+            expected_count = 3
+        else:
+            # index based on time, will include an index of the origin sequential
+            # because it is in a common subtree but not of the original vertical
+            # because the original sequential's subtree is too old
+            expected_count = 5
         new_indexed_count = self.index_recent_changes(store, before_time)
-        self.assertEqual(new_indexed_count, 5)
+        self.assertEqual(new_indexed_count, expected_count)
 
         # full index again
         indexed_count = self.reindex_course(store)
         self.assertEqual(indexed_count, 7)
 
+    def _test_index_structure_changes(self, store):
+        """ Make sure that only the blocks changed since the last indexed structure are indexed """
+        self.publish_item(store, self.vertical.location)
+        indexed_count = self.reindex_course(store)
+        self.assertEqual(indexed_count, 4)
+
+        # nothing has changed since the full index
+        since_time = datetime.now(UTC)
+        self.assertEqual(self.index_recent_changes(store, since_time), 0)
+
+        # changed content only updates the index of its own block
+        with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+            html_unit = store.get_item(self.html_unit.location)
+        html_unit.data = "<p>Updated some content</p>"
+        self.update_item(store, html_unit)
+        self.publish_item(store, self.vertical.location)
+        self.assertEqual(self.index_recent_changes(store, since_time), 1)
+        response = self.search(query_string="Updated")
+        self.assertEqual(response["total"], 1)
+
+        # changed settings update the index of the block's whole subtree
+        with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+            vertical = store.get_item(self.vertical.location)
+        vertical.display_name = "Subsection 1 Renamed"
+        self.update_item(store, vertical)
+        self.publish_item(store, self.vertical.location)
+        self.assertEqual(self.index_recent_changes(store, since_time), 2)
+        response = self.search(query_string="Updated")
+        self.assertEqual(response["results"][0]["data"]["location"], ["Week 1", "Lesson 1", "Subsection 1 Renamed"])
+
+        # deleted blocks are removed from the index
+        self.delete_item(store, self.html_unit.location)
+        self.publish_item(store, self.vertical.location)
+        self.assertEqual(self.index_recent_changes(store, since_time), 0)
+        response = self.search()
+        self.assertEqual(response["total"], 3)
+
     def _test_course_about_property_index(self, store):
         """ Test that informational properties in the course object end up in the course_info index """
         display_name = "Help, I need somebody!"
@@ -572,6 +615,9 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
     def test_time_based_index(self, store_type):
         self._perform_test_using_store(store_type, self._test_time_based_index)
 
+    def test_index_structure_changes(self):
+        self._perform_test_using_store(ModuleStoreEnum.Type.split, self._test_index_structure_changes)
+
     @ddt.data(*WORKS_WITH_STORES)
     def test_exception(self, store_type):
         self._perform_test_using_store(store_type, self._test_exception)
@@ -536,6 +536,15 @@ CODE_JAIL = {
     },
 }
 
+# Pool of sandboxed Pythons that capa's safe_exec keeps running, with the modules
+# that problems use already imported, rather than starting one per execution.
+CODE_JAIL_POOL = {
+    # Number of sandbox workers in each process.  0 means no pool.
+    'size': 0,
+    # Number of executions after which a sandbox worker is replaced.
+    'max_executions': 100,
+}
+
 ############################ DJANGO_BUILTINS ################################
 # Change DEBUG in your environment settings files, not here
 DEBUG = False
@@ -1399,6 +1408,15 @@ ENTERPRISE_API_CACHE_TIMEOUT = 3600  # Value is in seconds
 
 COURSE_CATALOG_API_URL = None
 
+# Maximum number of pages of an edX REST API collection (catalog, credentials,
+# ...) that get_edx_api_data fetches at the same time, once it has the first
+# page.  The pages share the API client's pooled connections.
+EDX_API_MAX_CONCURRENT_PAGES = 4
+# Number of seconds past their cache_ttl for which get_edx_api_data serves
+# cached API data while a single worker refreshes it.  0 disables serving
+# stale data.
+EDX_API_STALE_CACHE_TTL = 0
+
 ############################# Persistent Grades ####################################
 
 # Queue to use for updating persistent grades
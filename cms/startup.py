@@ -6,6 +6,7 @@ import django
 from django.conf import settings
 
 import cms.lib.xblock.runtime
+from capa.safe_exec import configure_pool
 import xmodule.x_module
 from openedx.core.djangoapps.monkey_patch import django_db_models_options
 from openedx.core.djangoapps.theming.core import enable_theming
@@ -37,6 +38,9 @@ def run():
 
     add_mimetypes()
 
+    # Configure capa's pool of sandbox workers, which each process starts when first used.
+    configure_pool(**settings.CODE_JAIL_POOL)
+
     # In order to allow descriptors to use a handler url, we need to
     # monkey-patch the x_module library.
     # TODO: Remove this code when Runtimes are no longer created by modulestores
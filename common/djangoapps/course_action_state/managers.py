@@ -128,6 +128,18 @@ class CourseRerunUIStateManager(CourseActionUIStateManager):
             display_name=display_name,
         )
 
+    def assets_copied(self, course_key, num_copied, num_assets):
+        """
+        To be called as an existing rerun for the given course copies the course's assets.
+        """
+        self.update_state(
+            course_key=course_key,
+            new_state=self.State.IN_PROGRESS,
+            message=u"Copied {num_copied} of {num_assets} assets.".format(
+                num_copied=num_copied, num_assets=num_assets
+            ),
+        )
+
     def succeeded(self, course_key):
         """
         To be called when an existing rerun for the given course has successfully completed.
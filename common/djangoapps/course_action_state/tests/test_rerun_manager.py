@@ -73,6 +73,16 @@ class TestCourseRerunStateManager(TestCase):
         )
         self.verify_rerun_state()
 
+    def test_rerun_assets_copied(self):
+        self.initiate_rerun()
+
+        CourseRerunState.objects.assets_copied(course_key=self.course_key, num_copied=50, num_assets=120)
+        self.expected_rerun_state.update({
+            'state': CourseRerunUIStateManager.State.IN_PROGRESS,
+            'message': u"Copied 50 of 120 assets.",
+        })
+        self.verify_rerun_state()
+
     def test_rerun_succeeded(self):
         # initiate
         self.initiate_rerun()
@@ -0,0 +1,142 @@
+"""
+Loads the data shown for each of a learner's course enrollments on the dashboard.
+"""
+from collections import defaultdict
+
+from lazy import lazy
+
+from bulk_email.models import BulkEmailFlag  # pylint: disable=import-error
+from certificates.models import GeneratedCertificate, certificate_status  # pylint: disable=import-error
+from course_modes.models import CourseMode
+from courseware.access import has_access
+from openedx.features.course_experience import COURSE_PRE_START_ACCESS_FLAG
+from shoppingcart.models import CourseRegistrationCode
+from student.helpers import check_verify_status_by_course
+from util.milestones_helpers import get_pre_requisite_courses_not_completed
+
+
+class DashboardData(object):
+    """
+    The data shown for each of a learner's course enrollments on the dashboard.
+
+    Each kind of data is loaded for all of the enrollments together when it is
+    first used, so that the number of queries made does not depend on the
+    number of enrollments.
+    """
+
+    def __init__(self, user, course_enrollments):
+        """
+        Arguments:
+            user (User): The learner.
+            course_enrollments (list[CourseEnrollment]): The learner's
+                enrollments, with their course overviews loaded.
+        """
+        self.user = user
+        self.course_enrollments = course_enrollments
+        self.course_ids = [enrollment.course_id for enrollment in course_enrollments]
+
+    @lazy
+    def course_modes_by_course(self):
+        """
+        Dict of each course id to a dict of the slugs of the course's unexpired
+        modes to the modes.
+        """
+        __, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(self.course_ids)
+        return {
+            course_id: {
+                mode.slug: mode
+                for mode in modes
+            }
+            for course_id, modes in unexpired_course_modes.iteritems()
+        }
+
+    @lazy
+    def certificate_statuses(self):
+        """
+        Dict of each course id to the certificate_status of the learner's
+        certificate in the course.
+        """
+        certificates = {
+            certificate.course_id: certificate
+            for certificate in GeneratedCertificate.objects.filter(user=self.user, course_id__in=self.course_ids)
+        }
+        return {
+            course_id: certificate_status(certificates.get(course_id))
+            for course_id in self.course_ids
+        }
+
+    @lazy
+    def courseware_course_ids(self):
+        """
+        Frozenset of the ids of the courses whose courseware the learner can load.
+        """
+        # The course overrides of the flag are otherwise read for each course
+        COURSE_PRE_START_ACCESS_FLAG.prefetch_course_overrides(self.course_ids)
+        return frozenset(
+            enrollment.course_id for enrollment in self.course_enrollments
+            if has_access(self.user, 'load', enrollment.course_overview)
+        )
+
+    @lazy
+    def courses_requirements_not_met(self):
+        """
+        Dict of the ids of the courses whose prerequisite courses the learner
+        has not completed to the prerequisite courses, as returned by
+        get_pre_requisite_courses_not_completed.
+        """
+        courses_having_prerequisites = frozenset(
+            enrollment.course_id for enrollment in self.course_enrollments
+            if enrollment.course_overview.pre_requisite_courses
+        )
+        return get_pre_requisite_courses_not_completed(self.user, courses_having_prerequisites)
+
+    @lazy
+    def email_enabled_course_ids(self):
+        """
+        Frozenset of the ids of the courses for which bulk email is enabled.
+        """
+        return frozenset(BulkEmailFlag.feature_enabled_for_courses(self.course_ids))
+
+    @lazy
+    def verification_status_by_course(self):
+        """
+        Dict of course ids to the learner's verification status in the course,
+        as returned by check_verify_status_by_course.
+        """
+        return check_verify_status_by_course(self.user, self.course_enrollments)
+
+    @lazy
+    def redeemed_registration_codes(self):
+        """
+        Dict of course ids to the list of the course's registration codes that
+        the learner redeemed, with their invoices loaded.
+        """
+        registration_codes = defaultdict(list)
+        for registration_code in CourseRegistrationCode.objects.filter(
+                course_id__in=self.course_ids,
+                registrationcoderedemption__redeemed_by=self.user
+        ).select_related('invoice_item__invoice'):
+            registration_codes[registration_code.course_id].append(registration_code)
+        return registration_codes
+
+    @lazy
+    def paid_course_ids(self):
+        """
+        Frozenset of the ids of the courses that the learner paid for.
+        """
+        return frozenset(
+            enrollment.course_id for enrollment in self.course_enrollments
+            if enrollment.is_paid_course(modes_dict=self._selectable_modes(enrollment.course_id))
+        )
+
+    def _selectable_modes(self, course_id):
+        """
+        Returns the dict of the slugs of the course's unexpired selectable modes
+        to the modes, as returned by CourseMode.modes_for_course_dict.
+        """
+        modes = {
+            slug: mode
+            for slug, mode in self.course_modes_by_course.get(course_id, {}).iteritems()
+            if slug not in CourseMode.CREDIT_MODES
+        }
+        return modes or {CourseMode.DEFAULT_MODE.slug: CourseMode.DEFAULT_MODE}
@@ -0,0 +1,99 @@
+"""
+Tests for the bulk loading of the dashboard's per-enrollment data.
+"""
+import unittest
+
+import ddt
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from nose.plugins.attrib import attr
+
+from bulk_email.models import BulkEmailFlag, CourseAuthorization
+from certificates.models import CertificateStatuses  # pylint: disable=import-error
+from certificates.tests.factories import GeneratedCertificateFactory  # pylint: disable=import-error
+from course_modes.models import CourseMode
+from course_modes.tests.factories import CourseModeFactory
+from request_cache.middleware import RequestCache
+from student.dashboard_data import DashboardData
+from student.models import CourseEnrollment
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+
+
+@attr(shard=3)
+@unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
+@ddt.ddt
+class DashboardDataTest(ModuleStoreTestCase):
+    """
+    Tests for DashboardData.
+    """
+    def setUp(self):
+        super(DashboardDataTest, self).setUp()
+        self.user = UserFactory()
+        BulkEmailFlag.objects.create(enabled=True, require_course_email_auth=True)
+        self.addCleanup(BulkEmailFlag.objects.all().delete)
+
+    def _create_enrollments(self, num_courses):
+        """
+        Creates num_courses courses, with a verified mode, a certificate and
+        email enabled for each, and returns the user's enrollments in them with
+        their course overviews loaded.
+        """
+        for __ in range(num_courses):
+            course = CourseFactory.create()
+            CourseModeFactory.create(course_id=course.id, mode_slug=CourseMode.VERIFIED)
+            CourseEnrollment.enroll(self.user, course.id, mode=CourseMode.VERIFIED)
+            GeneratedCertificateFactory.create(
+                user=self.user, course_id=course.id, status=CertificateStatuses.downloadable,
+            )
+            CourseAuthorization.objects.create(course_id=course.id, email_enabled=True)
+
+        enrollments = list(CourseEnrollment.enrollments_for_user(self.user))
+        for enrollment in enrollments:
+            self.assertIsNotNone(enrollment.course_overview)
+        return enrollments
+
+    def _load_dashboard_data(self, enrollments):
+        """
+        Loads all of the dashboard data for the given enrollments, and returns
+        the number of queries made.
+        """
+        RequestCache.clear_request_cache()
+        dashboard_data = DashboardData(self.user, enrollments)
+        with CaptureQueriesContext(connection) as captured:
+            for name in (
+                    'course_modes_by_course',
+                    'certificate_statuses',
+                    'courseware_course_ids',
+                    'courses_requirements_not_met',
+                    'email_enabled_course_ids',
+                    'verification_status_by_course',
+                    'redeemed_registration_codes',
+                    'paid_course_ids',
+            ):
+                self.assertIsNotNone(getattr(dashboard_data, name))
+        return len(captured.captured_queries)
+
+    def test_data(self):
+        enrollments = self._create_enrollments(2)
+        course_ids = set(enrollment.course_id for enrollment in enrollments)
+        dashboard_data = DashboardData(self.user, enrollments)
+
+        self.assertEqual(set(dashboard_data.course_modes_by_course), course_ids)
+        for course_id in course_ids:
+            self.assertEqual(dashboard_data.certificate_statuses[course_id]['status'], CertificateStatuses.downloadable)
+            self.assertEqual(dashboard_data.redeemed_registration_codes[course_id], [])
+        self.assertEqual(dashboard_data.courseware_course_ids, course_ids)
+        self.assertEqual(dashboard_data.email_enabled_course_ids, course_ids)
+        self.assertEqual(dashboard_data.paid_course_ids, frozenset())
+        self.assertEqual(dashboard_data.courses_requirements_not_met, {})
+
+    @ddt.data(2, 5)
+    def test_query_count_independent_of_enrollments(self, num_courses):
+        # If this fails, a query is being made for each enrollment; load the
+        # data for all of the enrollments together instead.
+        single_course_queries = self._load_dashboard_data(self._create_enrollments(1))
+        CourseEnrollment.objects.filter(user=self.user).delete()
+        self.assertEqual(self._load_dashboard_data(self._create_enrollments(num_courses)), single_course_queries)
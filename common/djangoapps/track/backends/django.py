@@ -74,9 +74,21 @@ class DjangoBackend(BaseBackend):
         self.name = name
 
     def send(self, event):
-        field_values = {x: event.get(x, '') for x in LOGFIELDS}
-        tldat = TrackingLog(**field_values)
+        tldat = _tracking_log(event)
         try:
             tldat.save(using=self.name)
         except Exception as e:  # pylint: disable=broad-except
             log.exception(e)
+
+    def send_many(self, events):
+        """Save the events with a single insert."""
+        try:
+            TrackingLog.objects.using(self.name).bulk_create([_tracking_log(event) for event in events])
+        except Exception as e:  # pylint: disable=broad-except
+            log.exception(e)
+
+
+def _tracking_log(event):
+    """Returns an unsaved TrackingLog of the event."""
+    field_values = {x: event.get(x, '') for x in LOGFIELDS}
+    return TrackingLog(**field_values)
@@ -2,13 +2,12 @@
 
 from __future__ import absolute_import
 
-import json
 import logging
 
 from django.conf import settings
 
 from track.backends import BaseBackend
-from track.utils import DateTimeJSONEncoder
+from track.utils import dumps_event
 
 log = logging.getLogger('track.backends.logger')
 application_log = logging.getLogger('track.backends.application_log')  # pylint: disable=invalid-name
@@ -34,17 +33,15 @@ class LoggerBackend(BaseBackend):
         self.event_logger = logging.getLogger(name)
 
     def send(self, event):
+        # TODO: remove trucation of the serialized event, either at a
+        # higher level during the emittion of the event, or by
+        # providing warnings when the events exceed certain size.
         try:
-            event_str = json.dumps(event, cls=DateTimeJSONEncoder)
+            event_str = dumps_event(event, settings.TRACK_MAX_EVENT)
         except UnicodeDecodeError:
             application_log.exception(
                 "UnicodeDecodeError Event_data: %r", event
             )
             raise
 
-        # TODO: remove trucation of the serialized event, either at a
-        # higher level during the emittion of the event, or by
-        # providing warnings when the events exceed certain size.
-        event_str = event_str[:settings.TRACK_MAX_EVENT]
-
         self.event_logger.info(event_str)
@@ -0,0 +1,179 @@
+"""
+Event tracker backend that queues events in-process, and sends them to
+another backend in batches from a background thread.
+
+Sending an event then only costs the request adding it to a queue, rather
+than a write to the other backend.  For example::
+
+  TRACKING_BACKENDS = {
+      'sql': {
+          'ENGINE': 'track.backends.queued.QueuedBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'track.backends.django.DjangoBackend',
+              },
+              'max_queue_size': 10000,
+              'flush_size': 100,
+              'flush_interval': 1.0,
+              'overflow': 'send',
+          }
+      }
+  }
+
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import logging
+import os
+import Queue
+import threading
+
+from django.db import close_old_connections
+
+from track.backends import BaseBackend
+
+log = logging.getLogger(__name__)
+
+
+class QueuedBackend(BaseBackend):
+    """
+    Event tracker backend that sends events to another backend in batches.
+
+    Events are sent with the other backend's `send_many`, when `flush_size`
+    events are queued or `flush_interval` seconds have passed, whichever is
+    first.  What happens to an event sent when `max_queue_size` events are
+    already queued depends on `overflow`:
+
+      - 'send': the event is sent to the other backend immediately.
+      - 'block': the sender waits until the event can be queued.
+      - 'drop': the event is dropped, and the number of dropped events is
+        logged when the queue is next flushed.
+
+    Queued events are flushed when the process exits.
+
+    """
+    OVERFLOW_POLICIES = ('send', 'block', 'drop')
+
+    def __init__(self, backend, max_queue_size=10000, flush_size=100, flush_interval=1.0, overflow='send', **kwargs):
+        """
+        :Parameters:
+
+          - `backend`: configuration of the backend to send events to, with
+            an `ENGINE` and optional `OPTIONS`, as in TRACKING_BACKENDS.
+          - `max_queue_size`: maximum number of queued events.
+          - `flush_size`: maximum number of events sent together.
+          - `flush_interval`: maximum number of seconds an event is queued
+            for before it is sent, barring a backlog.
+          - `overflow`: what to do with events sent when the queue is full.
+
+        """
+        super(QueuedBackend, self).__init__(**kwargs)
+
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError('Invalid overflow policy %s' % overflow)
+
+        # Imported here as the tracker initializes its backends on import.
+        from track.tracker import _instantiate_backend_from_name  # pylint: disable=protected-access
+        self.backend = _instantiate_backend_from_name(backend['ENGINE'], backend.get('OPTIONS', {}))
+
+        self.max_queue_size = max_queue_size
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._flush_lock = None
+        self._wake = None
+        self._stopped = None
+        self._flusher = None
+        self._dropped = 0
+
+        atexit.register(self.close)
+
+    def send(self, event):
+        """Queue the event to be sent."""
+        self._ensure_flusher()
+
+        try:
+            self._queue.put_nowait(event)
+        except Queue.Full:
+            if self.overflow == 'send':
+                self.backend.send(event)
+            elif self.overflow == 'block':
+                self._wake.set()
+                self._queue.put(event)
+            else:
+                self._dropped += 1
+
+        if self._queue.qsize() >= self.flush_size:
+            self._wake.set()
+
+    def flush(self):
+        """Send all of the queued events, in batches of at most `flush_size`."""
+        if self._queue is None:
+            return
+
+        with self._flush_lock:
+            while True:
+                events = []
+                try:
+                    while len(events) < self.flush_size:
+                        events.append(self._queue.get_nowait())
+                except Queue.Empty:
+                    pass
+
+                if not events:
+                    break
+
+                try:
+                    self.backend.send_many(events)
+                except Exception:  # pylint: disable=broad-except
+                    log.exception('Error sending %d queued events to the event tracker backend', len(events))
+
+            if self._dropped:
+                dropped, self._dropped = self._dropped, 0
+                log.warning('Dropped %d events as the event tracker queue was full', dropped)
+
+    def close(self):
+        """Stop the background thread, and send all of the queued events."""
+        if self._flusher is not None and self._pid == os.getpid():
+            self._stopped.set()
+            self._wake.set()
+            self._flusher.join(self.flush_interval)
+        self.flush()
+
+    def _ensure_flusher(self):
+        """
+        Start the queue and its background thread if they aren't running in
+        this process, as threads don't survive forking a worker process.
+        """
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+
+        with self._start_lock:
+            if self._pid == pid:
+                return
+
+            self._queue = Queue.Queue(self.max_queue_size)
+            self._flush_lock = threading.Lock()
+            self._wake = threading.Event()
+            self._stopped = threading.Event()
+            self._flusher = threading.Thread(target=self._run_flusher, name='track.backends.queued')
+            self._flusher.daemon = True
+            self._flusher.start()
+            self._pid = pid
+
+    def _run_flusher(self):
+        """Flush the queue whenever woken, or every `flush_interval` seconds."""
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            # The thread's database connection isn't closed by the end of a
+            # request, as a request thread's is.
+            close_old_connections()
+            self.flush()
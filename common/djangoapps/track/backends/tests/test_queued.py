@@ -0,0 +1,71 @@
+from __future__ import absolute_import
+
+from django.test import TestCase
+from mock import patch
+
+from track.backends import BaseBackend
+from track.backends.queued import QueuedBackend
+
+
+class TestQueuedBackend(TestCase):
+    def _create_backend(self, **options):
+        backend = QueuedBackend(
+            backend={'ENGINE': 'track.backends.tests.test_queued.BatchRecordingBackend'},
+            **options
+        )
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_events_sent_in_batches(self):
+        backend = self._create_backend(flush_size=2, flush_interval=60)
+        events = [{'test': index} for index in range(5)]
+
+        for event in events:
+            backend.send(event)
+        backend.close()
+
+        # Events are sent in order, whether by the background thread or the close
+        self.assertEqual([event for batch in backend.backend.batches for event in batch], events)
+        self.assertTrue(all(len(batch) <= 2 for batch in backend.backend.batches))
+        self.assertEqual(backend.backend.sent, [])
+
+    @patch.object(QueuedBackend, '_run_flusher')
+    def test_overflow_send(self, _mock_run_flusher):
+        backend = self._create_backend(max_queue_size=2, overflow='send')
+
+        for index in range(3):
+            backend.send({'test': index})
+
+        self.assertEqual(backend.backend.sent, [{'test': 2}])
+        backend.flush()
+        self.assertEqual(backend.backend.batches, [[{'test': 0}, {'test': 1}]])
+
+    @patch.object(QueuedBackend, '_run_flusher')
+    @patch('track.backends.queued.log')
+    def test_overflow_drop(self, mock_log, _mock_run_flusher):
+        backend = self._create_backend(max_queue_size=2, overflow='drop')
+
+        for index in range(4):
+            backend.send({'test': index})
+
+        backend.flush()
+        self.assertEqual(backend.backend.batches, [[{'test': 0}, {'test': 1}]])
+        self.assertEqual(backend.backend.sent, [])
+        mock_log.warning.assert_called_once_with('Dropped %d events as the event tracker queue was full', 2)
+
+    def test_invalid_overflow(self):
+        with self.assertRaises(ValueError):
+            self._create_backend(overflow='ignore')
+
+
+class BatchRecordingBackend(BaseBackend):
+    def __init__(self, **options):
+        super(BatchRecordingBackend, self).__init__(**options)
+        self.sent = []
+        self.batches = []
+
+    def send(self, event):
+        self.sent.append(event)
+
+    def send_many(self, events):
+        self.batches.append(events)
@@ -0,0 +1,143 @@
+"""
+Command to benchmark the serialization of tracking events by the LoggerBackend.
+"""
+import json
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from pytz import UTC
+
+from track.utils import DateTimeJSONEncoder, dumps_event
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_tracking_serializer --settings=devstack
+        $ ./manage.py lms benchmark_tracking_serializer --events /edx/var/log/tracking/tracking.log --settings=devstack
+    """
+    help = u'Measures the time taken to serialize tracking events with json.dumps and with dumps_event.'
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            '--events',
+            help=u'Tracking log to read the events from, one JSON event per line, instead of synthetic events.',
+        )
+        parser.add_argument(
+            '--iterations',
+            help=u'Number of times each event is serialized.',
+            default=1000,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        if options['events']:
+            events = _read_events(options['events'])
+        else:
+            events = _synthetic_events()
+
+        max_length = settings.TRACK_MAX_EVENT
+        serializers = (
+            (u'json.dumps', lambda event: json.dumps(event, cls=DateTimeJSONEncoder)[:max_length]),
+            (u'dumps_event', lambda event: dumps_event(event, max_length)),
+        )
+        self.stdout.write(u'{} events, serialized {} times each:'.format(len(events), options['iterations']))
+        for name, serialize in serializers:
+            start = time.time()
+            for __ in range(options['iterations']):
+                for event in events:
+                    serialize(event)
+            elapsed = time.time() - start
+            self.stdout.write(u'  {:<12} total: {:9.1f} ms  per event: {:7.2f} us'.format(
+                name,
+                elapsed * 1000.0,
+                elapsed * 1000000.0 / (options['iterations'] * len(events)),
+            ))
+
+
+def _read_events(path):
+    """
+    Returns the events of the given tracking log, skipping truncated ones.
+    Their times are parsed back into datetimes, as they are when emitted.
+    """
+    events = []
+    with open(path) as tracking_log:
+        for line in tracking_log:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(event, dict) and 'time' in event:
+                try:
+                    event['time'] = datetime.strptime(event['time'][:26], '%Y-%m-%dT%H:%M:%S.%f').replace(tzinfo=UTC)
+                except (TypeError, ValueError):
+                    pass
+            events.append(event)
+    return events
+
+
+def _synthetic_events():
+    """
+    Returns events shaped like those emitted by server_track for requests
+    tracked by the TrackMiddleware and for problem checks, including one
+    too long to be logged in full.
+    """
+    context = {
+        'user_id': 5,
+        'org_id': u'edX',
+        'course_id': u'course-v1:edX+DemoX+Demo_Course',
+        'path': u'/courses/course-v1:edX+DemoX+Demo_Course/courseware',
+        'session': uuid4().hex,
+    }
+    request_event = {
+        'username': u'learner',
+        'ip': u'127.0.0.1',
+        'referer': u'https://example.com/courses/course-v1:edX+DemoX+Demo_Course/info',
+        'accept_language': u'en-US,en;q=0.9',
+        'event_source': u'server',
+        'event_type': u'/courses/course-v1:edX+DemoX+Demo_Course/courseware',
+        'event': json.dumps({'GET': {}, 'POST': {}}),
+        'agent': u'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/60.0 Safari/537.36',
+        'page': None,
+        'time': datetime.now(UTC),
+        'host': u'example.com',
+        'context': context,
+    }
+    problem_check_event = dict(
+        request_event,
+        event_type=u'problem_check',
+        event={
+            'answers': {u'input_{}_2_1'.format(uuid4().hex): u'choice_1'},
+            'attempts': 1,
+            'correct_map': {},
+            'grade': 1,
+            'max_grade': 1,
+            'success': u'correct',
+        },
+    )
+    oversized_event = dict(
+        request_event,
+        event_type=u'problem_check',
+        event={
+            'answers': {u'input_{}_2_1'.format(uuid4().hex): u'A long answer to the question. ' * 2000},
+            'attempts': 1,
+            'correct_map': {},
+            'grade': 0,
+            'max_grade': 1,
+            'state': {
+                'student_answers': {
+                    u'input_{}_2_1'.format(index): u'A long answer to the question. ' * 10
+                    for index in range(2000)
+                },
+                'seed': 1,
+            },
+            'success': u'incorrect',
+        },
+    )
+    return [request_event, problem_check_event, oversized_event]
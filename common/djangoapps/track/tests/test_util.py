@@ -1,10 +1,14 @@
 import json
 from datetime import datetime
+from uuid import UUID
 
 from django.test import TestCase
+from mock import patch
+from opaque_keys.edx.keys import CourseKey
 from pytz import UTC
 
-from track.utils import DateTimeJSONEncoder
+from track import utils
+from track.utils import DateTimeJSONEncoder, dumps_event
 
 
 class TestDateTimeJSONEncoder(TestCase):
@@ -34,3 +38,102 @@ class TestDateTimeJSONEncoder(TestCase):
         self.assertEqual(from_json['a_datetime'], an_iso_datetime)
         self.assertEqual(from_json['a_tz_datetime'], an_iso_datetime)
         self.assertEqual(from_json['a_date'], an_iso_date)
+
+    def test_uuid_and_key_encoding(self):
+        a_uuid = UUID('ed70ffae-f041-4797-8e68-1d9528264132')
+        a_course_key = CourseKey.from_string('course-v1:edX+DemoX+Demo_Course')
+
+        to_json = json.dumps({'uuid': a_uuid, 'course_key': a_course_key}, cls=DateTimeJSONEncoder)
+
+        self.assertEqual(json.loads(to_json), {
+            'uuid': 'ed70ffae-f041-4797-8e68-1d9528264132',
+            'course_key': 'course-v1:edX+DemoX+Demo_Course',
+        })
+
+
+class TestDumpsEvent(TestCase):
+    def _event(self, payload):
+        return {
+            'username': 'test',
+            'event_type': 'problem_check',
+            'time': datetime(2012, 05, 01, 07, 27, 10, 20000, tzinfo=UTC),
+            'event': payload,
+        }
+
+    def _encoded_prefix(self, event):
+        """The encoding of the event up to its payload, which is encoded last."""
+        envelope = dict(event)
+        del envelope['event']
+        return json.dumps(envelope, cls=DateTimeJSONEncoder)[:-1] + ', "event": '
+
+    def _bounded_encoding(self, event, max_length):
+        """The encoding of the event with its payload last, truncated to max_length."""
+        return (self._encoded_prefix(event) + json.dumps(event['event'], cls=DateTimeJSONEncoder))[:max_length]
+
+    def test_small_payload(self):
+        event = self._event({'answer': 1})
+
+        self.assertEqual(dumps_event(event, 50000), json.dumps(event, cls=DateTimeJSONEncoder))
+
+    def test_many_fields(self):
+        payloads = (
+            {'field{}'.format(index): index for index in range(100)},
+            {index: index for index in range(100)},
+            range(100),
+        )
+        for payload in payloads:
+            event = self._event(payload)
+
+            self.assertEqual(dumps_event(event, 50000), json.dumps(event, cls=DateTimeJSONEncoder))
+            self.assertEqual(dumps_event(event, 300), self._bounded_encoding(event, 300))
+
+    def test_truncated_payload(self):
+        event = self._event({'field{}'.format(index): 'x' * 100 for index in range(1000)})
+
+        to_json = dumps_event(event, 1000)
+
+        self.assertEqual(len(to_json), 1000)
+        self.assertEqual(to_json, self._bounded_encoding(event, 1000))
+
+    def test_truncated_nested_values(self):
+        # Shaped like a problem_check event, with few fields but large values
+        event = self._event({
+            'answers': {'input_2_1': u'An answer \u00e9 "quoted"\n' * 5000},
+            'attempts': 1,
+            'grade': 0,
+            'max_grade': 1,
+            'state': {
+                'student_answers': {'input_{}_1'.format(index): ['choice_1', 'choice_2'] for index in range(5000)},
+                'seed': 1,
+            },
+        })
+        event_without_answers = self._event(dict(event['event'], answers={}))
+        string_events = (
+            self._event('x' * 100000),
+            self._event(u'\u00e9' * 100000),
+            self._event({'answer': u'\u00e9' * 100, 'hint': 'x' * 2000}),
+        )
+
+        for event in (event, event_without_answers) + string_events:
+            to_json = dumps_event(event, 1000)
+
+            self.assertEqual(len(to_json), 1000)
+            self.assertEqual(to_json, self._bounded_encoding(event, 1000))
+
+    def test_large_values_not_fully_encoded(self):
+        event = self._event({
+            'answers': 'x' * 100000,
+            'state': {'student_answers': {'input_{}_1'.format(index): 'choice_1' for index in range(5000)}},
+        })
+        encoded_lengths = []
+        encode = utils._EVENT_ENCODER.encode
+
+        def recording_encode(value):
+            encoded = encode(value)
+            encoded_lengths.append(len(encoded))
+            return encoded
+
+        with patch.object(utils._EVENT_ENCODER, 'encode', side_effect=recording_encode):
+            dumps_event(event, 1000)
+
+        self.assertLess(sum(encoded_lengths), 2000)
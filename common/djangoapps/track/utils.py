@@ -2,7 +2,9 @@
 
 import json
 from datetime import date, datetime
+from uuid import UUID
 
+from opaque_keys import OpaqueKey
 from pytz import UTC
 
 
@@ -13,18 +15,130 @@ class DateTimeJSONEncoder(json.JSONEncoder):
         """
         Serialize datetime and date objects of iso format.
 
-        datatime objects are converted to UTC.
+        datatime objects are converted to UTC.  UUIDs and opaque keys are
+        serialized as strings.
         """
 
         if isinstance(obj, datetime):
             if obj.tzinfo is None:
                 # Localize to UTC naive datetime objects
                 obj = UTC.localize(obj)
-            else:
+            elif obj.tzinfo is not UTC:
                 # Convert to UTC datetime objects from other timezones
                 obj = obj.astimezone(UTC)
             return obj.isoformat()
         elif isinstance(obj, date):
             return obj.isoformat()
+        elif isinstance(obj, (UUID, OpaqueKey)):
+            return unicode(obj)
 
         return super(DateTimeJSONEncoder, self).default(obj)
+
+
+# Shared by all events, rather than json.dumps creating an encoder for each.
+_EVENT_ENCODER = DateTimeJSONEncoder()
+
+
+def dumps_event(event, max_length):
+    """
+    Serialize an event to JSON with DateTimeJSONEncoder, truncated to
+    max_length characters.
+
+    An "event" payload that is too long to be logged in full is encoded after
+    the rest of the event, a piece at a time, stopping once max_length is
+    reached, so that oversized events aren't fully encoded only to be
+    truncated.
+    """
+    payload = event.get('event') if isinstance(event, dict) else None
+    if payload is None or _is_shorter_than(payload, max_length):
+        return _EVENT_ENCODER.encode(event)[:max_length]
+
+    envelope = dict(event)
+    del envelope['event']
+    prefix = _EVENT_ENCODER.encode(envelope)[:-1] + (', "event": ' if envelope else '"event": ')
+    return (prefix + _encode_bounded(payload, max_length - len(prefix)) + '}')[:max_length]
+
+
+def _is_shorter_than(value, max_length):
+    """
+    Returns whether the encoding of the value may be shorter than max_length,
+    from a lower bound of its length that stops being computed once it
+    reaches max_length.
+    """
+    length = 0
+    values = [value]
+    while values:
+        value = values.pop()
+        value_type = type(value)
+        if value_type is unicode or value_type is str:
+            length += len(value) + 2
+        elif value_type is dict:
+            # At least '"": ' and ', ' for each item, not counting the keys themselves
+            length += 6 * len(value)
+            values.extend(value.itervalues())
+        elif value_type is list or value_type is tuple:
+            length += 2 * len(value)
+            values.extend(value)
+        elif isinstance(value, (basestring, dict, list, tuple)):
+            # Subclasses are rare, and only counted as their own encoding
+            length += len(_EVENT_ENCODER.encode(value))
+        else:
+            length += 1
+        if length >= max_length:
+            return False
+    return True
+
+
+def _encode_bounded(value, max_length):
+    """
+    Encode the value, stopping once the encoding is at least max_length
+    characters long, in which case it is the start of the full encoding.
+
+    Dicts and lists are encoded a field at a time, and long strings only up to
+    max_length characters.
+    """
+    max_length = max(max_length, 0)
+    if isinstance(value, basestring):
+        if len(value) > max_length and isinstance(value, str):
+            # Sliced as text, rather than in the middle of a UTF-8 character
+            value = value.decode('utf-8')
+        if len(value) <= max_length:
+            return _EVENT_ENCODER.encode(value)
+        # Without its closing quote, as the rest of the string was cut off
+        return _EVENT_ENCODER.encode(value[:max_length])[:-1]
+
+    if not isinstance(value, (dict, list, tuple)) or _is_shorter_than(value, max_length):
+        return _EVENT_ENCODER.encode(value)
+
+    if isinstance(value, dict):
+        start, end = '{', '}'
+        fields = ((_encode_key(key) + ': ', item) for key, item in value.iteritems())
+    else:
+        start, end = '[', ']'
+        fields = (('', item) for item in value)
+
+    parts = [start]
+    length = 1
+    for field_start, item in fields:
+        if length > 1:
+            parts.append(', ')
+            length += 2
+        parts.append(field_start)
+        length += len(field_start)
+        encoded_item = _encode_bounded(item, max_length - length)
+        parts.append(encoded_item)
+        length += len(encoded_item)
+        if length >= max_length:
+            return ''.join(parts)
+    parts.append(end)
+    return ''.join(parts)
+
+
+def _encode_key(key):
+    """
+    Encode the key of a dict, which the encoder converts to a string if it
+    isn't one.
+    """
+    if isinstance(key, basestring):
+        return _EVENT_ENCODER.encode(key)
+    return _EVENT_ENCODER.encode({key: None})[1:-len(': null}')]
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Commandline tool comparing the throughput of formula checks with and without
+compiled expressions.
+
+A FormulaResponse check evaluates both the student's and the instructor's
+formula once for each random sample of the problem's variables. This times
+that work when every sample parses the formulas again (as `evaluator` did
+before expressions were compiled), and when they are compiled once.
+
+Example usage:
+    $ python -m calc.benchmark
+    $ python -m calc.benchmark --samples 50 --iterations 200
+"""
+import argparse
+import random
+import timeit
+
+from calc import CompiledExpression, clear_compiled_expressions, compile_expression
+
+# (student formula, instructor formula) pairs, of the kind found in courses.
+FORMULAS = (
+    ('2*x - x + y + y', 'x+2*y'),
+    ('sqrt(x^2 + y^2) / (R1 || R2)', 'sqrt(y^2 + x^2) * (1/R1 + 1/R2)'),
+    ('sin(x)^2 + cos(x)^2 + 3.5k*y', '1 + 3500*y'),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark formula checks')
+    parser.add_argument("--samples", required=False, default=20, type=int,
+                        help="Number of variable samples per check.")
+    parser.add_argument("--iterations", required=False, default=100, type=int,
+                        help="Number of timed checks per formula pair.")
+    args = parser.parse_args()
+
+    samples = [
+        {'x': random.uniform(-10, 10), 'y': random.uniform(-10, 10),
+         'R1': random.uniform(1, 10), 'R2': random.uniform(1, 10)}
+        for _ in range(args.samples)
+    ]
+
+    print "{} samples per check:".format(args.samples)
+    for student, instructor in FORMULAS:
+        parsed_per_sample = timeit.timeit(
+            lambda: [check_parsed_per_sample(formula, samples) for formula in (student, instructor)],
+            number=args.iterations,
+        )
+
+        clear_compiled_expressions()
+        compiled = timeit.timeit(
+            lambda: [check_compiled(formula, samples) for formula in (student, instructor)],
+            number=args.iterations,
+        )
+
+        print "  {:<32} parsed per sample: {:8.1f} checks/s  compiled: {:8.1f} checks/s".format(
+            student,
+            args.iterations / parsed_per_sample,
+            args.iterations / compiled,
+        )
+
+
+def check_parsed_per_sample(formula, samples):
+    """
+    Evaluate the formula for each sample, parsing it every time.
+    """
+    return [CompiledExpression(formula).evaluate(sample, {}) for sample in samples]
+
+
+def check_compiled(formula, samples):
+    """
+    Evaluate the formula for all samples with its cached compiled expression.
+    """
+    return compile_expression(formula).evaluate_many(samples, {})
+
+
+if __name__ == '__main__':
+    main()
@@ -2,11 +2,15 @@
 Parser and evaluator for FormulaResponse and NumericalResponse
 
 Uses pyparsing to parse. Main function as of now is evaluator().
+Expressions that are evaluated repeatedly should use compile_expression(),
+which parses each expression once.
 """
 
 import math
 import numbers
 import operator
+from collections import OrderedDict
+from threading import Lock
 
 import numpy
 import scipy.constants
@@ -87,6 +91,10 @@ SUFFIXES = {
 }
 
 
+# Maximum number of compiled expressions kept by compile_expression().
+COMPILED_EXPRESSION_CACHE_SIZE = 1000
+
+
 class UndefinedVariable(Exception):
     """
     Indicate when a student inputs a variable which was not expected.
@@ -238,38 +246,140 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
      python numbers.
     -Unary functions are passed as a dictionary from string to function.
     """
-    # No need to go further.
-    if math_expr.strip() == "":
-        return float('nan')
+    return compile_expression(math_expr, case_sensitive).evaluate(variables, functions)
 
-    # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
 
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
+_compiled_expressions = OrderedDict()  # pylint: disable=invalid-name
+_compiled_expressions_lock = Lock()  # pylint: disable=invalid-name
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
 
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
-
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
-
-    return math_interpreter.reduce_tree(evaluate_actions)
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Return a `CompiledExpression` for the given string of math.
+
+    Compiled expressions are kept in a least-recently-used cache of at most
+    COMPILED_EXPRESSION_CACHE_SIZE entries, keyed on the expression and its
+    case sensitivity. Expressions that fail to parse are not cached.
+    """
+    cache_key = (math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        compiled = _compiled_expressions.pop(cache_key, None)
+        if compiled is not None:
+            _compiled_expressions[cache_key] = compiled
+            return compiled
+
+    compiled = CompiledExpression(math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        _compiled_expressions[cache_key] = compiled
+        while len(_compiled_expressions) > COMPILED_EXPRESSION_CACHE_SIZE:
+            _compiled_expressions.popitem(last=False)
+    return compiled
+
+
+def clear_compiled_expressions():
+    """
+    Empty the cache of compiled expressions.
+    """
+    with _compiled_expressions_lock:
+        _compiled_expressions.clear()
+
+
+class CompiledExpression(object):
+    """
+    A math expression, parsed once and evaluable for any number of variables.
+
+    The parse tree is turned into a tree of closures, so evaluating doesn't
+    touch pyparsing at all. Instances are never modified after creation, and
+    so may be shared between threads.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        """
+        Parse `math_expr`; raise a `pyparsing.ParseException` if it is invalid.
+        """
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+
+        self._interpreter = ParseAugmenter(math_expr, case_sensitive)
+        if math_expr.strip() == "":
+            # No need to go further.
+            self._evaluate = lambda variables, functions: float('nan')
+        else:
+            self._interpreter.parse_algebra()
+            if case_sensitive:
+                casify = lambda x: x
+            else:
+                casify = lambda x: x.lower()  # Lowercase for case insens.
+            self._evaluate = _compile_node(self._interpreter.tree, casify)
+
+    def evaluate(self, variables, functions):
+        """
+        Evaluate the expression with the given variables and functions.
+
+        Arguments are as in `evaluator`.
+        """
+        return self.evaluate_many([variables], functions)[0]
+
+    def evaluate_many(self, variables_list, functions):
+        """
+        Evaluate the expression once for each of the `variables_list` dicts.
+
+        The default variables and the `functions` are merged only once, so
+        this is cheaper than calling `evaluate` for each dict. Return a list
+        of results in the order of `variables_list`.
+        """
+        all_variables, all_functions = add_defaults({}, functions, self.case_sensitive)
+
+        results = []
+        for variables in variables_list:
+            if not self.case_sensitive:
+                variables = lower_dict(variables)
+            sample_variables = dict(all_variables)
+            sample_variables.update(variables)
+
+            self._interpreter.check_variables(sample_variables, all_functions)
+            results.append(self._evaluate(sample_variables, all_functions))
+        return results
+
+
+EVALUATE_ACTIONS = {
+    'atom': eval_atom,
+    'power': eval_power,
+    'parallel': eval_parallel,
+    'product': eval_product,
+    'sum': eval_sum
+}
+
+
+def _compile_node(node, casify):
+    """
+    Return a function of (variables, functions) evaluating the parse `node`.
+
+    Numbers are converted once, here, rather than on every evaluation.
+    """
+    if not isinstance(node, ParseResults):
+        # Then treat it as a terminal node.
+        return lambda variables, functions: node
+
+    node_name = node.getName()
+    if node_name == 'number':
+        value = eval_number(node)
+        return lambda variables, functions: value
+
+    if node_name == 'variable':
+        variable_name = casify(node[0])
+        return lambda variables, functions: variables[variable_name]
+
+    if node_name == 'function':
+        function_name = casify(node[0])
+        argument = _compile_node(node[1], casify)
+        return lambda variables, functions: functions[function_name](argument(variables, functions))
+
+    if node_name not in EVALUATE_ACTIONS:  # pragma: no cover
+        raise Exception(u"Unknown branch name '{}'".format(node_name))
+
+    action = EVALUATE_ACTIONS[node_name]
+    kids = [_compile_node(kid, casify) for kid in node]
+    return lambda variables, functions: action([kid(variables, functions) for kid in kids])
 
 
 class ParseAugmenter(object):
@@ -5,6 +5,7 @@ Unit tests for calc.py
 import unittest
 import numpy
 import calc
+from mock import patch
 from pyparsing import ParseException
 
 # numpy's default behavior when it evaluates a function outside its domain
@@ -559,3 +560,72 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+
+class CompiledExpressionTest(unittest.TestCase):
+    """
+    Run tests for calc.compile_expression and calc.CompiledExpression
+    """
+
+    def setUp(self):
+        super(CompiledExpressionTest, self).setUp()
+        calc.clear_compiled_expressions()
+        self.addCleanup(calc.clear_compiled_expressions)
+
+    def test_cached(self):
+        """
+        Compiling the same expression twice should only parse it once
+        """
+        compiled = calc.compile_expression('x^2 + 1')
+        self.assertIs(compiled, calc.compile_expression('x^2 + 1'))
+        self.assertIsNot(compiled, calc.compile_expression('x^2 + 1', case_sensitive=True))
+
+    def test_cache_size(self):
+        """
+        The least recently used expressions should be evicted
+        """
+        with patch('calc.calc.COMPILED_EXPRESSION_CACHE_SIZE', 2):
+            first = calc.compile_expression('1+x')
+            second = calc.compile_expression('2+x')
+            self.assertIs(first, calc.compile_expression('1+x'))
+            calc.compile_expression('3+x')
+            self.assertIs(first, calc.compile_expression('1+x'))
+            self.assertIsNot(second, calc.compile_expression('2+x'))
+
+    def test_parse_error_not_cached(self):
+        """
+        Invalid expressions should raise every time they are compiled
+        """
+        for _ in range(2):
+            with self.assertRaises(ParseException):
+                calc.compile_expression('1+.')
+
+    def test_evaluate_many(self):
+        """
+        Evaluating many variable dicts should match evaluating each one
+        """
+        variables_list = [{'x': 1.0, 'Y': 2.0}, {'x': -3.0, 'Y': 0.5}, {'x': 10.0, 'Y': 4.0}]
+        functions = {'f': lambda x: x * 3}
+        math_expr = 'f(x)^2 / y + 5k || pi'
+        compiled = calc.compile_expression(math_expr)
+        self.assertEqual(
+            compiled.evaluate_many(variables_list, functions),
+            [calc.evaluator(variables, functions, math_expr) for variables in variables_list]
+        )
+        self.assertEqual(compiled.evaluate_many([], functions), [])
+
+    def test_evaluate_blank(self):
+        """
+        A blank expression should evaluate to NaN, like in evaluator
+        """
+        results = calc.compile_expression('  ').evaluate_many([{}, {'x': 1}], {})
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(numpy.isnan(result) for result in results))
+
+    def test_evaluate_many_undefined_vars(self):
+        """
+        Every variable dict should be checked for undefined variables
+        """
+        compiled = calc.compile_expression('x + y')
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'y'):
+            compiled.evaluate_many([{'x': 1, 'y': 2}, {'x': 1}], {})
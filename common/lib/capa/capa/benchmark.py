@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""
+Commandline tool comparing the latency of capa problem requests with and
+without problem templates.
+
+Each request for a problem loads its LoncapaProblem from the problem's
+definition and the student's state, so rendering a problem (as
+`get_problem_html` does) constructs a LoncapaProblem and renders it, and
+submitting it (as `submit_problem` does) constructs one, grades the answers,
+and renders it again.  This times both on a large multi-part problem when the
+problem is parsed for every request (as it was before problem templates were
+cached), and when it is parsed once.
+
+Example usage:
+    $ python -m capa.benchmark
+    $ python -m capa.benchmark --parts 100 --iterations 50
+"""
+import argparse
+import timeit
+
+from capa.capa_problem import LoncapaProblem, clear_problem_templates
+from capa.tests.helpers import mock_capa_module, test_capa_system
+
+# The parts of the problem, repeated as many times as needed.
+PARTS = (
+    """
+    <p>Which of the following is a fruit?</p>
+    <multiplechoiceresponse>
+        <label>Select the fruit</label>
+        <description>Only one is a fruit.</description>
+        <choicegroup type="MultipleChoice" shuffle="true">
+            <choice correct="false">Carrot</choice>
+            <choice correct="true">Apple</choice>
+            <choice correct="false">Potato</choice>
+            <choice correct="false">Onion</choice>
+        </choicegroup>
+    </multiplechoiceresponse>
+    """,
+    """
+    <optionresponse>
+        <label>What color is the sky?</label>
+        <optioninput options="('yellow','blue','green')" correct="blue"/>
+    </optionresponse>
+    """,
+    """
+    <stringresponse answer="Paris" type="ci">
+        <label>What is the capital of France?</label>
+        <additional_answer answer="Paris, France"/>
+        <textline size="20"/>
+    </stringresponse>
+    """,
+    """
+    <numericalresponse answer="9.81">
+        <label>What is the acceleration of gravity, in m/s^2?</label>
+        <responseparam type="tolerance" default="1%"/>
+        <formulaequationinput/>
+    </numericalresponse>
+    """,
+    """
+    <choiceresponse>
+        <label>Which of these are prime?</label>
+        <checkboxgroup>
+            <choice correct="true">2</choice>
+            <choice correct="true">3</choice>
+            <choice correct="false">4</choice>
+        </checkboxgroup>
+    </choiceresponse>
+    """,
+)
+
+# Answers to each of the parts, by their index.
+ANSWERS = ('choice_1', 'blue', 'paris', '9.8', ['choice_0', 'choice_1'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark capa problem requests')
+    parser.add_argument("--parts", required=False, default=50, type=int,
+                        help="Number of parts of the problem.")
+    parser.add_argument("--iterations", required=False, default=20, type=int,
+                        help="Number of timed requests of each kind.")
+    args = parser.parse_args()
+
+    problem_text = "<problem>{}</problem>".format(
+        "".join(PARTS[index % len(PARTS)] for index in range(args.parts))
+    )
+    answers = {
+        "1_{}_1".format(index + 2): ANSWERS[index % len(ANSWERS)]
+        for index in range(args.parts)
+    }
+    capa_system = test_capa_system()
+    capa_module = mock_capa_module()
+    seeds = iter(range(1000000))
+
+    def get_problem_html():
+        """
+        Load the problem for a new student, and render it.
+        """
+        problem = LoncapaProblem(problem_text, '1', capa_system, capa_module, seed=next(seeds))
+        problem.get_html()
+
+    def submit_problem():
+        """
+        Load the problem for a new student, grade their answers, and render it.
+        """
+        problem = LoncapaProblem(problem_text, '1', capa_system, capa_module, seed=next(seeds))
+        problem.grade_answers(answers)
+        problem.get_html()
+
+    print "Problem with {} parts:".format(args.parts)
+    for name, request in (('get_problem_html', get_problem_html), ('submit_problem', submit_problem)):
+        parsed_per_request = timeit.timeit(
+            lambda: [clear_problem_templates(), request()],
+            number=args.iterations,
+        )
+
+        clear_problem_templates()
+        parsed_once = timeit.timeit(request, number=args.iterations)
+
+        print "  {:<18} parsed per request: {:8.1f} ms  parsed once: {:8.1f} ms".format(
+            name,
+            parsed_per_request * 1000.0 / args.iterations,
+            parsed_once * 1000.0 / args.iterations,
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -13,12 +13,14 @@ Main module which shows problems (of "capa" type).
 This is used by capa_module.
 """
 
+import hashlib
 import logging
 import os.path
 import re
 from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
+from threading import Lock
 from xml.sax.saxutils import unescape
 
 from lxml import etree
@@ -71,6 +73,20 @@ html_problem_semantics = [
 
 log = logging.getLogger(__name__)
 
+# The number of problem templates kept by each process (see LoncapaProblem._get_problem_template).
+PROBLEM_TEMPLATE_CACHE_SIZE = 200
+
+_problem_templates = OrderedDict()  # pylint: disable=invalid-name
+_problem_templates_lock = Lock()  # pylint: disable=invalid-name
+
+
+def clear_problem_templates():
+    """
+    Empty the cache of problem templates.
+    """
+    with _problem_templates_lock:
+        _problem_templates.clear()
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -176,13 +192,9 @@ class LoncapaProblem(object):
         problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
         self.problem_text = problem_text
 
-        # parse problem XML file into an element tree
-        self.tree = etree.XML(problem_text)
-
-        self.make_xml_compatible(self.tree)
-
-        # handle any <include file="foo"> tags
-        self._process_includes()
+        # parse problem XML file into an element tree, with IDs and a11y data
+        # added to its responses and inputs, and any <include file="foo"> tags handled
+        self.tree, self.problem_data = self._get_problem_template(problem_text)
 
         # construct script processor context (eg for customresponse problems)
         if minimal_init:
@@ -190,11 +202,10 @@ class LoncapaProblem(object):
         else:
             self.context = self._extract_context(self.tree)
 
-        # Pre-parse the XML tree: modifies it to add ID's and perform some in-place
-        # transformations.  This also creates the dict (self.responders) of Response
+        # Pre-parse the XML tree: this creates the dict (self.responders) of Response
         # instances for each question in the problem. The dict has keys = xml subtree of
         # Response, values = Response instance
-        self.problem_data = self._preprocess_problem(self.tree, minimal_init)
+        self._preprocess_problem(self.tree, minimal_init)
 
         if not minimal_init:
             if not self.student_answers:  # True when student_answers is an empty dict
@@ -604,12 +615,52 @@ class LoncapaProblem(object):
 
     # ======= Private Methods Below ========
 
-    def _process_includes(self):
+    def _get_problem_template(self, problem_text):
+        """
+        Returns the element tree of the problem, with IDs added to its
+        responses and inputs, and the a11y data of its inputs (see
+        `_preprocess_problem_structure`).
+
+        None of this depends on the seed or the student, so it is only done
+        once for each problem definition in a process, and kept in a
+        least-recently-used cache of at most PROBLEM_TEMPLATE_CACHE_SIZE
+        templates, keyed on the problem ID and text.  Each LoncapaProblem gets
+        its own copy, which it is free to modify.  Problems with <include>s
+        aren't cached, as the included files may change.
+        """
+        if isinstance(problem_text, unicode):
+            digest = hashlib.md5(problem_text.encode('utf-8')).hexdigest()
+        else:
+            digest = hashlib.md5(problem_text).hexdigest()
+        cache_key = (self.problem_id, digest)
+        with _problem_templates_lock:
+            template = _problem_templates.pop(cache_key, None)
+            if template is not None:
+                _problem_templates[cache_key] = template
+
+        if template is None:
+            tree = etree.XML(problem_text)
+            self.make_xml_compatible(tree)
+
+            has_includes = self._process_includes(tree)
+            template = (tree, self._preprocess_problem_structure(tree))
+            if not has_includes:
+                with _problem_templates_lock:
+                    _problem_templates[cache_key] = template
+                    while len(_problem_templates) > PROBLEM_TEMPLATE_CACHE_SIZE:
+                        _problem_templates.popitem(last=False)
+
+        tree, problem_data = template
+        return deepcopy(tree), deepcopy(problem_data)
+
+    def _process_includes(self, tree):
         """
         Handle any <include file="foo"> tags by reading in the specified file and inserting it
-        into our XML tree.  Fail gracefully if debugging.
+        into the XML tree.  Fail gracefully if debugging.
+
+        Returns whether the tree had any <include> tags.
         """
-        includes = self.tree.findall('.//include')
+        includes = tree.findall('.//include')
         for inc in includes:
             filename = inc.get('file')
             if filename is not None:
@@ -654,6 +705,8 @@ class LoncapaProblem(object):
                 parent.remove(inc)
                 log.debug('Included %s into %s', filename, self.problem_id)
 
+        return bool(includes)
+
     def _extract_system_path(self, script):
         """
         Extracts and normalizes additional paths for code execution.
@@ -867,20 +920,16 @@ class LoncapaProblem(object):
 
         return tree
 
-    def _preprocess_problem(self, tree, minimal_init):  # private
+    def _preprocess_problem_structure(self, tree):  # private
         """
         Assign IDs to all the responses
         Assign sub-IDs to all entries (textline, schematic, etc.)
-        Annoted correctness and value
         In-place transformation
 
-        Also create capa Response instances for each responsetype and save as self.responders
-
-        Obtain all responder answers and save as self.responder_answers dict (key = response)
+        Returns the a11y data of the inputs (see `response_a11y_data`).
         """
         response_id = 1
         problem_data = {}
-        self.responders = {}
         for response in tree.xpath('//' + "|//".join(responsetypes.registry.registered_tags())):
             responsetype_id = self.problem_id + "_" + str(response_id)
             # create and save ID for this response
@@ -888,11 +937,7 @@ class LoncapaProblem(object):
             response_id += 1
 
             answer_id = 1
-            input_tags = inputtypes.registry.registered_tags()
-            inputfields = tree.xpath(
-                "|".join(['//' + response.tag + '[@id=$id]//' + x for x in input_tags]),
-                id=responsetype_id
-            )
+            inputfields = self._get_inputfields(tree, response)
 
             # assign one answer_id for each input type
             for entry in inputfields:
@@ -903,6 +948,30 @@ class LoncapaProblem(object):
 
             self.response_a11y_data(response, inputfields, responsetype_id, problem_data)
 
+        return problem_data
+
+    def _get_inputfields(self, tree, response):  # private
+        """
+        Returns the input elements of the response.
+        """
+        input_tags = inputtypes.registry.registered_tags()
+        return tree.xpath(
+            "|".join(['//' + response.tag + '[@id=$id]//' + x for x in input_tags]),
+            id=response.get('id')
+        )
+
+    def _preprocess_problem(self, tree, minimal_init):  # private
+        """
+        Create capa Response instances for each responsetype and save as self.responders
+
+        Obtain all responder answers and save as self.responder_answers dict (key = response)
+
+        The tree must already have been given IDs by `_preprocess_problem_structure`.
+        """
+        self.responders = {}
+        for response in tree.xpath('//' + "|//".join(responsetypes.registry.registered_tags())):
+            inputfields = self._get_inputfields(tree, response)
+
             # instantiate capa Response
             responsetype_cls = responsetypes.registry.get_class_for_tag(response.tag)
             responder = responsetype_cls(
@@ -931,8 +1000,6 @@ class LoncapaProblem(object):
                 solution.attrib['id'] = "%s_solution_%i" % (self.problem_id, solution_id)
                 solution_id += 1
 
-        return problem_data
-
     def response_a11y_data(self, response, inputfields, responsetype_id, problem_data):
         """
         Construct data to be used for a11y.
@@ -1026,3 +1093,52 @@ class LoncapaProblem(object):
                 'label': HTML(label.strip()) if label else '',
                 'descriptions': descriptions
             }
+
+
+def get_grades_from_current_answers(problems):
+    """
+    Gets the grades for the currently-saved states of many problems, such as
+    those of many students with the same problem definition, but does not save
+    them to the problems.
+
+    This grades each problem like `get_grade_from_current_answers(None)`, as
+    for rescoring, but the same response in all of the problems is evaluated
+    at once, so that response types can evaluate their answers together (see
+    LoncapaResponse.evaluate_answers_many).  Custom responses, for instance,
+    execute their check functions for all of the problems in one sandbox
+    execution, rather than one each.
+
+    Returns a list with the new CorrectMap of each problem, or the
+    `sys.exc_info()` of the exception raised while grading it.
+    """
+    results = [CorrectMap() for __ in problems]
+
+    # The responders of each response, with the index of their problem.
+    responses = OrderedDict()
+    for index, problem in enumerate(problems):
+        for responder in problem.responders.values():
+            # As in `get_grade_from_current_answers`, file submissions can't be rescored.
+            if 'filesubmission' in responder.allowed_inputfields:
+                _ = problem.capa_system.i18n.ugettext
+                error = Exception(_(u"Cannot rescore problems with possible file submissions"))
+                results[index] = (type(error), error, None)
+            responses.setdefault((type(responder), responder.id), []).append((index, responder))
+
+    for (responsetype_cls, __), responders in responses.items():
+        responders = [
+            (index, responder) for index, responder in responders if isinstance(results[index], CorrectMap)
+        ]
+        if not responders:
+            continue
+        new_cmaps = responsetype_cls.evaluate_answers_many(
+            [responder for __, responder in responders],
+            [problems[index].student_answers for index, __ in responders],
+            [problems[index].correct_map for index, __ in responders],
+        )
+        for (index, __), new_cmap in zip(responders, new_cmaps):
+            if isinstance(new_cmap, tuple):
+                results[index] = new_cmap
+            else:
+                results[index].update(new_cmap)
+
+    return results
@@ -25,7 +25,7 @@ import sys
 import textwrap
 import traceback
 import xml.sax.saxutils as saxutils
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 from datetime import datetime
 from sys import float_info
 
@@ -42,7 +42,7 @@ import capa.safe_exec as safe_exec
 import capa.xqueue_interface as xqueue_interface
 import dogstats_wrapper as dog_stats_api
 # specific library imports
-from calc import UndefinedVariable, evaluator
+from calc import UndefinedVariable, compile_expression, evaluator
 from cmath import isnan
 from openedx.core.djangolib.markup import HTML, Text
 
@@ -313,6 +313,27 @@ class LoncapaResponse(object):
             student_answers), new_cmap, old_cmap)
         return new_cmap
 
+    @classmethod
+    def evaluate_answers_many(cls, responses, student_answers_list, old_cmaps):
+        """
+        Called by capa_problem.get_grades_from_current_answers to evaluate the
+        student answers to many responses of this type, such as the same
+        response in many students' problems, with `evaluate_answers`.
+
+        Response types can override this to evaluate the answers together.
+
+        Returns a list with the new CorrectMap of each response, or the
+        `sys.exc_info()` of the exception raised while evaluating its answers,
+        so that it can be raised again with its traceback.
+        """
+        results = []
+        for response, student_answers, old_cmap in zip(responses, student_answers_list, old_cmaps):
+            try:
+                results.append(response.evaluate_answers(student_answers, old_cmap))
+            except Exception:  # pylint: disable=broad-except
+                results.append(sys.exc_info())
+        return results
+
     def make_hint_div(self, hint_node, correct, student_answer, question_tag,
                       label=None, hint_log=None, multiline_mode=False, log_extra=None):
         """
@@ -2090,6 +2111,7 @@ class CustomResponse(LoncapaResponse):
                            'designprotein2dinput', 'editageneinput',
                            'annotationinput', 'jsinput', 'formulaequationinput']
     code = None
+    cfn = None
     expect = None
 
     # Standard amount for partial credit if not otherwise specified:
@@ -2125,31 +2147,22 @@ class CustomResponse(LoncapaResponse):
                 # can't get functions from previous executions.  So we make an
                 # actual function that will re-execute the original script,
                 # and invoke the function with the data needed.
-                def make_check_function(script_code, cfn):
-                    def check_function(expect, ans, **kwargs):
-                        extra_args = "".join(", {0}={0}".format(k) for k in kwargs)
-                        code = (
-                            script_code + "\n" +
-                            "cfn_return = %s(expect, ans%s)\n" % (cfn, extra_args)
-                        )
-                        globals_dict = {
-                            'expect': expect,
-                            'ans': ans,
-                        }
-                        globals_dict.update(kwargs)
-                        safe_exec.safe_exec(
-                            code,
-                            globals_dict,
-                            python_path=self.context['python_path'],
-                            extra_files=self.context['extra_files'],
-                            slug=self.id,
-                            random_seed=self.context['seed'],
-                            unsafely=self.capa_system.can_execute_unsafe_code(),
-                        )
-                        return globals_dict['cfn_return']
-                    return check_function
+                self.cfn = cfn
+
+                def check_function(expect, ans, **kwargs):
+                    code, globals_dict = self.get_cfn_execution(expect, ans, kwargs)
+                    safe_exec.safe_exec(
+                        code,
+                        globals_dict,
+                        python_path=self.context['python_path'],
+                        extra_files=self.context['extra_files'],
+                        slug=self.id,
+                        random_seed=self.context['seed'],
+                        unsafely=self.capa_system.can_execute_unsafe_code(),
+                    )
+                    return globals_dict['cfn_return']
 
-                self.code = make_check_function(self.context['script_code'], cfn)
+                self.code = check_function
 
         if not self.code:
             if answer is None:
@@ -2169,10 +2182,100 @@ class CustomResponse(LoncapaResponse):
         student_answers is a dict with everything from request.POST, but with the first part
         of each key removed (the string before the first "_").
         """
-        _ = self.capa_system.i18n.ugettext
-
         log.debug('%s: student_answers=%s', unicode(self), student_answers)
 
+        idset, submission = self._get_submission(student_answers)
+
+        empty_correct_map = self._get_empty_correct_map(idset, submission)
+        if empty_correct_map is not None:
+            return empty_correct_map
+
+        self._set_check_context(student_answers, idset, submission)
+
+        # Run the check function
+        self.execute_check_function(idset, submission)
+
+        return self._get_correct_map(idset)
+
+    @classmethod
+    def evaluate_answers_many(cls, responses, student_answers_list, old_cmaps):
+        """
+        Evaluates the student answers to many custom responses, like
+        LoncapaResponse.evaluate_answers_many, but executes the check functions
+        of the responses that run in the sandbox together, with one call to
+        safe_exec_many for each check script.
+        """
+        results = [None] * len(responses)
+
+        # The check executions of each check script, keyed by everything the
+        # sandbox executes it with except for the globals and the seed.
+        executions = OrderedDict()
+        for index, (response, student_answers) in enumerate(zip(responses, student_answers_list)):
+            try:
+                idset, submission = response._get_submission(student_answers)
+                results[index] = response._get_empty_correct_map(idset, submission)
+                if results[index] is not None:
+                    continue
+
+                response._set_check_context(student_answers, idset, submission)
+                execution = response.get_check_execution(idset, submission)
+                if execution is None:
+                    response.execute_check_function(idset, submission)
+                    results[index] = response._get_correct_map(idset)
+                    continue
+            except Exception:  # pylint: disable=broad-except
+                results[index] = sys.exc_info()
+                continue
+
+            code, globals_dict = execution
+            key = (
+                code,
+                tuple(response.context['python_path']),
+                tuple(tuple(extra_file) for extra_file in response.context['extra_files'] or []),
+                response.capa_system.can_execute_unsafe_code(),
+            )
+            executions.setdefault(key, []).append((index, idset, globals_dict))
+
+        for (code, python_path, extra_files, unsafely), checks in executions.items():
+            first_response = responses[checks[0][0]]
+            errors = safe_exec.safe_exec_many(
+                code,
+                [check_globals for __, __, check_globals in checks],
+                [responses[check_index].context['seed'] for check_index, __, __ in checks],
+                python_path=list(python_path),
+                extra_files=list(extra_files) or None,
+                # As in `execute_check_function`, only <answer> scripts are cached.
+                cache=first_response.capa_system.cache if first_response.cfn is None else None,
+                slug=first_response.id,
+                unsafely=unsafely,
+            )
+            for (index, idset, globals_dict), error in zip(checks, errors):
+                response = responses[index]
+                try:
+                    if error is not None:
+                        response._handle_exec_exception(error)
+                    if response.cfn is not None:
+                        response._apply_check_function_return(idset, globals_dict['cfn_return'])
+                    results[index] = response._get_correct_map(idset)
+                except Exception:  # pylint: disable=broad-except
+                    results[index] = sys.exc_info()
+
+        for index, (response, student_answers, old_cmap) in enumerate(zip(responses, student_answers_list, old_cmaps)):
+            if isinstance(results[index], CorrectMap):
+                try:
+                    response.get_hints(convert_files_to_filenames(student_answers), results[index], old_cmap)
+                except Exception:  # pylint: disable=broad-except
+                    results[index] = sys.exc_info()
+
+        return results
+
+    def _get_submission(self, student_answers):
+        """
+        Returns the ordered list of the ids of the inputs of this response,
+        and the ordered list of the student's answers to them.
+        """
+        _ = self.capa_system.i18n.ugettext
+
         # ordered list of answer id's
         # sort the responses on the bases of the problem's position number
         # which can be found in the last place in the problem id. Then convert
@@ -2198,9 +2301,14 @@ class CustomResponse(LoncapaResponse):
             )
             raise Exception(msg)
 
-        # global variable in context which holds the Presentation MathML from dynamic math input
-        # ordered list of dynamath responses
-        dynamath = [student_answers.get(k + '_dynamath', None) for k in idset]
+        return idset, submission
+
+    def _get_empty_correct_map(self, idset, submission):
+        """
+        Returns the CorrectMap for an empty answer, which isn't evaluated, or
+        None if the answer isn't empty.
+        """
+        _ = self.capa_system.i18n.ugettext
 
         # if there is only one box, and it's empty, then don't evaluate
         if len(idset) == 1 and not submission[0]:
@@ -2210,6 +2318,16 @@ class CustomResponse(LoncapaResponse):
             msg = (u'<span class="inline-error">{0}</span>'.format(_(u'No answer entered!'))
                    if self.xml.get('empty_answer_err') else '')
             return CorrectMap(idset[0], 'incorrect', msg=msg)
+        return None
+
+    def _set_check_context(self, student_answers, idset, submission):
+        """
+        Puts the student's answers, and the lists for the check function to
+        fill in, in the context of the check function.
+        """
+        # global variable in context which holds the Presentation MathML from dynamic math input
+        # ordered list of dynamath responses
+        dynamath = [student_answers.get(k + '_dynamath', None) for k in idset]
 
         # NOTE: correct = 'unknown' could be dangerous. Inputtypes such as textline are
         # not expecting 'unknown's
@@ -2256,9 +2374,10 @@ class CustomResponse(LoncapaResponse):
         # Pass DEBUG to the check function.
         self.context['debug'] = self.capa_system.DEBUG
 
-        # Run the check function
-        self.execute_check_function(idset, submission)
-
+    def _get_correct_map(self, idset):
+        """
+        Returns the CorrectMap built from the results of the check function.
+        """
         # build map giving "correct"ness of the answer(s)
         correct = self.context['correct']
         messages = self.context['messages']
@@ -2317,141 +2436,181 @@ class CustomResponse(LoncapaResponse):
                 "[courseware.capa.responsetypes.customresponse.get_score] ret = %s",
                 ret
             )
-            if isinstance(ret, dict):
-                # One kind of dictionary the check function can return has the
-                # form {'ok': BOOLEAN or STRING, 'msg': STRING, 'grade_decimal' (optional): FLOAT (between 0.0 and 1.0)}
-                # 'ok' will control the checkmark, while grade_decimal, if present, will scale
-                # the score the student receives on the response.
-                # If there are multiple inputs, they all get marked
-                # to the same correct/incorrect value
-                if 'ok' in ret:
-
-                    # Returning any falsy value or the "false" string for "ok" gives incorrect.
-                    # Returning any string that includes "partial" for "ok" gives partial credit.
-                    # Returning any other truthy value for "ok" gives correct
-
-                    ok_val = str(ret['ok']).lower().strip() if bool(ret['ok']) else 'false'
-
-                    if ok_val == 'false':
-                        correct = 'incorrect'
-                    elif 'partial' in ok_val:
-                        correct = 'partially-correct'
+            self._apply_check_function_return(idset, ret)
+
+    def get_check_execution(self, idset, submission):
+        """
+        Returns the code that `execute_check_function` executes in the sandbox
+        for these answers, and the globals it executes it with, or None if the
+        check function isn't executed in the sandbox.
+        """
+        if isinstance(self.code, basestring):
+            return self.code, self.context
+        if self.cfn is None:
+            return None
+        answer_given = submission[0] if (len(idset) == 1) else submission
+        kwnames = self.xml.get("cfn_extra_args", "").split()
+        kwargs = {n: self.context.get(n) for n in kwnames}
+        return self.get_cfn_execution(self.expect, answer_given, kwargs)
+
+    def get_cfn_execution(self, expect, ans, kwargs):
+        """
+        Returns the code that executes the script of the problem and then the
+        `cfn` check function with these arguments, and the globals to execute
+        it with.
+        """
+        extra_args = "".join(", {0}={0}".format(k) for k in kwargs)
+        code = (
+            self.context['script_code'] + "\n" +
+            "cfn_return = %s(expect, ans%s)\n" % (self.cfn, extra_args)
+        )
+        globals_dict = {
+            'expect': expect,
+            'ans': ans,
+        }
+        globals_dict.update(kwargs)
+        return code, globals_dict
+
+    def _apply_check_function_return(self, idset, ret):
+        """
+        Puts the results of the value returned by a `cfn` check function in
+        the context, as the results of an <answer> check script are.
+        """
+        if isinstance(ret, dict):
+            # One kind of dictionary the check function can return has the
+            # form {'ok': BOOLEAN or STRING, 'msg': STRING, 'grade_decimal' (optional): FLOAT (between 0.0 and 1.0)}
+            # 'ok' will control the checkmark, while grade_decimal, if present, will scale
+            # the score the student receives on the response.
+            # If there are multiple inputs, they all get marked
+            # to the same correct/incorrect value
+            if 'ok' in ret:
+
+                # Returning any falsy value or the "false" string for "ok" gives incorrect.
+                # Returning any string that includes "partial" for "ok" gives partial credit.
+                # Returning any other truthy value for "ok" gives correct
+
+                ok_val = str(ret['ok']).lower().strip() if bool(ret['ok']) else 'false'
+
+                if ok_val == 'false':
+                    correct = 'incorrect'
+                elif 'partial' in ok_val:
+                    correct = 'partially-correct'
+                else:
+                    correct = 'correct'
+                correct = [correct] * len(idset)   # All inputs share the same mark.
+
+                # old version, no partial credit:
+                # correct = ['correct' if ret['ok'] else 'incorrect'] * len(idset)
+
+                msg = ret.get('msg', None)
+                msg = self.clean_message_html(msg)
+
+                # If there is only one input, apply the message to that input
+                # Otherwise, apply the message to the whole problem
+                if len(idset) > 1:
+                    self.context['overall_message'] = msg
+                else:
+                    self.context['messages'][0] = msg
+
+                if 'grade_decimal' in ret:
+                    decimal = float(ret['grade_decimal'])
+                else:
+                    if correct[0] == 'correct':
+                        decimal = 1.0
+                    elif correct[0] == 'partially-correct':
+                        decimal = self.default_pc
                     else:
-                        correct = 'correct'
-                    correct = [correct] * len(idset)   # All inputs share the same mark.
+                        decimal = 0.0
+                grade_decimals = [decimal] * len(idset)
+                self.context['grade_decimals'] = grade_decimals
+
+            # Another kind of dictionary the check function can return has
+            # the form:
+            # { 'overall_message': STRING,
+            #   'input_list': [
+            #     {
+            #         'ok': BOOLEAN or STRING,
+            #         'msg': STRING,
+            #         'grade_decimal' (optional): FLOAT (between 0.0 and 1.0)
+            #     },
+            #   ...
+            #   ]
+            # }
+            # 'ok' will control the checkmark, while grade_decimal, if present, will scale
+            # the score the student receives on the response.
+            #
+            # This allows the function to return an 'overall message'
+            # that applies to the entire problem, as well as correct/incorrect
+            # status, scaled grades, and messages for individual inputs
+            elif 'input_list' in ret:
+                overall_message = ret.get('overall_message', '')
+                input_list = ret['input_list']
 
-                    # old version, no partial credit:
-                    # correct = ['correct' if ret['ok'] else 'incorrect'] * len(idset)
+                correct = []
+                messages = []
+                grade_decimals = []
 
-                    msg = ret.get('msg', None)
-                    msg = self.clean_message_html(msg)
+                # Returning any falsy value or the "false" string for "ok" gives incorrect.
+                # Returning any string that includes "partial" for "ok" gives partial credit.
+                # Returning any other truthy value for "ok" gives correct
 
-                    # If there is only one input, apply the message to that input
-                    # Otherwise, apply the message to the whole problem
-                    if len(idset) > 1:
-                        self.context['overall_message'] = msg
+                for input_dict in input_list:
+                    if str(input_dict['ok']).lower().strip() == "false" or not input_dict['ok']:
+                        correct.append('incorrect')
+                    elif 'partial' in str(input_dict['ok']).lower().strip():
+                        correct.append('partially-correct')
                     else:
-                        self.context['messages'][0] = msg
+                        correct.append('correct')
 
-                    if 'grade_decimal' in ret:
-                        decimal = float(ret['grade_decimal'])
+                    # old version, no partial credit
+                    # correct.append('correct'
+                    #                if input_dict['ok'] else 'incorrect')
+
+                    msg = (self.clean_message_html(input_dict['msg'])
+                           if 'msg' in input_dict else None)
+                    messages.append(msg)
+                    if 'grade_decimal' in input_dict:
+                        decimal = input_dict['grade_decimal']
                     else:
-                        if correct[0] == 'correct':
+                        if str(input_dict['ok']).lower().strip() == 'true':
                             decimal = 1.0
-                        elif correct[0] == 'partially-correct':
+                        elif 'partial' in str(input_dict['ok']).lower().strip():
                             decimal = self.default_pc
                         else:
                             decimal = 0.0
-                    grade_decimals = [decimal] * len(idset)
-                    self.context['grade_decimals'] = grade_decimals
-
-                # Another kind of dictionary the check function can return has
-                # the form:
-                # { 'overall_message': STRING,
-                #   'input_list': [
-                #     {
-                #         'ok': BOOLEAN or STRING,
-                #         'msg': STRING,
-                #         'grade_decimal' (optional): FLOAT (between 0.0 and 1.0)
-                #     },
-                #   ...
-                #   ]
-                # }
-                # 'ok' will control the checkmark, while grade_decimal, if present, will scale
-                # the score the student receives on the response.
-                #
-                # This allows the function to return an 'overall message'
-                # that applies to the entire problem, as well as correct/incorrect
-                # status, scaled grades, and messages for individual inputs
-                elif 'input_list' in ret:
-                    overall_message = ret.get('overall_message', '')
-                    input_list = ret['input_list']
-
-                    correct = []
-                    messages = []
-                    grade_decimals = []
-
-                    # Returning any falsy value or the "false" string for "ok" gives incorrect.
-                    # Returning any string that includes "partial" for "ok" gives partial credit.
-                    # Returning any other truthy value for "ok" gives correct
-
-                    for input_dict in input_list:
-                        if str(input_dict['ok']).lower().strip() == "false" or not input_dict['ok']:
-                            correct.append('incorrect')
-                        elif 'partial' in str(input_dict['ok']).lower().strip():
-                            correct.append('partially-correct')
-                        else:
-                            correct.append('correct')
+                    grade_decimals.append(decimal)
 
-                        # old version, no partial credit
-                        # correct.append('correct'
-                        #                if input_dict['ok'] else 'incorrect')
-
-                        msg = (self.clean_message_html(input_dict['msg'])
-                               if 'msg' in input_dict else None)
-                        messages.append(msg)
-                        if 'grade_decimal' in input_dict:
-                            decimal = input_dict['grade_decimal']
-                        else:
-                            if str(input_dict['ok']).lower().strip() == 'true':
-                                decimal = 1.0
-                            elif 'partial' in str(input_dict['ok']).lower().strip():
-                                decimal = self.default_pc
-                            else:
-                                decimal = 0.0
-                        grade_decimals.append(decimal)
-
-                    self.context['messages'] = messages
-                    self.context['overall_message'] = overall_message
-                    self.context['grade_decimals'] = grade_decimals
-
-                # Otherwise, we do not recognize the dictionary
-                # Raise an exception
-                else:
-                    log.error(traceback.format_exc())
-                    _ = self.capa_system.i18n.ugettext
-                    raise ResponseError(
-                        _("CustomResponse: check function returned an invalid dictionary!")
-                    )
+                self.context['messages'] = messages
+                self.context['overall_message'] = overall_message
+                self.context['grade_decimals'] = grade_decimals
 
+            # Otherwise, we do not recognize the dictionary
+            # Raise an exception
             else:
+                log.error(traceback.format_exc())
+                _ = self.capa_system.i18n.ugettext
+                raise ResponseError(
+                    _("CustomResponse: check function returned an invalid dictionary!")
+                )
 
-                # Returning any falsy value or the "false" string for "ok" gives incorrect.
-                # Returning any string that includes "partial" for "ok" gives partial credit.
-                # Returning any other truthy value for "ok" gives correct
+        else:
 
-                if str(ret).lower().strip() == "false" or not bool(ret):
-                    correct = 'incorrect'
-                elif 'partial' in str(ret).lower().strip():
-                    correct = 'partially-correct'
-                else:
-                    correct = 'correct'
-                correct = [correct] * len(idset)
+            # Returning any falsy value or the "false" string for "ok" gives incorrect.
+            # Returning any string that includes "partial" for "ok" gives partial credit.
+            # Returning any other truthy value for "ok" gives correct
 
-                # old version, no partial credit:
-                # correct = ['correct' if ret else 'incorrect'] * len(idset)
+            if str(ret).lower().strip() == "false" or not bool(ret):
+                correct = 'incorrect'
+            elif 'partial' in str(ret).lower().strip():
+                correct = 'partially-correct'
+            else:
+                correct = 'correct'
+            correct = [correct] * len(idset)
 
-            self.context['correct'] = correct
+            # old version, no partial credit:
+            # correct = ['correct' if ret else 'incorrect'] * len(idset)
+
+        self.context['correct'] = correct
 
     def clean_message_html(self, msg):
 
@@ -2537,6 +2696,12 @@ class SymbolicResponse(CustomResponse):
         # Let CustomResponse do its setup
         super(SymbolicResponse, self).setup_response()
 
+    def get_check_execution(self, idset, submission):
+        """
+        symmath_check isn't executed in the sandbox.
+        """
+        return None
+
     def execute_check_function(self, idset, submission):
         from symmath import symmath_check
         try:
@@ -3090,59 +3255,53 @@ class FormulaResponse(LoncapaResponse):
         Takes in an answer and a list of dictionaries mapping variables to values.
         Each dictionary represents a test case for the answer.
         Returns a tuple of formula evaluation results.
+
+        The answer is parsed once (and cached), then evaluated for every test case.
         """
         _ = self.capa_system.i18n.ugettext
 
-        out = []
-        for var_dict in var_dict_list:
-            try:
-                out.append(evaluator(
-                    var_dict,
-                    dict(),
-                    answer,
-                    case_sensitive=self.case_sensitive,
-                ))
-            except UndefinedVariable as err:
+        try:
+            return compile_expression(answer, self.case_sensitive).evaluate_many(var_dict_list, dict())
+        except UndefinedVariable as err:
+            log.debug(
+                'formularesponse: undefined variable in formula=%s',
+                cgi.escape(answer)
+            )
+            raise StudentInputError(
+                _("Invalid input: {bad_input} not permitted in answer.").format(bad_input=err.message)
+            )
+        except ValueError as err:
+            if 'factorial' in err.message:
+                # This is thrown when fact() or factorial() is used in a formularesponse answer
+                #   that tests on negative and/or non-integer inputs
+                # err.message will be: `factorial() only accepts integral values` or
+                # `factorial() not defined for negative values`
                 log.debug(
-                    'formularesponse: undefined variable in formula=%s',
+                    ('formularesponse: factorial function used in response '
+                     'that tests negative and/or non-integer inputs. '
+                     'Provided answer was: %s'),
                     cgi.escape(answer)
                 )
                 raise StudentInputError(
-                    _("Invalid input: {bad_input} not permitted in answer.").format(bad_input=err.message)
+                    _("Factorial function not permitted in answer "
+                      "for this problem. Provided answer was: "
+                      "{bad_input}").format(bad_input=cgi.escape(answer))
                 )
-            except ValueError as err:
-                if 'factorial' in err.message:
-                    # This is thrown when fact() or factorial() is used in a formularesponse answer
-                    #   that tests on negative and/or non-integer inputs
-                    # err.message will be: `factorial() only accepts integral values` or
-                    # `factorial() not defined for negative values`
-                    log.debug(
-                        ('formularesponse: factorial function used in response '
-                         'that tests negative and/or non-integer inputs. '
-                         'Provided answer was: %s'),
-                        cgi.escape(answer)
-                    )
-                    raise StudentInputError(
-                        _("Factorial function not permitted in answer "
-                          "for this problem. Provided answer was: "
-                          "{bad_input}").format(bad_input=cgi.escape(answer))
-                    )
-                # If non-factorial related ValueError thrown, handle it the same as any other Exception
-                log.debug('formularesponse: error %s in formula', err)
-                raise StudentInputError(
-                    _("Invalid input: Could not parse '{bad_input}' as a formula.").format(
-                        bad_input=cgi.escape(answer)
-                    )
+            # If non-factorial related ValueError thrown, handle it the same as any other Exception
+            log.debug('formularesponse: error %s in formula', err)
+            raise StudentInputError(
+                _("Invalid input: Could not parse '{bad_input}' as a formula.").format(
+                    bad_input=cgi.escape(answer)
                 )
-            except Exception as err:
-                # traceback.print_exc()
-                log.debug('formularesponse: error %s in formula', err)
-                raise StudentInputError(
-                    _("Invalid input: Could not parse '{bad_input}' as a formula").format(
-                        bad_input=cgi.escape(answer)
-                    )
+            )
+        except Exception as err:
+            # traceback.print_exc()
+            log.debug('formularesponse: error %s in formula', err)
+            raise StudentInputError(
+                _("Invalid input: Could not parse '{bad_input}' as a formula").format(
+                    bad_input=cgi.escape(answer)
                 )
-        return out
+            )
 
     def randomize_variables(self, samples):
         """
@@ -0,0 +1,304 @@
+"""
+A pool of warm sandbox workers for safe_exec.
+
+Executing code with codejail starts a sandboxed Python for each execution,
+which then has to import the modules that problems use, like numpy and
+scipy.  The pool instead keeps sandboxed Pythons running that have already
+imported them, and which make each execution in a forked child process of
+its own (see sandbox_worker.py), so that executions stay isolated from each
+other.
+
+Workers are replaced after a number of executions, and whenever anything
+goes wrong with one.  Each worker enforces codejail's limits on the children
+that execute its requests, and kills them, with any processes they started,
+when they are done, time out, or the worker is stopped.
+"""
+import base64
+import json
+import logging
+import os
+import Queue
+import select
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+from codejail import jail_code
+from codejail.safe_exec import SafeExecException, json_safe
+from dogapi import dog_stats_api
+
+from . import sandbox_worker
+
+log = logging.getLogger(__name__)
+
+# The modules imported by each worker before it executes any code.
+PRELOADED_MODULES = [
+    "numpy",
+    "math",
+    "scipy",
+    "calc",
+    "eia",
+    "chem.chemcalc",
+    "chem.chemtools",
+    "chem.miller",
+    "verifiers.draganddrop",
+]
+
+# We'll need the code from sandbox_worker.py to run the workers, so read it now.
+sandbox_worker_py_file = sandbox_worker.__file__
+if sandbox_worker_py_file.endswith("c"):
+    sandbox_worker_py_file = sandbox_worker_py_file[:-1]
+
+SANDBOX_WORKER_PY = open(sandbox_worker_py_file).read()
+
+# The codejail limits that workers apply to the children executing requests.
+CHILD_LIMITS = ("CPU", "REALTIME", "VMEM", "FSIZE", "NPROC")
+
+# Seconds a worker is given to answer beyond codejail's REALTIME limit, which
+# it enforces on its children itself, before it is considered to have failed.
+WORKER_TIMEOUT_MARGIN = 5
+
+# Seconds a worker is given to exit once it has been told to stop, before it
+# is killed.
+WORKER_STOP_TIMEOUT = 5
+
+_pool = None
+
+
+def configure_pool(size, max_executions=100, python_bin=None):
+    """
+    Configure the pool of workers that `safe_exec` executes code in.
+
+    `size` is the number of workers, and 0 disables the pool.
+
+    `max_executions` is the number of executions after which a worker is
+    replaced.
+
+    `python_bin` is the Python the workers run, unsandboxed, which is only
+    meant for testing.  By default, the workers run the sandboxed Python that
+    codejail is configured with, and the pool isn't used if there isn't one.
+
+    """
+    global _pool  # pylint: disable=global-statement
+    if _pool is not None:
+        _pool.close()
+    _pool = SandboxPool(size, max_executions, python_bin) if size else None
+
+
+def get_pool():
+    """
+    Returns the configured pool if it can be used, or else None.
+    """
+    if _pool is None or not (_pool.python_bin or jail_code.is_configured("python")):
+        return None
+    return _pool
+
+
+class SandboxPool(object):
+    """
+    A pool of sandbox workers.
+    """
+    def __init__(self, size, max_executions, python_bin=None):
+        self.size = size
+        self.max_executions = max_executions
+        self.python_bin = python_bin
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._idle_workers = None
+        self._num_waiting = 0
+
+    def can_execute(self, python_path, extra_files):
+        """
+        Returns whether code with the given python path and extra files can be
+        executed by the pool, which only supports paths to the extra files.
+        """
+        extra_file_names = set(name for name, __ in extra_files or [])
+        return all(name in extra_file_names for name in python_path or [])
+
+    def execute(self, code, globals_dict, python_path=None, extra_files=None, slug=None):
+        """
+        Execute code in a worker, like codejail's safe_exec.
+
+        Any changes the code makes to the globals are made to `globals_dict`.
+        Raises SafeExecException if the code can't be executed.
+
+        """
+        error, = self.execute_many(code, [globals_dict], python_path, extra_files, slug)
+        if error is not None:
+            raise error
+
+    def execute_many(self, code, globals_dicts, python_path=None, extra_files=None, slug=None):
+        """
+        Execute code in a worker once for each of `globals_dicts`, each time
+        in a child process of its own, as `execute` would.
+
+        Any changes the code makes to the globals are made to `globals_dicts`.
+        Returns a list with the SafeExecException for each execution that
+        couldn't be made, or None.  Raises SafeExecException if the worker
+        fails.
+
+        """
+        request = {
+            "code": code,
+            "items": [json_safe(globals_dict) for globals_dict in globals_dicts],
+            "files": [[name, base64.b64encode(contents)] for name, contents in extra_files or []],
+            "python_path": python_path or [],
+            "limits": {name: jail_code.LIMITS.get(name) for name in CHILD_LIMITS},
+        }
+        # The worker enforces REALTIME on each execution in turn.
+        realtime = jail_code.LIMITS.get("REALTIME")
+        timeout = realtime * len(globals_dicts) + WORKER_TIMEOUT_MARGIN if realtime else None
+
+        worker = self._checkout()
+        start = time.time()
+        try:
+            results = worker.execute(request, timeout)["results"]
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Sandbox worker failed while executing %s", slug)
+            worker.close()
+            worker = None
+            raise SafeExecException("Couldn't execute jailed code: the sandbox worker failed")
+        finally:
+            dog_stats_api.histogram("capa.safe_exec.pool.execution_time", time.time() - start)
+            self._checkin(worker)
+
+        errors = []
+        for globals_dict, result in zip(globals_dicts, results):
+            if result["error"]:
+                errors.append(SafeExecException("Couldn't execute jailed code: {}".format(result["error"])))
+            else:
+                globals_dict.update(result["globals"])
+                errors.append(None)
+        return errors
+
+    def close(self):
+        """
+        Stop the idle workers of this process.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            while True:
+                try:
+                    self._idle_workers.get_nowait().close()
+                except Queue.Empty:
+                    break
+
+    def _checkout(self):
+        """
+        Returns an idle worker, waiting for one if they are all busy.
+        """
+        with self._lock:
+            # Workers started by a parent process belong to it.
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._idle_workers = Queue.Queue()
+                for __ in range(self.size):
+                    self._idle_workers.put(self._start_worker())
+            self._num_waiting += 1
+            dog_stats_api.gauge("capa.safe_exec.pool.queue_depth", self._num_waiting)
+
+        start = time.time()
+        worker = self._idle_workers.get()
+        dog_stats_api.histogram("capa.safe_exec.pool.wait_time", time.time() - start)
+        with self._lock:
+            self._num_waiting -= 1
+        return worker
+
+    def _checkin(self, worker):
+        """
+        Returns the worker to the pool, replacing it with a new one if it is
+        closed or has executed enough code.
+        """
+        if worker is not None and worker.executions >= self.max_executions:
+            worker.close()
+            worker = None
+        if worker is None:
+            dog_stats_api.increment("capa.safe_exec.pool.recycled")
+            worker = self._start_worker()
+        self._idle_workers.put(worker)
+
+    def _start_worker(self):
+        """
+        Returns a new worker.
+        """
+        if self.python_bin:
+            cmdline = [self.python_bin, "-E", "-B"]
+        else:
+            command = jail_code.COMMANDS["python"]
+            cmdline = list(command["cmdline_start"])
+            if command["user"]:
+                cmdline = ["sudo", "-u", command["user"]] + cmdline
+        return SandboxWorker(cmdline)
+
+
+class SandboxWorker(object):
+    """
+    A running sandbox worker, which executes one request at a time.
+    """
+    def __init__(self, cmdline):
+        # Like codejail, run the worker in a temporary directory, with a
+        # temporary directory of its own that the sandbox user can write to.
+        self.tmpdir = tempfile.mkdtemp(prefix="codejail-pool-")
+        os.chmod(self.tmpdir, 0775)
+        tmptmp = os.path.join(self.tmpdir, "tmp")
+        os.mkdir(tmptmp)
+        os.chmod(tmptmp, 0777)
+
+        self.process = subprocess.Popen(
+            cmdline + ["-c", SANDBOX_WORKER_PY, json.dumps(PRELOADED_MODULES)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=self.tmpdir,
+            # As in safe_exec's CODE_PROLOG, OpenBLAS mustn't start threads
+            # (see TNL-6456), and numpy is imported before any code runs.
+            env={"TMPDIR": tmptmp, "OPENBLAS_NUM_THREADS": "1"},
+            close_fds=True,
+        )
+        self.executions = 0
+
+    def execute(self, request, timeout=None):
+        """
+        Returns the worker's result for the request.  Raises an exception if
+        the worker fails, or doesn't respond within `timeout` seconds.
+        """
+        self.executions += 1
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+
+        deadline = time.time() + timeout if timeout else None
+        fd = self.process.stdout.fileno()
+        chunks = []
+        while not chunks or not chunks[-1].endswith("\n"):
+            remaining = deadline - time.time() if deadline else None
+            if remaining is not None and remaining <= 0:
+                raise Exception("Sandbox worker timed out")
+            readable, __, __ = select.select([fd], [], [], remaining)
+            if readable:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    raise Exception("Sandbox worker exited")
+                chunks.append(chunk)
+        return json.loads("".join(chunks))
+
+    def close(self):
+        """
+        Stop the worker, which kills the child executing its request, if any.
+        """
+        try:
+            self.process.stdin.close()
+            if self.process.poll() is None:
+                self.process.terminate()
+            deadline = time.time() + WORKER_STOP_TIMEOUT
+            while self.process.poll() is None and time.time() < deadline:
+                time.sleep(0.05)
+            if self.process.poll() is None:
+                log.error("Sandbox worker didn't stop, killing it")
+                self.process.kill()
+                self.process.wait()
+        except OSError:
+            log.exception("Failed to stop sandbox worker")
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
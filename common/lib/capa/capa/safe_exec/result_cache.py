@@ -0,0 +1,223 @@
+"""
+A two-level cache of the results of safe_exec.
+
+Results are kept in a least-recently-used cache in each process, in front of
+the cache shared by all processes that is passed to safe_exec (usually
+memcached).  Both levels store them compressed.
+
+The key of an execution is a hash of its code, random seed and Python path,
+and only of the globals whose names appear in the code, rather than all of
+them.  So problems whose scripts don't use `anonymous_student_id`, for
+instance, share results between all of the students who have the same seed,
+which is most of them when problems are randomized in bins.  Likewise, only
+the globals that the execution added or changed are cached, so that a result
+doesn't carry one student's globals over to another.
+
+Executions that raised exceptions are cached like any others.
+"""
+import hashlib
+import json
+import re
+import zlib
+from collections import OrderedDict
+from threading import Lock
+
+from codejail.safe_exec import json_safe
+from dogapi import dog_stats_api
+
+# The number of results kept by each process.
+LOCAL_CACHE_SIZE = 1000
+
+# The number of problems whose hits and misses are counted by each process.
+STATS_SIZE = 1000
+
+# If code uses any of these names, it may use any of the globals.
+DYNAMIC_NAMES = frozenset([
+    "__dict__",
+    "__import__",
+    "__main__",
+    "compile",
+    "dir",
+    "eval",
+    "exec",
+    "execfile",
+    "globals",
+    "locals",
+    "vars",
+])
+
+_local_results = OrderedDict()  # pylint: disable=invalid-name
+_stats = OrderedDict()  # pylint: disable=invalid-name
+_lock = Lock()  # pylint: disable=invalid-name
+
+
+def update_hash(hasher, obj):
+    """
+    Update a `hashlib` hasher with a nested object.
+
+    To properly cache nested structures, we need to compute a hash from the
+    entire structure, canonicalizing at every level.
+
+    `hasher`'s `.update()` method is called a number of times, touching all of
+    `obj` in the process.  Only primitive JSON-safe types are supported.
+
+    """
+    hasher.update(str(type(obj)))
+    if isinstance(obj, (tuple, list)):
+        for e in obj:
+            update_hash(hasher, e)
+    elif isinstance(obj, dict):
+        for k in sorted(obj):
+            update_hash(hasher, k)
+            update_hash(hasher, obj[k])
+    else:
+        hasher.update(repr(obj))
+
+
+class CachedExecution(object):
+    """
+    The inputs of an execution of code that are relevant to its result, and
+    its cache key.
+    """
+    def __init__(self, code, globals_dict, random_seed=None, python_path=None, extra_files=None):
+        # Code executed with a Python path may import modules that use any of the globals.
+        code_names = _code_names(code)
+        if python_path or not DYNAMIC_NAMES.isdisjoint(code_names):
+            self.relevant_names = frozenset(globals_dict)
+        else:
+            self.relevant_names = code_names.intersection(globals_dict)
+        self.input_names = frozenset(globals_dict)
+        self.relevant_globals = json_safe({name: globals_dict[name] for name in self.relevant_names})
+
+        md5er = hashlib.md5()
+        md5er.update(repr(code))
+        md5er.update(repr(random_seed))
+        md5er.update(repr(python_path or []))
+        for name, contents in extra_files or []:
+            md5er.update(repr(name))
+            md5er.update(hashlib.md5(contents).hexdigest())
+        update_hash(md5er, self.relevant_globals)
+        self.key = "safe_exec.result.{}".format(md5er.hexdigest())
+
+    def get_changed_globals(self, globals_dict):
+        """
+        Returns the JSON-safe globals of `globals_dict` that were added or
+        changed by the execution.
+        """
+        candidates = json_safe({
+            name: value for name, value in globals_dict.iteritems()
+            if name not in self.input_names or name in self.relevant_names
+        })
+        return {
+            name: value for name, value in candidates.iteritems()
+            if name not in self.relevant_globals or self.relevant_globals[name] != value
+        }
+
+
+def get_result(cache, execution, slug=None):
+    """
+    Returns the cached (exception message, changed globals) result of the
+    execution, or None if it isn't cached.  The exception message is None if
+    the execution succeeded.
+
+    `cache` is the shared cache, an object with .get(key) and .set(key, value)
+    methods.  `slug` is the name of the problem that hits and misses are
+    counted for.
+    """
+    with _lock:
+        encoded = _local_results.pop(execution.key, None)
+        if encoded is not None:
+            _local_results[execution.key] = encoded
+    level = "local"
+
+    if encoded is None:
+        encoded = cache.get(execution.key)
+        level = "shared"
+        if encoded is not None:
+            _set_local_result(execution.key, encoded)
+
+    if encoded is None:
+        _count(slug, "misses")
+        return None
+
+    _count(slug, "{}_hits".format(level))
+    return _decode_result(encoded)
+
+
+def set_result(cache, execution, emsg, globals_dict):
+    """
+    Cache the result of the execution, given its exception message, or None,
+    and the globals after it.
+    """
+    encoded = _encode_result(emsg, execution.get_changed_globals(globals_dict))
+    _set_local_result(execution.key, encoded)
+    cache.set(execution.key, encoded)
+
+
+def get_stats():
+    """
+    Returns the hits and misses of the cache in this process for each recent
+    problem, as {slug: {"local_hits": n, "shared_hits": n, "misses": n,
+    "hit_ratio": ratio}}.
+    """
+    with _lock:
+        stats = {slug: dict(counts) for slug, counts in _stats.iteritems()}
+    for counts in stats.itervalues():
+        hits = counts["local_hits"] + counts["shared_hits"]
+        counts["hit_ratio"] = float(hits) / (hits + counts["misses"])
+    return stats
+
+
+def clear():
+    """
+    Empty the cache of this process, and its stats.
+    """
+    with _lock:
+        _local_results.clear()
+        _stats.clear()
+
+
+def _set_local_result(key, encoded):
+    """
+    Keep the encoded result in the cache of this process.
+    """
+    with _lock:
+        _local_results.pop(key, None)
+        _local_results[key] = encoded
+        while len(_local_results) > LOCAL_CACHE_SIZE:
+            _local_results.popitem(last=False)
+
+
+def _count(slug, outcome):
+    """
+    Count a hit or miss of the cache for the problem.
+    """
+    dog_stats_api.increment("capa.safe_exec.cache", tags=[u"result:{}".format(outcome)])
+    with _lock:
+        counts = _stats.pop(slug, None) or {"local_hits": 0, "shared_hits": 0, "misses": 0}
+        counts[outcome] += 1
+        _stats[slug] = counts
+        while len(_stats) > STATS_SIZE:
+            _stats.popitem(last=False)
+
+
+def _encode_result(emsg, changed_globals):
+    """
+    Returns the compressed encoding of a result.
+    """
+    return zlib.compress(json.dumps([emsg, changed_globals]))
+
+
+def _decode_result(encoded):
+    """
+    Returns the (exception message, changed globals) result of an encoding.
+    """
+    emsg, changed_globals = json.loads(zlib.decompress(encoded))
+    return emsg, changed_globals
+
+
+def _code_names(code):
+    """
+    Returns the set of words in the code, which includes the names it uses.
+    """
+    return set(re.findall(r"[A-Za-z_]\w*", code))
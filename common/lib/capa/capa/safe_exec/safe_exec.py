@@ -3,10 +3,14 @@
 from codejail.safe_exec import safe_exec as codejail_safe_exec
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import json_safe, SafeExecException
-from . import lazymod
+from . import lazymod, result_cache
+from .pool import get_pool
+from .result_cache import update_hash  # pylint: disable=unused-import
 from dogapi import dog_stats_api
 
-import hashlib
+import logging
+
+log = logging.getLogger(__name__)
 
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
@@ -19,11 +23,14 @@ os.environ["OPENBLAS_NUM_THREADS"] = "1"    # See TNL-6456
 
 import random as random_module
 import sys
-random = random_module.Random(%r)
+random = random_module.Random(%s)
 random.Random = random_module.Random
 sys.modules['random'] = random
 """
 
+# The number of executions `safe_exec_many` sends to a pool worker at once.
+SAFE_EXEC_BATCH_SIZE = 50
+
 ASSUMED_IMPORTS = [
     ("numpy", "numpy"),
     ("math", "math"),
@@ -50,29 +57,6 @@ for name, modname in ASSUMED_IMPORTS:
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
 
-def update_hash(hasher, obj):
-    """
-    Update a `hashlib` hasher with a nested object.
-
-    To properly cache nested structures, we need to compute a hash from the
-    entire structure, canonicalizing at every level.
-
-    `hasher`'s `.update()` method is called a number of times, touching all of
-    `obj` in the process.  Only primitive JSON-safe types are supported.
-
-    """
-    hasher.update(str(type(obj)))
-    if isinstance(obj, (tuple, list)):
-        for e in obj:
-            update_hash(hasher, e)
-    elif isinstance(obj, dict):
-        for k in sorted(obj):
-            update_hash(hasher, k)
-            update_hash(hasher, obj[k])
-    else:
-        hasher.update(repr(obj))
-
-
 @dog_stats_api.timed('capa.safe_exec.time')
 def safe_exec(
     code,
@@ -100,41 +84,39 @@ def safe_exec(
     `extra_files` is a list of (filename, contents) pairs.  These files are
     created in the sandbox.
 
-    `cache` is an object with .get(key) and .set(key, value) methods.  It will be used
-    to cache the execution, taking into account the code, the values of the globals,
-    and the random seed.
+    `cache` is an object with .get(key) and .set(key, value) methods.  It will be used,
+    behind a cache in this process, to cache the execution, taking into account the
+    code, the values of the globals it uses, the random seed, and the Python path
+    (see result_cache.py).
 
     `slug` is an arbitrary string, a description that's meaningful to the
     caller, that will be used in log messages.
 
     If `unsafely` is true, then the code will actually be executed without sandboxing.
+    Otherwise, the code is executed by the pool of sandbox workers if one is
+    configured (see pool.py), unless `python_path` names files other than
+    `extra_files`.
 
     """
     # Check the cache for a previous result.
     if cache:
-        safe_globals = json_safe(globals_dict)
-        md5er = hashlib.md5()
-        md5er.update(repr(code))
-        update_hash(md5er, safe_globals)
-        key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
-        cached = cache.get(key)
+        execution = result_cache.CachedExecution(code, globals_dict, random_seed, python_path, extra_files)
+        cached = result_cache.get_result(cache, execution, slug)
         if cached is not None:
             # We have a cached result.  The result is a pair: the exception
-            # message, if any, else None; and the resulting globals dictionary.
-            emsg, cleaned_results = cached
-            globals_dict.update(cleaned_results)
+            # message, if any, else None; and the globals that the execution
+            # changed.
+            emsg, changed_globals = cached
+            globals_dict.update(changed_globals)
             if emsg:
                 raise SafeExecException(emsg)
             return
 
     # Create the complete code we'll run.
-    code_prolog = CODE_PROLOG % random_seed
+    code_prolog = CODE_PROLOG % repr(random_seed)
 
     # Decide which code executor to use.
-    if unsafely:
-        exec_fn = codejail_not_safe_exec
-    else:
-        exec_fn = codejail_safe_exec
+    exec_fn = _get_exec_fn(python_path, extra_files, unsafely)
 
     # Run the code!  Results are side effects in globals_dict.
     try:
@@ -147,12 +129,123 @@ def safe_exec(
     else:
         emsg = None
 
-    # Put the result back in the cache.  This is complicated by the fact that
-    # the globals dict might not be entirely serializable.
+    # Put the result back in the cache.
     if cache:
-        cleaned_results = json_safe(globals_dict)
-        cache.set(key, (emsg, cleaned_results))
+        result_cache.set_result(cache, execution, emsg, globals_dict)
 
     # If an exception happened, raise it now.
     if emsg:
         raise e
+
+
+@dog_stats_api.timed('capa.safe_exec.many.time')
+def safe_exec_many(
+    code,
+    globals_dicts,
+    random_seeds,
+    python_path=None,
+    extra_files=None,
+    cache=None,
+    slug=None,
+    unsafely=False,
+):
+    """
+    Execute python code safely, once for each of a list of globals dicts.
+
+    This is like calling `safe_exec` for each of `globals_dicts`, with the
+    corresponding seed of `random_seeds`.  If the pool of sandbox workers
+    would execute the code (see pool.py), the code is sent to a worker once
+    with all of the globals (or a few times, see SAFE_EXEC_BATCH_SIZE), and
+    the worker makes each execution in a child process of its own, rather
+    than each being sent separately.  Otherwise, the executions are made one
+    at a time.
+
+    If a worker fails as a whole, its executions are made one at a time
+    instead.
+
+    The other arguments are as for `safe_exec`.
+
+    Returns a list with the SafeExecException raised by each execution, or
+    None if it succeeded.
+
+    """
+    errors = [None] * len(globals_dicts)
+
+    def execute_one_at_a_time(indexes):
+        """Make the executions of `indexes` with `safe_exec`."""
+        for index in indexes:
+            try:
+                safe_exec(
+                    code, globals_dicts[index], random_seed=random_seeds[index], python_path=python_path,
+                    extra_files=extra_files, cache=cache, slug=slug, unsafely=unsafely,
+                )
+            except SafeExecException as err:
+                errors[index] = err
+
+    pool = get_pool()
+    if unsafely or pool is None or not pool.can_execute(python_path, extra_files):
+        execute_one_at_a_time(range(len(globals_dicts)))
+        return errors
+
+    # Check the cache for previous results.
+    executions = [None] * len(globals_dicts)
+    uncached = []
+    for index, (globals_dict, random_seed) in enumerate(zip(globals_dicts, random_seeds)):
+        if cache:
+            executions[index] = result_cache.CachedExecution(
+                code, globals_dict, random_seed, python_path, extra_files
+            )
+            cached = result_cache.get_result(cache, executions[index], slug)
+            if cached is not None:
+                emsg, changed_globals = cached
+                globals_dict.update(changed_globals)
+                if emsg:
+                    errors[index] = SafeExecException(emsg)
+                continue
+        uncached.append(index)
+
+    # Each execution is seeded by the global "batch_seed", which the code
+    # can't see.
+    batch_code = CODE_PROLOG % "batch_seed" + "del batch_seed\n" + LAZY_IMPORTS + code
+
+    for start in xrange(0, len(uncached), SAFE_EXEC_BATCH_SIZE):
+        batch = uncached[start:start + SAFE_EXEC_BATCH_SIZE]
+        batch_globals = [dict(json_safe(globals_dicts[index]), batch_seed=random_seeds[index]) for index in batch]
+        try:
+            batch_errors = pool.execute_many(
+                batch_code, batch_globals, python_path=python_path, extra_files=extra_files, slug=slug,
+            )
+        except SafeExecException:
+            log.warning(
+                "Couldn't execute %d executions of %s together, executing them one at a time",
+                len(batch), slug, exc_info=True
+            )
+            dog_stats_api.increment('capa.safe_exec.many.fallback')
+            execute_one_at_a_time(batch)
+            continue
+
+        dog_stats_api.histogram('capa.safe_exec.many.batch_size', len(batch))
+        for index, changed_globals, error in zip(batch, batch_globals, batch_errors):
+            if error is None:
+                del changed_globals['batch_seed']
+                globals_dicts[index].update(changed_globals)
+            errors[index] = error
+            if cache:
+                emsg = error.message if error else None
+                result_cache.set_result(cache, executions[index], emsg, globals_dicts[index])
+
+    return errors
+
+
+def _get_exec_fn(python_path, extra_files, unsafely):
+    """
+    Returns the function to execute code with, which is codejail's
+    `safe_exec` or `not_safe_exec`, or the pool's `execute`.
+    """
+    pool = get_pool()
+    if unsafely:
+        return codejail_not_safe_exec
+    elif pool is not None and pool.can_execute(python_path, extra_files):
+        return pool.execute
+    else:
+        return codejail_safe_exec
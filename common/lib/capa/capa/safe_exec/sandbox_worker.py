@@ -0,0 +1,238 @@
+"""
+A sandbox worker, run by the pool in pool.py in a sandboxed Python.
+
+This source is sent to the sandboxed Python to run, so it may only use the
+standard library.  The worker imports the modules named in its argument,
+then reads requests to execute code, one JSON object per line, from stdin.
+A request executes the code with each of a list of globals, each time in a
+forked child process of its own, so that executions don't affect each other
+or the worker, but don't pay for the imports.  The result of each request is
+written to stdout as one JSON object per line.
+
+Like codejail's sandboxed processes, each child runs in a new session, with
+codejail's resource limits, and without the worker's stdin and stdout.  Once
+it has answered, or has run for longer than the REALTIME limit, the child is
+killed along with any processes it started, so nothing it does outlives its
+execution.  If the worker is terminated, it kills its child the same way.
+
+A request has:
+
+    code: the code to execute.
+    items: the JSON-safe globals to execute the code with, once for each.
+    files: [name, base64 contents] pairs of files to create for the code.
+    python_path: names of the files to add to the Python path.
+    limits: codejail's limits for the child, as {"CPU": seconds, ...}.
+
+A result has:
+
+    results: for each of the request's items, an object with:
+
+        globals: the JSON-safe globals after executing the code.
+        error: a description of why the code couldn't be executed, or null.
+
+"""
+import base64
+import json
+import os
+import resource
+import select
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+# The pid of the child executing the current request, if any.
+_child_pid = None  # pylint: disable=invalid-name
+
+
+def main():
+    """Import the modules, then execute requests until stdin is closed."""
+    signal.signal(signal.SIGTERM, terminate)
+
+    # OpenBLAS mustn't start threads in the children (see TNL-6456), so this
+    # has to be set before numpy is imported, even if sudo dropped it.
+    os.environ['OPENBLAS_NUM_THREADS'] = '1'
+
+    for module_name in json.loads(sys.argv[1]):
+        try:
+            __import__(module_name)
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break
+        request = json.loads(line)
+        # The children mustn't find other executions' globals in the line.
+        del line
+        result = execute(request)
+        sys.stdout.write(result + '\n')
+        sys.stdout.flush()
+
+
+def terminate(signum, frame):  # pylint: disable=unused-argument
+    """Kill the child executing the current request, if any, and exit."""
+    if _child_pid is not None:
+        try:
+            kill(_child_pid)
+        except OSError:
+            pass
+    os._exit(1)  # pylint: disable=protected-access
+
+
+def execute(request):
+    """Execute the request's items, and return its encoded result."""
+    items = request.pop('items')
+    results = []
+    while items:
+        results.append(execute_item(request, items.pop(0), items, results))
+    return '{"results": [' + ', '.join(results) + ']}'
+
+
+def execute_item(request, globals_dict, items, results):
+    """
+    Execute the request with `globals_dict` in a child process, and return
+    its encoded result.  The child forgets the request's other `items` and
+    `results`, so that it can't find them.
+    """
+    global _child_pid  # pylint: disable=global-statement
+
+    exec_dir = tempfile.mkdtemp()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        del items[:], results[:]
+        try:
+            try:
+                isolate()
+                result = run(request, globals_dict, exec_dir)
+            except BaseException:  # pylint: disable=broad-except
+                result = json.dumps({'globals': {}, 'error': traceback.format_exc()})
+            result += '\n'
+            while result:
+                result = result[os.write(write_fd, result):]
+        finally:
+            os._exit(0)  # pylint: disable=protected-access
+
+    _child_pid = pid
+    os.close(write_fd)
+    result = read_result(read_fd, request['limits'].get('REALTIME'))
+    os.close(read_fd)
+    status = kill(pid)
+    _child_pid = None
+    shutil.rmtree(exec_dir, ignore_errors=True)
+
+    if result is None:
+        result = json.dumps({'globals': {}, 'error': 'Jailed code timed out'})
+    elif not result:
+        result = json.dumps({'globals': {}, 'error': 'Jailed code exited with status {}'.format(status)})
+    return result
+
+
+def read_result(read_fd, realtime):
+    """
+    Read the child's result from the pipe, which is complete once it ends
+    with a newline or the pipe is closed.  Returns None if the child doesn't
+    answer within `realtime` seconds.
+    """
+    deadline = time.time() + realtime if realtime else None
+    chunks = []
+    while not chunks or not chunks[-1].endswith('\n'):
+        remaining = deadline - time.time() if deadline else None
+        if remaining is not None and remaining <= 0:
+            return None
+        readable, __, __ = select.select([read_fd], [], [], remaining)
+        if readable:
+            chunk = os.read(read_fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return ''.join(chunks).rstrip('\n')
+
+
+def kill(pid):
+    """
+    Kill the child and any processes it started, which are in its process
+    group, and return its exit status.
+    """
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass
+    __, status = os.waitpid(pid, 0)
+    return status
+
+
+def isolate():
+    """
+    Isolate this child from the worker.
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    # A new session, and so a new process group, so that the child and any
+    # processes it starts can be killed together.
+    os.setsid()
+
+    # The child mustn't read the worker's requests, or write to its results.
+    sys.stdout.flush()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+
+
+def set_limits(limits):
+    """
+    Apply codejail's limits to this child, as codejail does to its sandboxed
+    processes.
+    """
+    cpu = limits.get('CPU')
+    if cpu:
+        # The soft limit sends a SIGXCPU, before the hard limit kills.
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    vmem = limits.get('VMEM')
+    if vmem:
+        resource.setrlimit(resource.RLIMIT_AS, (vmem, vmem))
+    nproc = limits.get('NPROC')
+    if nproc:
+        resource.setrlimit(resource.RLIMIT_NPROC, (nproc, nproc))
+    # Zero means that nothing can be written.
+    fsize = limits.get('FSIZE') or 0
+    resource.setrlimit(resource.RLIMIT_FSIZE, (fsize, fsize))
+
+
+def run(request, globals_dict, exec_dir):
+    """
+    Execute the request with `globals_dict` in this child process, and return
+    its encoded result.
+    """
+    os.chdir(exec_dir)
+    for name, contents in request['files']:
+        with open(os.path.join(exec_dir, name), 'wb') as extra_file:
+            extra_file.write(base64.b64decode(contents))
+    sys.path[0:0] = [os.path.join(exec_dir, name) for name in request['python_path']]
+    set_limits(request['limits'])
+
+    try:
+        exec compile(request['code'], 'jailed_code', 'exec') in globals_dict  # pylint: disable=exec-used
+    except BaseException:  # pylint: disable=broad-except
+        return json.dumps({'globals': {}, 'error': traceback.format_exc()})
+
+    safe_globals = {}
+    for name, value in globals_dict.items():
+        if name == '__builtins__':
+            continue
+        try:
+            json.dumps(value)
+        except Exception:  # pylint: disable=broad-except
+            continue
+        safe_globals[name] = value
+    return json.dumps({'globals': safe_globals, 'error': None})
+
+
+if __name__ == '__main__':
+    main()
@@ -4,14 +4,19 @@ import hashlib
 import os
 import os.path
 import random
+import sys
 import textwrap
 import unittest
+import zipfile
+from StringIO import StringIO
 
+from mock import patch
 from nose.plugins.skip import SkipTest
 
-from capa.safe_exec import safe_exec, update_hash
+from capa.safe_exec import configure_pool, safe_exec, safe_exec_many, update_hash
+from capa.safe_exec import pool, result_cache
 from codejail.safe_exec import SafeExecException
-from codejail.jail_code import is_configured
+from codejail.jail_code import LIMITS, is_configured
 
 
 class TestSafeExec(unittest.TestCase):
@@ -90,6 +95,113 @@ class TestSafeOrNot(unittest.TestCase):
         self.assertEqual(g['files'], os.listdir('/'))
 
 
+class TestSafeExecPool(unittest.TestCase):
+    """Test safe_exec with a pool of workers, run unsandboxed."""
+
+    def setUp(self):
+        super(TestSafeExecPool, self).setUp()
+        configure_pool(1, max_executions=2, python_bin=sys.executable)
+        self.addCleanup(configure_pool, 0)
+
+    def test_set_values(self):
+        g = {'b': 2}
+        safe_exec("a = b * 17", g)
+        self.assertEqual(g['a'], 34)
+
+    def test_executions_are_isolated(self):
+        g = {}
+        safe_exec("import sys; sys.leaked = 1; a = 1/2", g)
+        safe_exec("import sys; a = getattr(sys, 'leaked', None)", g)
+        self.assertIsNone(g['a'])
+
+    def test_random_seeding(self):
+        g = {}
+        r = random.Random(17)
+        rnums = [r.randint(0, 999) for _ in xrange(100)]
+
+        safe_exec("rnums = [random.randint(0, 999) for _ in xrange(100)]", g, random_seed=17)
+        self.assertEqual(g['rnums'], rnums)
+
+    def test_python_lib_zip(self):
+        zip_lib = StringIO()
+        with zipfile.ZipFile(zip_lib, 'w') as zipped:
+            zipped.writestr('constant.py', 'THE_CONST = 23\n')
+        g = {}
+        safe_exec(
+            "import constant; a = constant.THE_CONST", g,
+            python_path=["python_lib.zip"], extra_files=[("python_lib.zip", zip_lib.getvalue())],
+        )
+        self.assertEqual(g['a'], 23)
+
+    def test_raising_exceptions(self):
+        g = {}
+        with self.assertRaises(SafeExecException) as cm:
+            safe_exec("1/0", g)
+        self.assertIn("ZeroDivisionError", cm.exception.message)
+
+    def test_worker_recycled(self):
+        workers = set()
+        for __ in range(3):
+            safe_exec("a = 1", {})
+            workers.add(pool.get_pool()._idle_workers.queue[0])  # pylint: disable=protected-access
+        # The worker is replaced after its second execution
+        self.assertEqual(len(workers), 2)
+
+    @patch.dict(LIMITS, {'REALTIME': 1})
+    def test_worker_timeout(self):
+        with self.assertRaises(SafeExecException) as cm:
+            safe_exec("import time; time.sleep(5)", {})
+        self.assertIn("timed out", cm.exception.message)
+        g = {}
+        safe_exec("a = 1", g)
+        self.assertEqual(g['a'], 1)
+
+    def test_worker_environment(self):
+        # Without safe_exec's prolog, the worker must already limit OpenBLAS's threads.
+        g = {}
+        pool.get_pool().execute("import os; a = os.environ.get('OPENBLAS_NUM_THREADS')", g)
+        self.assertEqual(g['a'], '1')
+
+    def test_no_stdin(self):
+        g = {}
+        safe_exec("import os; a = os.read(0, 100)", g)
+        self.assertEqual(g['a'], '')
+
+    def test_new_session(self):
+        g = {}
+        safe_exec("import os; a = os.getsid(0) == os.getpid()", g)
+        self.assertTrue(g['a'])
+
+    def test_started_processes_killed(self):
+        g = {}
+        safe_exec(textwrap.dedent("""\
+            import os, time
+            pid = os.fork()
+            if pid == 0:
+                time.sleep(100)
+                os._exit(0)
+            """), g)
+        self.assertFalse(process_running(g['pid']))
+
+    def test_python_path_outside_sandbox(self):
+        # Paths to files other than the extra files are copied into a sandbox by codejail
+        pylib = os.path.dirname(__file__) + "/test_files/pylib"
+        with patch.object(pool.SandboxPool, 'execute') as mock_execute:
+            safe_exec("import constant; a = constant.THE_CONST", {}, python_path=[pylib])
+        self.assertFalse(mock_execute.called)
+
+
+def process_running(pid):
+    """Is the process with this pid running, rather than dead or a zombie?"""
+    try:
+        with open("/proc/{}/stat".format(pid)) as stat_file:
+            stat = stat_file.read()
+    except IOError:
+        return False
+    # The state follows the parenthesized command name.
+    return stat[stat.rindex(")") + 2] not in "ZX"
+
+
 class DictCache(object):
     """A cache implementation over a simple dict, for testing."""
 
@@ -107,9 +219,24 @@ class DictCache(object):
         self.cache[key] = value
 
 
+def cached_result(value):
+    """Return the (exception message, changed globals) result of a cached value."""
+    return result_cache._decode_result(value)  # pylint: disable=protected-access
+
+
+def cache_result(emsg, changed_globals):
+    """Return the value to cache for a result."""
+    return result_cache._encode_result(emsg, changed_globals)  # pylint: disable=protected-access
+
+
 class TestSafeExecCaching(unittest.TestCase):
     """Test that caching works on safe_exec."""
 
+    def setUp(self):
+        super(TestSafeExecCaching, self).setUp()
+        result_cache.clear()
+        self.addCleanup(result_cache.clear)
+
     def test_cache_miss_then_hit(self):
         g = {}
         cache = {}
@@ -118,10 +245,11 @@ class TestSafeExecCaching(unittest.TestCase):
         safe_exec("a = int(math.pi)", g, cache=DictCache(cache))
         self.assertEqual(g['a'], 3)
         # A result has been cached
-        self.assertEqual(cache.values()[0], (None, {'a': 3}))
+        self.assertEqual(cached_result(cache.values()[0]), (None, {'a': 3}))
 
         # Fiddle with the cache, then try it again.
-        cache[cache.keys()[0]] = (None, {'a': 17})
+        cache[cache.keys()[0]] = cache_result(None, {'a': 17})
+        result_cache.clear()
 
         g = {}
         safe_exec("a = int(math.pi)", g, cache=DictCache(cache))
@@ -148,24 +276,82 @@ class TestSafeExecCaching(unittest.TestCase):
 
         # The exception should be in the cache now.
         self.assertEqual(len(cache), 1)
-        cache_exc_msg, cache_globals = cache.values()[0]
+        cache_exc_msg, cache_globals = cached_result(cache.values()[0])
         self.assertIn("ZeroDivisionError", cache_exc_msg)
 
         # Change the value stored in the cache, the result should change.
-        cache[cache.keys()[0]] = ("Hey there!", {})
+        cache[cache.keys()[0]] = cache_result("Hey there!", {})
+        result_cache.clear()
 
         with self.assertRaises(SafeExecException):
             safe_exec(code, g, cache=DictCache(cache))
 
         self.assertEqual(len(cache), 1)
-        cache_exc_msg, cache_globals = cache.values()[0]
+        cache_exc_msg, cache_globals = cached_result(cache.values()[0])
         self.assertEqual("Hey there!", cache_exc_msg)
 
         # Change it again, now no exception!
-        cache[cache.keys()[0]] = (None, {'a': 17})
+        cache[cache.keys()[0]] = cache_result(None, {'a': 17})
+        result_cache.clear()
         safe_exec(code, g, cache=DictCache(cache))
         self.assertEqual(g['a'], 17)
 
+    def test_local_cache(self):
+        cache = {}
+        safe_exec("a = int(math.pi)", {}, cache=DictCache(cache))
+
+        # The result is found in this process without the shared cache.
+        cache.clear()
+        g = {}
+        safe_exec_module = sys.modules['capa.safe_exec.safe_exec']
+        with patch.object(safe_exec_module, 'codejail_safe_exec') as mock_exec_fn:
+            safe_exec("a = int(math.pi)", g, cache=DictCache(cache))
+        self.assertEqual(g['a'], 3)
+        self.assertFalse(mock_exec_fn.called)
+        self.assertEqual(cache, {})
+
+    def test_unused_globals_not_in_key(self):
+        cache = {}
+        code = "a = b * random.randint(0, 999)"
+        g1 = {'b': 2, 'anonymous_student_id': 'student1'}
+        safe_exec(code, g1, random_seed=17, cache=DictCache(cache))
+
+        # Globals that the code doesn't use don't change the key, and aren't
+        # carried over from one execution to another.
+        g2 = {'b': 2, 'anonymous_student_id': 'student2'}
+        safe_exec(code, g2, random_seed=17, cache=DictCache(cache))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cached_result(cache.values()[0]), (None, {'a': g1['a']}))
+        self.assertEqual(g2, {'b': 2, 'anonymous_student_id': 'student2', 'a': g1['a']})
+
+        # Globals that the code uses, and the seed, do.
+        safe_exec(code, {'b': 3, 'anonymous_student_id': 'student1'}, random_seed=17, cache=DictCache(cache))
+        safe_exec(code, {'b': 2, 'anonymous_student_id': 'student1'}, random_seed=18, cache=DictCache(cache))
+        self.assertEqual(len(cache), 3)
+
+    def test_dynamic_globals_in_key(self):
+        # Code that may use any of the globals is cached for all of their values.
+        cache = {}
+        code = "a = globals()['b']"
+        safe_exec(code, {'b': 1}, cache=DictCache(cache))
+        g = {'b': 2}
+        safe_exec(code, g, cache=DictCache(cache))
+        self.assertEqual(g['a'], 2)
+        self.assertEqual(len(cache), 2)
+
+    def test_stats(self):
+        cache = {}
+        for __ in range(3):
+            safe_exec("a = 1", {}, cache=DictCache(cache), slug="problem1")
+        result_cache.clear()
+        safe_exec("a = 1", {}, cache=DictCache(cache), slug="problem2")
+
+        self.assertEqual(result_cache.get_stats(), {
+            "problem2": {"local_hits": 0, "shared_hits": 1, "misses": 0, "hit_ratio": 1.0},
+        })
+        safe_exec("a = 2", {}, cache=DictCache(cache), slug="problem2")
+        self.assertEqual(result_cache.get_stats()["problem2"]["hit_ratio"], 0.5)
+
     def test_unicode_submission(self):
         # Check that using non-ASCII unicode does not raise an encoding error.
         # Try several non-ASCII unicode characters.
@@ -177,6 +363,144 @@ class TestSafeExecCaching(unittest.TestCase):
                 self.fail("Tried executing code with non-ASCII unicode: {0}".format(code))
 
 
+class SafeExecManyTests(object):
+    """Test safe_exec_many, which executes code with many globals together."""
+
+    def setUp(self):
+        super(SafeExecManyTests, self).setUp()
+        # The module, rather than the function that shadows it in the package.
+        self.safe_exec_module = sys.modules['capa.safe_exec.safe_exec']
+
+    def test_set_values(self):
+        globals_dicts = [{'a': 1}, {'a': 2}]
+        errors = safe_exec_many("b = a * 17", globals_dicts, [None, None])
+        self.assertEqual(errors, [None, None])
+        self.assertEqual(globals_dicts, [{'a': 1, 'b': 17}, {'a': 2, 'b': 34}])
+
+    def test_division(self):
+        globals_dicts = [{}]
+        safe_exec_many("a = 1/2", globals_dicts, [None])
+        self.assertEqual(globals_dicts[0]['a'], 0.5)
+
+    def test_random_seeding(self):
+        code = "rnums = [random.randint(0, 999) for _ in xrange(100)]"
+        globals_dicts = [{}, {}]
+        safe_exec_many(code, globals_dicts, [17, 42])
+
+        # The results are the same as executing the code with each seed on its own
+        for globals_dict, seed in zip(globals_dicts, [17, 42]):
+            r = random.Random(seed)
+            self.assertEqual(globals_dict['rnums'], [r.randint(0, 999) for _ in xrange(100)])
+
+    def test_raising_exceptions(self):
+        globals_dicts = [{'a': 1}, {'a': 0}]
+        errors = safe_exec_many("b = 1/a", globals_dicts, [None, None])
+
+        # Only the execution that raised is affected
+        self.assertIsNone(errors[0])
+        self.assertEqual(globals_dicts[0]['b'], 1)
+        self.assertIsInstance(errors[1], SafeExecException)
+        self.assertIn("ZeroDivisionError", errors[1].message)
+        self.assertNotIn('b', globals_dicts[1])
+
+    def test_caching(self):
+        result_cache.clear()
+        self.addCleanup(result_cache.clear)
+        cache = {}
+        globals_dicts = [{'a': 1}, {'a': 2}]
+        safe_exec_many("b = a * 17", globals_dicts, [None, None], cache=DictCache(cache))
+        self.assertEqual(
+            sorted(cached_result(value) for value in cache.values()),
+            [(None, {'b': 17}), (None, {'b': 34})]
+        )
+
+        # Fiddle with the cache, then try it again.
+        for key in cache:
+            cache[key] = cache_result(None, {'b': 0})
+        result_cache.clear()
+
+        globals_dicts = [{'a': 1}, {'a': 2}]
+        safe_exec_many("b = a * 17", globals_dicts, [None, None], cache=DictCache(cache))
+        self.assertEqual([g['b'] for g in globals_dicts], [0, 0])
+
+        # The results are cached as safe_exec caches them.
+        g = {'a': 1}
+        safe_exec("b = a * 17", g, cache=DictCache(cache))
+        self.assertEqual(g['b'], 0)
+
+
+class TestSafeExecMany(SafeExecManyTests, unittest.TestCase):
+    """Test safe_exec_many without a pool of workers."""
+
+    def test_executed_one_at_a_time(self):
+        exec_fn = self.safe_exec_module.codejail_safe_exec
+        with patch.object(self.safe_exec_module, 'codejail_safe_exec', wraps=exec_fn) as mock_exec_fn:
+            globals_dicts = [{'a': index} for index in range(5)]
+            safe_exec_many("b = a * 17", globals_dicts, [None] * 5)
+
+        self.assertEqual(mock_exec_fn.call_count, 5)
+        self.assertEqual([g['b'] for g in globals_dicts], [0, 17, 34, 51, 68])
+
+
+class TestSafeExecManyPool(SafeExecManyTests, unittest.TestCase):
+    """Test safe_exec_many with a pool of workers, run unsandboxed."""
+
+    def setUp(self):
+        super(TestSafeExecManyPool, self).setUp()
+        configure_pool(1, python_bin=sys.executable)
+        self.addCleanup(configure_pool, 0)
+
+    def test_executed_together(self):
+        execute_many = pool.SandboxPool.execute_many
+        with patch.object(self.safe_exec_module, 'SAFE_EXEC_BATCH_SIZE', 2):
+            with patch.object(pool.SandboxPool, 'execute_many', autospec=True, side_effect=execute_many) as mock:
+                globals_dicts = [{'a': index} for index in range(5)]
+                safe_exec_many("b = a * 17", globals_dicts, [None] * 5)
+
+        self.assertEqual(mock.call_count, 3)
+        self.assertEqual([g['b'] for g in globals_dicts], [0, 17, 34, 51, 68])
+
+    def test_worker_failure(self):
+        # If the worker fails to make the executions together, they are made one at a time.
+        worker_execute = pool.SandboxWorker.execute
+
+        def execute(worker, request, timeout=None):
+            """Fail to execute more than one item."""
+            if len(request['items']) > 1:
+                raise Exception("Worker failed")
+            return worker_execute(worker, request, timeout)
+
+        with patch.object(pool.SandboxWorker, 'execute', execute):
+            globals_dicts = [{'a': 1}, {'a': 0}]
+            errors = safe_exec_many("b = 1/a", globals_dicts, [None, None])
+
+        self.assertIsNone(errors[0])
+        self.assertEqual(globals_dicts[0]['b'], 1)
+        self.assertIn("ZeroDivisionError", errors[1].message)
+
+    def test_executions_are_isolated(self):
+        code = textwrap.dedent("""\
+            import gc, sys
+            a = getattr(sys, 'leaked', None)
+            sys.leaked = secret
+            # Other executions' globals, before or after executing
+            found = [o['secret'] for o in gc.get_objects() if isinstance(o, dict) and 'secret' in o]
+            found.remove(secret)
+            """)
+        globals_dicts = [{'secret': [index]} for index in range(3)]
+        errors = safe_exec_many(code, globals_dicts, [None] * 3)
+        self.assertEqual(errors, [None] * 3)
+        self.assertEqual([(g['a'], g['found']) for g in globals_dicts], [(None, [])] * 3)
+
+    @patch.dict(LIMITS, {'REALTIME': 1})
+    def test_timeouts(self):
+        # Each execution has the REALTIME limit to itself.
+        globals_dicts = [{'a': 0.6}, {'a': 0.6}, {'a': 5}]
+        errors = safe_exec_many("import time; time.sleep(a)", globals_dicts, [None] * 3)
+        self.assertEqual(errors[:2], [None, None])
+        self.assertIn("timed out", errors[2].message)
+
+
 class TestUpdateHash(unittest.TestCase):
     """Test the safe_exec.update_hash function to be sure it canonicalizes properly."""
 
@@ -4,9 +4,12 @@ Test capa problem.
 import ddt
 import textwrap
 from lxml import etree
+from mock import Mock, patch
+from StringIO import StringIO
 import unittest
 
-from capa.tests.helpers import new_loncapa_problem
+from capa.capa_problem import LoncapaProblem, clear_problem_templates
+from capa.tests.helpers import new_loncapa_problem, test_capa_system
 
 
 @ddt.ddt
@@ -590,3 +593,79 @@ class CAPAMultiInputProblemTest(unittest.TestCase):
             description_element = multi_inputs_group.xpath('//p[@id="{}"]'.format(description_id))
             self.assertEqual(len(description_element), 1)
             self.assertEqual(description_element[0].text, descriptions[index])
+
+
+class CAPAProblemTemplateTest(unittest.TestCase):
+    """ TestCase for the problem templates shared by problems with the same definition """
+
+    xml = """
+    <problem>
+        <multiplechoiceresponse>
+            <label>Which is a color?</label>
+            <choicegroup type="MultipleChoice" shuffle="true">
+                <choice correct="false">Apple</choice>
+                <choice correct="true">Red</choice>
+                <choice correct="false">Pear</choice>
+                <choice correct="false">Plum</choice>
+            </choicegroup>
+        </multiplechoiceresponse>
+        <solution><p>Red is a color.</p></solution>
+    </problem>
+    """
+
+    def setUp(self):
+        super(CAPAProblemTemplateTest, self).setUp()
+        clear_problem_templates()
+        self.addCleanup(clear_problem_templates)
+
+    def test_template_shared(self):
+        """
+        Verify that a problem definition is only parsed once, but that each
+        problem gets its own tree.
+        """
+        preprocess = LoncapaProblem._preprocess_problem_structure  # pylint: disable=protected-access
+        with patch.object(LoncapaProblem, '_preprocess_problem_structure', autospec=True, side_effect=preprocess) \
+                as mock_preprocess:
+            problem1 = new_loncapa_problem(self.xml, seed=1)
+            problem2 = new_loncapa_problem(self.xml, seed=2)
+        self.assertEqual(mock_preprocess.call_count, 1)
+
+        self.assertIsNot(problem1.tree, problem2.tree)
+        self.assertEqual(problem1.problem_data, problem2.problem_data)
+        self.assertEqual(problem1.problem_data['1_2_1']['label'], 'Which is a color?')
+        self.assertEqual(problem2.tree.find('.//solution').get('id'), '1_solution_1')
+
+        # Each problem is shuffled with its own seed.
+        self.assertNotEqual(
+            [choice.text for choice in problem1.tree.iter('choice')],
+            [choice.text for choice in problem2.tree.iter('choice')],
+        )
+
+    def test_template_per_problem_id(self):
+        """
+        Verify that problems with different IDs don't share templates.
+        """
+        new_loncapa_problem(self.xml, problem_id='1')
+        problem = new_loncapa_problem(self.xml, problem_id='2')
+        self.assertEqual(problem.tree.find('.//multiplechoiceresponse').get('id'), '2_1')
+
+    def test_includes_not_cached(self):
+        """
+        Verify that problems with <include>s are parsed every time, with the
+        current contents of the included files.
+        """
+        xml = """
+        <problem>
+            <include file="included.xml"/>
+        </problem>
+        """
+        capa_system = test_capa_system()
+        capa_system.filestore = Mock()
+
+        capa_system.filestore.open.return_value = StringIO("<p>First</p>")
+        problem = new_loncapa_problem(xml, capa_system=capa_system)
+        self.assertEqual(problem.tree.find('p').text, 'First')
+
+        capa_system.filestore.open.return_value = StringIO("<p>Second</p>")
+        problem = new_loncapa_problem(xml, capa_system=capa_system)
+        self.assertEqual(problem.tree.find('p').text, 'Second')
@@ -10,6 +10,7 @@ import os
 import pyparsing
 import random
 import textwrap
+import traceback
 import unittest
 import zipfile
 
@@ -20,6 +21,9 @@ import requests
 from capa.tests.helpers import new_loncapa_problem, test_capa_system, load_fixture
 import calc
 
+from capa.capa_problem import get_grades_from_current_answers
+from capa.safe_exec import safe_exec_many
+
 from capa.responsetypes import LoncapaProblemError, \
     StudentInputError, ResponseError
 from capa.correctmap import CorrectMap
@@ -619,6 +623,30 @@ class FormulaResponseTest(ResponseTest):
         self.assertTrue(problem.responders.values()[0].validate_answer('14*x'))
         self.assertFalse(problem.responders.values()[0].validate_answer('3*y+2*x'))
 
+    def test_parses_once(self):
+        """
+        Test that each formula is parsed once, rather than once per sample.
+        """
+        calc.clear_compiled_expressions()
+        self.addCleanup(calc.clear_compiled_expressions)
+
+        sample_dict = {'x': (-10, 10), 'y': (-10, 10)}
+        problem = self.build_problem(sample_dict=sample_dict,
+                                     num_samples=20,
+                                     tolerance=0.01,
+                                     answer="x+2*y")
+
+        parse_algebra = calc.ParseAugmenter.parse_algebra
+        with mock.patch.object(
+            calc.ParseAugmenter, 'parse_algebra', autospec=True, side_effect=parse_algebra
+        ) as mock_parse:
+            self.assert_grade(problem, "2*x - x + y + y", "correct")
+            self.assertEqual(mock_parse.call_count, 2)
+
+            # Both formulas are already compiled.
+            self.assert_grade(problem, "2*x - x + y + y", "correct")
+            self.assertEqual(mock_parse.call_count, 2)
+
 
 class StringResponseTest(ResponseTest):  # pylint: disable=missing-docstring
     xml_factory_class = StringResponseXMLFactory
@@ -2381,6 +2409,79 @@ class CustomResponseTest(ResponseTest):  # pylint: disable=missing-docstring
         self.assertEqual(correct_map.get_msg('1_2_9'), '9')
         self.assertEqual(correct_map.get_msg('1_2_11'), '11')
 
+    def _build_answered_problems(self, answers, **kwargs):
+        """
+        Returns problems built with `kwargs` and a seed of their own, with each
+        of `answers` as the saved answer of one of them.
+        """
+        problems = []
+        for seed, answer in enumerate(answers):
+            problem = new_loncapa_problem(self.xml_factory.build_xml(**kwargs), seed=seed)
+            problem.student_answers = {'1_2_1': answer}
+            problems.append(problem)
+        return problems
+
+    def test_grade_many_inline_code(self):
+        # The answers to many problems are graded with one execution of the script
+        inline_script = textwrap.dedent("""
+            correct[0] = 'correct' if (answers['1_2_1'] == expect) else 'incorrect'
+            messages[0] = {code}
+            """.format(code=self._get_random_number_code()))
+        problems = self._build_answered_problems(['42', '0', '42'], answer=inline_script, expect="42")
+
+        with mock.patch('capa.safe_exec.safe_exec') as mock_safe_exec:
+            with mock.patch('capa.safe_exec.safe_exec_many', wraps=safe_exec_many) as mock_safe_exec_many:
+                correct_maps = get_grades_from_current_answers(problems)
+
+        self.assertFalse(mock_safe_exec.called)
+        self.assertEqual(mock_safe_exec_many.call_count, 1)
+        self.assertEqual(
+            [correct_map.get_correctness('1_2_1') for correct_map in correct_maps],
+            ['correct', 'incorrect', 'correct']
+        )
+        for problem, correct_map in zip(problems, correct_maps):
+            # The script is executed with the seed of each problem
+            self.assertEqual(correct_map.get_msg('1_2_1'), self._get_random_number_result(problem.seed))
+            # The grades are those of grading each problem on its own
+            self.assertEqual(correct_map.get_dict(), problem.get_grade_from_current_answers(None).get_dict())
+
+    def test_grade_many_function_code(self):
+        script = textwrap.dedent("""
+            def check_func(expect, answer_given):
+                return {'ok': answer_given == expect, 'msg': 'Message text'}
+        """)
+        problems = self._build_answered_problems(['42', '0'], script=script, cfn="check_func", expect="42")
+
+        with mock.patch('capa.safe_exec.safe_exec_many', wraps=safe_exec_many) as mock_safe_exec_many:
+            correct_maps = get_grades_from_current_answers(problems)
+
+        self.assertEqual(mock_safe_exec_many.call_count, 1)
+        self.assertEqual(correct_maps[0].get_correctness('1_2_1'), 'correct')
+        self.assertEqual(correct_maps[0].get_npoints('1_2_1'), 1)
+        self.assertEqual(correct_maps[1].get_correctness('1_2_1'), 'incorrect')
+        self.assertEqual(correct_maps[1].get_npoints('1_2_1'), 0)
+        for correct_map in correct_maps:
+            self.assertEqual(correct_map.get_msg('1_2_1'), 'Message text')
+
+    def test_grade_many_errors(self):
+        # An error grading one of the problems doesn't affect the others
+        script = textwrap.dedent("""
+            def check_func(expect, answer_given):
+                return 1 / int(answer_given) > 0
+        """)
+        problems = self._build_answered_problems(['1', '0', ''], script=script, cfn="check_func")
+
+        correct_maps = get_grades_from_current_answers(problems)
+
+        self.assertEqual(correct_maps[0].get_correctness('1_2_1'), 'correct')
+        # The error is given with the traceback of where it was raised
+        error_type, error, error_traceback = correct_maps[1]
+        self.assertIs(error_type, ResponseError)
+        self.assertIsInstance(error, ResponseError)
+        self.assertEqual(traceback.extract_tb(error_traceback)[-1][2], '_handle_exec_exception')
+        # Empty answers aren't evaluated
+        self.assertEqual(correct_maps[2].get_correctness('1_2_1'), 'incorrect')
+
 
 class SchematicResponseTest(ResponseTest):
     """
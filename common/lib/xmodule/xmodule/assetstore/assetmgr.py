@@ -58,3 +58,12 @@ class AssetManager(object):
         compressed course structure from the structure cache.
         """
         return contentstore().find(asset_key, throw_on_not_found, as_stream)
+
+    @staticmethod
+    @contract(asset_key='AssetKey')
+    def find_metadata(asset_key):
+        """
+        Returns the AssetMetadata (content digest, lock and content type) of the course asset
+        from the contentstore's per-course asset index, or None if the asset does not exist.
+        """
+        return contentstore().asset_index.get(asset_key)
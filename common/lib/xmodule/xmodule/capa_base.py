@@ -1575,7 +1575,7 @@ class CapaMixin(ScorableXBlockMixin, CapaFields):
 
     # ScorableXBlockMixin methods
 
-    def rescore(self, only_if_higher=False):
+    def rescore(self, only_if_higher=False, new_correctness=None):
         """
         Checks whether the existing answers to a problem are correct.
 
@@ -1585,6 +1585,11 @@ class CapaMixin(ScorableXBlockMixin, CapaFields):
         If only_if_higher is True, the answer and grade are updated
         only if the resulting score is higher than before.
 
+        If new_correctness is given, it is used as the grade of the existing
+        answers, instead of grading them again.  It is the CorrectMap, or the
+        `sys.exc_info()` of the exception raised while grading, from grading
+        many problems together with capa.capa_problem.get_grades_from_current_answers.
+
         Returns a dict with one key:
             {'success' : 'correct' | 'incorrect' | AJAX alert msg string }
 
@@ -1617,7 +1622,10 @@ class CapaMixin(ScorableXBlockMixin, CapaFields):
         event_info['orig_total'] = orig_score.raw_possible
 
         try:
-            calculated_score = self.calculate_score()
+            if isinstance(new_correctness, tuple):
+                # Raise the exception with the traceback of where it was raised while grading
+                raise new_correctness[0], new_correctness[1], new_correctness[2]
+            calculated_score = self.calculate_score(new_correctness)
 
         except (StudentInputError, ResponseError, LoncapaProblemError) as inst:
             log.warning("Input error in capa_module:problem_rescore", exc_info=True)
@@ -1668,13 +1676,15 @@ class CapaMixin(ScorableXBlockMixin, CapaFields):
         """
         return self.score
 
-    def calculate_score(self):
+    def calculate_score(self, new_correctness=None):
         """
         Returns the score calculated from the current problem state.
         Operates by creating a new correctness map based on the current
-        state of the LCP, and having the LCP generate a score from that.
+        state of the LCP, unless one is given, and having the LCP generate
+        a score from that.
         """
-        new_correctness = self.lcp.get_grade_from_current_answers(None)
+        if new_correctness is None:
+            new_correctness = self.lcp.get_grade_from_current_answers(None)
         new_score = self.lcp.calculate_score(new_correctness)
         return Score(raw_earned=new_score['score'], raw_possible=new_score['total'])
 
@@ -0,0 +1,198 @@
+"""
+A per-course index of the metadata of the assets in a contentstore.
+
+Rendering course content canonicalizes the url of every static asset it
+refers to, and serving an asset needs to know whether it is locked and what
+its digest is.  Rather than a contentstore lookup for each asset, the metadata
+of each course's assets is kept in an index that is cached in-process and in
+the shared django cache.
+
+Each course's index is versioned.  Any change to a course's assets through the
+contentstore, such as an upload, replaces the version, so that all processes
+stop using the previous index.  The index of a version is built the first
+time it is needed, from a single query for the metadata of all of the
+course's assets, and is then only read.
+"""
+import hashlib
+from collections import OrderedDict, namedtuple
+from threading import Lock
+from uuid import uuid4
+
+from django.core.cache import caches, InvalidCacheBackendError
+
+try:
+    # We may not always have the request_cache module available
+    import request_cache
+except ImportError:
+    request_cache = None  # pylint: disable=invalid-name
+
+
+# The metadata of an asset that is needed to refer to it and serve it.
+AssetMetadata = namedtuple('AssetMetadata', ['content_digest', 'locked', 'content_type'])
+
+
+class CourseAssetIndex(object):
+    """
+    A map of each course's asset keys to the AssetMetadata of the asset, or
+    None if the contentstore has no such asset.
+    """
+    # Maximum number of course indexes kept in-process.
+    MAX_COURSES = 100
+
+    REQUEST_CACHE_NAMESPACE = 'contentstore.asset_index.versions'
+
+    def __init__(self, contentstore, namespace):
+        """
+        Arguments:
+            contentstore (ContentStore) - The contentstore to find assets in.
+            namespace (unicode) - Identifies the contentstore's data in the
+                shared cache.
+        """
+        self.contentstore = contentstore
+        self.namespace = namespace
+
+        # Map of (course id, version) to the course's index, in order of least
+        # to most recently used.
+        # OrderedDict {((org, course, run), unicode): {unicode: AssetMetadata}}
+        self._indexes = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, asset_key):
+        """
+        Returns the AssetMetadata of the given asset, or None if not found.
+        """
+        course_id = _course_id(asset_key)
+        index = self._get_index(course_id, self._get_version(course_id), asset_key.course_key)
+        return index.get(_asset_id(asset_key))
+
+    def invalidate(self, key):
+        """
+        Replaces the version of the index of the course of the given key,
+        which may be a CourseKey, an AssetKey or an asset's database id.
+        """
+        course_id = _course_id(key)
+        version = uuid4().hex
+        _get_shared_cache().set(self._version_cache_key(course_id), version, None)
+        self._get_versions()[(self.namespace, course_id)] = version
+        with self._lock:
+            for index_key in [index_key for index_key in self._indexes if index_key[0] == course_id]:
+                del self._indexes[index_key]
+
+    def clear(self):
+        """
+        Invalidates the index of every course known to this process.
+        """
+        with self._lock:
+            course_ids = set(course_id for course_id, __ in self._indexes)
+        versions = self._get_versions()
+        course_ids.update(course_id for namespace, course_id in versions if namespace == self.namespace)
+        for course_id in course_ids:
+            self.invalidate(course_id)
+
+    def _get_index(self, course_id, version, course_key):
+        """
+        Returns the index for the given course and version, from the
+        in-process cache, the shared cache, or else built from the
+        contentstore.
+        """
+        index_key = (course_id, version)
+        with self._lock:
+            index = self._indexes.pop(index_key, None)
+            if index is not None:
+                self._indexes[index_key] = index
+                return index
+
+        index_cache_key = self._index_cache_key(course_id, version)
+        index = _get_shared_cache().get(index_cache_key)
+        if index is None:
+            index = {
+                _asset_id(asset_key): asset_metadata
+                for asset_key, asset_metadata
+                in self.contentstore.get_all_asset_metadata_for_course(course_key).iteritems()
+            }
+            _get_shared_cache().set(index_cache_key, index)
+
+        with self._lock:
+            self._indexes[index_key] = index
+            while len(self._indexes) > self.MAX_COURSES:
+                self._indexes.popitem(last=False)
+        return index
+
+    def _get_version(self, course_id):
+        """
+        Returns the current version of the given course's index, which is
+        read from the shared cache once per request.
+        """
+        versions = self._get_versions()
+        version = versions.get((self.namespace, course_id))
+        if version is None:
+            cache = _get_shared_cache()
+            version_cache_key = self._version_cache_key(course_id)
+            version = cache.get(version_cache_key)
+            if version is None:
+                version = uuid4().hex
+                if not cache.add(version_cache_key, version, None):
+                    version = cache.get(version_cache_key) or version
+            versions[(self.namespace, course_id)] = version
+        return version
+
+    def _get_versions(self):
+        """
+        Returns the request's map of (namespace, course id) to the version of
+        the course's index.
+        """
+        if request_cache is None:
+            return {}
+        return request_cache.get_cache(self.REQUEST_CACHE_NAMESPACE)
+
+    def _version_cache_key(self, course_id):
+        """
+        Returns the shared cache key for the version of the given course's
+        index.
+        """
+        return self._cache_key(u'version', course_id)
+
+    def _index_cache_key(self, course_id, version):
+        """
+        Returns the shared cache key for the given version of the given
+        course's index.
+        """
+        return self._cache_key(u'index', course_id, version)
+
+    def _cache_key(self, *parts):
+        """
+        Returns a shared cache key for the given parts, safe for memcached.
+        """
+        key = u'.'.join([self.namespace] + [unicode(part) for part in parts])
+        return u'asset_index.{}'.format(hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+
+def _get_shared_cache():
+    """
+    Returns the "course_assets" cache if configured, or else the default
+    cache.
+    """
+    try:
+        return caches['course_assets']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def _course_id(key):
+    """
+    Returns the (org, course, run) of the given course id, CourseKey, AssetKey
+    or asset database id.  The run of deprecated keys is None, as it is
+    not part of their assets' database ids.
+    """
+    if isinstance(key, tuple):
+        return key
+    if isinstance(key, dict):
+        return (key.get('org'), key.get('course'), key.get('run'))
+    return (key.org, key.course, None if getattr(key, 'deprecated', False) else key.run)
+
+
+def _asset_id(asset_key):
+    """
+    Returns the id of the given asset in its course's index.
+    """
+    return unicode(asset_key.for_branch(None))
@@ -20,8 +20,6 @@ from urllib import urlencode, quote_plus
 from opaque_keys.edx.locator import AssetLocator
 from opaque_keys.edx.keys import CourseKey, AssetKey
 from opaque_keys import InvalidKeyError
-from xmodule.modulestore.exceptions import ItemNotFoundError
-from xmodule.exceptions import NotFoundError
 from PIL import Image
 
 
@@ -246,13 +244,11 @@ class StaticContent(object):
         # Check the status of the asset to see if this can be served via CDN aka publicly.
         serve_from_cdn = False
         content_digest = None
-        try:
-            content = AssetManager.find(asset_key, as_stream=True)
-            serve_from_cdn = not getattr(content, "locked", True)
-            content_digest = getattr(content, "content_digest", None)
-        except (ItemNotFoundError, NotFoundError):
-            # If we can't find the item, just treat it as if it's locked.
-            serve_from_cdn = False
+        asset_metadata = AssetManager.find_metadata(asset_key)
+        if asset_metadata is not None:
+            serve_from_cdn = not asset_metadata.locked
+            content_digest = asset_metadata.content_digest
+        # If we can't find the item, just treat it as if it's locked.
 
         # Do a generic check to see if anything about this asset disqualifies it from being CDN'd.
         is_excluded = False
@@ -291,9 +287,18 @@ class StaticContent(object):
 
         return urlunparse((None, base_url.encode('utf-8'), asset_path, params, urlencode(updated_query_params), None))
 
-    def stream_data(self):
+    def stream_data(self, chunk_size=None):
+        """
+        Stream the data.  The data is already in memory, so it is yielded whole.
+        """
         yield self._data
 
+    def stream_data_in_range(self, first_byte, last_byte, chunk_size=None):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        yield self._data[first_byte:last_byte + 1]
+
     @staticmethod
     def serialize_asset_key_with_slash(asset_key):
         """
@@ -314,26 +319,30 @@ class StaticContentStream(StaticContent):
                                                   length=length, locked=locked, content_digest=content_digest)
         self._stream = stream
 
-    def stream_data(self):
+    def stream_data(self, chunk_size=STREAM_DATA_CHUNK_SIZE):
+        """
+        Stream the data in chunks of at most chunk_size bytes.
+        """
         while True:
-            chunk = self._stream.read(STREAM_DATA_CHUNK_SIZE)
+            chunk = self._stream.read(chunk_size)
             if len(chunk) == 0:
                 break
             yield chunk
 
-    def stream_data_in_range(self, first_byte, last_byte):
+    def stream_data_in_range(self, first_byte, last_byte, chunk_size=STREAM_DATA_CHUNK_SIZE):
         """
-        Stream the data between first_byte and last_byte (included)
+        Stream the data between first_byte and last_byte (included), in chunks
+        of at most chunk_size bytes.
         """
         self._stream.seek(first_byte)
         position = first_byte
         while True:
-            if last_byte < position + STREAM_DATA_CHUNK_SIZE - 1:
+            if last_byte < position + chunk_size - 1:
                 chunk = self._stream.read(last_byte - position + 1)
                 yield chunk
                 break
-            chunk = self._stream.read(STREAM_DATA_CHUNK_SIZE)
-            position += STREAM_DATA_CHUNK_SIZE
+            chunk = self._stream.read(chunk_size)
+            position += chunk_size
             yield chunk
 
     def close(self):
@@ -373,6 +382,14 @@ class ContentStore(object):
         '''
         raise NotImplementedError
 
+    def get_all_asset_metadata_for_course(self, course_key):
+        """
+        Returns a dict of the AssetKey of each of the course's assets and
+        thumbnails to its AssetMetadata (content digest, lock and content
+        type), which is all that is needed to refer to the asset and serve it.
+        """
+        raise NotImplementedError
+
     def delete_all_course_assets(self, course_key):
         """
         Delete all of the assets which use this course_key as an identifier
@@ -380,9 +397,12 @@ class ContentStore(object):
         """
         raise NotImplementedError
 
-    def copy_all_course_assets(self, source_course_key, dest_course_key):
+    def copy_all_course_assets(self, source_course_key, dest_course_key, progress_callback=None):
         """
         Copy all the course assets from source_course_key to dest_course_key
+
+        If given, progress_callback is called from time to time with the number of assets copied
+        so far and the total number of assets to copy.
         """
         raise NotImplementedError
 
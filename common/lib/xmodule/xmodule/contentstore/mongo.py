@@ -3,6 +3,7 @@ MongoDB/GridFS-level code for the contentstore.
 """
 import os
 import json
+import datetime
 import pymongo
 import gridfs
 from gridfs.errors import NoFile
@@ -16,6 +17,7 @@ from xmodule.exceptions import NotFoundError
 from xmodule.modulestore.django import ASSET_IGNORE_REGEX
 from xmodule.util.misc import escape_invalid_characters
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
+from .asset_index import AssetMetadata, CourseAssetIndex
 from .content import StaticContent, ContentStore, StaticContentStream
 
 
@@ -47,6 +49,8 @@ class MongoContentStore(ContentStore):
         self.fs_files = mongo_db[bucket + ".files"]  # the underlying collection GridFS uses
         self.chunks = mongo_db[bucket + ".chunks"]
 
+        self.asset_index = CourseAssetIndex(self, u'{}.{}'.format(mongo_db.name, bucket))
+
     def close_connections(self):
         """
         Closes any open connections to the underlying databases
@@ -76,6 +80,8 @@ class MongoContentStore(ContentStore):
             self.fs_files.remove({})
             self.chunks.remove({})
 
+        self.asset_index.clear()
+
         if connections:
             self.close_connections()
 
@@ -99,6 +105,7 @@ class MongoContentStore(ContentStore):
                     fp.write(chunk)
             else:
                 fp.write(content.data)
+        self.asset_index.invalidate(content.location)
 
         return content
 
@@ -110,27 +117,19 @@ class MongoContentStore(ContentStore):
             location_or_id, _ = self.asset_db_key(location_or_id)
         # Deletes of non-existent files are considered successful
         self.fs.delete(location_or_id)
+        if isinstance(location_or_id, basestring):
+            self.asset_index.invalidate(AssetKey.from_string(location_or_id))
+        else:
+            self.asset_index.invalidate(location_or_id)
 
+    @autoretry_read()
     @autoretry_read()
     def find(self, location, throw_on_not_found=True, as_stream=False):
         content_id, __ = self.asset_db_key(location)
 
         try:
             if as_stream:
-                fp = self.fs.get(content_id)
-                thumbnail_location = getattr(fp, 'thumbnail_location', None)
-                if thumbnail_location:
-                    thumbnail_location = location.course_key.make_asset_key(
-                        'thumbnail',
-                        thumbnail_location[4]
-                    )
-                return StaticContentStream(
-                    location, fp.displayname, fp.content_type, fp, last_modified_at=fp.uploadDate,
-                    thumbnail_location=thumbnail_location,
-                    import_path=getattr(fp, 'import_path', None),
-                    length=fp.length, locked=getattr(fp, 'locked', False),
-                    content_digest=getattr(fp, 'md5', None),
-                )
+                return self._make_content_stream(location, self.fs.get(content_id))
             else:
                 with self.fs.get(content_id) as fp:
                     thumbnail_location = getattr(fp, 'thumbnail_location', None)
@@ -152,6 +151,26 @@ class MongoContentStore(ContentStore):
             else:
                 return None
 
+    @staticmethod
+    def _make_content_stream(location, fp):
+        """
+        Returns a StaticContentStream of the asset at the given location read
+        from the given GridOut.
+        """
+        thumbnail_location = getattr(fp, 'thumbnail_location', None)
+        if thumbnail_location:
+            thumbnail_location = location.course_key.make_asset_key(
+                'thumbnail',
+                thumbnail_location[4]
+            )
+        return StaticContentStream(
+            location, fp.displayname, fp.content_type, fp, last_modified_at=fp.uploadDate,
+            thumbnail_location=thumbnail_location,
+            import_path=getattr(fp, 'import_path', None),
+            length=fp.length, locked=getattr(fp, 'locked', False),
+            content_digest=getattr(fp, 'md5', None),
+        )
+
     def export(self, location, output_directory):
         content = self.find(location)
 
@@ -227,6 +246,7 @@ class MongoContentStore(ContentStore):
                 self.fs.delete(asset[prefix])
 
             self.fs_files.remove(query)
+        self.asset_index.clear()
         return assets_to_delete
 
     @autoretry_read()
@@ -268,6 +288,24 @@ class MongoContentStore(ContentStore):
             asset['asset_key'] = course_key.make_asset_key(asset_id['category'], asset_id['name'])
         return assets, count
 
+    @autoretry_read()
+    def get_all_asset_metadata_for_course(self, course_key):
+        """
+        See :meth:`.ContentStore.get_all_asset_metadata_for_course`
+        """
+        items = self.fs_files.find(
+            query_for_course(course_key),
+            projection=['_id', 'content_son', 'md5', 'locked', 'contentType'],
+        )
+        assets_metadata = {}
+        for item in items:
+            asset_id = item.get('content_son', item['_id'])
+            asset_key = course_key.make_asset_key(asset_id['category'], asset_id['name'])
+            assets_metadata[asset_key] = AssetMetadata(
+                item.get('md5'), item.get('locked', False), item.get('contentType'),
+            )
+        return assets_metadata
+
     def set_attr(self, asset_key, attr, value=True):
         """
         Add/set the given attr on the asset at the given location. Does not allow overwriting gridFS built in
@@ -309,6 +347,7 @@ class MongoContentStore(ContentStore):
         asset_db_key, __ = self.asset_db_key(location)
         # catch upsert error and raise NotFoundError if asset doesn't exist
         result = self.fs_files.update({'_id': asset_db_key}, {"$set": attr_dict}, upsert=False)
+        self.asset_index.invalidate(location)
         if not result.get('updatedExisting', True):
             raise NotFoundError(asset_db_key)
 
@@ -329,21 +368,25 @@ class MongoContentStore(ContentStore):
             raise NotFoundError(asset_db_key)
         return item
 
-    def copy_all_course_assets(self, source_course_key, dest_course_key):
+    # Number of assets copied between progress reports, and number of chunks copied per insert.
+    COPY_PROGRESS_INTERVAL = 50
+    COPY_CHUNKS_BATCH_SIZE = 16
+
+    def copy_all_course_assets(self, source_course_key, dest_course_key, progress_callback=None):
         """
         See :meth:`.ContentStore.copy_all_course_assets`
 
-        This implementation fairly expensively copies all of the data
+        Rather than reading each file through GridFS and writing it again, this copies the files' documents
+        and chunks as they are, with rewritten ids, in batched inserts.
         """
         source_query = query_for_course(source_course_key)
-        # it'd be great to figure out how to do all of this on the db server and not pull the bits over
-        for asset in self.fs_files.find(source_query):
-            asset_key = self.make_id_son(asset)
-            # don't convert from string until fs access
-            source_content = self.fs.get(asset_key)
-            if isinstance(asset_key, basestring):
-                asset_key = AssetKey.from_string(asset_key)
-                __, asset_key = self.asset_db_key(asset_key)
+        assets = list(self.fs_files.find(source_query))
+        for num_copied, asset in enumerate(assets, start=1):
+            source_id = self.make_id_son(asset)
+            if isinstance(source_id, basestring):
+                __, asset_key = self.asset_db_key(AssetKey.from_string(source_id))
+            else:
+                asset_key = SON(source_id)
             asset_key['org'] = dest_course_key.org
             asset_key['course'] = dest_course_key.course
             if getattr(dest_course_key, 'deprecated', False):  # remove the run if exists
@@ -356,17 +399,33 @@ class MongoContentStore(ContentStore):
                     dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
                 )
 
-            self.fs.put(
-                source_content.read(),
-                _id=asset_id, filename=asset['filename'], content_type=asset['contentType'],
-                displayname=asset['displayname'], content_son=asset_key,
-                # thumbnail is not technically correct but will be functionally correct as the code
-                # only looks at the name which is not course relative.
-                thumbnail_location=asset['thumbnail_location'],
-                import_path=asset['import_path'],
-                # getattr b/c caching may mean some pickled instances don't have attr
-                locked=asset.get('locked', False)
-            )
+            # As GridFS does, write the chunks before the file document, so that the file is only
+            # visible once complete.
+            self._copy_chunks(source_id, asset_id)
+
+            # Keep all of the file's attributes, including its md5 and the filename, which is not
+            # course relative. Thumbnail locations are not technically correct but will be functionally
+            # correct as the code only looks at the name which is not course relative.
+            asset.update(_id=asset_id, content_son=asset_key, uploadDate=datetime.datetime.utcnow())
+            self.fs_files.insert(asset)
+
+            if progress_callback and (num_copied % self.COPY_PROGRESS_INTERVAL == 0 or num_copied == len(assets)):
+                progress_callback(num_copied, len(assets))
+
+        self.asset_index.invalidate(dest_course_key)
+
+    def _copy_chunks(self, source_id, dest_id):
+        """
+        Copies the chunks of the file with the given id to the file with the given new id.
+        """
+        batch = []
+        for chunk in self.chunks.find({'files_id': source_id}, sort=[('n', pymongo.ASCENDING)]):
+            batch.append({'files_id': dest_id, 'n': chunk['n'], 'data': chunk['data']})
+            if len(batch) == self.COPY_CHUNKS_BATCH_SIZE:
+                self.chunks.insert(batch)
+                batch = []
+        if batch:
+            self.chunks.insert(batch)
 
     def delete_all_course_assets(self, course_key):
         """
@@ -379,6 +438,7 @@ class MongoContentStore(ContentStore):
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
             self.fs.delete(asset_key)
+        self.asset_index.invalidate(course_key)
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
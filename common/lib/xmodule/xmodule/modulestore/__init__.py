@@ -1331,11 +1331,16 @@ class ModuleStoreWriteBase(ModuleStoreReadBase, ModuleStoreWrite):
         """
         This base method just copies the assets. The lower level impls must do the actual cloning of
         content.
+
+        If given, the asset_progress_callback kwarg is called from time to time with the number of assets
+        copied so far and the total number of assets to copy.
         """
         with self.bulk_operations(dest_course_id):
             # copy the assets
             if self.contentstore:
-                self.contentstore.copy_all_course_assets(source_course_id, dest_course_id)
+                self.contentstore.copy_all_course_assets(
+                    source_course_id, dest_course_id, progress_callback=kwargs.get('asset_progress_callback')
+                )
             return dest_course_id
 
     def delete_course(self, course_key, user_id, **kwargs):
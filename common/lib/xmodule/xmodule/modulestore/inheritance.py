@@ -3,6 +3,8 @@ Support for inheritance of fields down an XBlock hierarchy.
 """
 from __future__ import absolute_import
 
+from copy import deepcopy
+
 from django.conf import settings
 
 from xmodule.partitions.partitions import UserPartition
@@ -280,17 +282,73 @@ def own_metadata(module):
     return module.get_explicitly_set_fields_by_scope(Scope.settings)
 
 
+class InheritanceTable(object):
+    """
+    The values of inheritable fields that each block of a course version
+    inherits from its ancestors, computed for all of the blocks in one pass
+    down the course, so that reading them doesn't walk up the blocks' parents.
+
+    Blocks that don't set any inheritable fields share the values that their
+    parents inherit, so there is only one dict of values for each block that
+    sets some.
+    """
+    def __init__(self, blocks, parent_map, inheritable_names=None):
+        """
+        `blocks` maps the key of each block of the course version to its
+        (block type, JSON field values, child keys).  `parent_map` maps the
+        key of each block to the key of its parent.
+
+        `inheritable_names` is a list of names that can be inherited from
+        parents, by default those of InheritanceMixin.
+        """
+        if inheritable_names is None:
+            inheritable_names = InheritanceMixin.fields.keys()
+        inheritable_names = set(inheritable_names)
+
+        # (the values the block inherits, the type of its parent) for each block
+        self._entries = {}
+        stack = [(block_key, {}, None) for block_key in blocks if block_key not in parent_map]
+        while stack:
+            block_key, inherited, parent_type = stack.pop()
+            if block_key in self._entries or block_key not in blocks:
+                continue
+            self._entries[block_key] = (inherited, parent_type)
+
+            block_type, fields, children = blocks[block_key]
+            inheriting = inherited
+            for name in inheritable_names.intersection(fields):
+                if inheriting is inherited:
+                    inheriting = dict(inherited)
+                inheriting[name] = fields[name]
+            for child in children:
+                if parent_map.get(child) == block_key:
+                    stack.append((child, inheriting, block_type))
+
+    def get(self, block_key):
+        """
+        Returns (the JSON values that the block inherits, by field name, the
+        type of its parent), or None if the block isn't in the table.  The
+        values must not be modified.
+        """
+        return self._entries.get(block_key)
+
+
 class InheritingFieldData(KvsFieldData):
     """A `FieldData` implementation that can inherit value from parents to children."""
 
-    def __init__(self, inheritable_names, **kwargs):
+    def __init__(self, inheritable_names, inherited_values=None, **kwargs):
         """
         `inheritable_names` is a list of names that can be inherited from
         parents.
 
+        `inherited_values` is a function that returns the entry of the block
+        in an InheritanceTable, or None if the values it inherits have to be
+        found by walking up its parents.
+
         """
         super(InheritingFieldData, self).__init__(**kwargs)
         self.inheritable_names = set(inheritable_names)
+        self.inherited_values = inherited_values
 
     def has_default_value(self, name):
         """
@@ -307,6 +365,15 @@ class InheritingFieldData(KvsFieldData):
         The default for an inheritable name is found on a parent.
         """
         if name in self.inheritable_names:
+            entry = self.inherited_values() if self.inherited_values is not None else None
+            if entry is not None:
+                inherited, parent_type = entry
+                # As below, blocks in a 'library_content' block use the kvs' default.
+                if name in inherited and not (parent_type == 'library_content' and self.has_default_value(name)):
+                    # The values are shared, so give the block its own copy.
+                    return deepcopy(inherited[name])
+                return super(InheritingFieldData, self).default(block, name)
+
             # Walk up the content tree to find the first ancestor
             # that this field is set on. Use the field from the current
             # block so that if it has a different default than the root
@@ -330,10 +397,14 @@ class InheritingFieldData(KvsFieldData):
         return super(InheritingFieldData, self).default(block, name)
 
 
-def inheriting_field_data(kvs):
-    """Create an InheritanceFieldData that inherits the names in InheritanceMixin."""
+def inheriting_field_data(kvs, inherited_values=None):
+    """
+    Create an InheritanceFieldData that inherits the names in InheritanceMixin,
+    from an InheritanceTable if `inherited_values` is given (see InheritingFieldData).
+    """
     return InheritingFieldData(
         inheritable_names=InheritanceMixin.fields.keys(),
+        inherited_values=inherited_values,
         kvs=kvs,
     )
 
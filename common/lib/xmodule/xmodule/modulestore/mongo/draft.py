@@ -194,7 +194,7 @@ class DraftModuleStore(MongoModuleStore):
                 )
 
             # clone the assets
-            super(DraftModuleStore, self).clone_course(source_course_id, dest_course_id, user_id, fields)
+            super(DraftModuleStore, self).clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
 
             # get the whole old course
             new_course = self.get_course(dest_course_id)
@@ -1,5 +1,6 @@
 import sys
 import logging
+from functools import partial
 
 from contracts import contract, new_contract
 from fs.osfs import OSFS
@@ -16,7 +17,7 @@ from xmodule.errortracker import exc_info_to_str
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.edit_info import EditInfoRuntimeMixin
 from xmodule.modulestore.exceptions import ItemNotFoundError
-from xmodule.modulestore.inheritance import inheriting_field_data, InheritanceMixin
+from xmodule.modulestore.inheritance import inheriting_field_data, InheritanceMixin, InheritanceTable
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
 from xmodule.modulestore.split_mongo.id_manager import SplitMongoIdManager
 from xmodule.modulestore.split_mongo.definition_lazy_loader import DefinitionLazyLoader
@@ -93,6 +94,31 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
                 parent_map[child] = block_key
         return parent_map
 
+    @lazy
+    def _inheritance_table(self):
+        """
+        The values that the blocks of the course version inherit from their ancestors.
+        """
+        blocks = {
+            block_key: (block_key.type, block.fields, block.fields.get('children', []))
+            for block_key, block in self.course_entry.structure['blocks'].iteritems()
+        }
+        return InheritanceTable(blocks, self._parent_map)
+
+    def _get_inherited_values(self, block_key):
+        """
+        Returns the entry of the block in the inheritance table, or None if
+        the values it inherits have to be found by walking up its parents.
+        """
+        # Blocks may have been changed, without this structure, by the writes of a
+        # bulk operation, and their children see those changes when walking up to them.
+        bulk_write_record = self.modulestore._get_bulk_ops_record(  # pylint: disable=protected-access
+            self.course_entry.course_key
+        )
+        if bulk_write_record.dirty_branches:
+            return None
+        return self._inheritance_table.get(block_key)
+
     @contract(usage_key="BlockUsageLocator | BlockKey", course_entry_override="CourseEnvelope | None")
     def _load_item(self, usage_key, course_entry_override=None, **kwargs):
         """
@@ -243,7 +269,7 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
             )
 
             if InheritanceMixin in self.modulestore.xblock_mixins:
-                field_data = inheriting_field_data(kvs)
+                field_data = inheriting_field_data(kvs, partial(self._get_inherited_values, block_key))
             else:
                 field_data = KvsFieldData(kvs)
 
@@ -1813,6 +1813,8 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if source_index is None:
             raise ItemNotFoundError("Cannot find a course at {0}. Aborting".format(source_course_id))
 
+        # only the asset copy understands this
+        asset_progress_callback = kwargs.pop('asset_progress_callback', None)
         with self.bulk_operations(dest_course_id):
             new_course = self.create_course(
                 dest_course_id.org, dest_course_id.course, dest_course_id.run,
@@ -1824,7 +1826,10 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 **kwargs
             )
             # don't copy assets until we create the course in case something's awry
-            super(SplitMongoModuleStore, self).clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
+            super(SplitMongoModuleStore, self).clone_course(
+                source_course_id, dest_course_id, user_id, fields,
+                asset_progress_callback=asset_progress_callback, **kwargs
+            )
             return new_course
 
     DEFAULT_ROOT_COURSE_BLOCK_ID = 'course'
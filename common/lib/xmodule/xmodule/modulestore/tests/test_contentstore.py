@@ -9,6 +9,8 @@ from tempfile import mkdtemp
 import path
 import shutil
 
+from mock import patch
+
 from opaque_keys.edx.locator import CourseLocator, AssetLocator
 from opaque_keys.edx.keys import AssetKey
 from xmodule.tests import DATA_DIR
@@ -123,6 +125,58 @@ class TestContentstore(unittest.TestCase):
             "Found unknown asset {}".format(unknown_asset)
         )
 
+    @ddt.data(True, False)
+    def test_get_all_asset_metadata_for_course(self, deprecated):
+        """
+        Test listing the metadata of all of a course's assets
+        """
+        self.set_up_assets(deprecated)
+        asset_keys = [self.course1_key.make_asset_key('asset', filename) for filename in self.course1_files]
+
+        assets_metadata = self.contentstore.get_all_asset_metadata_for_course(self.course1_key)
+        self.assertEqual(set(assets_metadata), set(asset_keys))
+        for asset_key in asset_keys:
+            content = self.contentstore.find(asset_key)
+            self.assertEqual(
+                assets_metadata[asset_key],
+                (content.content_digest, content.locked, content.content_type),
+            )
+
+    @ddt.data(True, False)
+    def test_asset_index(self, deprecated):
+        """
+        Test that the asset index is built with one query and is invalidated by changes to assets
+        """
+        self.set_up_assets(deprecated)
+        asset_keys = [self.course1_key.make_asset_key('asset', filename) for filename in self.course1_files]
+        unknown_asset = self.course1_key.make_asset_key('asset', 'no_such_file.gif')
+
+        with patch.object(
+            self.contentstore, 'get_all_asset_metadata_for_course',
+            wraps=self.contentstore.get_all_asset_metadata_for_course,
+        ) as mock_get_all:
+            for asset_key in asset_keys:
+                content = self.contentstore.find(asset_key)
+                self.assertEqual(
+                    self.contentstore.asset_index.get(asset_key),
+                    (content.content_digest, content.locked, content.content_type),
+                )
+            self.assertIsNone(self.contentstore.asset_index.get(unknown_asset))
+            self.assertEqual(mock_get_all.call_count, 1)
+
+            self.contentstore.set_attr(asset_keys[0], 'locked', True)
+            self.assertTrue(self.contentstore.asset_index.get(asset_keys[0]).locked)
+            self.contentstore.delete(asset_keys[0])
+            self.assertIsNone(self.contentstore.asset_index.get(asset_keys[0]))
+            self.assertEqual(mock_get_all.call_count, 3)
+
+            # Other courses' indexes are kept.
+            course2_asset_key = self.course2_key.make_asset_key('asset', self.course2_files[0])
+            self.assertIsNotNone(self.contentstore.asset_index.get(course2_asset_key))
+            self.contentstore.set_attr(asset_keys[1], 'locked', True)
+            self.assertIsNotNone(self.contentstore.asset_index.get(course2_asset_key))
+            self.assertEqual(mock_get_all.call_count, 4)
+
     @ddt.data(True, False)
     def test_export_for_course(self, deprecated):
         """
@@ -184,13 +238,19 @@ class TestContentstore(unittest.TestCase):
         """
         self.set_up_assets(deprecated)
         dest_course = CourseLocator('test', 'destination', 'copy')
-        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        progress = []
+        with patch.object(MongoContentStore, 'COPY_PROGRESS_INTERVAL', 2), \
+                patch.object(MongoContentStore, 'COPY_CHUNKS_BATCH_SIZE', 1):
+            self.contentstore.copy_all_course_assets(
+                self.course1_key, dest_course, progress_callback=lambda *args: progress.append(args)
+            )
+        self.assertEqual(progress, [(2, 3), (3, 3)])
         for filename in self.course1_files:
             asset_key = self.course1_key.make_asset_key('asset', filename)
             dest_key = dest_course.make_asset_key('asset', filename)
             source = self.contentstore.find(asset_key)
             copied = self.contentstore.find(dest_key)
-            for propname in ['name', 'content_type', 'length', 'locked']:
+            for propname in ['name', 'content_type', 'length', 'locked', 'content_digest', 'data']:
                 self.assertEqual(getattr(source, propname), getattr(copied, propname))
 
         __, count = self.contentstore.get_all_content_for_course(dest_course)
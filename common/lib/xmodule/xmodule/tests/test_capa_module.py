@@ -10,7 +10,9 @@ import json
 import random
 import requests
 import os
+import sys
 import textwrap
+import traceback
 import unittest
 
 import ddt
@@ -1078,6 +1080,45 @@ class CapaModuleTest(unittest.TestCase):
         # Expect that the number of attempts is not incremented
         self.assertEqual(module.attempts, 0)
 
+    def test_rescore_problem_new_correctness(self):
+        module = CapaFactory.create(attempts=1, done=True)
+
+        # The new correctness given, from grading many problems together, is used
+        # instead of grading the problem again
+        new_correctness = CorrectMap(answer_id=CapaFactory.answer_key(), correctness='correct', npoints=1)
+        with patch('capa.capa_problem.LoncapaProblem.get_grade_from_current_answers') as mock_grade:
+            module.rescore(only_if_higher=False, new_correctness=new_correctness)
+        self.assertFalse(mock_grade.called)
+
+        # Expect that the problem is marked correct
+        self.assertEqual(module.is_correct(), True)
+
+    def test_rescore_problem_new_correctness_error(self):
+        module = CapaFactory.create(attempts=1, done=True)
+
+        def grade():
+            """
+            Raises an error, as if while grading many problems together.
+            """
+            raise ResponseError(u'test error')
+
+        try:
+            grade()
+        except ResponseError:
+            new_correctness = sys.exc_info()
+
+        # An exception raised while grading many problems together is raised,
+        # with the traceback of where it was raised
+        with self.assertRaises(ResponseError):
+            try:
+                module.rescore(only_if_higher=False, new_correctness=new_correctness)
+            except ResponseError:
+                self.assertEqual(traceback.extract_tb(sys.exc_info()[2])[-1][2], 'grade')
+                raise
+
+        # Expect that the number of attempts is NOT incremented
+        self.assertEqual(module.attempts, 1)
+
     def test_rescore_problem_not_done(self):
         # Simulate that the problem is NOT done
         module = CapaFactory.create(done=False)
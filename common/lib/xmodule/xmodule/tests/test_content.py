@@ -209,6 +209,25 @@ class ContentTest(unittest.TestCase):
 
         self.assertEqual(total_length, last_byte - first_byte + 1)
 
+    def test_static_content_stream_data_chunk_size(self):
+        """
+        Test that StaticContentStream streams its data in chunks of the requested size,
+        and that StaticContent streams the same data.
+        """
+        data = SAMPLE_STRING
+        static_content_stream = StaticContentStream('loc', 'name', 'type', FakeGridFsItem(data), length=len(data))
+        static_content = StaticContent('loc', 'name', 'type', data, length=len(data))
+
+        chunks = list(static_content_stream.stream_data(chunk_size=500))
+        self.assertEqual(''.join(chunks), data)
+        self.assertEqual(max(len(chunk) for chunk in chunks), 500)
+        self.assertEqual(''.join(static_content.stream_data(chunk_size=500)), data)
+
+        chunks = list(static_content_stream.stream_data_in_range(100, 1500, chunk_size=500))
+        self.assertEqual(''.join(chunks), data[100:1501])
+        self.assertEqual(max(len(chunk) for chunk in chunks), 500)
+        self.assertEqual(''.join(static_content.stream_data_in_range(100, 1500)), data[100:1501])
+
     def test_static_content_write_js(self):
         """
         Test that only one filename starts with 000.
@@ -2,17 +2,22 @@
 # pylint: disable=missing-docstring
 
 import unittest
+from datetime import datetime
 
 from mock import Mock
 from nose.tools import assert_equals, assert_not_equals, assert_true, assert_false, assert_in, assert_not_in  # pylint: disable=no-name-in-module
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
+from pytz import UTC
 
+from xblock.core import XBlock
 from xblock.field_data import DictFieldData
 from xblock.fields import Scope, String, Dict, Boolean, Integer, Float, Any, List
 from xblock.runtime import KvsFieldData, DictKeyValueStore
 
 from xmodule.fields import Date, Timedelta, RelativeTime
-from xmodule.modulestore.inheritance import InheritanceKeyValueStore, InheritanceMixin, InheritingFieldData
+from xmodule.modulestore.inheritance import (
+    InheritanceKeyValueStore, InheritanceMixin, InheritanceTable, InheritingFieldData
+)
 from xmodule.modulestore.split_mongo.split_mongo_kvs import SplitMongoKVS
 from xmodule.xml_module import XmlDescriptor, serialize_field, deserialize_field
 from xmodule.course_module import CourseDescriptor
@@ -227,6 +232,76 @@ class InheritingFieldDataTest(unittest.TestCase):
         self.assertEqual(child.inherited, "child's default")
 
 
+class InheritanceTableTest(unittest.TestCase):
+    """
+    Tests of InheritanceTable, and of InheritingFieldData using it.
+    """
+    def setUp(self):
+        super(InheritanceTableTest, self).setUp()
+        blocks = {
+            'course': ('course', {'graded': True, 'children': ['chapter']}, ['chapter']),
+            'chapter': ('chapter', {'display_name': 'Chapter'}, ['sequential', 'library']),
+            'sequential': ('sequential', {'graded': False, 'due': '2030-01-01T00:00'}, ['problem']),
+            'problem': ('problem', {}, []),
+            'library': ('library_content', {'max_attempts': 3}, ['library_problem']),
+            'library_problem': ('problem', {}, []),
+            'orphan': ('problem', {'graded': True}, []),
+        }
+        parent_map = {
+            child: block_key for block_key, (__, __, children) in blocks.iteritems() for child in children
+        }
+        self.table = InheritanceTable(blocks, parent_map)
+
+    def test_inherited_values(self):
+        self.assertEqual(self.table.get('course'), ({}, None))
+        self.assertEqual(self.table.get('chapter'), ({'graded': True}, 'course'))
+        self.assertEqual(self.table.get('sequential'), ({'graded': True}, 'chapter'))
+        self.assertEqual(
+            self.table.get('problem'),
+            ({'graded': False, 'due': '2030-01-01T00:00'}, 'sequential'),
+        )
+        self.assertEqual(self.table.get('library_problem'), ({'graded': True, 'max_attempts': 3}, 'library_content'))
+        self.assertEqual(self.table.get('orphan'), ({}, None))
+        self.assertIsNone(self.table.get('unknown'))
+
+    def test_values_shared(self):
+        # Blocks that don't set inheritable fields pass on what they inherit.
+        self.assertIs(self.table.get('chapter')[0], self.table.get('sequential')[0])
+
+    class TestableTableBlock(InheritanceMixin, XBlock):
+        """
+        An XBlock we can use in these tests.
+        """
+        pass
+
+    def get_block(self, block_key, defaults=None):
+        """
+        Returns a block whose InheritingFieldData uses the table.
+        """
+        kvs = SplitMongoKVS(definition=Mock(), initial_values={}, default_values=defaults or {}, parent=None)
+        field_data = InheritingFieldData(
+            inheritable_names=InheritanceMixin.fields.keys(),
+            inherited_values=lambda: self.table.get(block_key),
+            kvs=kvs,
+        )
+        block = self.TestableTableBlock(runtime=Mock(), field_data=field_data, scope_ids=Mock())
+        block.get_parent = Mock()
+        return block
+
+    def test_field_data(self):
+        block = self.get_block('problem')
+        self.assertEqual(block.graded, False)
+        self.assertEqual(block.due, datetime(2030, 1, 1, tzinfo=UTC))
+        self.assertIsNone(block.max_attempts)
+        self.assertFalse(block.get_parent.called)
+
+    def test_field_data_library_defaults(self):
+        # Blocks in a library_content block use their defaults rather than inheriting.
+        block = self.get_block('library_problem', defaults={'max_attempts': 5})
+        self.assertEqual(block.max_attempts, 5)
+        self.assertEqual(block.graded, True)
+
+
 class EditableMetadataFieldsTest(unittest.TestCase):
     def test_display_name_field(self):
         editable_fields = self.get_xml_editable_fields(DictFieldData({}))
@@ -429,6 +429,15 @@ class CourseAuthorization(models.Model):
         except cls.DoesNotExist:
             return False
 
+    @classmethod
+    def instructor_email_enabled_course_ids(cls, course_ids):
+        """
+        Returns the set of the given course ids for which email is enabled.
+        """
+        return set(
+            record.course_id for record in cls.objects.filter(course_id__in=course_ids, email_enabled=True)
+        )
+
     def __unicode__(self):
         not_en = "Not "
         if self.email_enabled:
@@ -470,6 +479,20 @@ class BulkEmailFlag(ConfigurationModel):
         else:  # implies enabled == True and require_course_email == False, so email is globally enabled
             return True
 
+    @classmethod
+    def feature_enabled_for_courses(cls, course_ids):
+        """
+        Returns the set of the given course ids for which the bulk email feature
+        is available, as decided by feature_enabled, with at most one query for
+        the courses' authorizations.
+        """
+        if not BulkEmailFlag.is_enabled():
+            return set()
+        elif BulkEmailFlag.current().require_course_email_auth:
+            return CourseAuthorization.instructor_email_enabled_course_ids(course_ids)
+        else:
+            return set(course_ids)
+
     class Meta(object):
         app_label = "bulk_email"
 
@@ -4,7 +4,6 @@ defined in edx_user_state_client.
 """
 
 from collections import defaultdict
-from unittest import skip
 
 from django.test import TestCase
 from edx_user_state_client.tests import UserStateClientTestBase
@@ -34,36 +33,50 @@ class TestDjangoUserStateClient(UserStateClientTestBase, TestCase):
         self.client = DjangoXBlockUserStateClient()
         self.users = defaultdict(UserFactory.create)
 
-    # We're skipping these tests because the iter_all_by_block and iter_all_by_course
-    # are not implemented in the DjangoXBlockUserStateClient
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_blocks_deleted_block(self):
-        pass
-
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_blocks_empty(self):
-        pass
-
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_blocks_many_users(self):
-        pass
-
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_blocks_single_user(self):
-        pass
-
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_course_deleted_block(self):
-        pass
-
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_course_empty(self):
-        pass
-
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_course_single_user(self):
-        pass
-
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_course_many_users(self):
-        pass
+    def test_set_many_query_count(self):
+        # One query for the user and one to read the existing modules,
+        # then one bulk INSERT in a savepoint and one to read the created
+        # modules back.
+        with self.assertNumQueries(6, using='default'):
+            self.set_many(0, {block_idx: {'field': block_idx} for block_idx in range(3)})
+
+        # One query for the user and one to read the existing modules,
+        # then one bulk UPDATE in a savepoint, and one INSERT in a
+        # savepoint for the new module.
+        with self.assertNumQueries(8, using='default'):
+            self.set_many(0, {block_idx: {'other_field': block_idx} for block_idx in range(4)})
+
+        for block_idx in range(3):
+            self.assertEqual(self.get(0, block_idx).state, {'field': block_idx, 'other_field': block_idx})
+        self.assertEqual(self.get(0, 3).state, {'other_field': 3})
+        self.assertEqual(len(list(self.get_history(0, 0))), 2)
+
+    def test_iter_all_for_block_in_batches(self):
+        for user_idx in range(5):
+            self.set(user_idx, 0, {'field': user_idx})
+        self.set(0, 1, {'field': 'other block'})
+
+        # Three batches of StudentModules, and a last, empty one.
+        with self.assertNumQueries(4, using='default'):
+            states = list(self.client.iter_all_for_block(self._block(0), batch_size=2))
+        self.assertEqual(
+            {(state.username, state.state['field']) for state in states},
+            {(self._user(user_idx), user_idx) for user_idx in range(5)},
+        )
+
+    def test_iter_all_for_block_raw_state(self):
+        for user_idx in range(3):
+            self.set(user_idx, 0, {'field': user_idx})
+        self.delete(1, 0)
+
+        # Deleted states are included, as they are stored, in order of student.
+        states = list(self.client.iter_all_for_block(self._block(0), batch_size=2, raw_state=True))
+        self.assertEqual(
+            [(state.username, state.state) for state in states],
+            [(self._user(0), '{"field": 0}'), (self._user(1), '{}'), (self._user(2), '{"field": 2}')],
+        )
+
+    def test_iter_all_for_course_block_type(self):
+        self.set(0, 0, {'field': 'value'})
+        self.assertEqual(len(list(self.client.iter_all_for_course(self._block(0).course_key, 'problem'))), 1)
+        self.assertEqual(len(list(self.client.iter_all_for_course(self._block(0).course_key, 'html'))), 0)
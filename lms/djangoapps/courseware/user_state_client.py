@@ -10,7 +10,10 @@ from time import time
 
 from django.contrib.auth.models import User
 from django.db import transaction
+from django.db.models import Case, TextField, Value, When
+from django.db.models.signals import post_save
 from django.db.utils import IntegrityError
+from django.utils import timezone
 from edx_user_state_client.interface import XBlockUserState, XBlockUserStateClient
 from xblock.fields import Scope
 
@@ -50,6 +53,10 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
     # Use this sample rate for DataDog events.
     API_DATADOG_SAMPLE_RATE = 0.1
 
+    # Default number of StudentModules read at a time by iter_all_for_block
+    # and iter_all_for_course.
+    ITER_BATCH_SIZE = 1000
+
     class ServiceUnavailable(XBlockUserStateClient.ServiceUnavailable):
         """
         This error is raised if the service backing this client is currently unavailable.
@@ -254,7 +261,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         # count how many times this function gets called
         self._nr_stat_increment('set_many', 'calls')
 
-        # We do a find_or_create for every block (rather than re-using field objects
+        # We read every block's StudentModule (rather than re-using field objects
         # that were queried in get_many) so that if the score has
         # been changed by some other piece of the code, we don't overwrite
         # that score.
@@ -270,41 +277,9 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         evt_time = time()
 
+        set_results = self._set_student_modules(user, block_keys_to_state)
         for usage_key, state in block_keys_to_state.items():
-            student_module, created = StudentModule.objects.get_or_create(
-                student=user,
-                course_id=usage_key.course_key,
-                module_state_key=usage_key,
-                defaults={
-                    'state': json.dumps(state),
-                    'module_type': usage_key.block_type,
-                },
-            )
-
-            num_fields_before = num_fields_after = num_new_fields_set = len(state)
-            num_fields_updated = 0
-            if not created:
-                if student_module.state is None:
-                    current_state = {}
-                else:
-                    current_state = json.loads(student_module.state)
-                num_fields_before = len(current_state)
-                current_state.update(state)
-                num_fields_after = len(current_state)
-                student_module.state = json.dumps(current_state)
-                try:
-                    with transaction.atomic():
-                        # Updating the object - force_update guarantees no INSERT will occur.
-                        student_module.save(force_update=True)
-                except IntegrityError:
-                    # The UPDATE above failed. Log information - but ignore the error.
-                    # See https://openedx.atlassian.net/browse/TNL-5365
-                    log.warning("set_many: IntegrityError for student {} - course_id {} - usage key {}".format(
-                        user, repr(unicode(usage_key.course_key)), usage_key
-                    ))
-                    log.warning("set_many: All {} block keys: {}".format(
-                        len(block_keys_to_state), block_keys_to_state.keys()
-                    ))
+            student_module, created, num_fields_before, num_fields_after = set_results[usage_key]
 
             # DataDog and New Relic reporting
 
@@ -337,6 +312,171 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         self._ddog_histogram(evt_time, 'set_many.response_time', duration)
         self._nr_stat_accumulate('set_many', 'duration', duration)
 
+    def _set_student_modules(self, user, block_keys_to_state):
+        """
+        Overlays the given states on the user's StudentModules, creating
+        any that don't exist yet.  All the StudentModules are read with
+        one query, new ones are created with one bulk INSERT, and existing
+        ones are changed with one bulk UPDATE.
+
+        Returns a dict mapping each UsageKey to a tuple of
+        (StudentModule, created, number of fields before, number of fields after).
+        """
+        existing_modules = {
+            _student_module_key(student_module.module_state_key): student_module
+            for student_module, _ in self._get_student_modules(user.username, block_keys_to_state.keys())
+        }
+
+        modified = timezone.now()
+        set_results = {}
+        new_modules = {}
+        for usage_key, state in block_keys_to_state.items():
+            student_module = existing_modules.get(_student_module_key(usage_key))
+            if student_module is None:
+                new_modules[usage_key] = StudentModule(
+                    student=user,
+                    course_id=usage_key.course_key,
+                    module_state_key=usage_key,
+                    state=json.dumps(state),
+                    module_type=usage_key.block_type,
+                )
+            else:
+                current_state = {} if student_module.state is None else json.loads(student_module.state)
+                num_fields_before = len(current_state)
+                current_state.update(state)
+                student_module.state = json.dumps(current_state)
+                student_module.modified = modified
+                set_results[usage_key] = (student_module, False, num_fields_before, len(current_state))
+
+        self._update_student_modules(
+            user, [result[0] for result in set_results.itervalues()], block_keys_to_state, modified,
+        )
+        set_results.update(self._create_student_modules(user, new_modules, block_keys_to_state))
+        return set_results
+
+    def _update_student_modules(self, user, student_modules, block_keys_to_state, modified):
+        """
+        Saves the states of the given existing StudentModules with a
+        single UPDATE, and sends their post_save signals.
+        """
+        if not student_modules:
+            return
+        try:
+            with transaction.atomic():
+                # Updating the objects - a queryset update guarantees no INSERT will occur.
+                StudentModule.objects.filter(id__in=[student_module.id for student_module in student_modules]).update(
+                    state=Case(
+                        *[
+                            When(id=student_module.id, then=Value(student_module.state))
+                            for student_module in student_modules
+                        ],
+                        output_field=TextField()
+                    ),
+                    modified=modified,
+                )
+        except IntegrityError:
+            # The UPDATE above failed. Log information - but ignore the error.
+            # See https://openedx.atlassian.net/browse/TNL-5365
+            for student_module in student_modules:
+                log.warning("set_many: IntegrityError for student {} - course_id {} - usage key {}".format(
+                    user, repr(unicode(student_module.course_id)), student_module.module_state_key
+                ))
+            log.warning("set_many: All {} block keys: {}".format(
+                len(block_keys_to_state), block_keys_to_state.keys()
+            ))
+        else:
+            # Queryset updates don't send post_save, which records the history of the modules.
+            for student_module in student_modules:
+                post_save.send(sender=StudentModule, instance=student_module, created=False, raw=False)
+
+    def _create_student_modules(self, user, new_modules, block_keys_to_state):
+        """
+        Creates the given new StudentModules, with a single INSERT, and
+        sends their post_save signals.
+
+        Returns a dict mapping each UsageKey to a tuple of
+        (StudentModule, created, number of fields before, number of fields after).
+        """
+        if not new_modules:
+            return {}
+        try:
+            with transaction.atomic():
+                if len(new_modules) == 1:
+                    new_modules.values()[0].save(force_insert=True)
+                else:
+                    StudentModule.objects.bulk_create(new_modules.values())
+        except IntegrityError:
+            # Some of the modules were created concurrently.  Fall back
+            # to setting the state of each block individually.
+            return {
+                usage_key: self._set_student_module(user, usage_key, block_keys_to_state)
+                for usage_key in new_modules
+            }
+
+        if len(new_modules) > 1:
+            # Bulk inserts don't set primary keys (on MySQL) or send
+            # post_save, so read the created modules back for the
+            # history receivers.
+            created_modules = {
+                _student_module_key(student_module.module_state_key): student_module
+                for student_module, _ in self._get_student_modules(user.username, new_modules.keys())
+            }
+            new_modules = {
+                usage_key: created_modules[_student_module_key(usage_key)]
+                for usage_key in new_modules
+            }
+            for student_module in new_modules.itervalues():
+                post_save.send(sender=StudentModule, instance=student_module, created=True, raw=False)
+
+        return {
+            usage_key: (student_module, True, len(block_keys_to_state[usage_key]), len(block_keys_to_state[usage_key]))
+            for usage_key, student_module in new_modules.iteritems()
+        }
+
+    def _set_student_module(self, user, usage_key, block_keys_to_state):
+        """
+        Overlays the state in block_keys_to_state for the given UsageKey on
+        the user's StudentModule, creating it if needed.
+
+        Returns a tuple of
+        (StudentModule, created, number of fields before, number of fields after).
+        """
+        state = block_keys_to_state[usage_key]
+        student_module, created = StudentModule.objects.get_or_create(
+            student=user,
+            course_id=usage_key.course_key,
+            module_state_key=usage_key,
+            defaults={
+                'state': json.dumps(state),
+                'module_type': usage_key.block_type,
+            },
+        )
+
+        num_fields_before = num_fields_after = len(state)
+        if not created:
+            if student_module.state is None:
+                current_state = {}
+            else:
+                current_state = json.loads(student_module.state)
+            num_fields_before = len(current_state)
+            current_state.update(state)
+            num_fields_after = len(current_state)
+            student_module.state = json.dumps(current_state)
+            try:
+                with transaction.atomic():
+                    # Updating the object - force_update guarantees no INSERT will occur.
+                    student_module.save(force_update=True)
+            except IntegrityError:
+                # The UPDATE above failed. Log information - but ignore the error.
+                # See https://openedx.atlassian.net/browse/TNL-5365
+                log.warning("set_many: IntegrityError for student {} - course_id {} - usage key {}".format(
+                    user, repr(unicode(usage_key.course_key)), usage_key
+                ))
+                log.warning("set_many: All {} block keys: {}".format(
+                    len(block_keys_to_state), block_keys_to_state.keys()
+                ))
+        return student_module, created, num_fields_before, num_fields_after
+
     def delete_many(self, username, block_keys, scope=Scope.user_state, fields=None):
         """
         Delete the stored XBlock state for a many xblock usages.
@@ -429,22 +569,102 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
             yield XBlockUserState(username, block_key, state, history_entry.created, scope)
 
-    def iter_all_for_block(self, block_key, scope=Scope.user_state, batch_size=None):
+    def iter_all_for_block(self, block_key, scope=Scope.user_state, batch_size=None, raw_state=False):
         """
         You get no ordering guarantees. Fetching will happen in batch_size
         increments. If you're using this method, you should be running in an
         async task.
+
+        If `raw_state` is true, every student's state is yielded as it is
+        stored, as a JSON string or None, including deleted (empty) states.
         """
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
-        raise NotImplementedError()
 
-    def iter_all_for_course(self, course_key, block_type=None, scope=Scope.user_state, batch_size=None):
+        query = StudentModule.objects.filter(
+            course_id=block_key.course_key,
+            module_state_key=block_key,
+        )
+        # Each student has one StudentModule for the block, so they can be
+        # paginated by student.
+        return self._iter_all(query, 'iter_all_for_block', scope, batch_size, raw_state, 'student_id')
+
+    def iter_all_for_course(self, course_key, block_type=None, scope=Scope.user_state, batch_size=None,
+                            raw_state=False):
         """
         You get no ordering guarantees. Fetching will happen in batch_size
         increments. If you're using this method, you should be running in an
         async task.
+
+        If `raw_state` is true, every state is yielded as it is stored, as a
+        JSON string or None, including deleted (empty) states.
         """
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
-        raise NotImplementedError()
+
+        query = StudentModule.objects.filter(course_id=course_key)
+        if block_type is not None:
+            query = query.filter(module_type=block_type)
+        return self._iter_all(query, 'iter_all_for_course', scope, batch_size, raw_state, 'id')
+
+    def _iter_all(self, query, function_name, scope, batch_size, raw_state, order_field):
+        """
+        Yields XBlockUserState tuples for the StudentModules in the given
+        query that have state, or for all of them, with their stored states,
+        if `raw_state` is true.
+
+        The StudentModules are read in batches of batch_size, paginated by
+        `order_field`, which must be unique in the query, so that only one
+        batch is held in memory at a time no matter how many StudentModules
+        there are.
+        """
+        batch_size = batch_size or self.ITER_BATCH_SIZE
+        evt_time = time()
+        total_block_count = 0
+
+        # count how many times this function gets called
+        self._nr_stat_increment(function_name, 'calls')
+
+        query = query.select_related('student').order_by(order_field)
+        last_value = None
+        while True:
+            batch_query = query if last_value is None else query.filter(**{order_field + '__gt': last_value})
+            student_modules = list(batch_query[:batch_size])
+            if not student_modules:
+                break
+            last_value = getattr(student_modules[-1], order_field)
+
+            for student_module in student_modules:
+                if raw_state:
+                    state = student_module.state
+                elif student_module.state is None:
+                    continue
+                else:
+                    # If the state is the empty dict, then it has been deleted, and so
+                    # conformant UserStateClients should treat it as if it doesn't exist.
+                    state = json.loads(student_module.state)
+                    if state == {}:
+                        continue
+
+                total_block_count += 1
+                usage_key = student_module.module_state_key.map_into_course(student_module.course_id)
+                yield XBlockUserState(
+                    student_module.student.username, usage_key, state, student_module.modified, scope,
+                )
+
+        # The rest of this method exists only to report metrics.
+        finish_time = time()
+        duration = (finish_time - evt_time) * 1000  # milliseconds
+
+        self._ddog_histogram(evt_time, '{}.blks_out'.format(function_name), total_block_count)
+        self._nr_stat_accumulate(function_name, 'blocks_out', total_block_count)
+        self._nr_stat_accumulate(function_name, 'duration', duration)
+
+
+def _student_module_key(usage_key):
+    """
+    Returns the given UsageKey as it is stored in the module_state_key
+    of a StudentModule, for matching keys with and without runs.
+    """
+    module_state_key_field = StudentModule._meta.get_field('module_state_key')  # pylint: disable=protected-access
+    return module_state_key_field.get_prep_value(usage_key)
@@ -46,7 +46,7 @@ from student.tests.factories import AdminFactory, CourseEnrollmentFactory, UserF
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import TEST_DATA_MIXED_MODULESTORE, ModuleStoreTestCase
-from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, ToyCourseFactory
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, ToyCourseFactory, check_mongo_calls
 
 
 @attr(shard=1)
@@ -208,11 +208,10 @@ class CoursewareContextTestCase(ModuleStoreTestCase):
         utils.add_courseware_context([thread], self.course, self.user)
         self.assertNotIn('/', thread.get("courseware_title"))
 
-    @ddt.data((ModuleStoreEnum.Type.mongo, 2), (ModuleStoreEnum.Type.split, 1))
-    @ddt.unpack
-    def test_get_accessible_discussion_xblocks(self, modulestore_type, expected_discussion_xblocks):
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    def test_get_accessible_discussion_xblocks(self, modulestore_type):
         """
-        Tests that the accessible discussion xblocks having no parents do not get fetched for split modulestore.
+        Tests that the accessible discussion xblocks having no parents do not get fetched.
         """
         course = CourseFactory.create(default_store=modulestore_type)
 
@@ -232,7 +231,7 @@ class CoursewareContextTestCase(ModuleStoreTestCase):
         # Assert that the discussion xblock is an orphan.
         self.assertIn(orphan, self.store.get_orphans(course.id))
 
-        self.assertEqual(len(utils.get_accessible_discussion_xblocks(course, self.user)), expected_discussion_xblocks)
+        self.assertEqual(len(utils.get_accessible_discussion_xblocks(course, self.user)), 1)
 
 
 @attr(shard=3)
@@ -276,27 +275,6 @@ class CachedDiscussionIdMapTestCase(ModuleStoreTestCase):
             discussion_target=None
         )
 
-    def test_cache_returns_correct_key(self):
-        usage_key = utils.get_cached_discussion_key(self.course.id, 'test_discussion_id')
-        self.assertEqual(usage_key, self.discussion.location)
-
-    def test_cache_returns_none_if_id_is_not_present(self):
-        usage_key = utils.get_cached_discussion_key(self.course.id, 'bogus_id')
-        self.assertIsNone(usage_key)
-
-    def test_cache_raises_exception_if_course_structure_not_cached(self):
-        CourseStructure.objects.all().delete()
-        with self.assertRaises(utils.DiscussionIdMapIsNotCached):
-            utils.get_cached_discussion_key(self.course.id, 'test_discussion_id')
-
-    def test_cache_raises_exception_if_discussion_id_not_cached(self):
-        cache = CourseStructure.objects.get(course_id=self.course.id)
-        cache.discussion_id_map_json = None
-        cache.save()
-
-        with self.assertRaises(utils.DiscussionIdMapIsNotCached):
-            utils.get_cached_discussion_key(self.course.id, 'test_discussion_id')
-
     def test_xblock_does_not_have_required_keys(self):
         self.assertTrue(utils.has_required_keys(self.discussion))
         self.assertFalse(utils.has_required_keys(self.bad_discussion))
@@ -376,6 +354,8 @@ class CategoryMapTestCase(CategoryMapTestMixin, ModuleStoreTestCase):
     Base testcase class for discussion categories for the
     comment client service integration
     """
+    ENABLED_SIGNALS = ['course_published']
+
     def setUp(self):
         super(CategoryMapTestCase, self).setUp()
 
@@ -467,6 +447,16 @@ class CategoryMapTestCase(CategoryMapTestMixin, ModuleStoreTestCase):
         )
         check_cohorted_topics([])
 
+    def test_inline_from_collected_block_structure(self):
+        self.create_discussion("Chapter", "Discussion")
+        # The course's block structure was collected when it was published,
+        # so the discussion xblocks aren't loaded again.
+        with check_mongo_calls(0):
+            category_map = utils.get_discussion_category_map(self.course, self.instructor)
+            discussion_id_map = utils.get_cached_discussion_id_map(self.course, ["discussion1"], self.instructor)
+        self.assertEqual(category_map["subcategories"]["Chapter"]["entries"]["Discussion"]["id"], "discussion1")
+        self.assertEqual(discussion_id_map["discussion1"]["title"], "Chapter / Discussion")
+
     def test_single_inline(self):
         self.create_discussion("Chapter", "Discussion")
         self.assert_category_map_equals(
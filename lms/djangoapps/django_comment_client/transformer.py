@@ -0,0 +1,59 @@
+"""
+Discussion Transformer
+"""
+from openedx.core.djangoapps.content.block_structure.transformer import BlockStructureTransformer
+
+
+class DiscussionTransformer(BlockStructureTransformer):
+    """
+    The DiscussionTransformer collects the fields of the course's inline
+    discussion xblocks that the forums use to build the course's topics,
+    so that the topics can be listed for each user from the collected
+    block structure, without loading the xblocks.
+
+    No runtime transformations are performed.
+
+    The following values are stored as xblock_fields on their respective blocks
+    in the block structure:
+
+        discussion_id: (string) the id of the discussion's topic.
+        discussion_category: (string) the "/"-separated category of the topic.
+        discussion_target: (string) the name of the topic in its category.
+        sort_key: (string) the key by which the topic is sorted.
+        start: (datetime) when the discussion is released.
+        display_name: (string)
+        self_paced: (boolean) stored on the course block.
+    """
+    WRITE_VERSION = 1
+    READ_VERSION = 1
+    FIELDS_TO_COLLECT = [
+        u'discussion_id',
+        u'discussion_category',
+        u'discussion_target',
+        u'sort_key',
+        u'start',
+        u'display_name',
+        u'self_paced',
+    ]
+
+    @classmethod
+    def name(cls):
+        """
+        Unique identifier for the transformer's class;
+        same identifier used in setup.py.
+        """
+        return u'discussion'
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects any information that's necessary to execute this
+        transformer's transform method.
+        """
+        block_structure.request_xblock_fields(*cls.FIELDS_TO_COLLECT)
+
+    def transform(self, block_structure, usage_context):
+        """
+        Perform no transformations.
+        """
+        pass
@@ -22,12 +22,16 @@ from django_comment_client.settings import MAX_COMMENT_DEPTH
 from django_comment_common.models import FORUM_ROLE_STUDENT, CourseDiscussionSettings, Role
 from django_comment_common.utils import get_course_discussion_settings
 from edxmako import lookup_template
-from openedx.core.djangoapps.content.course_structures.models import CourseStructure
+from lms.djangoapps.course_blocks.api import get_course_blocks
+from lms.djangoapps.course_blocks.transformers.start_date import StartDateTransformer
+from lms.djangoapps.course_blocks.transformers.user_partitions import UserPartitionTransformer
+from lms.djangoapps.course_blocks.transformers.visibility import VisibilityTransformer
+from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
+from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort_id, get_cohort_names, is_course_cohorted
-from request_cache.middleware import request_cached
+from openedx.core.djangoapps.self_paced.models import SelfPacedConfiguration
 from student.models import get_user_by_username_or_email
 from student.roles import GlobalStaff
-from xmodule.modulestore.django import modulestore
 from xmodule.partitions.partitions import ENROLLMENT_TRACK_PARTITION_ID
 from xmodule.partitions.partitions_service import PartitionService
 
@@ -137,15 +141,49 @@ def get_accessible_discussion_xblocks_by_course_id(course_id, user, include_all=
     """
     Return a list of all valid discussion xblocks in this course that
     are accessible to the given user.
-    """
-    all_xblocks = modulestore().get_items(course_id, qualifiers={'category': 'discussion'}, include_orphans=False)
 
+    The xblocks are read from the course's collected block structure (see
+    DiscussionTransformer), so they are BlockData objects with the
+    location and the discussion fields of the xblocks rather than the
+    xblocks themselves.
+    """
+    block_structure = _get_discussion_block_structure(course_id, user, include_all)
     return [
-        xblock for xblock in all_xblocks
-        if has_required_keys(xblock) and (include_all or has_access(user, 'load', xblock, course_id))
+        block_structure[block_key] for block_key in block_structure.topological_traversal()
+        if block_key.block_type == 'discussion' and has_required_keys(block_structure[block_key])
     ]
 
 
+def _get_discussion_block_structure(course_id, user, include_all):
+    """
+    Returns the block structure of the course, with only the blocks that
+    the user can load unless include_all is True.
+
+    The user's access is decided as `has_access(user, 'load', xblock)`
+    would for each xblock, but from the collected block structure.
+    """
+    collected_block_structure = get_block_structure_manager(course_id).get_collected()
+    if include_all:
+        return collected_block_structure
+
+    transformers = [UserPartitionTransformer(), VisibilityTransformer()]
+    # The release dates of the content of self-paced courses are removed
+    # by SelfPacedDateOverrideProvider, so only check them otherwise
+    root_block_usage_key = collected_block_structure.root_block_usage_key
+    if not (
+            collected_block_structure.get_xblock_field(root_block_usage_key, 'self_paced') and
+            SelfPacedConfiguration.current().enabled
+    ):
+        transformers.append(StartDateTransformer())
+
+    return get_course_blocks(
+        user,
+        root_block_usage_key,
+        transformers=BlockStructureTransformers(transformers),
+        collected_block_structure=collected_block_structure,
+    )
+
+
 def get_discussion_id_map_entry(xblock):
     """
     Returns a tuple of (discussion_id, metadata) suitable for inclusion in the results of get_discussion_id_map().
@@ -159,28 +197,6 @@ def get_discussion_id_map_entry(xblock):
     )
 
 
-class DiscussionIdMapIsNotCached(Exception):
-    """Thrown when the discussion id map is not cached for this course, but an attempt was made to access it."""
-    pass
-
-
-@request_cached
-def get_cached_discussion_key(course_id, discussion_id):
-    """
-    Returns the usage key of the discussion xblock associated with discussion_id if it is cached. If the discussion id
-    map is cached but does not contain discussion_id, returns None. If the discussion id map is not cached for course,
-    raises a DiscussionIdMapIsNotCached exception.
-    """
-    try:
-        mapping = CourseStructure.objects.get(course_id=course_id).discussion_id_map
-        if not mapping:
-            raise DiscussionIdMapIsNotCached()
-
-        return mapping.get(discussion_id)
-    except CourseStructure.DoesNotExist:
-        raise DiscussionIdMapIsNotCached()
-
-
 def get_cached_discussion_id_map(course, discussion_ids, user):
     """
     Returns a dict mapping discussion_ids to respective discussion xblock metadata if it is cached and visible to the
@@ -191,22 +207,14 @@ def get_cached_discussion_id_map(course, discussion_ids, user):
 
 def get_cached_discussion_id_map_by_course_id(course_id, discussion_ids, user):  # pylint: disable=invalid-name
     """
-    Returns a dict mapping discussion_ids to respective discussion xblock metadata if it is cached and visible to the
-    user. If not, returns the result of get_discussion_id_map
+    Returns a dict mapping discussion_ids to respective discussion xblock metadata if it is visible to the user,
+    read from the course's collected block structure.
     """
-    try:
-        entries = []
-        for discussion_id in discussion_ids:
-            key = get_cached_discussion_key(course_id, discussion_id)
-            if not key:
-                continue
-            xblock = modulestore().get_item(key)
-            if not (has_required_keys(xblock) and has_access(user, 'load', xblock, course_id)):
-                continue
-            entries.append(get_discussion_id_map_entry(xblock))
-        return dict(entries)
-    except DiscussionIdMapIsNotCached:
-        return get_discussion_id_map_by_course_id(course_id, user)
+    discussion_id_map = get_discussion_id_map_by_course_id(course_id, user)
+    return {
+        discussion_id: discussion_id_map[discussion_id]
+        for discussion_id in discussion_ids if discussion_id in discussion_id_map
+    }
 
 
 def get_discussion_id_map(course, user):
@@ -426,20 +434,13 @@ def discussion_category_id_access(course, user, discussion_id, xblock=None):
     """
     Returns True iff the given discussion_id is accessible for user in course.
     Assumes that the commentable identified by discussion_id has a null or 'course' context.
-    Uses the discussion id cache if available, falling back to
-    get_discussion_categories_ids if there is no cache.
+    Uses the course's collected block structure unless the discussion xblock is given.
     """
     if discussion_id in course.top_level_discussion_topic_ids:
         return True
-    try:
-        if not xblock:
-            key = get_cached_discussion_key(course.id, discussion_id)
-            if not key:
-                return False
-            xblock = modulestore().get_item(key)
+    if xblock:
         return has_required_keys(xblock) and has_access(user, 'load', xblock, course.id)
-    except DiscussionIdMapIsNotCached:
-        return discussion_id in get_discussion_categories_ids(course, user)
+    return discussion_id in get_discussion_id_map(course, user)
 
 
 def get_discussion_categories_ids(course, user, include_all=False):
@@ -1,5 +1,6 @@
 from collections import namedtuple
 from contextlib import contextmanager
+from itertools import islice
 from logging import getLogger
 
 import dogstats_wrapper as dog_stats_api
@@ -9,7 +10,8 @@ from openedx.core.djangoapps.signals.signals import COURSE_GRADE_CHANGED, COURSE
 from .config import assume_zero_if_absent, should_persist_grades
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
-from .models import PersistentCourseGrade, VisibleBlocks
+from .models import PersistentCourseGrade, PersistentSubsectionGrade, PersistentSubsectionGradeOverride, VisibleBlocks
+from .subsection_grade_factory import SubsectionGradeFactory
 
 log = getLogger(__name__)
 
@@ -20,6 +22,9 @@ class CourseGradeFactory(object):
     """
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'error'])
 
+    # Number of users whose grading data is prefetched together by iter.
+    USER_BATCH_SIZE = 100
+
     def read(
             self,
             user,
@@ -58,6 +63,7 @@ class CourseGradeFactory(object):
             course_structure=None,
             course_key=None,
             force_update_subsections=False,
+            subsection_grade_factory=None,
     ):
         """
         Computes, updates, and returns the CourseGrade for the given
@@ -65,9 +71,29 @@ class CourseGradeFactory(object):
 
         At least one of course, collected_block_structure, course_structure,
         or course_key should be provided.
+
+        If given, subsection_grade_factory is a SubsectionGradeFactory that
+        was just used to update some of the user's subsection grades for the
+        same course_structure.  Its cached subsection grades and scores are
+        reused, so only the updated subsections are recomputed.  It is not
+        reused if the user's course grade was last computed for a different
+        version of the course, in which case all subsection grades are
+        reloaded.  The course grade read to decide this is then saved
+        without being read again.
         """
         course_data = CourseData(user, course, collected_block_structure, course_structure, course_key)
-        return self._update(user, course_data, force_update_subsections=force_update_subsections)
+        persistent_grade = None
+        if subsection_grade_factory:
+            persistent_grade = self._read_for_update(user, course_data)
+            if not self._is_version_unchanged(persistent_grade, course_data):
+                subsection_grade_factory = None
+        return self._update(
+            user,
+            course_data,
+            force_update_subsections=force_update_subsections,
+            subsection_grade_factory=subsection_grade_factory,
+            persistent_grade=persistent_grade,
+        )
 
     def iter(
             self,
@@ -85,6 +111,9 @@ class CourseGradeFactory(object):
 
         If an error occurred, course_grade will be None and err_msg will be an
         exception message. If there was no error, err_msg is an empty string.
+
+        Students are graded in batches of USER_BATCH_SIZE, for which the
+        persisted grades and scores are prefetched in bulk.
         """
         # Pre-fetch the collected course_structure so:
         # 1. Correctness: the same version of the course is used to
@@ -96,9 +125,14 @@ class CourseGradeFactory(object):
         )
         stats_tags = [u'action:{}'.format(course_data.course_key)]
         with self._course_transaction(course_data.course_key):
-            for user in users:
-                with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
-                    yield self._iter_grade_result(user, course_data, force_update)
+            users = iter(users)
+            user_batch = list(islice(users, self.USER_BATCH_SIZE))
+            while user_batch:
+                with self._prefetched_batch(user_batch, course_data, force_update):
+                    for user in user_batch:
+                        with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
+                            yield self._iter_grade_result(user, course_data, force_update)
+                user_batch = list(islice(users, self.USER_BATCH_SIZE))
 
     @contextmanager
     def _course_transaction(self, course_key):
@@ -108,6 +142,52 @@ class CourseGradeFactory(object):
         yield
         VisibleBlocks.clear_cache(course_key)
 
+    @contextmanager
+    def _prefetched_batch(self, users, course_data, force_update):
+        """
+        Provides a context in which the data needed to grade the given
+        users is prefetched in bulk, rather than queried per user.
+        """
+        course_key = course_data.course_key
+        users_to_grade = users
+        if should_persist_grades(course_key):
+            if not force_update:
+                if assume_zero_if_absent(course_key):
+                    # Nobody is graded, so the course grades are only
+                    # fetched if they are read.
+                    PersistentCourseGrade.prefetch(course_key, users, lazily=True)
+                    users_to_grade = []
+                else:
+                    PersistentCourseGrade.prefetch(course_key, users)
+                    users_to_grade = [
+                        user for user in users
+                        if not self._has_prefetched_course_grade(user, course_key)
+                    ]
+            if users_to_grade:
+                PersistentSubsectionGrade.prefetch(course_key, users_to_grade)
+                PersistentSubsectionGradeOverride.prefetch(course_key, users_to_grade)
+        if users_to_grade:
+            SubsectionGradeFactory.prefetch(course_data, users_to_grade)
+        try:
+            yield
+        finally:
+            PersistentCourseGrade.clear_prefetched_data(course_key)
+            PersistentSubsectionGrade.clear_prefetched_data(course_key)
+            PersistentSubsectionGradeOverride.clear_prefetched_data(course_key)
+            SubsectionGradeFactory.clear_prefetched_data(course_key)
+
+    @staticmethod
+    def _has_prefetched_course_grade(user, course_key):
+        """
+        Returns whether a persisted course grade was prefetched for the
+        given user.
+        """
+        try:
+            PersistentCourseGrade.read(user.id, course_key)
+            return True
+        except PersistentCourseGrade.DoesNotExist:
+            return False
+
     def _iter_grade_result(self, user, course_data, force_update):
         try:
             kwargs = {
@@ -162,14 +242,49 @@ class CourseGradeFactory(object):
         )
 
     @staticmethod
-    def _update(user, course_data, force_update_subsections=False):
+    def _read_for_update(user, course_data):
+        """
+        Returns the user's persisted course grade, a new, unsaved one if the
+        user has none, or None if grades aren't persisted for the course.
+        """
+        if not should_persist_grades(course_data.course_key):
+            return None
+        try:
+            return PersistentCourseGrade.read(user.id, course_data.course_key)
+        except PersistentCourseGrade.DoesNotExist:
+            return PersistentCourseGrade(user_id=user.id, course_id=course_data.course_key)
+
+    @staticmethod
+    def _is_version_unchanged(persistent_grade, course_data):
+        """
+        Returns whether the given persisted course grade was computed for the
+        current version of the course and its grading policy.
+        """
+        return (
+            persistent_grade is not None and
+            persistent_grade.pk is not None and
+            persistent_grade.course_version == (course_data.version or "") and
+            persistent_grade.grading_policy_hash == course_data.grading_policy_hash
+        )
+
+    @staticmethod
+    def _update(user, course_data, force_update_subsections=False, subsection_grade_factory=None,
+                persistent_grade=None):
         """
         Computes, saves, and returns a CourseGrade object for the
         given user and course.
         Sends a COURSE_GRADE_CHANGED signal to listeners and a
         COURSE_GRADE_NOW_PASSED if learner has passed course.
+
+        If given, persistent_grade is the user's course grade as it was
+        just read (see PersistentCourseGrade.update_or_create).
         """
-        course_grade = CourseGrade(user, course_data, force_update_subsections=force_update_subsections)
+        course_grade = CourseGrade(
+            user,
+            course_data,
+            force_update_subsections=force_update_subsections,
+            subsection_grade_factory=subsection_grade_factory,
+        )
         course_grade = course_grade.update()
 
         should_persist = (
@@ -181,6 +296,7 @@ class CourseGradeFactory(object):
             PersistentCourseGrade.update_or_create(
                 user_id=user.id,
                 course_id=course_data.course_key,
+                grade=persistent_grade,
                 course_version=course_data.version,
                 course_edited_timestamp=course_data.edited_on,
                 grading_policy_hash=course_data.grading_policy_hash,
@@ -14,7 +14,7 @@ from base64 import b64encode
 from collections import namedtuple
 from hashlib import sha1
 
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.utils.timezone import now
 from lazy import lazy
 from model_utils.models import TimeStampedModel
@@ -308,6 +308,8 @@ class PersistentSubsectionGrade(TimeStampedModel):
     # track which blocks were visible at the time of grade calculation
     visible_blocks = models.ForeignKey(VisibleBlocks, db_column='visible_blocks_hash', to_field='hashed')
 
+    CACHE_NAMESPACE = u"grades.models.PersistentSubsectionGrade"
+
     @property
     def full_usage_key(self):
         """
@@ -359,15 +361,48 @@ class PersistentSubsectionGrade(TimeStampedModel):
         """
         Reads all grades for the given user and course.
 
+        If the grades were prefetched for the user, the prefetched
+        grades are returned (once) instead of querying the database.
+
         Arguments:
             user_id: The user associated with the desired grades
             course_key: The course identifier for the desired grades
         """
+        prefetched_grades = get_cache(cls.CACHE_NAMESPACE).get(cls._cache_key(course_key))
+        if prefetched_grades is not None and user_id in prefetched_grades:
+            return prefetched_grades.pop(user_id)
+
         return cls.objects.select_related('visible_blocks').filter(
             user_id=user_id,
             course_id=course_key,
         )
 
+    @classmethod
+    def _cache_key(cls, course_key):
+        return u"subsection_grades_cache.{}".format(course_key)
+
+    @classmethod
+    def prefetch(cls, course_key, users):
+        """
+        Prefetches all subsection grades for the given users for the
+        given course, along with their visible blocks and overrides.
+        """
+        prefetched_grades = {user.id: [] for user in users}
+        grades = cls.objects.select_related('visible_blocks', 'override').filter(
+            user_id__in=prefetched_grades.keys(),
+            course_id=course_key,
+        )
+        for grade in grades:
+            prefetched_grades[grade.user_id].append(grade)
+        get_cache(cls.CACHE_NAMESPACE)[cls._cache_key(course_key)] = prefetched_grades
+
+    @classmethod
+    def clear_prefetched_data(cls, course_key):
+        """
+        Clears any subsection grades prefetched for the given course.
+        """
+        get_cache(cls.CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
+
     @classmethod
     def update_or_create_grade(cls, **params):
         """
@@ -381,11 +416,7 @@ class PersistentSubsectionGrade(TimeStampedModel):
 
         # apply grade override if one exists before saving model
         try:
-            override = PersistentSubsectionGradeOverride.objects.get(
-                grade__user_id=user_id,
-                grade__course_id=usage_key.course_key,
-                grade__usage_key=usage_key,
-            )
+            override = PersistentSubsectionGradeOverride.read(user_id, usage_key)
             if override.earned_all_override is not None:
                 params['earned_all'] = override.earned_all_override
             if override.possible_all_override is not None:
@@ -573,14 +604,44 @@ class PersistentCourseGrade(TimeStampedModel):
         return u"grades_cache.{}".format(course_id)
 
     @classmethod
-    def prefetch(cls, course_id, users):
+    def _pending_cache_key(cls, course_id):
+        return u"pending_grades_cache.{}".format(course_id)
+
+    @classmethod
+    def prefetch(cls, course_id, users, lazily=False):
         """
         Prefetches grades for the given users for the given course.
+
+        If lazily is True, the grades are only fetched when the first of
+        them is read, so nothing is fetched if none of them are read.
+        """
+        cache = get_cache(cls.CACHE_NAMESPACE)
+        user_ids = [user.id for user in users]
+        if lazily:
+            cache[cls._pending_cache_key(course_id)] = user_ids
+        else:
+            cache.pop(cls._pending_cache_key(course_id), None)
+            cls._fetch(course_id, user_ids)
+
+    @classmethod
+    def clear_prefetched_data(cls, course_id):
+        """
+        Clears any grades prefetched for the given course.
+        """
+        cache = get_cache(cls.CACHE_NAMESPACE)
+        cache.pop(cls._cache_key(course_id), None)
+        cache.pop(cls._pending_cache_key(course_id), None)
+
+    @classmethod
+    def _fetch(cls, course_id, user_ids):
+        """
+        Fetches the grades of the given users for the given course into
+        the prefetch cache.
         """
         get_cache(cls.CACHE_NAMESPACE)[cls._cache_key(course_id)] = {
             grade.user_id: grade
             for grade in
-            cls.objects.filter(user_id__in=[user.id for user in users], course_id=course_id)
+            cls.objects.filter(user_id__in=user_ids, course_id=course_id)
         }
 
     @classmethod
@@ -594,6 +655,9 @@ class PersistentCourseGrade(TimeStampedModel):
 
         Raises PersistentCourseGrade.DoesNotExist if applicable
         """
+        pending_user_ids = get_cache(cls.CACHE_NAMESPACE).pop(cls._pending_cache_key(course_id), None)
+        if pending_user_ids is not None:
+            cls._fetch(course_id, pending_user_ids)
         try:
             prefetched_grades = get_cache(cls.CACHE_NAMESPACE)[cls._cache_key(course_id)]
             try:
@@ -607,24 +671,43 @@ class PersistentCourseGrade(TimeStampedModel):
             return cls.objects.get(user_id=user_id, course_id=course_id)
 
     @classmethod
-    def update_or_create(cls, user_id, course_id, **kwargs):
+    def update_or_create(cls, user_id, course_id, grade=None, **kwargs):
         """
         Creates a course grade in the database.
         Returns a PersistedCourseGrade object.
+
+        If given, `grade` is the user's course grade as it was just read, or
+        a new, unsaved PersistentCourseGrade if the user had none, which is
+        saved without reading it again.
         """
         passed = kwargs.pop('passed')
 
         if kwargs.get('course_version', None) is None:
             kwargs['course_version'] = ""
 
-        grade, _ = cls.objects.update_or_create(
-            user_id=user_id,
-            course_id=course_id,
-            defaults=kwargs
-        )
-        if passed and not grade.passed_timestamp:
-            grade.passed_timestamp = now()
-            grade.save()
+        if grade is None:
+            grade, _ = cls.objects.update_or_create(
+                user_id=user_id,
+                course_id=course_id,
+                defaults=kwargs
+            )
+            if passed and not grade.passed_timestamp:
+                grade.passed_timestamp = now()
+                grade.save()
+        else:
+            for field, value in kwargs.iteritems():
+                setattr(grade, field, value)
+            if passed and not grade.passed_timestamp:
+                grade.passed_timestamp = now()
+            if grade.pk is None:
+                try:
+                    with transaction.atomic():
+                        grade.save()
+                except IntegrityError:
+                    # The grade was created since it was read.
+                    return cls.update_or_create(user_id, course_id, passed=passed, **kwargs)
+            else:
+                grade.save()
         cls._emit_grade_calculated_event(grade)
         return grade
 
@@ -673,3 +756,54 @@ class PersistentSubsectionGradeOverride(models.Model):
     possible_all_override = models.FloatField(null=True, blank=True)
     earned_graded_override = models.FloatField(null=True, blank=True)
     possible_graded_override = models.FloatField(null=True, blank=True)
+
+    CACHE_NAMESPACE = u"grades.models.PersistentSubsectionGradeOverride"
+
+    @classmethod
+    def _cache_key(cls, course_key):
+        return u"overrides_cache.{}".format(course_key)
+
+    @classmethod
+    def prefetch(cls, course_key, users):
+        """
+        Prefetches the subsection grade overrides for the given users
+        for the given course.
+        """
+        prefetched_overrides = {user.id: {} for user in users}
+        overrides = cls.objects.select_related('grade').filter(
+            grade__user_id__in=prefetched_overrides.keys(),
+            grade__course_id=course_key,
+        )
+        for override in overrides:
+            prefetched_overrides[override.grade.user_id][override.grade.full_usage_key] = override
+        get_cache(cls.CACHE_NAMESPACE)[cls._cache_key(course_key)] = prefetched_overrides
+
+    @classmethod
+    def clear_prefetched_data(cls, course_key):
+        """
+        Clears any overrides prefetched for the given course.
+        """
+        get_cache(cls.CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
+
+    @classmethod
+    def read(cls, user_id, usage_key):
+        """
+        Reads the override of the given user's grade for the given
+        subsection.
+
+        Raises PersistentSubsectionGradeOverride.DoesNotExist if applicable
+        """
+        prefetched_overrides = get_cache(cls.CACHE_NAMESPACE).get(cls._cache_key(usage_key.course_key))
+        if prefetched_overrides is not None and user_id in prefetched_overrides:
+            try:
+                return prefetched_overrides[user_id][usage_key]
+            except KeyError:
+                # the user's overrides were prefetched, so
+                # assume there is no override for this subsection
+                raise cls.DoesNotExist
+
+        return cls.objects.get(
+            grade__user_id=user_id,
+            grade__course_id=usage_key.course_key,
+            grade__usage_key=usage_key,
+        )
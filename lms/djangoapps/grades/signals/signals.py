@@ -79,6 +79,8 @@ SUBSECTION_SCORE_CHANGED = Signal(
         'course_structure',  # BlockStructure object
         'user',  # User object
         'subsection_grade',  # SubsectionGrade object
+        'subsection_grade_factory',  # Optional SubsectionGradeFactory object that
+                                     # computed the subsection_grade.
     ]
 )
 
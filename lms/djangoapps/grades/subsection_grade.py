@@ -103,7 +103,24 @@ class SubsectionGrade(SubsectionGradeBase):
     """
     def __init__(self, subsection):
         super(SubsectionGrade, self).__init__(subsection)
-        self.problem_scores = OrderedDict()  # dict of problem locations to ProblemScore
+        self._problem_scores = OrderedDict()  # dict of problem locations to ProblemScore
+
+        # Arguments for computing the problem scores of a grade loaded
+        # from a persisted model, deferred until first accessed.
+        self._deferred_score_args = None
+
+    @property
+    def problem_scores(self):
+        """
+        Returns the ordered dict of problem locations to ProblemScore
+        for this subsection.
+        """
+        if self._deferred_score_args is not None:
+            model, course_structure, submissions_scores, csm_scores = self._deferred_score_args
+            self._deferred_score_args = None
+            for block in model.visible_blocks.blocks:
+                self._compute_block_score(block.locator, course_structure, submissions_scores, csm_scores, block)
+        return self._problem_scores
 
     def init_from_structure(self, student, course_structure, submissions_scores, csm_scores):
         """
@@ -122,9 +139,11 @@ class SubsectionGrade(SubsectionGradeBase):
     def init_from_model(self, student, model, course_structure, submissions_scores, csm_scores):
         """
         Load the subsection grade from the persisted model.
+
+        Since the aggregate scores are read from the model, the scores of
+        the individual problems are only computed when first accessed.
         """
-        for block in model.visible_blocks.blocks:
-            self._compute_block_score(block.locator, course_structure, submissions_scores, csm_scores, block)
+        self._deferred_score_args = (model, course_structure, submissions_scores, csm_scores)
 
         self.graded_total = AggregatedScore(
             tw_earned=model.earned_graded,
@@ -212,7 +231,7 @@ class SubsectionGrade(SubsectionGradeBase):
                     block,
                 )
                 if problem_score:
-                    self.problem_scores[block_key] = problem_score
+                    self._problem_scores[block_key] = problem_score
 
     def _persisted_model_params(self, student):
         """
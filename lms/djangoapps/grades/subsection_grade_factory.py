@@ -8,8 +8,11 @@ from lms.djangoapps.grades.config import assume_zero_if_absent, should_persist_g
 from lms.djangoapps.grades.models import PersistentSubsectionGrade
 from lms.djangoapps.grades.scores import possibly_scored
 from openedx.core.lib.grade_utils import is_score_higher_or_equal
+from request_cache import get_cache
 from student.models import anonymous_id_for_user
 from submissions import api as submissions_api
+from submissions.models import ScoreSummary
+from submissions.serializers import UnannotatedScoreSerializer
 
 from .course_data import CourseData
 from .subsection_grade import SubsectionGrade, ZeroSubsectionGrade
@@ -21,6 +24,8 @@ class SubsectionGradeFactory(object):
     """
     Factory for Subsection Grades.
     """
+    CACHE_NAMESPACE = u"grades.subsection_grade_factory.SubsectionGradeFactory"
+
     def __init__(self, student, course=None, course_structure=None, course_data=None):
         self.student = student
         self.course_data = course_data or CourseData(student, course=course, structure=course_structure)
@@ -96,12 +101,75 @@ class SubsectionGradeFactory(object):
 
         return calculated_grade
 
+    @classmethod
+    def prefetch(cls, course_data, users):
+        """
+        Prefetches, in bulk, the scores stored in CSM and by the
+        Submissions API for the given users in the given course.  Each
+        user's prefetched scores are used (once) by the next factory
+        created for the user.
+
+        Scores are fetched for all scorable blocks in the collected
+        course structure, since course_data is not specific to a user.
+        """
+        scorable_locations = [
+            block_key for block_key in course_data.collected_structure if possibly_scored(block_key)
+        ]
+        csm_scores = ScoresClient.create_for_users(
+            course_data.course_key, [user.id for user in users], scorable_locations,
+        )
+
+        anonymous_user_ids = {
+            anonymous_id_for_user(user, course_data.course_key): user.id
+            for user in users
+        }
+        submissions_scores = {user.id: {} for user in users}
+        score_summaries = ScoreSummary.objects.filter(
+            student_item__course_id=str(course_data.course_key),
+            student_item__student_id__in=anonymous_user_ids.keys(),
+        ).select_related('latest', 'latest__submission', 'student_item')
+        for summary in score_summaries:
+            # mirrors submissions_api.get_scores, for many students at once
+            if not summary.latest.is_hidden():
+                user_id = anonymous_user_ids[summary.student_item.student_id]
+                submissions_scores[user_id][summary.student_item.item_id] = (
+                    UnannotatedScoreSerializer(summary.latest).data
+                )
+
+        get_cache(cls.CACHE_NAMESPACE)[cls._cache_key(course_data.course_key)] = {
+            user.id: (csm_scores[user.id], submissions_scores[user.id])
+            for user in users
+        }
+
+    @classmethod
+    def clear_prefetched_data(cls, course_key):
+        """
+        Clears any scores prefetched for the given course.
+        """
+        get_cache(cls.CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
+
+    @classmethod
+    def _cache_key(cls, course_key):
+        return u"scores_cache.{}".format(course_key)
+
+    @lazy
+    def _prefetched_scores(self):
+        """
+        Returns the (csm_scores, submissions_scores) prefetched for the
+        student, if any, removing them from the prefetch cache.
+        """
+        prefetched_scores = get_cache(self.CACHE_NAMESPACE).get(self._cache_key(self.course_data.course_key), {})
+        return prefetched_scores.pop(self.student.id, None)
+
     @lazy
     def _csm_scores(self):
         """
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        if self._prefetched_scores:
+            return self._prefetched_scores[0]
+
         scorable_locations = [block_key for block_key in self.course_data.structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, scorable_locations)
 
@@ -111,6 +179,9 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns the scores stored by the
         Submissions API for the course, while caching the result.
         """
+        if self._prefetched_scores:
+            return self._prefetched_scores[1]
+
         anonymous_user_id = anonymous_id_for_user(self.student, self.course_data.course_key)
         return submissions_api.get_scores(str(self.course_data.course_key), anonymous_user_id)
 
@@ -7,6 +7,8 @@ import itertools
 
 import ddt
 from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from lms.djangoapps.course_blocks.api import get_course_blocks
 from mock import patch
 from nose.plugins.attrib import attr
@@ -119,7 +121,40 @@ class TestGradeIteration(SharedModuleStoreTestCase):
         self.assertIsNotNone(all_course_grades[student2])
         self.assertIsNotNone(all_course_grades[student5])
 
-    def _course_grades_and_errors_for(self, course, students):
+    @patch.object(CourseGradeFactory, 'USER_BATCH_SIZE', 2)
+    def test_batched_prefetch(self):
+        with patch.object(
+            SubsectionGradeFactory,
+            'prefetch',
+            wraps=SubsectionGradeFactory.prefetch
+        ) as mock_prefetch:
+            all_course_grades, all_errors = self._course_grades_and_errors_for(
+                self.course, self.students, force_update=True,
+            )
+            self.assertEquals(
+                [len(call_args[0][1]) for call_args in mock_prefetch.call_args_list],
+                [2, 2, 1],
+            )
+
+        self.assertEqual(len(all_errors), 0)
+        self.assertEqual(set(all_course_grades), set(self.students))
+        for course_grade in all_course_grades.values():
+            self.assertEqual(course_grade.percent, 0.0)
+
+    def test_batched_course_grade_reads(self):
+        with patch.object(CourseGradeFactory, 'USER_BATCH_SIZE', 1):
+            with CaptureQueriesContext(connection) as one_at_a_time:
+                self._course_grades_and_errors_for(self.course, self.students)
+
+        # The course grades of each batch of users are read in one query.
+        with patch.object(CourseGradeFactory, 'USER_BATCH_SIZE', 2):
+            with self.assertNumQueries(len(one_at_a_time) - 2):
+                all_course_grades, all_errors = self._course_grades_and_errors_for(self.course, self.students)
+
+        self.assertEqual(len(all_errors), 0)
+        self.assertEqual(set(all_course_grades), set(self.students))
+
+    def _course_grades_and_errors_for(self, course, students, force_update=False):
         """
         Simple helper method to iterate through student grades and give us
         two dictionaries -- one that has all students and their respective
@@ -129,7 +164,7 @@ class TestGradeIteration(SharedModuleStoreTestCase):
         students_to_course_grades = {}
         students_to_errors = {}
 
-        for student, course_grade, error in CourseGradeFactory().iter(students, course):
+        for student, course_grade, error in CourseGradeFactory().iter(students, course, force_update=force_update):
             students_to_course_grades[student] = course_grade
             if error:
                 students_to_errors[student] = error
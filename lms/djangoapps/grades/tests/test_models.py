@@ -13,7 +13,7 @@ from django.db.utils import IntegrityError
 from django.test import TestCase
 from django.utils.timezone import now
 from freezegun import freeze_time
-from mock import patch
+from mock import Mock, patch
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 
 from lms.djangoapps.grades.config import waffle
@@ -315,6 +315,37 @@ class PersistentSubsectionGradeTest(GradesModelTestCase):
         self.assertEqual(grade.earned_all, 0.0)
         self.assertEqual(grade.earned_graded, 0.0)
 
+    def test_prefetched_grade_override(self):
+        grade = PersistentSubsectionGrade.create_grade(**self.params)
+        PersistentSubsectionGradeOverride(grade=grade, earned_all_override=0.0).save()
+        PersistentSubsectionGradeOverride.prefetch(self.course_key, [Mock(id=self.params["user_id"])])
+        with self.assertNumQueries(0):
+            override = PersistentSubsectionGradeOverride.read(self.params["user_id"], self.usage_key)
+        self.assertEqual(override.earned_all_override, 0.0)
+
+        PersistentSubsectionGradeOverride.clear_prefetched_data(self.course_key)
+        with self.assertRaises(PersistentSubsectionGradeOverride.DoesNotExist):
+            PersistentSubsectionGradeOverride.read(self.params["user_id"] + 1, self.usage_key)
+
+    def test_prefetch_grades(self):
+        grade = PersistentSubsectionGrade.create_grade(**self.params)
+        other_user_id = self.params["user_id"] + 1
+        PersistentSubsectionGrade.prefetch(self.course_key, [Mock(id=self.params["user_id"]), Mock(id=other_user_id)])
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                list(PersistentSubsectionGrade.bulk_read_grades(self.params["user_id"], self.course_key)),
+                [grade],
+            )
+            self.assertEqual(list(PersistentSubsectionGrade.bulk_read_grades(other_user_id, self.course_key)), [])
+
+        # prefetched grades are only returned once
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                list(PersistentSubsectionGrade.bulk_read_grades(self.params["user_id"], self.course_key)),
+                [grade],
+            )
+        PersistentSubsectionGrade.clear_prefetched_data(self.course_key)
+
     def _assert_tracker_emitted_event(self, tracker_mock, grade):
         """
         Helper function to ensure that the mocked event tracker
@@ -374,6 +405,54 @@ class PersistentCourseGradesTest(GradesModelTestCase):
         self.assertEqual(updated_grade.letter_grade, "Better job")
         self.assertEqual(created_grade.id, updated_grade.id)
 
+    def test_lazily_prefetched_grades(self):
+        grade = PersistentCourseGrade.update_or_create(**self.params)
+        other_user_id = self.params["user_id"] + 1
+        users = [Mock(id=self.params["user_id"]), Mock(id=other_user_id)]
+
+        # Nothing is fetched until a grade is read, then all of them are.
+        with self.assertNumQueries(0):
+            PersistentCourseGrade.prefetch(self.course_key, users, lazily=True)
+        with self.assertNumQueries(1):
+            self.assertEqual(PersistentCourseGrade.read(self.params["user_id"], self.course_key), grade)
+        with self.assertNumQueries(0):
+            with self.assertRaises(PersistentCourseGrade.DoesNotExist):
+                PersistentCourseGrade.read(other_user_id, self.course_key)
+
+        PersistentCourseGrade.clear_prefetched_data(self.course_key)
+        with self.assertNumQueries(1):
+            PersistentCourseGrade.read(self.params["user_id"], self.course_key)
+
+    def test_update_read_grade(self):
+        PersistentCourseGrade.update_or_create(**self.params)
+        self.params["percent_grade"] = 88.8
+        with self.assertNumQueries(2):
+            PersistentCourseGrade.update_or_create(**self.params)
+
+        # A grade that was just read is saved without being read again.
+        grade = PersistentCourseGrade.read(self.params["user_id"], self.params["course_id"])
+        self.params["percent_grade"] = 99.9
+        with self.assertNumQueries(1):
+            PersistentCourseGrade.update_or_create(grade=grade, **self.params)
+        self.assertEqual(
+            PersistentCourseGrade.read(self.params["user_id"], self.params["course_id"]).percent_grade, 99.9,
+        )
+
+    def test_create_read_grade(self):
+        # A user without a grade, as just read, has theirs created without reading it again.
+        grade = PersistentCourseGrade(user_id=self.params["user_id"], course_id=self.params["course_id"])
+        with self.assertNumQueries(3):  # the INSERT, in a savepoint
+            created_grade = PersistentCourseGrade.update_or_create(grade=grade, **self.params)
+        self.assertIsInstance(created_grade.passed_timestamp, datetime)
+        self.assertEqual(PersistentCourseGrade.read(self.params["user_id"], self.params["course_id"]), created_grade)
+
+        # If it was created since it was read, it is updated instead.
+        grade = PersistentCourseGrade(user_id=self.params["user_id"], course_id=self.params["course_id"])
+        self.params["percent_grade"] = 88.8
+        updated_grade = PersistentCourseGrade.update_or_create(grade=grade, **self.params)
+        self.assertEqual(updated_grade.id, created_grade.id)
+        self.assertEqual(updated_grade.percent_grade, 88.8)
+
     def test_passed_timestamp(self):
         # When the user has not passed, passed_timestamp is None
         self.params.update({
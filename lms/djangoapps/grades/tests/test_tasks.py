@@ -11,7 +11,9 @@ import ddt
 import pytz
 import six
 from django.conf import settings
+from django.db import connection
 from django.db.utils import IntegrityError
+from django.test.utils import CaptureQueriesContext
 from mock import MagicMock, patch
 
 from lms.djangoapps.grades.config.models import PersistentGradesEnabledFlag
@@ -200,6 +202,20 @@ class RecalculateSubsectionGradeTest(HasCourseWithProblemsMixin, ModuleStoreTest
                 with self.assertNumQueries(num_sql_calls):
                     self._apply_recalculate_subsection_grade()
 
+    def test_course_grade_reuses_subsection_grades(self):
+        self.set_up_course()
+        self._apply_recalculate_subsection_grade()
+
+        # A course grade computed for another grading policy reloads the subsection grades.
+        PersistentCourseGrade.objects.filter(user_id=self.user.id).update(grading_policy_hash='stale')
+        with CaptureQueriesContext(connection) as reloaded:
+            self._apply_recalculate_subsection_grade()
+
+        # A current course grade reuses the task's subsection grades, in fewer queries.
+        with CaptureQueriesContext(connection) as reused:
+            self._apply_recalculate_subsection_grade()
+        self.assertLess(len(reused), len(reloaded))
+
     @patch('lms.djangoapps.grades.signals.signals.SUBSECTION_SCORE_CHANGED.send')
     def test_other_inaccessible_subsection(self, mock_subsection_signal):
         self.set_up_course()
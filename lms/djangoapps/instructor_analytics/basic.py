@@ -17,7 +17,7 @@ from opaque_keys.edx.keys import UsageKey
 
 import xmodule.graders as xmgraders
 from certificates.models import CertificateStatuses, GeneratedCertificate
-from courseware.models import StudentModule
+from courseware.user_state_client import DjangoXBlockUserStateClient
 from lms.djangoapps.grades.context import grading_context_for_course
 from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
@@ -52,6 +52,9 @@ CERTIFICATE_FEATURES = ('course_id', 'mode', 'status', 'grade', 'created_date',
 
 UNAVAILABLE = "[unavailable]"
 
+# The number of responses read from the database at a time by list_problem_responses.
+PROBLEM_RESPONSES_BATCH_SIZE = 1000
+
 
 def sale_order_record_features(course_id, features):
     """
@@ -407,18 +410,22 @@ def coupon_codes_features(features, coupons_list, course_id):
 
 def list_problem_responses(course_key, problem_location):
     """
-    Return responses to a given problem as a dict.
+    Yield responses to a given problem as dicts.
 
     list_problem_responses(course_key, problem_location)
 
-    would return [
+    would yield
         {'username': u'user1', 'state': u'...'},
         {'username': u'user2', 'state': u'...'},
         {'username': u'user3', 'state': u'...'},
-    ]
 
     where `state` represents a student's response to the problem
-    identified by `problem_location`.
+    identified by `problem_location`, as it is stored.
+
+    Responses are yielded in order of student, and are read by the user
+    state client in batches of PROBLEM_RESPONSES_BATCH_SIZE, so that only
+    one batch is held in memory at a time no matter how many students
+    responded.
     """
     problem_key = UsageKey.from_string(problem_location)
     # Are we dealing with an "old-style" problem location?
@@ -426,18 +433,13 @@ def list_problem_responses(course_key, problem_location):
     if not run:
         problem_key = UsageKey.from_string(problem_location).map_into_course(course_key)
     if problem_key.course_key != course_key:
-        return []
+        return
 
-    smdat = StudentModule.objects.filter(
-        course_id=course_key,
-        module_state_key=problem_key
+    user_states = DjangoXBlockUserStateClient().iter_all_for_block(
+        problem_key, batch_size=PROBLEM_RESPONSES_BATCH_SIZE, raw_state=True,
     )
-    smdat = smdat.order_by('student')
-
-    return [
-        {'username': response.student.username, 'state': response.state}
-        for response in smdat
-    ]
+    for user_state in user_states:
+        yield {'username': user_state.username, 'state': user_state.state}
 
 
 def course_registration_features(features, registration_codes, csv_type):
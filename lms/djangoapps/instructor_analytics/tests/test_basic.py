@@ -10,18 +10,16 @@ from django.core.urlresolvers import reverse
 from django.db.models import Q
 from edx_proctoring.api import create_exam
 from edx_proctoring.models import ProctoredExamStudentAttempt
-from mock import MagicMock, Mock, patch
+from mock import patch
 from nose.plugins.attrib import attr
-from opaque_keys.edx.locator import UsageKey
 
 from course_modes.models import CourseMode
 from course_modes.tests.factories import CourseModeFactory
-from courseware.tests.factories import InstructorFactory
+from courseware.tests.factories import InstructorFactory, StudentModuleFactory
 from instructor_analytics.basic import (
     AVAILABLE_FEATURES,
     PROFILE_FEATURES,
     STUDENT_FEATURES,
-    StudentModule,
     coupon_codes_features,
     course_registration_features,
     enrolled_students_features,
@@ -73,46 +71,29 @@ class TestAnalyticsBasic(ModuleStoreTestCase):
             )
 
     def test_list_problem_responses(self):
-        def result_factory(result_id):
-            """
-            Return a dummy StudentModule object that can be queried for
-            relevant info (student.username and state).
-            """
-            result = Mock(spec=['student', 'state'])
-            result.student.username.return_value = u'user{}'.format(result_id)
-            result.state.return_value = u'state{}'.format(result_id)
-            return result
-
-        # Ensure that UsageKey.from_string returns a problem key that list_problem_responses can work with
-        # (even when called with a dummy location):
-        mock_problem_key = Mock(return_value=u'')
-        mock_problem_key.course_key = self.course_key
-        with patch.object(UsageKey, 'from_string') as patched_from_string:
-            patched_from_string.return_value = mock_problem_key
-
-            # Ensure that StudentModule.objects.filter returns a result set that list_problem_responses can work with
-            # (this keeps us from having to create fixtures for this test):
-            mock_results = MagicMock(return_value=[result_factory(n) for n in range(5)])
-            with patch.object(StudentModule, 'objects') as patched_manager:
-                patched_manager.filter.return_value = mock_results
-
-                mock_problem_location = ''
-                problem_responses = list_problem_responses(self.course_key, problem_location=mock_problem_location)
-
-                # Check if list_problem_responses called UsageKey.from_string to look up problem key:
-                patched_from_string.assert_called_once_with(mock_problem_location)
-                # Check if list_problem_responses called StudentModule.objects.filter to obtain relevant records:
-                patched_manager.filter.assert_called_once_with(
-                    course_id=self.course_key, module_state_key=mock_problem_key
-                )
-
-                # Check if list_problem_responses returned expected results:
-                self.assertEqual(len(problem_responses), len(mock_results))
-                for mock_result in mock_results:
-                    self.assertIn(
-                        {'username': mock_result.student.username, 'state': mock_result.state},
-                        problem_responses
-                    )
+        problem_key = self.course_key.make_usage_key('problem', 'test_problem')
+        states = ['{"answer":  0}', '{}', None, '{"answer": "\\u00e9"}', '{"answer": 4}']
+        for user, state in reversed(zip(self.users, states)):
+            StudentModuleFactory(
+                student=user,
+                course_id=self.course_key,
+                module_state_key=problem_key,
+                state=state,
+            )
+
+        with patch('instructor_analytics.basic.PROBLEM_RESPONSES_BATCH_SIZE', 2):
+            problem_responses = list(list_problem_responses(self.course_key, problem_location=unicode(problem_key)))
+
+        # Every student's state is listed as it is stored, in order of student.
+        self.assertEqual(problem_responses, [
+            {'username': user.username, 'state': state}
+            for user, state in zip(self.users, states)
+        ])
+
+    def test_list_problem_responses_other_course(self):
+        other_course_key = self.store.make_course_key('robot', 'other_course', 'id')
+        problem_key = other_course_key.make_usage_key('problem', 'test_problem')
+        self.assertEqual(list(list_problem_responses(self.course_key, problem_location=unicode(problem_key))), [])
 
     def test_enrolled_students_features_username(self):
         self.assertIn('username', AVAILABLE_FEATURES)
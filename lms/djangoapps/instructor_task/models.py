@@ -17,12 +17,13 @@ import hashlib
 import json
 import logging
 import os.path
+from tempfile import SpooledTemporaryFile
 from uuid import uuid4
 
 from boto.exception import BotoServerError
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files.base import File
 from django.db import models, transaction
 
 from openedx.core.djangoapps.xmodule_django.models import CourseKeyField
@@ -181,9 +182,9 @@ class InstructorTask(models.Model):
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. Large reports should be written a batch of rows at a time to a
+    ReportFile, created with `create_report_file`, rather than passing in the
+    whole dataset.
     """
     @classmethod
     def from_config(cls, config_name):
@@ -215,6 +216,13 @@ class ReportStore(object):
             )
         return DjangoStorageReportStore.from_config(config_name)
 
+    def create_report_file(self, course_id, filename):
+        """
+        Return an empty ReportFile that is stored as `filename` for the
+        given `course_id` when complete.
+        """
+        return ReportFile(self, course_id, filename)
+
     def _get_utf8_encoded_rows(self, rows):
         """
         Given a list of `rows` containing unicode strings, return a
@@ -225,6 +233,56 @@ class ReportStore(object):
             yield [unicode(item).encode('utf-8') for item in row]
 
 
+class ReportFile(object):
+    """
+    A CSV file for a ReportStore that rows can be appended to.
+
+    Rows are spooled to a temporary file, which only stays in memory while it
+    is smaller than MAX_MEMORY_SIZE, so that reports for large courses need
+    not be held in memory before being stored.  Use as a context manager, so
+    that the temporary file is removed whether or not it is stored.
+    """
+    # Size in bytes beyond which rows are written to disk.
+    MAX_MEMORY_SIZE = 5 * 1024 * 1024
+
+    def __init__(self, report_store, course_id, filename):
+        self.report_store = report_store
+        self.course_id = course_id
+        self.filename = filename
+        self.num_rows = 0
+        self._file = SpooledTemporaryFile(max_size=self.MAX_MEMORY_SIZE)
+        self._csvwriter = csv.writer(self._file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_rows(self, rows):
+        """
+        Append the given rows (each row is an iterable of strings) to this
+        file in csv format.  `rows` may be any iterable, including a
+        generator.
+        """
+        for row in self.report_store._get_utf8_encoded_rows(rows):  # pylint: disable=protected-access
+            self._csvwriter.writerow(row)
+            self.num_rows += 1
+
+    def store(self):
+        """
+        Store the rows written so far with the report store.
+        """
+        self._file.seek(0)
+        self.report_store.store(self.course_id, self.filename, File(self._file))
+
+    def close(self):
+        """
+        Remove the temporary file.
+        """
+        self._file.close()
+
+
 class DjangoStorageReportStore(ReportStore):
     """
     ReportStore implementation that delegates to django's storage api.
@@ -268,11 +326,9 @@ class DjangoStorageReportStore(ReportStore):
         Given a course_id, filename, and rows (each row is an iterable of
         strings), write the rows to the storage backend in csv format.
         """
-        output_buffer = ContentFile('')
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        output_buffer.seek(0)
-        self.store(course_id, filename, output_buffer)
+        with self.create_report_file(course_id, filename) as report_file:
+            report_file.write_rows(rows)
+            report_file.store()
 
     def links_for(self, course_id):
         """
@@ -46,8 +46,9 @@ from lms.djangoapps.instructor_task.tasks_helper.module_state import (
     delete_problem_module_state,
     perform_module_state_update,
     override_score_module_state,
-    rescore_problem_module_state,
-    reset_attempts_module_state
+    rescore_problem_module_states,
+    reset_attempts_module_state,
+    RESCORE_BATCH_SIZE
 )
 from lms.djangoapps.instructor_task.tasks_helper.runner import run_main_task
 
@@ -75,9 +76,9 @@ def rescore_problem(entry_id, xmodule_instance_args):
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('rescored')
-    update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
+    update_fcn = partial(rescore_problem_module_states, xmodule_instance_args)
 
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    visit_fcn = partial(perform_module_state_update, update_fcn, None, batch_size=RESCORE_BATCH_SIZE)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
@@ -5,7 +5,7 @@ import logging
 import re
 from collections import OrderedDict
 from datetime import datetime
-from itertools import chain, izip, izip_longest
+from itertools import chain, izip_longest
 from time import time
 
 from lazy import lazy
@@ -14,9 +14,7 @@ from pytz import UTC
 from certificates.models import CertificateWhitelist, GeneratedCertificate, certificate_info_for_user
 from courseware.courses import get_course_by_id
 from instructor_analytics.basic import list_problem_responses
-from instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.grades.context import grading_context, grading_context_for_course
-from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
@@ -30,7 +28,7 @@ from xmodule.partitions.partitions_service import PartitionService
 from xmodule.split_test_module import get_split_user_partitions
 
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store
+from .utils import create_csv_report_file, upload_csv_report_file
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -180,7 +178,6 @@ class _CourseGradeBulkContext(object):
         self.enrollments = _EnrollmentBulkContext(context, users)
         bulk_cache_cohorts(context.course_id, users)
         BulkRoleCache.prefetch(users)
-        PersistentCourseGrade.prefetch(context.course_id, users)
         BulkCourseTags.prefetch(context.course_id, users)
 
 
@@ -209,11 +206,17 @@ class CourseGradeReport(object):
         error_headers = self._error_headers()
         batched_rows = self._batched_rows(context)
 
-        context.update_status(u'Compiling grades')
-        success_rows, error_rows = self._compile(context, batched_rows)
+        date = datetime.now(UTC)
+        with create_csv_report_file('grade_report', context.course_id, date) as success_file, \
+                create_csv_report_file('grade_report_err', context.course_id, date) as error_file:
+            success_file.write_rows([success_headers])
+            error_file.write_rows([error_headers])
+
+            context.update_status(u'Compiling grades')
+            self._compile(context, batched_rows, success_file, error_file)
 
-        context.update_status(u'Uploading grades')
-        self._upload(context, success_headers, success_rows, error_headers, error_rows)
+            context.update_status(u'Uploading grades')
+            self._upload(success_file, error_file)
 
         return context.update_status(u'Completed grades')
 
@@ -246,32 +249,30 @@ class CourseGradeReport(object):
             users = filter(lambda u: u is not None, users)
             yield self._rows_for_users(context, users)
 
-    def _compile(self, context, batched_rows):
+    def _compile(self, context, batched_rows, success_file, error_file):
         """
-        Compiles and returns the complete list of (success_rows, error_rows) for
-        the given batched_rows and context.
+        Writes the given batched_rows to the success and error report files
+        a batch at a time, so that only one batch is held in memory.
         """
-        # partition and chain successes and errors
-        success_rows, error_rows = izip(*batched_rows)
-        success_rows = list(chain(*success_rows))
-        error_rows = list(chain(*error_rows))
+        for success_rows, error_rows in batched_rows:
+            success_file.write_rows(success_rows)
+            error_file.write_rows(error_rows)
+
+            # update metrics on task status
+            context.task_progress.succeeded += len(success_rows)
+            context.task_progress.failed += len(error_rows)
 
-        # update metrics on task status
-        context.task_progress.succeeded = len(success_rows)
-        context.task_progress.failed = len(error_rows)
         context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
         context.task_progress.total = context.task_progress.attempted
-        return success_rows, error_rows
 
-    def _upload(self, context, success_headers, success_rows, error_headers, error_rows):
+    def _upload(self, success_file, error_file):
         """
-        Creates and uploads a CSV for the given headers and rows.
+        Uploads the given report files, skipping the error file if it
+        contains only its header.
         """
-        date = datetime.now(UTC)
-        upload_csv_to_report_store([success_headers] + success_rows, 'grade_report', context.course_id, date)
-        if len(error_rows) > 0:
-            error_rows = [error_headers] + error_rows
-            upload_csv_to_report_store(error_rows, 'grade_report_err', context.course_id, date)
+        upload_csv_report_file(success_file, 'grade_report')
+        if error_file.num_rows > 1:
+            upload_csv_report_file(error_file, 'grade_report_err')
 
     def _grades_header(self, context):
         """
@@ -445,8 +446,8 @@ class ProblemGradeReport(object):
         graded_scorable_blocks = cls._graded_scorable_blocks_to_header(course_id)
 
         # Just generate the static fields for now.
-        rows = [list(header_row.values()) + ['Enrollment Status', 'Grade'] + _flatten(graded_scorable_blocks.values())]
-        error_rows = [list(header_row.values()) + ['error_msg']]
+        headers = list(header_row.values()) + ['Enrollment Status', 'Grade'] + _flatten(graded_scorable_blocks.values())
+        error_headers = list(header_row.values()) + ['error_msg']
         current_step = {'step': 'Calculating Grades'}
 
         # Bulk fetch and cache enrollment states so we can efficiently determine
@@ -454,45 +455,53 @@ class ProblemGradeReport(object):
         CourseEnrollment.bulk_fetch_enrollment_states(enrolled_students, course_id)
 
         course = get_course_by_id(course_id)
-        for student, course_grade, error in CourseGradeFactory().iter(enrolled_students, course):
-            student_fields = [getattr(student, field_name) for field_name in header_row]
-            task_progress.attempted += 1
-
-            if not course_grade:
-                err_msg = error.message
-                # There was an error grading this student.
-                if not err_msg:
-                    err_msg = u'Unknown error'
-                error_rows.append(student_fields + [err_msg])
-                task_progress.failed += 1
-                continue
-
-            enrollment_status = _user_enrollment_status(student, course_id)
-
-            earned_possible_values = []
-            for block_location in graded_scorable_blocks:
-                try:
-                    problem_score = course_grade.problem_scores[block_location]
-                except KeyError:
-                    earned_possible_values.append([u'Not Available', u'Not Available'])
-                else:
-                    if problem_score.first_attempted:
-                        earned_possible_values.append([problem_score.earned, problem_score.possible])
+        with create_csv_report_file('problem_grade_report', course_id, start_date) as success_file, \
+                create_csv_report_file('problem_grade_report_err', course_id, start_date) as error_file:
+            # Rows are written out as students are graded, rather than kept in memory.
+            success_file.write_rows([headers])
+            error_file.write_rows([error_headers])
+
+            for student, course_grade, error in CourseGradeFactory().iter(enrolled_students, course):
+                student_fields = [getattr(student, field_name) for field_name in header_row]
+                task_progress.attempted += 1
+
+                if not course_grade:
+                    err_msg = error.message
+                    # There was an error grading this student.
+                    if not err_msg:
+                        err_msg = u'Unknown error'
+                    error_file.write_rows([student_fields + [err_msg]])
+                    task_progress.failed += 1
+                    continue
+
+                enrollment_status = _user_enrollment_status(student, course_id)
+
+                earned_possible_values = []
+                for block_location in graded_scorable_blocks:
+                    try:
+                        problem_score = course_grade.problem_scores[block_location]
+                    except KeyError:
+                        earned_possible_values.append([u'Not Available', u'Not Available'])
                     else:
-                        earned_possible_values.append([u'Not Attempted', problem_score.possible])
+                        if problem_score.first_attempted:
+                            earned_possible_values.append([problem_score.earned, problem_score.possible])
+                        else:
+                            earned_possible_values.append([u'Not Attempted', problem_score.possible])
 
-            rows.append(student_fields + [enrollment_status, course_grade.percent] + _flatten(earned_possible_values))
+                success_file.write_rows(
+                    [student_fields + [enrollment_status, course_grade.percent] + _flatten(earned_possible_values)]
+                )
 
-            task_progress.succeeded += 1
-            if task_progress.attempted % status_interval == 0:
-                task_progress.update_task_state(extra_meta=current_step)
+                task_progress.succeeded += 1
+                if task_progress.attempted % status_interval == 0:
+                    task_progress.update_task_state(extra_meta=current_step)
 
-        # Perform the upload if any students have been successfully graded
-        if len(rows) > 1:
-            upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
-        # If there are any error rows, write them out as well
-        if len(error_rows) > 1:
-            upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
+            # Perform the upload if any students have been successfully graded
+            if success_file.num_rows > 1:
+                upload_csv_report_file(success_file, 'problem_grade_report')
+            # If there are any error rows, write them out as well
+            if error_file.num_rows > 1:
+                upload_csv_report_file(error_file, 'problem_grade_report_err')
 
         return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
 
@@ -535,23 +544,25 @@ class ProblemResponses(object):
         current_step = {'step': 'Calculating students answers to problem'}
         task_progress.update_task_state(extra_meta=current_step)
 
-        # Compute result table and format it
         problem_location = task_input.get('problem_location')
-        student_data = list_problem_responses(course_id, problem_location)
+        csv_name = 'student_state_from_{}'.format(re.sub(r'[:/]', '_', problem_location))
         features = ['username', 'state']
-        header, rows = format_dictlist(student_data, features)
 
-        task_progress.attempted = task_progress.succeeded = len(rows)
-        task_progress.skipped = task_progress.total - task_progress.attempted
+        with create_csv_report_file(csv_name, course_id, start_date) as report_file:
+            # Rows are written out as responses are read, rather than kept in memory.
+            report_file.write_rows([features])
+            report_file.write_rows(
+                [response[feature] for feature in features]
+                for response in list_problem_responses(course_id, problem_location)
+            )
 
-        rows.insert(0, header)
+            task_progress.attempted = task_progress.succeeded = report_file.num_rows - 1
+            task_progress.skipped = task_progress.total - task_progress.attempted
 
-        current_step = {'step': 'Uploading CSV'}
-        task_progress.update_task_state(extra_meta=current_step)
+            current_step = {'step': 'Uploading CSV'}
+            task_progress.update_task_state(extra_meta=current_step)
 
-        # Perform the upload
-        problem_location = re.sub(r'[:/]', '_', problem_location)
-        csv_name = 'student_state_from_{}'.format(problem_location)
-        upload_csv_to_report_store(rows, csv_name, course_id, start_date)
+            # Perform the upload
+            upload_csv_report_file(report_file, csv_name)
 
         return task_progress.update_task_state(extra_meta=current_step)
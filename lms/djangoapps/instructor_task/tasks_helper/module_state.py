@@ -10,6 +10,7 @@ from opaque_keys.edx.keys import UsageKey
 from xblock.runtime import KvsFieldData
 
 import dogstats_wrapper as dog_stats_api
+from capa.capa_problem import LoncapaProblem, get_grades_from_current_answers
 from capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputError
 from courseware.courses import get_course_by_id, get_problems_in_section
 from courseware.model_data import DjangoKeyValueStore, FieldDataCache
@@ -36,8 +37,12 @@ TASK_LOG = logging.getLogger('edx.celery.task')
 GRADES_RESCORE_EVENT_TYPE = 'edx.grades.problem.rescored'
 GRADES_OVERRIDE_EVENT_TYPE = 'edx.grades.problem.score_overridden'
 
+# maximum number of StudentModules of a problem that are rescored together
+RESCORE_BATCH_SIZE = 100
 
-def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
+
+def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name,
+                                batch_size=None):
     """
     Performs generic update by visiting StudentModule instances with the update_fcn provided.
 
@@ -56,6 +61,10 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     the update is successful; False indicates the update on the particular student module failed.
     A raised exception indicates a fatal condition -- that no other student modules should be considered.
 
+    If `batch_size` is not None, the StudentModules are visited in batches of up to `batch_size`
+    StudentModules of the same problem instead.  The `update_fcn` is then passed a list of the
+    StudentModules of a batch in place of a single StudentModule, and returns a list of their statuses.
+
     The return value is a dict containing the task's results, with the following keys:
 
           'attempted': number of attempts made
@@ -116,103 +125,166 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     task_progress = TaskProgress(action_name, modules_to_update.count(), start_time)
     task_progress.update_task_state()
 
-    for module_to_update in modules_to_update:
-        task_progress.attempted += 1
-        module_descriptor = problems[unicode(module_to_update.module_state_key)]
+    if batch_size is None:
+        module_batches = ([module_to_update] for module_to_update in modules_to_update)
+    else:
+        module_batches = _get_module_batches(modules_to_update, batch_size)
+
+    for module_batch in module_batches:
+        task_progress.attempted += len(module_batch)
+        module_descriptor = problems[unicode(module_batch[0].module_state_key)]
         # There is no try here:  if there's an error, we let it throw, and the task will
         # be marked as FAILED, with a stack trace.
         with dog_stats_api.timer('instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]):
-            update_status = update_fcn(module_descriptor, module_to_update, task_input)
-            if update_status == UPDATE_STATUS_SUCCEEDED:
-                # If the update_fcn returns true, then it performed some kind of work.
-                # Logging of failures is left to the update_fcn itself.
-                task_progress.succeeded += 1
-            elif update_status == UPDATE_STATUS_FAILED:
-                task_progress.failed += 1
-            elif update_status == UPDATE_STATUS_SKIPPED:
-                task_progress.skipped += 1
+            if batch_size is None:
+                update_statuses = [update_fcn(module_descriptor, module_batch[0], task_input)]
             else:
-                raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
+                update_statuses = update_fcn(module_descriptor, module_batch, task_input)
+            for update_status in update_statuses:
+                if update_status == UPDATE_STATUS_SUCCEEDED:
+                    # If the update_fcn returns true, then it performed some kind of work.
+                    # Logging of failures is left to the update_fcn itself.
+                    task_progress.succeeded += 1
+                elif update_status == UPDATE_STATUS_FAILED:
+                    task_progress.failed += 1
+                elif update_status == UPDATE_STATUS_SKIPPED:
+                    task_progress.skipped += 1
+                else:
+                    raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
 
     return task_progress.update_task_state()
 
 
-@outer_atomic
-def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, task_input):
+def _get_module_batches(modules_to_update, batch_size):
+    """
+    Yields the StudentModules in `modules_to_update` in lists of up to `batch_size`
+    StudentModules of the same problem.
+    """
+    module_batch = []
+    for module_to_update in modules_to_update.order_by('module_state_key', 'id'):
+        if module_batch and (
+                len(module_batch) == batch_size or
+                module_batch[0].module_state_key != module_to_update.module_state_key
+        ):
+            yield module_batch
+            module_batch = []
+        module_batch.append(module_to_update)
+    if module_batch:
+        yield module_batch
+
+
+def rescore_problem_module_states(xmodule_instance_args, module_descriptor, student_modules, task_input):
     '''
-    Takes an XModule descriptor and a corresponding StudentModule object, and
-    performs rescoring on the student's problem submission.
+    Takes an XModule descriptor and a list of corresponding StudentModule objects, and
+    performs rescoring on each of the students' problem submissions.
 
     Throws exceptions if the rescoring is fatal and should be aborted if in a loop.
-    In particular, raises UpdateProblemModuleStateError if module fails to instantiate,
-    or if the module doesn't support rescoring.
+    In particular, raises UpdateProblemModuleStateError if a module doesn't support rescoring.
+
+    The submissions to capa problems are graded together, so that the check functions
+    of their custom responses are executed together for all of the students, rather
+    than one each (see capa.capa_problem.get_grades_from_current_answers).  Each
+    student's rescore is then saved in a transaction of its own.
 
-    Returns True if problem was successfully rescored for the given student, and False
-    if problem encountered some kind of error in rescoring.
+    Returns a list of the update status of each StudentModule.
     '''
-    # unpack the StudentModule:
-    course_id = student_module.course_id
-    student = student_module.student
-    usage_key = student_module.module_state_key
+    course_id = student_modules[0].course_id
+    update_statuses = [None] * len(student_modules)
 
     with modulestore().bulk_operations(course_id):
         course = get_course_by_id(course_id)
-        # TODO: Here is a call site where we could pass in a loaded course.  I
-        # think we certainly need it since grading is happening here, and field
-        # overrides would be important in handling that correctly
-        instance = _get_module_instance_for_task(
-            course_id,
-            student,
-            module_descriptor,
-            xmodule_instance_args,
-            grade_bucket_type='rescore',
-            course=course
-        )
 
-        if instance is None:
-            # Either permissions just changed, or someone is trying to be clever
-            # and load something they shouldn't have access to.
-            msg = "No module {location} for student {student}--access denied?".format(
-                location=usage_key,
-                student=student
+        instances = []
+        for index, student_module in enumerate(student_modules):
+            # unpack the StudentModule:
+            student = student_module.student
+            usage_key = student_module.module_state_key
+
+            # TODO: Here is a call site where we could pass in a loaded course.  I
+            # think we certainly need it since grading is happening here, and field
+            # overrides would be important in handling that correctly
+            instance = _get_module_instance_for_task(
+                course_id,
+                student,
+                module_descriptor,
+                xmodule_instance_args,
+                grade_bucket_type='rescore',
+                course=course
             )
-            TASK_LOG.warning(msg)
-            return UPDATE_STATUS_FAILED
-
-        if not hasattr(instance, 'rescore'):
-            # This should not happen, since it should be already checked in the
-            # caller, but check here to be sure.
-            msg = "Specified problem does not support rescoring."
-            raise UpdateProblemModuleStateError(msg)
-
-        # We check here to see if the problem has any submissions. If it does not, we don't want to rescore it
-        if not instance.has_submitted_answer():
-            return UPDATE_STATUS_SKIPPED
-
-        # Set the tracking info before this call, because it makes downstream
-        # calls that create events.  We retrieve and store the id here because
-        # the request cache will be erased during downstream calls.
-        create_new_event_transaction_id()
-        set_event_transaction_type(GRADES_RESCORE_EVENT_TYPE)
 
-        # specific events from CAPA are not propagated up the stack. Do we want this?
-        try:
-            instance.rescore(only_if_higher=task_input['only_if_higher'])
-        except (LoncapaProblemError, StudentInputError, ResponseError):
-            TASK_LOG.warning(
-                u"error processing rescore call for course %(course)s, problem %(loc)s "
-                u"and student %(student)s",
-                dict(
-                    course=course_id,
-                    loc=usage_key,
+            if instance is None:
+                # Either permissions just changed, or someone is trying to be clever
+                # and load something they shouldn't have access to.
+                msg = "No module {location} for student {student}--access denied?".format(
+                    location=usage_key,
                     student=student
                 )
+                TASK_LOG.warning(msg)
+                update_statuses[index] = UPDATE_STATUS_FAILED
+                continue
+
+            if not hasattr(instance, 'rescore'):
+                # This should not happen, since it should be already checked in the
+                # caller, but check here to be sure.
+                msg = "Specified problem does not support rescoring."
+                raise UpdateProblemModuleStateError(msg)
+
+            # We check here to see if the problem has any submissions. If it does not, we don't want to rescore it
+            if not instance.has_submitted_answer():
+                update_statuses[index] = UPDATE_STATUS_SKIPPED
+                continue
+
+            instances.append((index, instance))
+
+        # grade the capa problems together, if there's more than one
+        capa_instances = [
+            (capa_index, capa_instance) for capa_index, capa_instance in instances
+            if isinstance(getattr(capa_instance, 'lcp', None), LoncapaProblem) and
+            capa_instance.lcp.supports_rescoring()
+        ]
+        new_correctnesses = {}
+        if len(capa_instances) > 1:
+            new_correctnesses = dict(zip(
+                [capa_index for capa_index, __ in capa_instances],
+                get_grades_from_current_answers([capa_instance.lcp for __, capa_instance in capa_instances]),
+            ))
+
+        for index, instance in instances:
+            student_module = student_modules[index]
+            update_statuses[index] = _rescore_module_instance(
+                instance, student_module, task_input, new_correctnesses.get(index)
             )
-            return UPDATE_STATUS_FAILED
 
-        instance.save()
-        TASK_LOG.debug(
-            u"successfully processed rescore call for course %(course)s, problem %(loc)s "
+    return update_statuses
+
+
+@outer_atomic
+def _rescore_module_instance(instance, student_module, task_input, new_correctness=None):
+    '''
+    Performs rescoring on the student's problem submission, given the instance of the
+    problem for the student, and the new grade of the submission if it has been graded.
+
+    Returns the update status of the StudentModule.
+    '''
+    course_id = student_module.course_id
+    student = student_module.student
+    usage_key = student_module.module_state_key
+
+    # Set the tracking info before this call, because it makes downstream
+    # calls that create events.  We retrieve and store the id here because
+    # the request cache will be erased during downstream calls.
+    create_new_event_transaction_id()
+    set_event_transaction_type(GRADES_RESCORE_EVENT_TYPE)
+
+    # specific events from CAPA are not propagated up the stack. Do we want this?
+    try:
+        if new_correctness is None:
+            instance.rescore(only_if_higher=task_input['only_if_higher'])
+        else:
+            instance.rescore(only_if_higher=task_input['only_if_higher'], new_correctness=new_correctness)
+    except (LoncapaProblemError, StudentInputError, ResponseError):
+        TASK_LOG.warning(
+            u"error processing rescore call for course %(course)s, problem %(loc)s "
             u"and student %(student)s",
             dict(
                 course=course_id,
@@ -220,8 +292,20 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
                 student=student
             )
         )
+        return UPDATE_STATUS_FAILED
+
+    instance.save()
+    TASK_LOG.debug(
+        u"successfully processed rescore call for course %(course)s, problem %(loc)s "
+        u"and student %(student)s",
+        dict(
+            course=course_id,
+            loc=usage_key,
+            student=student
+        )
+    )
 
-        return UPDATE_STATUS_SUCCEEDED
+    return UPDATE_STATUS_SUCCEEDED
 
 
 @outer_atomic
@@ -24,19 +24,38 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
                 [row1_colum1, row1_colum2, ...],
                 ...
             ]
+            Any iterable of rows, such as a generator, may be used.
         csv_name: Name of the resulting CSV
         course_id: ID of the course
     """
+    with create_csv_report_file(csv_name, course_id, timestamp, config_name) as report_file:
+        report_file.write_rows(rows)
+        upload_csv_report_file(report_file, csv_name)
+
+
+def create_csv_report_file(csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'):
+    """
+    Return an empty ReportFile for a CSV, that rows can be written to a batch at
+    a time and that is uploaded with `upload_csv_report_file`.  The arguments
+    are as for `upload_csv_to_report_store`.
+    """
     report_store = ReportStore.from_config(config_name)
-    report_store.store_rows(
+    return report_store.create_report_file(
         course_id,
         u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
             course_prefix=course_filename_prefix_generator(course_id),
             csv_name=csv_name,
             timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
         ),
-        rows
     )
+
+
+def upload_csv_report_file(report_file, csv_name):
+    """
+    Upload the given ReportFile, created by `create_csv_report_file` for
+    `csv_name`.
+    """
+    report_file.store()
     tracker_emit(csv_name)
 
 
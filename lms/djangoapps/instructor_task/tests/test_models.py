@@ -12,7 +12,7 @@ from mock import patch
 from opaque_keys.edx.locator import CourseLocator
 
 from common.test.utils import MockS3Mixin
-from lms.djangoapps.instructor_task.models import ReportStore
+from lms.djangoapps.instructor_task.models import ReportFile, ReportStore
 from lms.djangoapps.instructor_task.tests.test_base import TestReportMixin
 
 
@@ -49,6 +49,23 @@ class ReportStoreTestMixin(object):
             ['new_file', 'middle_file', 'old_file']
         )
 
+    @patch.object(ReportFile, 'MAX_MEMORY_SIZE', 10)
+    def test_report_file(self):
+        """
+        Test that rows appended to a ReportFile are stored in csv format,
+        after being spooled to disk.
+        """
+        report_store = self.create_report_store()
+        with report_store.create_report_file(self.course_id, 'report.csv') as report_file:
+            report_file.write_rows([[u'Username', u'Grade']])
+            report_file.write_rows(iter([[u'ni\xf1o', 0.5], [u'student', 1]]))
+            self.assertEqual(report_file.num_rows, 3)
+            self.assertTrue(report_file._file._rolled)  # pylint: disable=protected-access
+            report_file.store()
+
+        with report_store.storage.open(report_store.path_to(self.course_id, 'report.csv')) as csv_file:
+            self.assertEqual(csv_file.read(), 'Username,Grade\r\nni\xc3\xb1o,0.5\r\nstudent,1\r\n')
+
 
 class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, SimpleTestCase):
     """
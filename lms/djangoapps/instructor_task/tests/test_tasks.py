@@ -29,6 +29,7 @@ from lms.djangoapps.instructor_task.tasks import (
     override_problem_score
 )
 from lms.djangoapps.instructor_task.tasks_helper.misc import upload_ora2_data
+from lms.djangoapps.instructor_task.tasks_helper.utils import UPDATE_STATUS_SUCCEEDED
 from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import InstructorTaskModuleTestCase
 from student.tests.factories import CourseEnrollmentFactory, UserFactory
@@ -447,6 +448,58 @@ class TestRescoreInstructorTask(TestInstructorTasks):
             action_name='rescored'
         )
 
+    def test_rescoring_in_batches(self):
+        """
+        Tests rescoring a problem visits the students' submissions in batches.
+        """
+        num_students = 10
+        self._create_students_with_state(num_students)
+        task_entry = self._create_input_entry()
+        with patch('lms.djangoapps.instructor_task.tasks.RESCORE_BATCH_SIZE', 4):
+            with patch('lms.djangoapps.instructor_task.tasks.rescore_problem_module_states') as mock_rescore:
+                mock_rescore.side_effect = lambda _args, _descriptor, student_modules, _input: (
+                    [UPDATE_STATUS_SUCCEEDED] * len(student_modules)
+                )
+                self._run_task_with_mock_celery(rescore_problem, task_entry.id, task_entry.task_id)
+
+        self.assertEqual([len(call[0][2]) for call in mock_rescore.call_args_list], [4, 4, 2])
+        self.assert_task_output(
+            output=self.get_task_output(task_entry.id),
+            total=num_students,
+            attempted=num_students,
+            succeeded=num_students,
+            skipped=0,
+            failed=0,
+            action_name='rescored'
+        )
+
+    def test_rescoring_failure_keeps_earlier_rescores(self):
+        """
+        Tests a fatal error rescoring a student's submission doesn't undo the rescores
+        of the students before them in the same batch.
+        """
+        students = self._create_students_with_state(3)
+        task_entry = self._create_input_entry()
+
+        def get_module(user, **kwargs):  # pylint: disable=unused-argument
+            """Returns a problem whose rescore sets the student's grade, or fails for the last student."""
+            mock_instance = MagicMock()
+            mock_instance.has_submitted_answer.return_value = True
+            if user == students[-1]:
+                mock_instance.rescore.side_effect = TestTaskFailure("Rescore failed")
+            mock_instance.save.side_effect = lambda: StudentModule.objects.filter(student=user).update(grade=1)
+            return mock_instance
+
+        with patch(
+                'lms.djangoapps.instructor_task.tasks_helper.module_state.get_module_for_descriptor_internal'
+        ) as mock_get_module:
+            mock_get_module.side_effect = get_module
+            with self.assertRaises(TestTaskFailure):
+                self._run_task_with_mock_celery(rescore_problem, task_entry.id, task_entry.task_id)
+
+        grades = [StudentModule.objects.get(student=student).grade for student in students]
+        self.assertEqual(grades, [1, 1, 0])
+
 
 @attr(shard=3)
 class TestResetAttemptsInstructorTask(TestInstructorTasks):
@@ -380,6 +380,8 @@ for name, value in ENV_TOKENS.get("CODE_JAIL", {}).items():
     else:
         CODE_JAIL[name] = value
 
+CODE_JAIL_POOL.update(ENV_TOKENS.get("CODE_JAIL_POOL", {}))
+
 COURSES_WITH_UNSAFE_CODE = ENV_TOKENS.get("COURSES_WITH_UNSAFE_CODE", [])
 
 ASSET_IGNORE_REGEX = ENV_TOKENS.get('ASSET_IGNORE_REGEX', ASSET_IGNORE_REGEX)
@@ -809,6 +811,9 @@ COURSE_CATALOG_API_URL = ENV_TOKENS.get('COURSE_CATALOG_API_URL', COURSE_CATALOG
 CREDENTIALS_INTERNAL_SERVICE_URL = ENV_TOKENS.get('CREDENTIALS_INTERNAL_SERVICE_URL', CREDENTIALS_INTERNAL_SERVICE_URL)
 CREDENTIALS_PUBLIC_SERVICE_URL = ENV_TOKENS.get('CREDENTIALS_PUBLIC_SERVICE_URL', CREDENTIALS_PUBLIC_SERVICE_URL)
 
+EDX_API_MAX_CONCURRENT_PAGES = ENV_TOKENS.get('EDX_API_MAX_CONCURRENT_PAGES', EDX_API_MAX_CONCURRENT_PAGES)
+EDX_API_STALE_CACHE_TTL = ENV_TOKENS.get('EDX_API_STALE_CACHE_TTL', EDX_API_STALE_CACHE_TTL)
+
 ECOMMERCE_SERVICE_WORKER_USERNAME = ENV_TOKENS.get(
     'ECOMMERCE_SERVICE_WORKER_USERNAME',
     ECOMMERCE_SERVICE_WORKER_USERNAME
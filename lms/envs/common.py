@@ -841,6 +841,15 @@ CODE_JAIL = {
     },
 }
 
+# Pool of sandboxed Pythons that capa's safe_exec keeps running, with the modules
+# that problems use already imported, rather than starting one per execution.
+CODE_JAIL_POOL = {
+    # Number of sandbox workers in each process.  0 means no pool.
+    'size': 0,
+    # Number of executions after which a sandbox worker is replaced.
+    'max_executions': 100,
+}
+
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
 # of them must match the course id for that course to run unsafe code.
 #
@@ -1876,6 +1885,11 @@ BLOCK_STRUCTURES_SETTINGS = dict(
     # Maximum number of retries per task.
     TASK_MAX_RETRIES=5,
 
+    # Maximum number of deserialized block structures to keep in each
+    # process, in front of the cache.  Only used when the
+    # storage_backing_for_cache waffle switch is enabled.  0 disables.
+    PROCESS_CACHE_SIZE=0,
+
     # Backend storage
     # STORAGE_CLASS='storages.backends.s3boto.S3BotoStorage',
     # STORAGE_KWARGS=dict(bucket='nim-beryl-test'),
@@ -3014,6 +3028,15 @@ COURSE_CATALOG_API_URL = None
 CREDENTIALS_INTERNAL_SERVICE_URL = None
 CREDENTIALS_PUBLIC_SERVICE_URL = None
 
+# Maximum number of pages of an edX REST API collection (catalog, credentials,
+# ...) that get_edx_api_data fetches at the same time, once it has the first
+# page.  The pages share the API client's pooled connections.
+EDX_API_MAX_CONCURRENT_PAGES = 4
+# Number of seconds past their cache_ttl for which get_edx_api_data serves
+# cached API data while a single worker refreshes it.  0 disables serving
+# stale data.
+EDX_API_STALE_CACHE_TTL = 0
+
 # Reverification checkpoint name pattern
 CHECKPOINT_PATTERN = r'(?P<checkpoint_name>[^/]+)'
 
@@ -24,6 +24,7 @@ from startup_configurations.validate_config import validate_lms_config
 from openedx.core.djangoapps.theming.core import enable_theming
 from openedx.core.djangoapps.theming.helpers import is_comprehensive_theming_enabled
 
+from capa.safe_exec import configure_pool
 from microsite_configuration import microsite
 
 log = logging.getLogger(__name__)
@@ -55,6 +56,9 @@ def run():
 
     add_mimetypes()
 
+    # Configure capa's pool of sandbox workers, which each process starts when first used.
+    configure_pool(**settings.CODE_JAIL_POOL)
+
     # Mako requires the directories to be added after the django setup.
     microsite.enable_microsites(log)
 
@@ -3,3 +3,6 @@ PROGRAM_CACHE_KEY_TPL = 'program-{uuid}'
 
 # Cache key used to locate an item containing a list of all program UUIDs for a site.
 SITE_PROGRAM_UUIDS_CACHE_KEY_TPL = 'program-uuids-{domain}'
+
+# Cache key used to locate an item containing a list of summaries of all programs for a site.
+SITE_PROGRAM_INDEX_CACHE_KEY_TPL = 'program-index-{domain}'
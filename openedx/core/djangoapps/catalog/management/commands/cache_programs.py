@@ -8,10 +8,11 @@ from django.core.management import BaseCommand
 
 from openedx.core.djangoapps.catalog.cache import (
     PROGRAM_CACHE_KEY_TPL,
+    SITE_PROGRAM_INDEX_CACHE_KEY_TPL,
     SITE_PROGRAM_UUIDS_CACHE_KEY_TPL
 )
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
-from openedx.core.djangoapps.catalog.utils import create_catalog_api_client
+from openedx.core.djangoapps.catalog.utils import create_catalog_api_client, summarize_program
 
 logger = logging.getLogger(__name__)
 User = get_user_model()  # pylint: disable=invalid-name
@@ -21,7 +22,8 @@ class Command(BaseCommand):
     """Management command used to cache program data.
 
     This command requests every available program from the discovery
-    service, writing each to its own cache entry with an indefinite expiration.
+    service, writing each to its own cache entry with an indefinite expiration,
+    along with an index of summaries of each site's programs.
     It is meant to be run on a scheduled basis and should be the only code
     updating these cache entries.
     """
@@ -48,6 +50,7 @@ class Command(BaseCommand):
             if site_config is None or not site_config.get_value('COURSE_CATALOG_API_URL'):
                 logger.info('Skipping site {domain}. No configuration.'.format(domain=site.domain))
                 cache.set(SITE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=site.domain), [], None)
+                cache.set(SITE_PROGRAM_INDEX_CACHE_KEY_TPL.format(domain=site.domain), [], None)
                 continue
 
             client = create_catalog_api_client(user, site=site)
@@ -65,6 +68,16 @@ class Command(BaseCommand):
             ))
             cache.set(SITE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=site.domain), uuids, None)
 
+            program_index = [
+                summarize_program(new_programs[PROGRAM_CACHE_KEY_TPL.format(uuid=uuid)])
+                for uuid in uuids if PROGRAM_CACHE_KEY_TPL.format(uuid=uuid) in new_programs
+            ]
+            logger.info('Caching summaries of {total} programs for site {site_name}.'.format(
+                total=len(program_index),
+                site_name=site.domain,
+            ))
+            cache.set(SITE_PROGRAM_INDEX_CACHE_KEY_TPL.format(domain=site.domain), program_index, None)
+
         successful = len(programs)
         logger.info('Caching details for {successful} programs.'.format(successful=successful))
         cache.set_many(programs, None)
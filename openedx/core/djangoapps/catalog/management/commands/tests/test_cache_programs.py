@@ -6,10 +6,12 @@ from django.core.management import call_command
 
 from openedx.core.djangoapps.catalog.cache import (
     PROGRAM_CACHE_KEY_TPL,
+    SITE_PROGRAM_INDEX_CACHE_KEY_TPL,
     SITE_PROGRAM_UUIDS_CACHE_KEY_TPL
 )
 from openedx.core.djangoapps.catalog.tests.factories import ProgramFactory
 from openedx.core.djangoapps.catalog.tests.mixins import CatalogIntegrationMixin
+from openedx.core.djangoapps.catalog.utils import summarize_program
 from openedx.core.djangoapps.site_configuration.tests.mixins import SiteMixin
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase, skip_unless_lms
 from student.tests.factories import UserFactory
@@ -115,6 +117,12 @@ class TestCachePrograms(CatalogIntegrationMixin, CacheIsolationTestCase, SiteMix
         for key, program in cached_programs.items():
             self.assertEqual(program, programs[key])
 
+        cached_program_index = cache.get(SITE_PROGRAM_INDEX_CACHE_KEY_TPL.format(domain=self.site_domain))
+        self.assertEqual(
+            cached_program_index,
+            [summarize_program(programs[PROGRAM_CACHE_KEY_TPL.format(uuid=uuid)]) for uuid in self.uuids]
+        )
+
     def test_handle_missing_service_user(self):
         """
         Verify that the command raises an exception when run without a service
@@ -182,3 +190,10 @@ class TestCachePrograms(CatalogIntegrationMixin, CacheIsolationTestCase, SiteMix
 
         for key, program in cached_programs.items():
             self.assertEqual(program, partial_programs[key])
+
+        # Only the programs that were retrieved are summarized.
+        cached_program_index = cache.get(SITE_PROGRAM_INDEX_CACHE_KEY_TPL.format(domain=self.site_domain))
+        self.assertEqual(
+            cached_program_index,
+            [summarize_program(program) for program in self.programs[:2]]
+        )
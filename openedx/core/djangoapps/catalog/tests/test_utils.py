@@ -9,16 +9,28 @@ from django.core.cache import cache
 from django.test import TestCase, override_settings
 from student.tests.factories import UserFactory
 
-from openedx.core.djangoapps.catalog.cache import PROGRAM_CACHE_KEY_TPL, SITE_PROGRAM_UUIDS_CACHE_KEY_TPL
+from openedx.core.djangoapps.catalog.cache import (
+    PROGRAM_CACHE_KEY_TPL,
+    SITE_PROGRAM_INDEX_CACHE_KEY_TPL,
+    SITE_PROGRAM_UUIDS_CACHE_KEY_TPL
+)
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
-from openedx.core.djangoapps.catalog.tests.factories import CourseRunFactory, ProgramFactory, ProgramTypeFactory
+from openedx.core.djangoapps.catalog.tests.factories import (
+    CourseFactory,
+    CourseRunFactory,
+    ProgramFactory,
+    ProgramTypeFactory
+)
 from openedx.core.djangoapps.catalog.tests.mixins import CatalogIntegrationMixin
 from openedx.core.djangoapps.catalog.utils import (
     get_course_runs,
     get_course_run_details,
+    get_program_index,
     get_program_types,
     get_programs,
-    get_programs_with_type
+    get_programs_with_type,
+    summarize_program,
+    _get_programs_chunk
 )
 from openedx.core.djangoapps.site_configuration.tests.factories import SiteFactory
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase, skip_unless_lms
@@ -67,7 +79,7 @@ class TestGetPrograms(CacheIsolationTestCase):
             set(program['uuid'] for program in actual_programs),
             set(program['uuid'] for program in partial_programs.values())
         )
-        mock_info.assert_called_with('Failed to get details for 1 programs. Retrying.')
+        mock_info.assert_called_with('Failed to get details for 1 of a chunk of 3 programs. Retrying.')
         mock_warning.assert_called_with(
             'Failed to get details for program {uuid} from the cache.'.format(uuid=programs[2]['uuid'])
         )
@@ -131,12 +143,51 @@ class TestGetPrograms(CacheIsolationTestCase):
             set(program['uuid'] for program in all_programs.values())
         )
         self.assertFalse(mock_warning.called)
-        mock_info.assert_called_with('Failed to get details for 1 programs. Retrying.')
+        mock_info.assert_called_with('Failed to get details for 1 of a chunk of 3 programs. Retrying.')
 
         for program in actual_programs:
             key = PROGRAM_CACHE_KEY_TPL.format(uuid=program['uuid'])
             self.assertEqual(program, all_programs[key])
 
+    @mock.patch(UTILS_MODULE + '.PROGRAM_CACHE_CHUNK_SIZE', 2)
+    def test_get_many_in_chunks(self, mock_warning, mock_info):
+        programs = ProgramFactory.create_batch(5)
+        cache.set(
+            SITE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=self.site.domain),
+            [program['uuid'] for program in programs],
+            None
+        )
+
+        # Cache details for all but the last program, which is in a chunk of its own.
+        cache.set_many({
+            PROGRAM_CACHE_KEY_TPL.format(uuid=program['uuid']): program for program in programs[:4]
+        }, None)
+
+        with mock.patch(UTILS_MODULE + '._get_programs_chunk', wraps=_get_programs_chunk) as mock_get_programs_chunk:
+            actual_programs = get_programs(self.site)
+
+        # The programs are read in chunks, and the chunk missing a program is retried.
+        self.assertEqual(sorted(len(call[0][0]) for call in mock_get_programs_chunk.call_args_list), [1, 2, 2])
+        self.assertEqual(
+            sorted(program['uuid'] for program in actual_programs),
+            sorted(program['uuid'] for program in programs[:4])
+        )
+        mock_info.assert_called_once_with('Failed to get details for 1 of a chunk of 1 programs. Retrying.')
+        mock_warning.assert_called_once_with(
+            'Failed to get details for program {uuid} from the cache.'.format(uuid=programs[4]['uuid'])
+        )
+
+    def test_get_many_by_uuids(self, mock_warning, _mock_info):
+        programs = ProgramFactory.create_batch(3)
+        cache.set_many({
+            PROGRAM_CACHE_KEY_TPL.format(uuid=program['uuid']): program for program in programs
+        }, None)
+
+        actual_programs = get_programs(self.site, uuids=[programs[1]['uuid']])
+
+        self.assertEqual(actual_programs, [programs[1]])
+        self.assertFalse(mock_warning.called)
+
     def test_get_one(self, mock_warning, _mock_info):
         expected_program = ProgramFactory()
         expected_uuid = expected_program['uuid']
@@ -160,6 +211,38 @@ class TestGetPrograms(CacheIsolationTestCase):
 
 @skip_unless_lms
 @ddt.ddt
+@skip_unless_lms
+@mock.patch(UTILS_MODULE + '.logger.warning')
+class TestGetProgramIndex(CacheIsolationTestCase):
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(TestGetProgramIndex, self).setUp()
+        self.site = SiteFactory()
+
+    def test_get_program_index(self, mock_warning):
+        self.assertIsNone(get_program_index(self.site))
+        mock_warning.assert_called_once_with('Failed to get the program index from the cache.')
+        mock_warning.reset_mock()
+
+        program_index = [summarize_program(program) for program in ProgramFactory.create_batch(2)]
+        cache.set(SITE_PROGRAM_INDEX_CACHE_KEY_TPL.format(domain=self.site.domain), program_index, None)
+
+        self.assertEqual(get_program_index(self.site), program_index)
+        self.assertFalse(mock_warning.called)
+
+    def test_summarize_program(self, _mock_warning):
+        course_runs = CourseRunFactory.create_batch(2)
+        program = ProgramFactory(courses=[CourseFactory(course_runs=course_runs)])
+
+        self.assertEqual(summarize_program(program), {
+            'uuid': program['uuid'],
+            'title': program['title'],
+            'type': program['type'],
+            'course_run_keys': [course_run['key'] for course_run in course_runs],
+        })
+
+
 class TestGetProgramsWithType(TestCase):
     def setUp(self):
         super(TestGetProgramsWithType, self).setUp()
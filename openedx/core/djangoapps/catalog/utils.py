@@ -1,6 +1,8 @@
 """Helper functions for working with the catalog service."""
 import copy
 import logging
+from multiprocessing.pool import ThreadPool
+from threading import Lock
 
 import waffle
 from django.conf import settings
@@ -8,8 +10,10 @@ from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from edx_rest_api_client.client import EdxRestApiClient
 
+from openedx.core.djangoapps import monitoring_utils
 from openedx.core.djangoapps.catalog.cache import (
     PROGRAM_CACHE_KEY_TPL,
+    SITE_PROGRAM_INDEX_CACHE_KEY_TPL,
     SITE_PROGRAM_UUIDS_CACHE_KEY_TPL
 )
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
@@ -18,6 +22,19 @@ from openedx.core.lib.token_utils import JwtBuilder
 
 logger = logging.getLogger(__name__)
 
+MISSING_DETAILS_MSG_TPL = 'Failed to get details for program {uuid} from the cache.'
+
+# Number of programs read from the cache with each get_many, and the number of
+# those reads made concurrently.  Smaller reads are less likely to be missing
+# keys, and are quicker to retry when they are.
+PROGRAM_CACHE_CHUNK_SIZE = 100
+PROGRAM_CACHE_MAX_CONCURRENT_CHUNKS = 4
+
+# The threads that read chunks of programs from the cache, shared by all
+# requests of the process.  Created when first needed.
+_chunk_pool = None
+_chunk_pool_lock = Lock()
+
 
 def create_catalog_api_client(user, site=None):
     """Returns an API client which can be used to make Catalog API requests."""
@@ -33,7 +50,7 @@ def create_catalog_api_client(user, site=None):
     return EdxRestApiClient(url, jwt=jwt)
 
 
-def get_programs(site, uuid=None):
+def get_programs(site, uuid=None, uuids=None):
     """Read programs from the cache.
 
     The cache is populated by a management command, cache_programs.
@@ -43,25 +60,95 @@ def get_programs(site, uuid=None):
 
     Keyword Arguments:
         uuid (string): UUID identifying a specific program to read from the cache.
+        uuids (list): UUIDs identifying the programs to read from the cache,
+            instead of all of the site's programs.
 
     Returns:
         list of dict, representing programs.
         dict, if a specific program is requested.
     """
-    missing_details_msg_tpl = 'Failed to get details for program {uuid} from the cache.'
-
     if uuid:
         program = cache.get(PROGRAM_CACHE_KEY_TPL.format(uuid=uuid))
         if not program:
-            logger.warning(missing_details_msg_tpl.format(uuid=uuid))
+            logger.warning(MISSING_DETAILS_MSG_TPL.format(uuid=uuid))
 
         return program
-    uuids = cache.get(SITE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=site.domain), [])
-    if not uuids:
-        logger.warning('Failed to get program UUIDs from the cache.')
 
-    programs = cache.get_many([PROGRAM_CACHE_KEY_TPL.format(uuid=uuid) for uuid in uuids])
-    programs = list(programs.values())
+    if uuids is None:
+        uuids = cache.get(SITE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=site.domain), [])
+        if not uuids:
+            logger.warning('Failed to get program UUIDs from the cache.')
+
+    chunks = [
+        uuids[index:index + PROGRAM_CACHE_CHUNK_SIZE]
+        for index in range(0, len(uuids), PROGRAM_CACHE_CHUNK_SIZE)
+    ]
+    if len(chunks) > 1:
+        chunk_results = _get_chunk_pool().map(_get_programs_chunk, chunks)
+    else:
+        chunk_results = [_get_programs_chunk(chunk) for chunk in chunks]
+
+    programs = []
+    for chunk_programs, misses in chunk_results:
+        programs += chunk_programs
+        monitoring_utils.accumulate('catalog.programs.cache_misses', misses)
+    monitoring_utils.accumulate('catalog.programs.cache_chunks', len(chunks))
+
+    return programs
+
+
+def get_program_index(site):
+    """Read the summaries of a site's programs from the cache.
+
+    The summaries hold what is needed to find the programs containing a course
+    run, so that the details of all of the site's programs need not be read.
+    The cache is populated by a management command, cache_programs.
+
+    Arguments:
+        site (Site): django.contrib.sites.models object
+
+    Returns:
+        list of dict, representing program summaries as returned by
+            summarize_program, or None if the summaries are not cached.
+    """
+    program_index = cache.get(SITE_PROGRAM_INDEX_CACHE_KEY_TPL.format(domain=site.domain))
+    if program_index is None:
+        logger.warning('Failed to get the program index from the cache.')
+
+    return program_index
+
+
+def summarize_program(program):
+    """Summarize a program for a site's program index.
+
+    Arguments:
+        program (dict): Representing a program.
+
+    Returns:
+        dict, containing the program's UUID, title, type and the keys of its
+            course runs.
+    """
+    return {
+        'uuid': program['uuid'],
+        'title': program['title'],
+        'type': program['type'],
+        'course_run_keys': [
+            course_run['key'] for course in program['courses'] for course_run in course['course_runs']
+        ],
+    }
+
+
+def _get_programs_chunk(uuids):
+    """Read a chunk of programs from the cache.
+
+    Arguments:
+        uuids (list): UUIDs identifying the programs to read from the cache.
+
+    Returns:
+        tuple of the list of dicts representing the programs read, and the
+            number of programs missing from the first read.
+    """
+    programs = list(cache.get_many([PROGRAM_CACHE_KEY_TPL.format(uuid=uuid) for uuid in uuids]).values())
 
     # The get_many above sometimes fails to bring back details cached on one or
     # more Memcached nodes. It doesn't look like these keys are being evicted.
@@ -69,22 +156,35 @@ def get_programs(site, uuid=None):
     # on one or more nodes are missing from the result of the get_many. One
     # get_many may fail to bring these keys back, but a get_many occurring
     # immediately afterwards will succeed in bringing back all the keys. This
-    # behavior can be mitigated by trying again for the missing keys, which is
-    # what we do here. Splitting the get_many into smaller chunks may also help.
+    # behavior is mitigated by reading the programs in chunks, and by trying
+    # again for each chunk's missing keys, which is what we do here.
     missing_uuids = set(uuids) - set(program['uuid'] for program in programs)
     if missing_uuids:
-        logger.info(
-            'Failed to get details for {count} programs. Retrying.'.format(count=len(missing_uuids))
-        )
+        logger.info('Failed to get details for {count} of a chunk of {total} programs. Retrying.'.format(
+            count=len(missing_uuids),
+            total=len(uuids),
+        ))
 
         retried_programs = cache.get_many([PROGRAM_CACHE_KEY_TPL.format(uuid=uuid) for uuid in missing_uuids])
         programs += list(retried_programs.values())
 
         still_missing_uuids = set(uuids) - set(program['uuid'] for program in programs)
         for uuid in still_missing_uuids:
-            logger.warning(missing_details_msg_tpl.format(uuid=uuid))
+            logger.warning(MISSING_DETAILS_MSG_TPL.format(uuid=uuid))
 
-    return programs
+    return programs, len(missing_uuids)
+
+
+def _get_chunk_pool():
+    """
+    Returns the pool of threads for reading chunks of programs, creating it
+    if needed.
+    """
+    global _chunk_pool  # pylint: disable=global-statement
+    with _chunk_pool_lock:
+        if _chunk_pool is None:
+            _chunk_pool = ThreadPool(PROGRAM_CACHE_MAX_CONCURRENT_CHUNKS)
+        return _chunk_pool
 
 
 def get_program_types(name=None):
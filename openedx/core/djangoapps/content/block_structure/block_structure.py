@@ -5,7 +5,7 @@ Module with family of classes for block structures.
     BlockStructureModulestoreData - responsible for xBlock data.
 
 The following internal data structures are implemented:
-    _BlockRelations - Data structure for a single block's relations.
+    _BlockGraph - Data structure for the relations of all blocks.
     _BlockData - Data structure for a single block's data.
 """
 from copy import deepcopy
@@ -28,6 +28,9 @@ class _BlockRelations(object):
     """
     Data structure to encapsulate relationships for a single block,
     including its children and parents.
+
+    Note: No longer used by BlockStructure, but kept to read block
+    structures that were stored before the introduction of _BlockGraph.
     """
     def __init__(self):
 
@@ -40,6 +43,104 @@ class _BlockRelations(object):
         self.children = []
 
 
+class _BlockGraph(object):
+    """
+    Data structure to encapsulate the relationships of all blocks in a
+    block structure.
+
+    Each block is assigned a dense integer index, and its parents and
+    children are stored as lists of indices, so traversals hash and
+    compare small integers rather than full usage keys.  The index of a
+    removed block is not reused; its relations are cleared until the
+    graph is compacted.
+    """
+    __slots__ = ('keys', 'indices', 'children', 'parents')
+
+    def __init__(self):
+
+        # List of the usage key of each block, by index, including
+        # removed blocks.
+        # list [UsageKey]
+        self.keys = []
+
+        # Map of a block's usage key to its index.  The existence of a
+        # block in the graph is determined by its presence in this map.
+        # dict {UsageKey: int}
+        self.indices = {}
+
+        # List of the indices of each block's children, by index.
+        # list [list [int]]
+        self.children = []
+
+        # List of the indices of each block's parents, by index.
+        # list [list [int]]
+        self.parents = []
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __deepcopy__(self, memo):
+        copied = _BlockGraph()
+        copied.keys = list(self.keys)
+        copied.indices = dict(self.indices)
+        copied.children = [list(children) for children in self.children]
+        copied.parents = [list(parents) for parents in self.parents]
+        return copied
+
+    def __getstate__(self):
+        return self.keys, self.indices, self.children, self.parents
+
+    def __setstate__(self, state):
+        self.keys, self.indices, self.children, self.parents = state
+
+    @classmethod
+    def from_relations(cls, block_relations):
+        """
+        Returns a new graph for the given legacy map of a block's usage
+        key to its _BlockRelations.
+        """
+        graph = cls()
+        for usage_key in block_relations:
+            graph.add_block(usage_key)
+        for usage_key, relations in block_relations.iteritems():
+            index = graph.indices[usage_key]
+            graph.children[index] = [graph.indices[child] for child in relations.children]
+            graph.parents[index] = [graph.indices[parent] for parent in relations.parents]
+        return graph
+
+    def add_block(self, usage_key):
+        """
+        Adds the given usage_key to the graph, if not already present,
+        and returns its index.
+        """
+        try:
+            return self.indices[usage_key]
+        except KeyError:
+            index = len(self.keys)
+            self.indices[usage_key] = index
+            self.keys.append(usage_key)
+            self.children.append([])
+            self.parents.append([])
+            return index
+
+    def add_relation(self, parent_index, child_index):
+        """
+        Adds a parent to child relationship between the blocks at the
+        given indices.
+        """
+        self.parents[child_index].append(parent_index)
+        self.children[parent_index].append(child_index)
+
+    def remove_block(self, index):
+        """
+        Removes the block at the given index from the graph, without
+        updating the relations of its parents and children.
+        """
+        del self.indices[self.keys[index]]
+        self.children[index] = []
+        self.parents[index] = []
+
+
 class BlockStructure(object):
     """
     Base class for a block structure.  BlockStructures are constructed
@@ -56,14 +157,12 @@ class BlockStructure(object):
         # UsageKey
         self.root_block_usage_key = root_block_usage_key
 
-        # Map of a block's usage key to its block relations. The
-        # existence of a block in the structure is determined by its
-        # presence in this map.
-        # dict {UsageKey: _BlockRelations}
-        self._block_relations = {}
+        # Graph of the blocks in this structure and their relations.
+        # _BlockGraph
+        self._block_graph = _BlockGraph()
 
         # Add the root block.
-        self._add_block(self._block_relations, root_block_usage_key)
+        self._block_graph.add_block(root_block_usage_key)
 
     def __iter__(self):
         """
@@ -74,7 +173,7 @@ class BlockStructure(object):
         return self.get_block_keys()
 
     def __len__(self):
-        return len(self._block_relations)
+        return len(self._block_graph)
 
     #--- Block structure relation methods ---#
 
@@ -91,7 +190,7 @@ class BlockStructure(object):
         Returns:
             [UsageKey] - A list of usage keys of the block's parents.
         """
-        return self._block_relations[usage_key].parents if usage_key in self else []
+        return self._get_related_keys(self._block_graph.parents, usage_key)
 
     def get_children(self, usage_key):
         """
@@ -105,7 +204,7 @@ class BlockStructure(object):
         Returns:
             [UsageKey] - A list of usage keys of the block's children.
         """
-        return self._block_relations[usage_key].children if usage_key in self else []
+        return self._get_related_keys(self._block_graph.children, usage_key)
 
     def set_root_block(self, usage_key):
         """
@@ -120,7 +219,7 @@ class BlockStructure(object):
                 new root of the block structure.
         """
         self.root_block_usage_key = usage_key
-        self._block_relations[usage_key].parents = []
+        self._block_graph.parents[self._block_graph.indices[usage_key]] = []
 
     def __contains__(self, usage_key):
         """
@@ -135,7 +234,7 @@ class BlockStructure(object):
             bool - Whether or not a block with the given usage_key
                 is present in this block structure.
         """
-        return usage_key in self._block_relations
+        return usage_key in self._block_graph.indices
 
     def get_block_keys(self):
         """
@@ -145,7 +244,7 @@ class BlockStructure(object):
             iterator(UsageKey) - An iterator of the usage
             keys of all the blocks in the block structure.
         """
-        return self._block_relations.iterkeys()
+        return self._block_graph.indices.iterkeys()
 
     #--- Block structure traversal methods ---#
 
@@ -167,13 +266,23 @@ class BlockStructure(object):
             generator - A generator object created from the
                 traverse_topologically method.
         """
-        return traverse_topologically(
-            start_node=start_node or self.root_block_usage_key,
-            get_parents=self.get_parents,
-            get_children=self.get_children,
-            filter_func=filter_func,
+        start_node = start_node or self.root_block_usage_key
+        graph = self._block_graph
+        if start_node not in graph.indices:
+            return traverse_topologically(
+                start_node=start_node,
+                get_parents=self.get_parents,
+                get_children=self.get_children,
+                filter_func=filter_func,
+                yield_descendants_of_unyielded=yield_descendants_of_unyielded,
+            )
+        return self._keys_of(traverse_topologically(
+            start_node=graph.indices[start_node],
+            get_parents=graph.parents.__getitem__,
+            get_children=graph.children.__getitem__,
+            filter_func=self._index_filter(filter_func),
             yield_descendants_of_unyielded=yield_descendants_of_unyielded,
-        )
+        ))
 
     def post_order_traversal(
             self,
@@ -192,11 +301,19 @@ class BlockStructure(object):
             generator - A generator object created from the
                 traverse_post_order method.
         """
-        return traverse_post_order(
-            start_node=start_node or self.root_block_usage_key,
-            get_children=self.get_children,
-            filter_func=filter_func,
-        )
+        start_node = start_node or self.root_block_usage_key
+        graph = self._block_graph
+        if start_node not in graph.indices:
+            return traverse_post_order(
+                start_node=start_node,
+                get_children=self.get_children,
+                filter_func=filter_func,
+            )
+        return self._keys_of(traverse_post_order(
+            start_node=graph.indices[start_node],
+            get_children=graph.children.__getitem__,
+            filter_func=self._index_filter(filter_func),
+        ))
 
     #--- Internal methods ---#
     # To be used within the block_structure framework or by tests.
@@ -206,28 +323,32 @@ class BlockStructure(object):
         Mutates this block structure by removing any unreachable blocks.
         """
 
-        # Create a new block relations map to store only those blocks
-        # that are still linked
-        pruned_block_relations = {}
-        old_block_relations = self._block_relations
+        # Create a new graph to store only those blocks that are
+        # still linked.
+        pruned_graph = _BlockGraph()
+        old_graph = self._block_graph
 
         # Build the structure from the leaves up by doing a post-order
         # traversal of the old structure, thereby encountering only
         # reachable blocks.
-        for block_key in self.post_order_traversal():
-            # If the block is in the old structure,
-            if block_key in old_block_relations:
-                # Add it to the new pruned structure
-                self._add_block(pruned_block_relations, block_key)
+        if self.root_block_usage_key in old_graph.indices:
+            new_indices = {}  # dict {int: int}
+            for old_index in traverse_post_order(
+                    start_node=old_graph.indices[self.root_block_usage_key],
+                    get_children=old_graph.children.__getitem__,
+            ):
+                # Add it to the new pruned structure.
+                new_index = pruned_graph.add_block(old_graph.keys[old_index])
+                new_indices[old_index] = new_index
 
                 # Add a relationship to only those old children that
                 # were also added to the new pruned structure.
-                for child in old_block_relations[block_key].children:
-                    if child in pruned_block_relations:
-                        self._add_to_relations(pruned_block_relations, block_key, child)
+                for old_child_index in old_graph.children[old_index]:
+                    if old_child_index in new_indices:
+                        pruned_graph.add_relation(new_index, new_indices[old_child_index])
 
-        # Replace this structure's relations with the newly pruned one.
-        self._block_relations = pruned_block_relations
+        # Replace this structure's graph with the newly pruned one.
+        self._block_graph = pruned_graph
 
     def _add_relation(self, parent_key, child_key):
         """
@@ -237,44 +358,38 @@ class BlockStructure(object):
             parent_key (UsageKey) - Usage key of the parent block.
             child_key (UsageKey) - Usage key of the child block.
         """
-        self._add_to_relations(self._block_relations, parent_key, child_key)
+        graph = self._block_graph
+        graph.add_relation(graph.add_block(parent_key), graph.add_block(child_key))
 
-    @staticmethod
-    def _add_to_relations(block_relations, parent_key, child_key):
+    def _get_related_keys(self, related_indices, usage_key):
         """
-        Adds a parent to child relationship in the given block
-        relations map.
-
-        Arguments:
-            block_relations (dict({UsageKey: _BlockRelations})) -
-                Internal map of a block's usage key to its
-                parents/children relations.
-
-            parent_key (UsageKey) - Usage key of the parent block.
-
-            child_key (UsageKey) - Usage key of the child block.
+        Returns the usage keys of the blocks at the given usage_key's
+        entry of related_indices (the graph's parents or children).
         """
-        BlockStructure._add_block(block_relations, parent_key)
-        BlockStructure._add_block(block_relations, child_key)
-
-        block_relations[child_key].parents.append(parent_key)
-        block_relations[parent_key].children.append(child_key)
+        graph = self._block_graph
+        index = graph.indices.get(usage_key)
+        if index is None:
+            return []
+        keys = graph.keys
+        return [keys[related_index] for related_index in related_indices[index]]
 
-    @staticmethod
-    def _add_block(block_relations, usage_key):
+    def _index_filter(self, filter_func):
         """
-        Adds the given usage_key to the given block_relations map.
-
-        Arguments:
-            block_relations (dict({UsageKey: _BlockRelations})) -
-                Internal map of a block's usage key to its
-                parents/children relations.
+        Returns a filter function on block indices for the given filter
+        function on usage keys.
+        """
+        if filter_func is None:
+            return None
+        keys = self._block_graph.keys
+        return lambda index: filter_func(keys[index])
 
-            usage_key (UsageKey) - Usage key of the block that is to
-                be added to the given block_relations.
+    def _keys_of(self, indices):
+        """
+        Returns a generator of the usage keys of the given iterable of
+        block indices.
         """
-        if usage_key not in block_relations:
-            block_relations[usage_key] = _BlockRelations()
+        keys = self._block_graph.keys
+        return (keys[index] for index in indices)
 
 
 class FieldData(object):
@@ -401,7 +516,7 @@ class BlockStructureBlockData(BlockStructure):
     # update this value whenever the data structure changes. Dependent storage
     # layers can then use this value when serializing/deserializing block
     # structures, and invalidating any previously cached/stored data.
-    VERSION = 2
+    VERSION = 3
 
     def __init__(self, root_block_usage_key):
         super(BlockStructureBlockData, self).__init__(root_block_usage_key)
@@ -422,7 +537,7 @@ class BlockStructureBlockData(BlockStructure):
         from .factory import BlockStructureFactory
         return BlockStructureFactory.create_new(
             self.root_block_usage_key,
-            deepcopy(self._block_relations),
+            deepcopy(self._block_graph),
             deepcopy(self.transformer_data),
             deepcopy(self._block_data_map),
         )
@@ -602,26 +717,28 @@ class BlockStructureBlockData(BlockStructure):
                 removed block's children become children of the
                 removed block's parents.
         """
-        children = self._block_relations[usage_key].children
-        parents = self._block_relations[usage_key].parents
+        graph = self._block_graph
+        index = graph.indices[usage_key]
+        children = graph.children[index]
+        parents = graph.parents[index]
 
         # Remove block from its children.
         for child in children:
-            self._block_relations[child].parents.remove(usage_key)
+            graph.parents[child].remove(index)
 
         # Remove block from its parents.
         for parent in parents:
-            self._block_relations[parent].children.remove(usage_key)
+            graph.children[parent].remove(index)
 
         # Remove block.
-        self._block_relations.pop(usage_key, None)
+        graph.remove_block(index)
         self._block_data_map.pop(usage_key, None)
 
         # Recreate the graph connections if descendants are to be kept.
         if keep_descendants:
             for child in children:
                 for parent in parents:
-                    self._add_relation(parent, child)
+                    graph.add_relation(parent, child)
 
     def create_universal_filter(self):
         """
@@ -1,7 +1,7 @@
 """
 Module for factory class for BlockStructure objects.
 """
-from .block_structure import BlockStructureModulestoreData, BlockStructureBlockData
+from .block_structure import BlockStructureModulestoreData, BlockStructureBlockData, _BlockGraph
 
 
 class BlockStructureFactory(object):
@@ -86,12 +86,18 @@ class BlockStructureFactory(object):
         return block_structure_store.get(root_block_usage_key)
 
     @classmethod
-    def create_new(cls, root_block_usage_key, block_relations, transformer_data, block_data_map):
+    def create_new(cls, root_block_usage_key, block_graph, transformer_data, block_data_map):
         """
         Returns a new block structure for given the arguments.
+
+        The block_graph may also be given as a map of usage keys to
+        _BlockRelations, as stored before the introduction of _BlockGraph.
         """
+        if not isinstance(block_graph, _BlockGraph):
+            block_graph = _BlockGraph.from_relations(block_graph)
+
         block_structure = BlockStructureBlockData(root_block_usage_key)
-        block_structure._block_relations = block_relations  # pylint: disable=protected-access
+        block_structure._block_graph = block_graph  # pylint: disable=protected-access
         block_structure.transformer_data = transformer_data
         block_structure._block_data_map = block_data_map  # pylint: disable=protected-access
         return block_structure
@@ -0,0 +1,147 @@
+"""
+Command to benchmark the serialization formats of collected block structures.
+"""
+from datetime import datetime
+import timeit
+
+from django.core.management.base import BaseCommand
+from opaque_keys.edx.locator import CourseLocator
+from pytz import UTC
+
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+import openedx.core.djangoapps.content.block_structure.serialization as serialization
+from openedx.core.djangoapps.content.block_structure.block_structure import BlockStructureBlockData, _BlockRelations
+
+
+# Names of collected xBlock fields set on each synthetic block, similar
+# to those requested by the course_blocks transformers.
+SYNTHETIC_FIELDS = (
+    'display_name', 'category', 'start', 'due', 'graded', 'format', 'weight', 'has_score',
+    'visible_to_staff_only', 'hide_from_toc', 'days_early_for_beta', 'group_access', 'merged_group_access',
+)
+
+# Fields read by a typical transform, for measuring lazy decoding.
+READ_FIELDS = ('display_name', 'start', 'visible_to_staff_only')
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_block_structure_serialization --settings=devstack
+        $ ./manage.py lms benchmark_block_structure_serialization --num_blocks 5000 10000 --settings=devstack
+    """
+    help = u'Compares the legacy zpickle and columnar serializations of large synthetic block structures.'
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            '--num_blocks',
+            help=u'Approximate number of blocks in each synthetic course.',
+            nargs='+',
+            default=[1000, 5000],
+            type=int,
+        )
+        parser.add_argument(
+            '--iterations',
+            help=u'Number of timed deserializations per format.',
+            default=10,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        for num_blocks in options['num_blocks']:
+            block_structure = create_synthetic_block_structure(num_blocks)
+            self.stdout.write(u'Synthetic course with {} blocks:'.format(len(block_structure)))
+
+            legacy_data = zpickle((
+                _legacy_block_relations(block_structure),
+                block_structure.transformer_data,
+                block_structure._block_data_map,  # pylint: disable=protected-access
+            ))
+            columnar_data = serialization.serialize(block_structure)
+
+            for format_name, serialized_data, deserialize in (
+                    (u'zpickle', legacy_data, zunpickle),
+                    (u'columnar', columnar_data, serialization.deserialize),
+            ):
+                self.stdout.write(u'  {:<9} bytes: {:>9}  deserialize: {:8.2f} ms  deserialize+read: {:8.2f} ms'.format(
+                    format_name,
+                    len(serialized_data),
+                    _time_ms(lambda: deserialize(serialized_data), options['iterations']),
+                    _time_ms(lambda: _read_fields(deserialize(serialized_data)), options['iterations']),
+                ))
+
+
+def create_synthetic_block_structure(num_blocks):
+    """
+    Returns a collected block structure of roughly num_blocks blocks,
+    shaped as chapters of sequentials of verticals of problems.
+    """
+    course_key = CourseLocator('BenchmarkX', 'Serialization', 'run_{}'.format(num_blocks))
+    root_key = course_key.make_usage_key('course', 'course')
+    block_structure = BlockStructureBlockData(root_key)
+    branching = max(2, int(round(num_blocks ** 0.25)))
+    now = datetime.now(UTC)
+
+    def add_block(block_key, index):
+        """
+        Sets synthetic collected data on the given block.
+        """
+        # pylint: disable=protected-access
+        block_data = block_structure._get_or_create_block(block_key)
+        for field_name in SYNTHETIC_FIELDS:
+            setattr(block_data, field_name, None)
+        block_data.display_name = u'Block {}'.format(index)
+        block_data.category = block_key.block_type
+        block_data.start = now
+        block_data.graded = bool(index % 3)
+        block_data.group_access = {index % 5: [1, 2]}
+        block_structure.set_transformer_block_field(block_key, 'synthetic_transformer', 'index', index)
+
+    add_block(root_key, 0)
+    parents = [root_key]
+    index = 1
+    for block_type in ('chapter', 'sequential', 'vertical', 'problem'):
+        children = []
+        for parent_key in parents:
+            for _ in range(branching):
+                child_key = course_key.make_usage_key(block_type, u'{}_{}'.format(block_type, index))
+                block_structure._add_relation(parent_key, child_key)  # pylint: disable=protected-access
+                add_block(child_key, index)
+                children.append(child_key)
+                index += 1
+        parents = children
+    return block_structure
+
+
+def _legacy_block_relations(block_structure):
+    """
+    Returns the legacy map of usage keys to _BlockRelations for the
+    given block structure.
+    """
+    block_relations = {}
+    for block_key in block_structure:
+        relations = _BlockRelations()
+        relations.parents = block_structure.get_parents(block_key)
+        relations.children = block_structure.get_children(block_key)
+        block_relations[block_key] = relations
+    return block_relations
+
+
+def _read_fields(deserialized_data):
+    """
+    Reads the READ_FIELDS of every block in the given deserialized data.
+    """
+    _, _, block_data_map = deserialized_data
+    for block_data in block_data_map.itervalues():
+        for field_name in READ_FIELDS:
+            getattr(block_data, field_name, None)
+
+
+def _time_ms(func, iterations):
+    """
+    Returns the average run time in milliseconds of the given function.
+    """
+    return timeit.timeit(func, number=iterations) * 1000.0 / iterations
@@ -0,0 +1,129 @@
+"""
+Module for the in-process cache of deserialized, collected BlockStructures.
+
+The cache sits in front of the shared django cache used by the
+BlockStructureStore.  It is keyed by the version fields of the stored
+BlockStructureModel, so it is only consulted when storage backing is
+enabled, since only then is the version of the collected data known
+without accessing the modulestore.
+
+Cached block structures are never handed out directly.  Callers receive a
+copy, which (for structures in the columnar format) shares the cached
+structure's decoded columns.
+"""
+from collections import OrderedDict
+from logging import getLogger
+from threading import Lock
+
+from django.conf import settings
+
+from openedx.core.djangoapps import monitoring_utils
+
+
+logger = getLogger(__name__)  # pylint: disable=invalid-name
+
+
+class BlockStructureProcessCache(object):
+    """
+    A size-bounded, least-recently-used map of a version-specific cache
+    key to a collected block structure.
+    """
+    def __init__(self, max_size):
+        """
+        Arguments:
+            max_size (int) - The maximum number of block structures
+                to keep.  A value of 0 disables the cache.
+        """
+        self.max_size = max_size
+
+        # Map of (root_block_usage_key, version key) to the block
+        # structure, in order of least to most recently used.
+        # OrderedDict {(UsageKey, unicode): BlockStructureBlockData}
+        self._block_structures = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, root_block_usage_key, version_key):
+        """
+        Returns a copy of the cached block structure for the given keys,
+        or None if not found.
+        """
+        if not self.max_size:
+            return None
+
+        cache_key = (root_block_usage_key, version_key)
+        with self._lock:
+            block_structure = self._block_structures.pop(cache_key, None)
+            if block_structure is not None:
+                self._block_structures[cache_key] = block_structure
+
+        if block_structure is None:
+            _increment_metric('miss')
+            return None
+
+        _increment_metric('hit')
+        return block_structure.copy()
+
+    def add(self, root_block_usage_key, version_key, block_structure):
+        """
+        Adds the given block structure, evicting the least recently used
+        block structures beyond max_size.  Any other versions of the
+        block structure are replaced.
+
+        The given block_structure must not be modified afterwards.
+        """
+        if not self.max_size:
+            return
+
+        with self._lock:
+            self._remove(root_block_usage_key)
+            self._block_structures[(root_block_usage_key, version_key)] = block_structure
+            while len(self._block_structures) > self.max_size:
+                evicted_key, _ = self._block_structures.popitem(last=False)
+                logger.info("BlockStructure: Evicted from process cache; %s.", evicted_key[0])
+                _increment_metric('eviction')
+
+    def delete(self, root_block_usage_key):
+        """
+        Removes all versions of the block structure for the given
+        root_block_usage_key.
+        """
+        with self._lock:
+            self._remove(root_block_usage_key)
+
+    def clear(self):
+        """
+        Removes all block structures.
+        """
+        with self._lock:
+            self._block_structures.clear()
+
+    def _remove(self, root_block_usage_key):
+        """
+        Removes all versions of the block structure for the given
+        root_block_usage_key.  Must be called with the lock held.
+        """
+        for cache_key in [key for key in self._block_structures if key[0] == root_block_usage_key]:
+            del self._block_structures[cache_key]
+
+
+def _increment_metric(name):
+    """
+    Increments the monitoring metric for the given process cache event.
+    """
+    monitoring_utils.increment('block_structure.process_cache.{}'.format(name))
+
+
+_process_cache = None  # pylint: disable=invalid-name
+
+
+def get_process_cache():
+    """
+    Returns the BlockStructureProcessCache for this process, sized by
+    BLOCK_STRUCTURES_SETTINGS['PROCESS_CACHE_SIZE'].
+    """
+    global _process_cache  # pylint: disable=global-statement, invalid-name
+    if _process_cache is None:
+        _process_cache = BlockStructureProcessCache(
+            settings.BLOCK_STRUCTURES_SETTINGS.get('PROCESS_CACHE_SIZE', 0),
+        )
+    return _process_cache
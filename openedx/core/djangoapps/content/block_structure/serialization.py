@@ -0,0 +1,419 @@
+"""
+Module for the columnar serialization format of collected BlockStructures.
+
+Rather than pickling the structure's object graph (a BlockData object per
+block, each with its own dicts), the data is laid out as columns:
+
+    * an interned table of the structure's block keys,
+    * CSR-style integer arrays for the parent/child adjacency lists,
+    * one separately pickled column per collected xBlock field, and
+    * one separately pickled column per transformer's block data.
+
+On deserialization, the keys and the _BlockGraph are rebuilt eagerly, but
+each field column is only unpickled the first time any block's value for
+that field is read.  So a transformer chain that reads 5 of the 30 collected
+fields only pays for decoding those 5 columns.
+"""
+# pylint: disable=protected-access
+from array import array
+from copy import deepcopy
+import cPickle as pickle
+from datetime import datetime, timedelta
+import zlib
+
+from .block_structure import BlockData, TransformerData, TransformerDataMap, _BlockGraph
+
+
+# Prefix identifying data serialized in the columnar format.  Data
+# without this prefix is treated as the legacy zpickle format.
+FORMAT_MARKER = 'BSC'
+
+# The version of the columnar format.  Incrementally update this value
+# whenever the layout below changes.
+FORMAT_VERSION = 1
+
+# Array typecode for block indices.
+_INDEX_TYPECODE = 'i'
+
+# Types of field values that are returned without copying.
+_IMMUTABLE_TYPES = (basestring, bool, int, long, float, datetime, timedelta)
+
+# Key table encodings.
+_KEYS_INTERNED = 'interned'
+_KEYS_RAW = 'raw'
+
+
+def is_columnar(serialized_data):
+    """
+    Returns whether the given serialized_data is in the columnar format.
+    """
+    return serialized_data[:len(FORMAT_MARKER)] == FORMAT_MARKER
+
+
+def serialize(block_structure):
+    """
+    Returns the columnar serialization of the given block structure's
+    relations, transformer data and block data.
+    """
+    block_graph = block_structure._block_graph
+    block_data_map = block_structure._block_data_map
+
+    # Blocks in the graph occupy the first indices, in graph order
+    # without any removed blocks, followed by any blocks that only have
+    # data.
+    graph_indices = sorted(block_graph.indices.itervalues())
+    block_keys = [block_graph.keys[graph_index] for graph_index in graph_indices]
+    block_keys.extend(key for key in block_data_map if key not in block_graph.indices)
+    index_of_graph_index = {graph_index: index for index, graph_index in enumerate(graph_indices)}
+
+    child_offsets, child_indices = _encode_adjacency(
+        (block_graph.children[graph_index] for graph_index in graph_indices), index_of_graph_index,
+    )
+    parent_offsets, parent_indices = _encode_adjacency(
+        (block_graph.parents[graph_index] for graph_index in graph_indices), index_of_graph_index,
+    )
+
+    data_indices = array(_INDEX_TYPECODE)
+    field_columns = {}
+    transformer_columns = {}
+    for index, block_key in enumerate(block_keys):
+        block_data = block_data_map.get(block_key)
+        if block_data is None:
+            continue
+        data_indices.append(index)
+        for field_name, value in block_data.fields.iteritems():
+            _append_to_column(field_columns, field_name, index, value)
+        for transformer_name, transformer_data in block_data.transformer_data.iteritems():
+            _append_to_column(transformer_columns, transformer_name, index, transformer_data.fields)
+
+    payload = {
+        'keys': _encode_keys(block_keys),
+        'num_related': len(graph_indices),
+        'child_offsets': child_offsets.tostring(),
+        'child_indices': child_indices.tostring(),
+        'parent_offsets': parent_offsets.tostring(),
+        'parent_indices': parent_indices.tostring(),
+        'data_indices': data_indices.tostring(),
+        'transformer_data': _dumps(block_structure.transformer_data),
+        'fields': {name: _encode_column(column) for name, column in field_columns.iteritems()},
+        'transformer_block_data': {
+            name: _encode_column(column) for name, column in transformer_columns.iteritems()
+        },
+    }
+    return FORMAT_MARKER + zlib.compress(_dumps((FORMAT_VERSION, payload)))
+
+
+def deserialize(serialized_data):
+    """
+    Parses the given columnar serialized_data and returns a tuple of
+    (block_graph, transformer_data, block_data_map), suitable for
+    BlockStructureFactory.create_new.  Collected field values are decoded
+    lazily, upon first access.
+    """
+    version, payload = pickle.loads(zlib.decompress(serialized_data[len(FORMAT_MARKER):]))
+    if version != FORMAT_VERSION:
+        raise ValueError('Unsupported BlockStructure serialization format version: {}'.format(version))
+
+    block_keys = _decode_keys(payload['keys'])
+    num_related = payload['num_related']
+
+    block_graph = _BlockGraph()
+    block_graph.keys = block_keys[:num_related]
+    block_graph.indices = {block_key: index for index, block_key in enumerate(block_graph.keys)}
+    block_graph.children = _decode_adjacency(payload['child_offsets'], payload['child_indices'])
+    block_graph.parents = _decode_adjacency(payload['parent_offsets'], payload['parent_indices'])
+
+    source = _ColumnSource(payload['fields'], payload['transformer_block_data'])
+    block_data_map = {}
+    for index in _decode_array(payload['data_indices']):
+        block_key = block_keys[index]
+        block_data_map[block_key] = _new_lazy_block_data(block_key, source, index)
+
+    return block_graph, pickle.loads(payload['transformer_data']), block_data_map
+
+
+class _ColumnSource(object):
+    """
+    Holds the encoded columns of a deserialized block structure and
+    decodes each column upon its first access.
+
+    The decoded columns are never handed out directly, so the source can
+    be shared by copies of the block structure.  Each read returns its
+    own copy of any mutable value.
+    """
+    def __init__(self, encoded_fields, encoded_transformer_block_data):
+        self._encoded_fields = encoded_fields
+        self._encoded_transformer_block_data = encoded_transformer_block_data
+        self._fields = {}
+        self._transformer_block_data = {}
+
+    def get_field(self, field_name, index):
+        """
+        Returns the value of the given field for the block at the given
+        index.  Raises KeyError if the block has no value for the field.
+        """
+        return _copy_value(self._get_column(field_name, self._encoded_fields, self._fields)[index])
+
+    def get_transformer_block_fields(self, transformer_name, index):
+        """
+        Returns the transformer's data dict for the block at the given
+        index.  Raises KeyError if the block has no data for the
+        transformer.
+        """
+        return deepcopy(self._get_column(
+            transformer_name, self._encoded_transformer_block_data, self._transformer_block_data,
+        )[index])
+
+    def field_names(self):
+        """
+        Returns the names of all collected xBlock fields.
+        """
+        return self._encoded_fields.keys()
+
+    def transformer_names(self):
+        """
+        Returns the names of all transformers with block data.
+        """
+        return self._encoded_transformer_block_data.keys()
+
+    def decoded_field_names(self):
+        """
+        Returns the names of the xBlock field columns decoded so far.
+        """
+        return self._fields.keys()
+
+    @staticmethod
+    def _get_column(name, encoded_columns, decoded_columns):
+        """
+        Returns the decoded column for the given name as a dict of
+        block index to value, decoding it if needed.
+        """
+        try:
+            return decoded_columns[name]
+        except KeyError:
+            column = _decode_column(encoded_columns[name])
+            decoded_columns[name] = column
+            return column
+
+
+class _LazyFields(dict):
+    """
+    A dict of a block's collected xBlock fields that pulls values from
+    the shared _ColumnSource when they are first read.  Deep copies keep
+    sharing the source, while pickling serializes a plain, fully
+    materialized dict.
+    """
+    __slots__ = ('_source', '_index')
+
+    def __missing__(self, field_name):
+        value = self._source.get_field(field_name, self._index)
+        self[field_name] = value
+        return value
+
+    def __contains__(self, field_name):
+        try:
+            self[field_name]  # pylint: disable=pointless-statement
+        except KeyError:
+            return False
+        return True
+
+    def get(self, field_name, default=None):
+        try:
+            return self[field_name]
+        except KeyError:
+            return default
+
+    def materialize(self):
+        """
+        Returns a plain dict of all of the block's field values.
+        """
+        for field_name in self._source.field_names():
+            field_name in self  # pylint: disable=pointless-statement
+        return dict(dict.iteritems(self))
+
+    def iteritems(self):
+        return self.materialize().iteritems()
+
+    def items(self):
+        return self.materialize().items()
+
+    def __reduce__(self):
+        return (dict, (self.materialize(),))
+
+    def __deepcopy__(self, memo):
+        copied = _LazyFields(
+            (field_name, deepcopy(value, memo)) for field_name, value in dict.iteritems(self)
+        )
+        copied._source = self._source
+        copied._index = self._index
+        return copied
+
+
+class _LazyTransformerDataMap(TransformerDataMap):
+    """
+    A TransformerDataMap of a block's transformer data that pulls
+    values from the shared _ColumnSource when they are first read.
+    Deep copies keep sharing the source, while pickling serializes a
+    plain, fully materialized TransformerDataMap.
+    """
+    __slots__ = ('_source', '_index')
+
+    def __missing__(self, transformer_name):
+        transformer_data = TransformerData()
+        transformer_data.fields = self._source.get_transformer_block_fields(transformer_name, self._index)
+        dict.__setitem__(self, transformer_name, transformer_data)
+        return transformer_data
+
+    def materialize(self):
+        """
+        Returns a plain TransformerDataMap of all of the block's
+        transformer data.
+        """
+        for transformer_name in self._source.transformer_names():
+            try:
+                self[transformer_name]  # pylint: disable=pointless-statement
+            except KeyError:
+                pass
+        return TransformerDataMap(dict.iteritems(self))
+
+    def iteritems(self):
+        return self.materialize().iteritems()
+
+    def items(self):
+        return self.materialize().items()
+
+    def __reduce__(self):
+        return (TransformerDataMap, (dict(self.materialize()),))
+
+    def __deepcopy__(self, memo):
+        copied = _LazyTransformerDataMap(
+            (transformer_name, deepcopy(transformer_data, memo))
+            for transformer_name, transformer_data in dict.iteritems(self)
+        )
+        copied._source = self._source
+        copied._index = self._index
+        return copied
+
+
+def _new_lazy_block_data(block_key, source, index):
+    """
+    Returns a BlockData for the given block whose fields and transformer
+    data are lazily read from the given source.
+    """
+    fields = _LazyFields()
+    fields._source = source
+    fields._index = index
+
+    transformer_data = _LazyTransformerDataMap()
+    transformer_data._source = source
+    transformer_data._index = index
+
+    # Bypass FieldData's attribute routing, as unpickling does.
+    block_data = BlockData.__new__(BlockData)
+    block_data.__dict__.update(location=block_key, fields=fields, transformer_data=transformer_data)
+    return block_data
+
+
+def _copy_value(value):
+    """
+    Returns a deep copy of the given value, unless it is immutable.
+    """
+    if value is None or isinstance(value, _IMMUTABLE_TYPES):
+        return value
+    return deepcopy(value)
+
+
+def _append_to_column(columns, name, index, value):
+    """
+    Appends the given block index and value to the named column.
+    """
+    try:
+        indices, values = columns[name]
+    except KeyError:
+        indices, values = columns[name] = (array(_INDEX_TYPECODE), [])
+    indices.append(index)
+    values.append(value)
+
+
+def _encode_column(column):
+    """
+    Returns the encoded form of the given (indices, values) column.
+    """
+    indices, values = column
+    return _dumps((indices.tostring(), values))
+
+
+def _decode_column(encoded_column):
+    """
+    Returns a dict of block index to value for the given encoded column.
+    """
+    indices, values = pickle.loads(encoded_column)
+    return dict(zip(_decode_array(indices), values))
+
+
+def _encode_adjacency(adjacency_lists, index_of_graph_index):
+    """
+    Returns the CSR (offsets, indices) arrays for the given iterable of
+    lists of graph indices.
+    """
+    offsets = array(_INDEX_TYPECODE, [0])
+    indices = array(_INDEX_TYPECODE)
+    for adjacent_graph_indices in adjacency_lists:
+        indices.extend(index_of_graph_index[graph_index] for graph_index in adjacent_graph_indices)
+        offsets.append(len(indices))
+    return offsets, indices
+
+
+def _decode_adjacency(encoded_offsets, encoded_indices):
+    """
+    Returns a list of lists of block indices for the given encoded CSR
+    (offsets, indices) arrays.
+    """
+    offsets = _decode_array(encoded_offsets)
+    indices = _decode_array(encoded_indices)
+    return [indices[offsets[i]:offsets[i + 1]].tolist() for i in xrange(len(offsets) - 1)]
+
+
+def _decode_array(encoded_array):
+    """
+    Returns the index array for the given encoded string.
+    """
+    decoded = array(_INDEX_TYPECODE)
+    decoded.fromstring(encoded_array)
+    return decoded
+
+
+def _encode_keys(block_keys):
+    """
+    Returns the encoded key table for the given list of block keys.
+
+    When all keys are usage keys of the same course, the course key is
+    stored once and each block key is reduced to its
+    (block_type, block_id) pair.  Otherwise, the keys are stored as is.
+    """
+    try:
+        course_key = block_keys[0].course_key
+        key_pairs = [(block_key.block_type, block_key.block_id) for block_key in block_keys]
+        if all(course_key.make_usage_key(*key_pair) == block_key for key_pair, block_key in zip(key_pairs, block_keys)):
+            return (_KEYS_INTERNED, course_key, key_pairs)
+    except (AttributeError, IndexError):
+        pass
+    return (_KEYS_RAW, block_keys)
+
+
+def _decode_keys(encoded_keys):
+    """
+    Returns the list of block keys for the given encoded key table.
+    """
+    if encoded_keys[0] == _KEYS_INTERNED:
+        _, course_key, key_pairs = encoded_keys
+        make_usage_key = course_key.make_usage_key
+        return [make_usage_key(block_type, block_id) for block_type, block_id in key_pairs]
+    return encoded_keys[1]
+
+
+def _dumps(data):
+    """
+    Pickles the given data with the highest protocol.
+    """
+    return pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
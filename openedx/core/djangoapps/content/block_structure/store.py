@@ -4,13 +4,14 @@ Module for the Storage of BlockStructure objects.
 # pylint: disable=protected-access
 from logging import getLogger
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
+from openedx.core.lib.cache_utils import zunpickle
 
-from . import config
+from . import config, serialization
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
 from .models import BlockStructureModel
+from .process_cache import get_process_cache
 from .transformer_registry import TransformerRegistry
 
 
@@ -69,7 +70,8 @@ class BlockStructureStore(object):
     def get(self, root_block_usage_key):
         """
         Deserializes and returns the block structure starting at
-        root_block_usage_key, if found in the cache or storage.
+        root_block_usage_key, if found in the process cache, the cache
+        or storage.
 
         The given root_block_usage_key must equate the
         root_block_usage_key previously passed to the `add` method.
@@ -89,13 +91,23 @@ class BlockStructureStore(object):
         """
         bs_model = self._get_model(root_block_usage_key)
 
+        # Only versioned models can be looked up in the process cache.
+        if _is_storage_backing_enabled():
+            block_structure = get_process_cache().get(root_block_usage_key, self._encode_root_cache_key(bs_model))
+            if block_structure is not None:
+                return block_structure
+
         try:
             serialized_data = self._get_from_cache(bs_model)
         except BlockStructureNotFound:
             serialized_data = self._get_from_store(bs_model)
             self._add_to_cache(serialized_data, bs_model)
 
-        return self._deserialize(serialized_data, root_block_usage_key)
+        block_structure = self._deserialize(serialized_data, root_block_usage_key)
+        if _is_storage_backing_enabled():
+            get_process_cache().add(root_block_usage_key, self._encode_root_cache_key(bs_model), block_structure)
+            block_structure = block_structure.copy()
+        return block_structure
 
     def delete(self, root_block_usage_key):
         """
@@ -107,6 +119,7 @@ class BlockStructureStore(object):
                 of the block structure that is to be removed.
         """
         bs_model = self._get_model(root_block_usage_key)
+        get_process_cache().delete(root_block_usage_key)
         self._cache.delete(self._encode_root_cache_key(bs_model))
         bs_model.delete()
         logger.info("BlockStructure: Deleted from cache and store; %s.", bs_model)
@@ -191,20 +204,22 @@ class BlockStructureStore(object):
 
     def _serialize(self, block_structure):
         """
-        Serializes the data for the given block_structure.
+        Serializes the data for the given block_structure, using the
+        columnar format.
         """
-        data_to_cache = (
-            block_structure._block_relations,
-            block_structure.transformer_data,
-            block_structure._block_data_map,
-        )
-        return zpickle(data_to_cache)
+        return serialization.serialize(block_structure)
 
     def _deserialize(self, serialized_data, root_block_usage_key):
         """
         Deserializes the given data and returns the parsed block_structure.
+
+        Data in the columnar format is decoded lazily; data previously
+        stored in the legacy zpickle format is still supported.
         """
-        block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
+        if serialization.is_columnar(serialized_data):
+            block_relations, transformer_data, block_data_map = serialization.deserialize(serialized_data)
+        else:
+            block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
         return BlockStructureFactory.create_new(
             root_block_usage_key,
             block_relations,
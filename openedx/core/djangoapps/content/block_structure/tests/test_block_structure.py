@@ -219,6 +219,16 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
 
         self.assert_block_structure(block_structure, pruned_children_map, missing_blocks)
 
+    def test_prune_compacts_graph(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP)
+        block_structure.remove_block(1, keep_descendants=False)
+        self.assertEquals(len(block_structure._block_graph.keys), 5)
+
+        block_structure._prune_unreachable()
+        self.assertEquals(len(block_structure._block_graph.keys), 2)
+        self.assert_block_structure(block_structure, [[2], [], [], [], []], missing_blocks=[1, 3, 4])
+        self.assertEquals(list(block_structure.topological_traversal()), [0, 2])
+
     def test_remove_block_traversal(self):
         block_structure = self.create_block_structure(ChildrenMapTestMixin.LINEAR_CHILDREN_MAP)
         block_structure.remove_block_traversal(lambda block: block == 2)
@@ -60,7 +60,7 @@ class TestBlockStructureFactory(TestCase, ChildrenMapTestMixin):
         )
         new_structure = BlockStructureFactory.create_new(
             block_structure.root_block_usage_key,
-            block_structure._block_relations,  # pylint: disable=protected-access
+            block_structure._block_graph,  # pylint: disable=protected-access
             block_structure.transformer_data,
             block_structure._block_data_map,  # pylint: disable=protected-access
         )
@@ -0,0 +1,78 @@
+"""
+Tests for block_structure/process_cache.py
+"""
+from django.test import TestCase
+from mock import patch
+from nose.plugins.attrib import attr
+
+from ..process_cache import BlockStructureProcessCache
+from .helpers import ChildrenMapTestMixin
+
+
+@attr(shard=2)
+@patch('openedx.core.djangoapps.content.block_structure.process_cache.monitoring_utils')
+class TestBlockStructureProcessCache(ChildrenMapTestMixin, TestCase):
+    """
+    Tests for BlockStructureProcessCache
+    """
+    def setUp(self):
+        super(TestBlockStructureProcessCache, self).setUp()
+        self.process_cache = BlockStructureProcessCache(max_size=2)
+
+    def add(self, root_block_usage_key, version_key='v1'):
+        """
+        Adds a block structure with the given root to the process cache.
+        """
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_structure.root_block_usage_key = root_block_usage_key
+        self.process_cache.add(root_block_usage_key, version_key, block_structure)
+        return block_structure
+
+    def assert_metric(self, mock_monitoring, name):
+        """
+        Verifies that the given metric was the last one reported.
+        """
+        mock_monitoring.increment.assert_called_with('block_structure.process_cache.{}'.format(name))
+
+    def test_get_copy(self, mock_monitoring):
+        block_structure = self.add('course')
+        cached = self.process_cache.get('course', 'v1')
+        self.assert_metric(mock_monitoring, 'hit')
+        self.assertIsNot(cached, block_structure)
+        self.assert_block_structure(cached, self.SIMPLE_CHILDREN_MAP)
+
+    def test_miss(self, mock_monitoring):
+        self.add('course')
+        self.assertIsNone(self.process_cache.get('course', 'v2'))
+        self.assert_metric(mock_monitoring, 'miss')
+        self.assertIsNone(self.process_cache.get('other_course', 'v1'))
+
+    def test_new_version_replaces(self, mock_monitoring):  # pylint: disable=unused-argument
+        self.add('course', 'v1')
+        self.add('course', 'v2')
+        self.assertIsNone(self.process_cache.get('course', 'v1'))
+        self.assertIsNotNone(self.process_cache.get('course', 'v2'))
+
+    def test_eviction(self, mock_monitoring):
+        self.add('course_1')
+        self.add('course_2')
+        self.process_cache.get('course_1', 'v1')
+        self.add('course_3')
+        self.assert_metric(mock_monitoring, 'eviction')
+
+        self.assertIsNone(self.process_cache.get('course_2', 'v1'))
+        self.assertIsNotNone(self.process_cache.get('course_1', 'v1'))
+        self.assertIsNotNone(self.process_cache.get('course_3', 'v1'))
+
+    def test_delete(self, mock_monitoring):  # pylint: disable=unused-argument
+        self.add('course_1')
+        self.add('course_2')
+        self.process_cache.delete('course_1')
+        self.assertIsNone(self.process_cache.get('course_1', 'v1'))
+        self.assertIsNotNone(self.process_cache.get('course_2', 'v1'))
+
+    def test_disabled(self, mock_monitoring):
+        self.process_cache = BlockStructureProcessCache(max_size=0)
+        self.add('course')
+        self.assertIsNone(self.process_cache.get('course', 'v1'))
+        self.assertFalse(mock_monitoring.increment.called)
@@ -0,0 +1,172 @@
+"""
+Tests for block_structure/serialization.py
+"""
+from copy import deepcopy
+import cPickle as pickle
+
+import ddt
+from django.test import TestCase
+from nose.plugins.attrib import attr
+
+from openedx.core.lib.cache_utils import zpickle
+
+from .. import serialization
+from ..factory import BlockStructureFactory
+from .helpers import ChildrenMapTestMixin, MockTransformer, UsageKeyFactoryMixin
+
+
+class SerializationTestMixin(ChildrenMapTestMixin):
+    """
+    Mixin with tests for serializing block structures.
+    """
+    def create_collected_structure(self, children_map):
+        """
+        Returns a block structure with xBlock fields and transformer
+        data set on its blocks.
+        """
+        block_structure = self.create_block_structure(children_map)
+        block_structure._add_transformer(MockTransformer)  # pylint: disable=protected-access
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            block_data = block_structure._get_or_create_block(block_key)  # pylint: disable=protected-access
+            block_data.display_name = 'Block {}'.format(block_id)
+            if block_id % 2:
+                block_data.graded = True
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'test', block_id)
+        return block_structure
+
+    def round_trip(self, block_structure):
+        """
+        Serializes and deserializes the given block structure.
+        """
+        serialized_data = serialization.serialize(block_structure)
+        self.assertTrue(serialization.is_columnar(serialized_data))
+        return BlockStructureFactory.create_new(
+            block_structure.root_block_usage_key,
+            *serialization.deserialize(serialized_data)
+        )
+
+    def assert_block_data(self, block_structure, children_map):
+        """
+        Verifies the fields and transformer data set by
+        create_collected_structure.
+        """
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            self.assertEqual(
+                block_structure.get_xblock_field(block_key, 'display_name'),
+                'Block {}'.format(block_id),
+            )
+            self.assertEqual(
+                block_structure.get_xblock_field(block_key, 'graded', 'missing'),
+                True if block_id % 2 else 'missing',
+            )
+            self.assertEqual(
+                block_structure.get_transformer_block_field(block_key, MockTransformer, 'test'),
+                block_id,
+            )
+        self.assertEqual(
+            block_structure._get_transformer_data_version(MockTransformer),  # pylint: disable=protected-access
+            1,
+        )
+
+
+@attr(shard=2)
+@ddt.ddt
+class TestSerialization(SerializationTestMixin, TestCase):
+    """
+    Tests for the columnar serialization of block structures with
+    simple block keys.
+    """
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip(self, children_map):
+        block_structure = self.round_trip(self.create_collected_structure(children_map))
+        self.assert_block_structure(block_structure, children_map)
+        self.assert_block_data(block_structure, children_map)
+
+    def test_relation_order(self):
+        children_map = self.DAG_CHILDREN_MAP
+        original = self.create_collected_structure(children_map)
+        block_structure = self.round_trip(original)
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            self.assertEqual(block_structure.get_children(block_key), original.get_children(block_key))
+            self.assertEqual(block_structure.get_parents(block_key), original.get_parents(block_key))
+
+    def test_lazy_decoding(self):
+        block_structure = self.round_trip(self.create_collected_structure(self.SIMPLE_CHILDREN_MAP))
+        source = block_structure[self.block_key_factory(0)].fields._source  # pylint: disable=protected-access
+        self.assertEqual(source.decoded_field_names(), [])
+
+        block_structure.get_xblock_field(self.block_key_factory(1), 'graded')
+        self.assertEqual(source.decoded_field_names(), ['graded'])
+
+    def test_modified_fields(self):
+        block_structure = self.round_trip(self.create_collected_structure(self.SIMPLE_CHILDREN_MAP))
+        block_key = self.block_key_factory(2)
+        block_structure[block_key].display_name = 'Changed'
+        block_structure.set_transformer_block_field(block_key, MockTransformer, 'test', 'changed')
+
+        self.assertEqual(block_structure.get_xblock_field(block_key, 'display_name'), 'Changed')
+        self.assertEqual(block_structure.get_transformer_block_field(block_key, MockTransformer, 'test'), 'changed')
+
+        # The change is local to this block.
+        self.assertEqual(block_structure.get_xblock_field(self.block_key_factory(3), 'display_name'), 'Block 3')
+
+    def test_copy(self):
+        children_map = self.SIMPLE_CHILDREN_MAP
+        block_structure = self.round_trip(self.create_collected_structure(children_map))
+        copied = block_structure.copy()
+        self.assert_block_structure(copied, children_map)
+        self.assert_block_data(copied, children_map)
+
+        # Copies share the decoded columns, but not the values.
+        block_key = self.block_key_factory(0)
+        # pylint: disable=protected-access
+        self.assertIs(copied[block_key].fields._source, block_structure[block_key].fields._source)
+        copied.set_transformer_block_field(block_key, MockTransformer, 'test', 'changed')
+        self.assertEqual(block_structure.get_transformer_block_field(block_key, MockTransformer, 'test'), 0)
+        self.assertEqual(block_structure.copy().get_transformer_block_field(block_key, MockTransformer, 'test'), 0)
+
+    def test_pickle_and_reserialize(self):
+        children_map = self.SIMPLE_CHILDREN_MAP
+        block_structure = self.round_trip(self.create_collected_structure(children_map))
+        unpickled = pickle.loads(pickle.dumps(deepcopy(block_structure), pickle.HIGHEST_PROTOCOL))
+        self.assert_block_data(unpickled, children_map)
+
+        reserialized = self.round_trip(block_structure)
+        self.assert_block_structure(reserialized, children_map)
+        self.assert_block_data(reserialized, children_map)
+
+    def test_removed_block(self):
+        children_map = self.SIMPLE_CHILDREN_MAP
+        block_structure = self.create_collected_structure(children_map)
+        block_structure.remove_block(self.block_key_factory(4), keep_descendants=False)
+        self.assert_block_structure(self.round_trip(block_structure), children_map, missing_blocks=[4])
+
+    def test_legacy_format(self):
+        self.assertFalse(serialization.is_columnar(zpickle(({}, {}, {}))))
+
+
+@attr(shard=2)
+class TestUsageKeySerialization(UsageKeyFactoryMixin, SerializationTestMixin, TestCase):
+    """
+    Tests for the columnar serialization of block structures with
+    usage keys.
+    """
+    def test_round_trip(self):
+        children_map = self.DAG_CHILDREN_MAP
+        block_structure = self.round_trip(self.create_collected_structure(children_map))
+        self.assert_block_structure(block_structure, children_map)
+        self.assert_block_data(block_structure, children_map)
+
+    def test_interned_keys(self):
+        block_keys = [self.block_key_factory(block_id) for block_id in range(3)]
+        # pylint: disable=protected-access
+        encoded_keys = serialization._encode_keys(block_keys)
+        self.assertEqual(encoded_keys[0], serialization._KEYS_INTERNED)
+        self.assertEqual(serialization._decode_keys(encoded_keys), block_keys)
@@ -2,6 +2,7 @@
 Tests for block_structure/cache.py
 """
 import ddt
+from mock import patch
 from nose.plugins.attrib import attr
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
@@ -9,6 +10,7 @@ from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 from ..config import STORAGE_BACKING_FOR_CACHE, waffle
 from ..config.models import BlockStructureConfiguration
 from ..exceptions import BlockStructureNotFound
+from ..process_cache import BlockStructureProcessCache
 from ..store import BlockStructureStore
 from .helpers import ChildrenMapTestMixin, UsageKeyFactoryMixin, MockCache, MockTransformer
 
@@ -90,3 +92,24 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         self.assertEquals(self.mock_cache.timeout_from_last_call, 0)
         self.store.add(self.block_structure)
         self.assertEquals(self.mock_cache.timeout_from_last_call, timeout)
+
+    @ddt.data(True, False)
+    def test_process_cache(self, with_storage_backing):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
+            with patch(
+                'openedx.core.djangoapps.content.block_structure.store.get_process_cache',
+                return_value=BlockStructureProcessCache(max_size=1),
+            ):
+                self.store.add(self.block_structure)
+                first_value = self.store.get(self.block_structure.root_block_usage_key)
+
+                self.mock_cache.map.clear()
+                if with_storage_backing:
+                    # Served from the process cache.
+                    second_value = self.store.get(self.block_structure.root_block_usage_key)
+                    self.assertIsNot(second_value, first_value)
+                    self.assert_block_structure(second_value, self.children_map)
+
+                    self.store.delete(self.block_structure.root_block_usage_key)
+                with self.assertRaises(BlockStructureNotFound):
+                    self.store.get(self.block_structure.root_block_usage_key)
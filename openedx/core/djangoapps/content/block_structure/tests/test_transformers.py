@@ -6,8 +6,9 @@ from nose.plugins.attrib import attr
 from unittest import TestCase
 
 from ..block_structure import BlockStructureModulestoreData
+from ..config import TIME_TRANSFORMER_FILTERS, waffle
 from ..exceptions import TransformerException, TransformerDataIncompatible
-from ..transformers import BlockStructureTransformers
+from ..transformers import BlockStructureTransformers, _combine_filters
 from .helpers import (
     ChildrenMapTestMixin, MockTransformer, MockFilteringTransformer, mock_registered_transformers
 )
@@ -71,6 +72,45 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
             self.transformers.transform(block_structure=MagicMock())
             self.assertTrue(mock_transform_call.called)
 
+    @patch('openedx.core.djangoapps.content.block_structure.transformers.monitoring_utils')
+    def test_transform_timing(self, mock_monitoring):
+        self.add_mock_transformer()
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+
+        for time_filters in (False, True):
+            mock_monitoring.reset_mock()
+            with waffle().override(TIME_TRANSFORMER_FILTERS, active=time_filters):
+                self.transformers.transform(block_structure)
+
+            reported_metrics = {call[0][0] for call in mock_monitoring.accumulate.call_args_list}
+            expected_metrics = {
+                'block_structure.transformers.MockTransformer.transform_ms',
+                'block_structure.transformers.MockFilteringTransformer.transform_ms',
+                'block_structure.transformers.combined.filter_traversal_ms',
+            }
+            if time_filters:
+                expected_metrics.add('block_structure.transformers.MockFilteringTransformer.filter_ms')
+            self.assertEquals(reported_metrics, expected_metrics)
+
+    def test_combine_filters(self):
+        visited = []
+
+        def _filter(name, result):
+            """
+            Returns a filter that records its calls and returns result.
+            """
+            def _record(block_key):
+                """
+                Records the call and returns result.
+                """
+                visited.append((name, block_key))
+                return result
+            return _record
+
+        self.assertTrue(_combine_filters([])(0))
+        self.assertFalse(_combine_filters([_filter('a', True), _filter('b', False), _filter('c', True)])(1))
+        self.assertEquals(visited, [('a', 1), ('b', 1)])
+
     def test_verify_versions(self):
         block_structure = self.create_block_structure(
             self.SIMPLE_CHILDREN_MAP,
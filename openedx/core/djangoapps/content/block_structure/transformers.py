@@ -1,9 +1,13 @@
 """
 Module for a collection of BlockStructureTransformers.
 """
-import functools
+from contextlib import contextmanager
 from logging import getLogger
+from time import time
 
+from openedx.core.djangoapps import monitoring_utils
+
+from . import config
 from .exceptions import TransformerException, TransformerDataIncompatible
 from .transformer import FilteringTransformerMixin
 from .transformer_registry import TransformerRegistry
@@ -111,6 +115,11 @@ class BlockStructureTransformers(object):
         collection. Tranformers with filters are combined and run first in a
         single course tree traversal, then remaining transformers are run in
         the order that they were added.
+
+        The time spent in each transformer is reported as a monitoring
+        metric.  The time spent in the filters of filtering transformers
+        during the combined traversal is only included when the
+        time_transformer_filters waffle switch is enabled.
         """
         self._transform_with_filters(block_structure)
         self._transform_without_filters(block_structure)
@@ -126,23 +135,26 @@ class BlockStructureTransformers(object):
         if not self._transformers['supports_filter']:
             return
 
+        # Map of transformer name to the seconds spent in its filters,
+        # if timed.
+        filter_times = {} if config.waffle().is_enabled(config.TIME_TRANSFORMER_FILTERS) else None
+
         filters = []
         for transformer in self._transformers['supports_filter']:
-            filters.extend(transformer.transform_block_filters(self.usage_info, block_structure))
+            with _timed(transformer.name(), 'transform'):
+                transformer_filters = transformer.transform_block_filters(self.usage_info, block_structure)
+            if filter_times is not None:
+                transformer_filters = [
+                    _timed_filter(block_filter, transformer.name(), filter_times)
+                    for block_filter in transformer_filters
+                ]
+            filters.extend(transformer_filters)
 
-        combined_filters = functools.reduce(
-            self._filter_chain,
-            filters,
-            block_structure.create_universal_filter()
-        )
-        block_structure.filter_topological_traversal(combined_filters)
+        with _timed('combined', 'filter_traversal'):
+            block_structure.filter_topological_traversal(_combine_filters(filters))
 
-    def _filter_chain(self, accumulated, additional):
-        """
-        Given two functions that take a block_key and return a boolean, yield
-        a function that takes a block key, and 'ands' the functions together
-        """
-        return lambda block_key: accumulated(block_key) and additional(block_key)
+        for transformer_name, seconds in (filter_times or {}).iteritems():
+            _report_time(transformer_name, 'filter', seconds)
 
     def _transform_without_filters(self, block_structure):
         """
@@ -150,4 +162,68 @@ class BlockStructureTransformers(object):
         method from the given transformers.
         """
         for transformer in self._transformers['no_filter']:
-            transformer.transform(self.usage_info, block_structure)
+            with _timed(transformer.name(), 'transform'):
+                transformer.transform(self.usage_info, block_structure)
+
+
+def _combine_filters(filters):
+    """
+    Returns a single filter function that 'ands' the given filter
+    functions together, in order, short-circuiting on the first filter
+    that returns False.
+    """
+    filters = tuple(filters)
+    if len(filters) == 1:
+        return filters[0]
+
+    def combined_filter(block_key):
+        """
+        Returns whether all filters retain the given block.
+        """
+        for block_filter in filters:
+            if not block_filter(block_key):
+                return False
+        return True
+    return combined_filter
+
+
+def _timed_filter(block_filter, transformer_name, filter_times):
+    """
+    Returns a filter function that adds the time spent in the given
+    block_filter to the transformer's entry in filter_times.
+    """
+    filter_times.setdefault(transformer_name, 0)
+
+    def timed_filter(block_key):
+        """
+        Calls and times block_filter for the given block_key.
+        """
+        start_time = time()
+        try:
+            return block_filter(block_key)
+        finally:
+            filter_times[transformer_name] += time() - start_time
+    return timed_filter
+
+
+@contextmanager
+def _timed(name, phase):
+    """
+    Context manager that reports the time spent within it for the given
+    transformer name and phase.
+    """
+    start_time = time()
+    try:
+        yield
+    finally:
+        _report_time(name, phase, time() - start_time)
+
+
+def _report_time(name, phase, seconds):
+    """
+    Accumulates the given time into the monitoring metric for the given
+    transformer name and phase.
+    """
+    duration_ms = seconds * 1000
+    monitoring_utils.accumulate('block_structure.transformers.{}.{}_ms'.format(name, phase), duration_ms)
+    logger.debug("BlockStructure: %s %s took %.2f ms.", name, phase, duration_ms)
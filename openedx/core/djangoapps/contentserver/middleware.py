@@ -4,6 +4,7 @@ Middleware to serve assets.
 
 import logging
 import datetime
+from uuid import uuid4
 log = logging.getLogger(__name__)
 try:
     import newrelic.agent
@@ -11,11 +12,11 @@ except ImportError:
     newrelic = None  # pylint: disable=invalid-name
 from django.http import (
     HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
-    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect)
+    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect, StreamingHttpResponse)
 from student.models import CourseEnrollment
 
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import StaticContent, StaticContentStream, XASSET_LOCATION_TAG
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
@@ -31,6 +32,17 @@ from .models import CourseAssetCacheTtlConfig, CdnUserAgentsConfig
 
 HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
 
+# Size of the buffers asset content is streamed in.  This is the GridFS chunk size,
+# so that each buffer is read from a single chunk.
+ASSET_STREAM_CHUNK_SIZE = 255 * 1024
+
+# Assets at least this large are never put in the cache, and are always streamed
+# from the contentstore.  This is also the default item size limit of memcached.
+MAX_CACHED_CONTENT_SIZE = 1024 * 1024
+
+# Maximum number of ranges served from a single Range header.
+MAX_BYTE_RANGES = 10
+
 
 class StaticContentServer(object):
     """
@@ -67,14 +79,12 @@ class StaticContentServer(object):
             except (InvalidLocationError, InvalidKeyError):
                 return HttpResponseBadRequest()
 
-            # Attempt to load the asset to make sure it exists, and grab the asset digest
-            # if we're able to load it.
-            actual_digest = None
-            try:
-                content = self.load_asset_from_location(loc)
-                actual_digest = getattr(content, "content_digest", None)
-            except (ItemNotFoundError, NotFoundError):
+            # Look the asset up in the course's asset index to make sure it exists, and grab
+            # the asset digest, before loading any of its content.
+            asset_metadata = AssetManager.find_metadata(loc)
+            if asset_metadata is None:
                 return HttpResponseNotFound()
+            actual_digest = asset_metadata.content_digest
 
             # If this was a versioned asset, and the digest doesn't match, redirect
             # them to the actual version.
@@ -99,13 +109,26 @@ class StaticContentServer(object):
                 newrelic.agent.add_custom_parameter('contentserver.from_cdn', is_from_cdn)
 
                 # Check if this content is locked or not.
-                locked = self.is_content_locked(content)
+                locked = self.is_content_locked(asset_metadata)
                 newrelic.agent.add_custom_parameter('contentserver.locked', locked)
 
             # Check that user has access to the content.
-            if not self.is_user_authorized(request, content, loc):
+            if not self.is_user_authorized(request, asset_metadata, loc):
                 return HttpResponseForbidden('Unauthorized')
 
+            # If the client already has this version of the asset, let them know without
+            # loading any of its content.
+            if actual_digest is not None and 'HTTP_IF_NONE_MATCH' in request.META:
+                if self.is_etag_matched(request.META['HTTP_IF_NONE_MATCH'], actual_digest):
+                    response = HttpResponseNotModified()
+                    response['ETag'] = self.get_etag(actual_digest)
+                    return response
+
+            try:
+                content = self.load_asset_from_location(loc)
+            except (ItemNotFoundError, NotFoundError):
+                return HttpResponseNotFound()
+
             # Figure out if the client sent us a conditional request, and let them know
             # if this asset has changed since then.
             last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
@@ -114,18 +137,16 @@ class StaticContentServer(object):
                 if if_modified_since == last_modified_at_str:
                     return HttpResponseNotModified()
 
-            # *** File streaming within a byte range ***
+            # *** File streaming within byte ranges ***
             # If a Range is provided, parse Range attribute of the request
             # Add Content-Range in the response if Range is structurally correct
-            # Request -> Range attribute structure: "Range: bytes=first-[last]"
+            # Request -> Range attribute structure: "Range: bytes=first-[last][, first-[last]]..."
             # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength"
+            # Several satisfiable ranges are sent back as a multipart/byteranges message.
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
+            response_content_type = content.content_type
             if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -138,36 +159,48 @@ class StaticContentServer(object):
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, unicode(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
+                    elif len(ranges) > MAX_BYTE_RANGES:
+                        # Sending many small parts costs far more than the full content, so don't.
                         log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            u"Too many ranges in Range header: %s for content: %s", header_value, unicode(loc)
                         )
                     else:
-                        first, last = ranges[0]
+                        # Unsatisfiable ranges are ignored, as long as one of them is satisfiable.
+                        ranges = [(first, last) for first, last in ranges if 0 <= first <= last < content.length]
+                        if not ranges:
+                            log.warning(
+                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            )
+                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
 
-                        if 0 <= first <= last < content.length:
-                            # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                        if len(ranges) == 1:
+                            first, last = ranges[0]
+                            response = StreamingHttpResponse(
+                                _stream_and_close(content, content.stream_data_in_range(
+                                    first, last, chunk_size=ASSET_STREAM_CHUNK_SIZE
+                                ))
+                            )
                             response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
                             response['Content-Length'] = str(last - first + 1)
-                            response.status_code = 206  # Partial Content
-
-                            if newrelic:
-                                newrelic.agent.add_custom_parameter('contentserver.ranged', True)
                         else:
-                            log.warning(
-                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            boundary = uuid4().hex
+                            response_content_type = 'multipart/byteranges; boundary={}'.format(boundary)
+                            response = StreamingHttpResponse(
+                                _stream_and_close(content, stream_byteranges(content, ranges, boundary))
                             )
-                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                            response['Content-Length'] = str(byteranges_length(content, ranges, boundary))
+                        response.status_code = 206  # Partial Content
+
+                        if newrelic:
+                            newrelic.agent.add_custom_parameter('contentserver.ranged', True)
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                response = StreamingHttpResponse(
+                    _stream_and_close(content, content.stream_data(chunk_size=ASSET_STREAM_CHUNK_SIZE))
+                )
                 response['Content-Length'] = content.length
 
             if newrelic:
@@ -176,7 +209,7 @@ class StaticContentServer(object):
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
+            response['Content-Type'] = response_content_type
 
             # Set any caching headers, and do any response cleanup needed.  Based on how much
             # middleware we have in place, there's no easy way to use the built-in Django
@@ -212,6 +245,8 @@ class StaticContentServer(object):
             response['Cache-Control'] = "private, no-cache, no-store"
 
         response['Last-Modified'] = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
+        if content.content_digest:
+            response['ETag'] = StaticContentServer.get_etag(content.content_digest)
 
         # Force the Vary header to only vary responses on Origin, so that XHR and browser requests get cached
         # separately and don't screw over one another. i.e. a browser request that doesn't send Origin, and
@@ -240,6 +275,24 @@ class StaticContentServer(object):
         expire_dt = now + datetime.timedelta(seconds=cache_ttl)
         return expire_dt.strftime(HTTP_DATE_FORMAT)
 
+    @staticmethod
+    def get_etag(content_digest):
+        """Generates the strong ETag of an asset from its content digest."""
+        return '"{}"'.format(content_digest)
+
+    @staticmethod
+    def is_etag_matched(if_none_match, content_digest):
+        """
+        Determines whether the given If-None-Match header value matches the ETag
+        of an asset with the given content digest.
+        """
+        etags = [etag.strip() for etag in if_none_match.split(',')]
+        if '*' in etags:
+            return True
+        # Weak comparison is used for If-None-Match, so ignore any weak indicators.
+        etags = [etag[2:] if etag.startswith('W/') else etag for etag in etags]
+        return StaticContentServer.get_etag(content_digest) in etags
+
     def is_content_locked(self, content):
         """
         Determines whether or not the given content is locked.
@@ -283,13 +336,66 @@ class StaticContentServer(object):
             # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
             # because it's the default for memcached and also we don't want to do too much
             # buffering in memory when we're serving an actual request.
-            if content.length is not None and content.length < 1048576:
+            if content.length is not None and content.length < MAX_CACHED_CONTENT_SIZE:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
 
         return content
 
 
+def _stream_and_close(content, chunks):
+    """
+    Yields the given chunks of the given content, and then closes the content's
+    stream, even if the response is not fully sent.
+    """
+    try:
+        for chunk in chunks:
+            yield chunk
+    finally:
+        if isinstance(content, StaticContentStream):
+            content.close()
+
+
+def _byterange_part_header(content, first, last, boundary):
+    """
+    Returns the header of the part of a multipart/byteranges message for the
+    given range of the content.
+    """
+    return (
+        '--{boundary}\r\n'
+        'Content-Type: {content_type}\r\n'
+        'Content-Range: bytes {first}-{last}/{length}\r\n'
+        '\r\n'
+    ).format(
+        boundary=boundary, content_type=content.content_type, first=first, last=last, length=content.length
+    )
+
+
+def stream_byteranges(content, ranges, boundary):
+    """
+    Yields the multipart/byteranges message of the given ranges of the content.
+
+    See spec for details: https://tools.ietf.org/html/rfc7233#appendix-A
+    """
+    for first, last in ranges:
+        yield _byterange_part_header(content, first, last, boundary)
+        for chunk in content.stream_data_in_range(first, last, chunk_size=ASSET_STREAM_CHUNK_SIZE):
+            yield chunk
+        yield '\r\n'
+    yield '--{boundary}--\r\n'.format(boundary=boundary)
+
+
+def byteranges_length(content, ranges, boundary):
+    """
+    Returns the length of the multipart/byteranges message streamed by
+    stream_byteranges.
+    """
+    length = len('--{boundary}--\r\n'.format(boundary=boundary))
+    for first, last in ranges:
+        length += len(_byterange_part_header(content, first, last, boundary)) + (last - first + 1) + len('\r\n')
+    return length
+
+
 def parse_range_header(header_value, content_length):
     """
     Returns the unit and a list of (start, end) tuples of ranges.
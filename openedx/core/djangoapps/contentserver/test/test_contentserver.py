@@ -242,17 +242,78 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart/byteranges message of the ranges.
         """
         first_byte = self.length_unlocked / 4
         last_byte = self.length_unlocked / 2
         resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -100'.format(
             first=first_byte, last=last_byte))
 
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertNotIn('Content-Range', resp)
+        content_type, boundary = resp['Content-Type'].split('; boundary=')
+        self.assertEqual(content_type, 'multipart/byteranges')
+
+        body = ''.join(resp.streaming_content)
+        self.assertEqual(resp['Content-Length'], str(len(body)))
+        content = self.contentstore.find(self.unlocked_asset)
+        self.assertEqual(body, ''.join([
+            '--{}\r\n'
+            'Content-Type: {}\r\n'
+            'Content-Range: bytes {}-{}/{}\r\n'
+            '\r\n'
+            '{}\r\n'.format(
+                boundary, content.content_type, first, last, self.length_unlocked, content.data[first:last + 1]
+            )
+            for first, last in ((first_byte, last_byte), (self.length_unlocked - 100, self.length_unlocked - 1))
+        ]) + '--{}--\r\n'.format(boundary))
+
+    def test_range_request_multiple_ranges_one_satisfiable(self):
+        """
+        Test that unsatisfiable ranges are ignored when another range is satisfiable.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-, 0-0'.format(
+            first=self.length_unlocked))
+
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertEqual(resp['Content-Range'], 'bytes 0-0/{}'.format(self.length_unlocked))
+        self.assertEqual(resp['Content-Length'], '1')
+
+    def test_range_request_too_many_ranges(self):
+        """
+        Test that requests for too many ranges output the full content.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=' + ', '.join(['0-0'] * 11))
+
         self.assertEqual(resp.status_code, 200)
         self.assertNotIn('Content-Range', resp)
         self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
 
+    def test_etag(self):
+        """
+        Test that assets are sent with an ETag of their digest, which is used for conditional requests.
+        """
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        content_digest = self.contentstore.find(self.unlocked_asset).content_digest
+        self.assertEqual(resp['ETag'], '"{}"'.format(content_digest))
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"other", W/"{}"'.format(content_digest))
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], '"{}"'.format(content_digest))
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(resp.status_code, 200)
+
+    def test_etag_locked_asset_not_registered(self):
+        """
+        Test that conditional requests for locked assets still require access to the asset.
+        """
+        content_digest = self.contentstore.find(self.locked_asset).content_digest
+        self.client.login(username=self.non_staff_usr, password='test')
+        resp = self.client.get(self.url_locked, HTTP_IF_NONE_MATCH='"{}"'.format(content_digest))
+        self.assertEqual(resp.status_code, 403)
+
     @ddt.data(
         'bytes 0-',
         'bits=0-',
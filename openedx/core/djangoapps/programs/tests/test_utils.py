@@ -25,6 +25,7 @@ from openedx.core.djangoapps.catalog.tests.factories import (
     CourseRunFactory,
     SeatFactory,
 )
+from openedx.core.djangoapps.catalog.utils import summarize_program
 from openedx.core.djangoapps.programs.tests.factories import ProgressFactory
 from openedx.core.djangoapps.programs.utils import (
     DEFAULT_ENROLLMENT_START_DATE,
@@ -336,6 +337,41 @@ class TestProgramProgressMeter(TestCase):
         )
         self.assertEqual(meter.completed_programs, [])
 
+    @mock.patch(UTILS_MODULE + '.get_program_index')
+    def test_engagement_from_program_index(self, mock_get_program_index, mock_get_programs):
+        """
+        Verify that the programs a user is engaged with are found from the
+        site's program index, and that only their details are read.
+        """
+        course_run_key = generate_course_run_key()
+        data = [
+            ProgramFactory(
+                courses=[
+                    CourseFactory(course_runs=[
+                        CourseRunFactory(key=course_run_key),
+                    ]),
+                ]
+            ),
+            ProgramFactory(),
+        ]
+        mock_get_program_index.return_value = [summarize_program(program) for program in data]
+        mock_get_programs.return_value = data[:1]
+
+        self._create_enrollments(course_run_key)
+        meter = ProgramProgressMeter(self.site, self.user)
+
+        inverted_programs = meter.invert_programs()
+        self.assertEqual(
+            [program['uuid'] for program in inverted_programs[course_run_key]],
+            [data[0]['uuid']]
+        )
+        self.assertFalse(mock_get_programs.called)
+
+        self._attach_detail_url(data)
+        self.assertEqual(inverted_programs[course_run_key][0]['detail_url'], data[0]['detail_url'])
+        self.assertEqual(meter.engaged_programs, data[:1])
+        mock_get_programs.assert_called_once_with(self.site, uuids=[data[0]['uuid']])
+
     @mock.patch(UTILS_MODULE + '.ProgramProgressMeter.completed_course_runs', new_callable=mock.PropertyMock)
     def test_simulate_progress(self, mock_completed_course_runs, mock_get_programs):
         """Simulate the entirety of a user's progress through a program."""
@@ -22,7 +22,7 @@ from course_modes.models import CourseMode
 from lms.djangoapps.certificates import api as certificate_api
 from lms.djangoapps.commerce.utils import EcommerceService
 from lms.djangoapps.courseware.access import has_access
-from openedx.core.djangoapps.catalog.utils import get_programs
+from openedx.core.djangoapps.catalog.utils import get_program_index, get_programs, summarize_program
 from openedx.core.djangoapps.commerce.utils import ecommerce_api_client
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from openedx.core.djangoapps.credentials.utils import get_credentials
@@ -89,31 +89,40 @@ class ProgramProgressMeter(object):
             # We can't use dict.keys() for this because the course run ids need to be ordered
             self.course_run_ids.append(enrollment_id)
 
-        if uuid:
-            self.programs = [get_programs(self.site, uuid=uuid)]
+        self.uuid = uuid
+
+    @cached_property
+    def programs(self):
+        """The programs inspected by the meter.
+
+        Returns:
+            list of program dicts
+        """
+        if self.uuid:
+            return [get_programs(self.site, uuid=self.uuid)]
         else:
-            self.programs = attach_program_detail_url(get_programs(self.site))
+            return attach_program_detail_url(get_programs(self.site))
 
     def invert_programs(self):
         """Intersect programs and enrollments.
 
-        Builds a dictionary of program dict lists keyed by course run ID. The
-        resulting dictionary is suitable in applications where programs must be
-        filtered by the course runs they contain (e.g., the student dashboard).
+        Builds a dictionary of program summary lists keyed by course run ID,
+        from the site's program index rather than the details of all of its
+        programs. The resulting dictionary is suitable in applications where
+        programs must be filtered by the course runs they contain (e.g., the
+        student dashboard).
 
         Returns:
-            defaultdict, programs keyed by course run ID
+            defaultdict, program summaries keyed by course run ID
         """
         inverted_programs = defaultdict(list)
 
-        for program in self.programs:
-            for course in program['courses']:
-                for course_run in course['course_runs']:
-                    course_run_id = course_run['key']
-                    if course_run_id in self.course_run_ids:
-                        program_list = inverted_programs[course_run_id]
-                        if program not in program_list:
-                            program_list.append(program)
+        for program in self._program_summaries():
+            for course_run_id in program['course_run_keys']:
+                if course_run_id in self.course_run_ids:
+                    program_list = inverted_programs[course_run_id]
+                    if program not in program_list:
+                        program_list.append(program)
 
         # Sort programs by title for consistent presentation.
         for program_list in inverted_programs.itervalues():
@@ -130,19 +139,43 @@ class ProgramProgressMeter(object):
         """
         inverted_programs = self.invert_programs()
 
-        programs = []
+        uuids = []
         # Remember that these course run ids are derived from a list of
         # enrollments sorted from most recent to least recent. Iterating
         # over the values in inverted_programs alone won't yield a program
         # ordering consistent with the user's enrollments.
         for course_run_id in self.course_run_ids:
             for program in inverted_programs[course_run_id]:
-                # Dicts aren't a hashable type, so we can't use a set. Sets also
-                # aren't ordered, which is important here.
-                if program not in programs:
-                    programs.append(program)
+                # Sets aren't ordered, which is important here.
+                if program['uuid'] not in uuids:
+                    uuids.append(program['uuid'])
+
+        if not uuids:
+            return []
+
+        # Only the details of the programs the user is engaged with are read.
+        programs = {
+            program['uuid']: program
+            for program in attach_program_detail_url(get_programs(self.site, uuids=uuids))
+        }
+        return [programs[uuid] for uuid in uuids if uuid in programs]
+
+    def _program_summaries(self):
+        """Summarize the programs inspected by the meter.
+
+        The summaries are read from the site's program index when all of the
+        site's programs are inspected, falling back to summarizing the details
+        of the programs if the index isn't cached.
+
+        Returns:
+            list of program summary dicts, as returned by summarize_program,
+                with detail URLs attached
+        """
+        program_index = None if self.uuid else get_program_index(self.site)
+        if program_index is None:
+            program_index = [summarize_program(program) for program in self.programs]
 
-        return programs
+        return attach_program_detail_url(program_index)
 
     def _is_course_in_progress(self, now, course):
         """Check if course qualifies as in progress as part of the program.
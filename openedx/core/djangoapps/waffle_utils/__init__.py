@@ -310,6 +310,23 @@ class CourseWaffleFlag(WaffleFlag):
 
         return course_override_callback
 
+    def prefetch_course_overrides(self, course_keys):
+        """
+        Loads and caches whether the flag was overridden for each of the
+        provided courses, with a single query.
+
+        Arguments:
+            course_keys (list): The CourseKeys of the courses whose overrides
+                will be checked by subsequent calls to is_enabled.
+        """
+        cached_flags = self.waffle_namespace._cached_flags  # pylint: disable=protected-access
+        override_values = WaffleFlagCourseOverrideModel.override_values(self.namespaced_flag_name, [
+            course_key for course_key in course_keys
+            if u'{}.{}'.format(self.namespaced_flag_name, unicode(course_key)) not in cached_flags
+        ])
+        for course_key, force_override in override_values.iteritems():
+            cached_flags[u'{}.{}'.format(self.namespaced_flag_name, unicode(course_key))] = force_override
+
     def is_enabled(self, course_key=None):
         """
         Returns whether or not the flag is enabled.
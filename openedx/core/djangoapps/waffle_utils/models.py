@@ -50,6 +50,24 @@ class WaffleFlagCourseOverrideModel(ConfigurationModel):
             return effective.override_choice
         return cls.ALL_CHOICES.unset
 
+    @classmethod
+    def override_values(cls, waffle_flag, course_ids):
+        """
+        Returns a dict of each of the given course ids to the override_value
+        of the waffle flag for the course, with a single query.
+        """
+        override_values = {course_id: cls.ALL_CHOICES.unset for course_id in course_ids}
+        if not course_ids or not waffle_flag:
+            return override_values
+
+        effective_course_ids = set()
+        for override in cls.objects.filter(waffle_flag=waffle_flag, course_id__in=course_ids).order_by('-change_date'):
+            if override.course_id not in effective_course_ids:
+                effective_course_ids.add(override.course_id)
+                if override.enabled:
+                    override_values[override.course_id] = override.override_choice
+        return override_values
+
     class Meta(object):
         app_label = "waffle_utils"
         verbose_name = 'Waffle flag course override'
@@ -2,6 +2,10 @@
 from __future__ import unicode_literals
 
 import logging
+import math
+import time
+from multiprocessing.pool import ThreadPool
+from threading import Lock
 
 from django.conf import settings
 from django.core.cache import cache
@@ -14,6 +18,16 @@ from openedx.core.lib.token_utils import JwtBuilder
 
 log = logging.getLogger(__name__)
 
+# Number of seconds after which a worker's claim to refresh stale cached data
+# lapses, in case the worker failed before releasing it.
+REFRESH_LOCK_TIMEOUT = 60
+
+# The threads that fetch the pages of paginated responses, shared by all
+# requests of the process so that the number of concurrent page requests is
+# bounded.  Created when first needed.
+_page_pool = None
+_page_pool_lock = Lock()
+
 
 def get_fields(fields, response):
     """Extracts desired fields from the API response"""
@@ -42,6 +56,11 @@ def get_edx_api_data(api_config, resource, api, resource_id=None, querystring=No
         many (bool): Whether the resource requested is a collection of objects, or a single object.
             If false, an empty dict will be returned in cases of failure rather than the default empty list.
         traverse_pagination (bool): Whether to traverse pagination or return paginated response..
+            Once the first page is retrieved, up to settings.EDX_API_MAX_CONCURRENT_PAGES of the
+            remaining pages are requested at the same time.
+
+    Cached data is kept for settings.EDX_API_STALE_CACHE_TTL seconds past the configured cache_ttl.
+    While it is stale, a single worker refreshes it and the others keep returning the stale data.
 
     Returns:
         Data returned by the API. When hitting a list endpoint, extracts "results" (list of dict)
@@ -53,13 +72,18 @@ def get_edx_api_data(api_config, resource, api, resource_id=None, querystring=No
         log.warning('%s configuration is disabled.', api_config.API_NAME)
         return no_data
 
+    stale_results = None
     if cache_key:
         cache_key = '{}.{}'.format(cache_key, resource_id) if resource_id is not None else cache_key
-        cache_key += '.zpickled'
+        # Cached values are (data, time until which the data is fresh) tuples.
+        cache_key += '.stamped.zpickled'
 
         cached = cache.get(cache_key)
         if cached:
-            return zunpickle(cached)
+            results, fresh_until = zunpickle(cached)
+            if time.time() < fresh_until or not cache.add(_refresh_lock_key(cache_key), True, REFRESH_LOCK_TIMEOUT):
+                return results
+            stale_results = results
 
     try:
         endpoint = getattr(api, resource)
@@ -77,15 +101,28 @@ def get_edx_api_data(api_config, resource, api, resource_id=None, querystring=No
             results = response
     except:  # pylint: disable=bare-except
         log.exception('Failed to retrieve data from the %s API.', api_config.API_NAME)
+        if stale_results is not None:
+            cache.delete(_refresh_lock_key(cache_key))
+            return stale_results
         return no_data
 
     if cache_key:
-        zdata = zpickle(results)
-        cache.set(cache_key, zdata, api_config.cache_ttl)
+        zdata = zpickle((results, time.time() + api_config.cache_ttl))
+        cache.set(cache_key, zdata, api_config.cache_ttl + settings.EDX_API_STALE_CACHE_TTL)
+        if stale_results is not None:
+            cache.delete(_refresh_lock_key(cache_key))
 
     return results
 
 
+def _refresh_lock_key(cache_key):
+    """
+    Returns the cache key of the claim of a worker to refresh the data cached
+    under the given key.
+    """
+    return cache_key + '.refreshing'
+
+
 def _traverse_pagination(response, endpoint, querystring, no_data):
     """Traverse a paginated API response.
 
@@ -93,6 +130,17 @@ def _traverse_pagination(response, endpoint, querystring, no_data):
     """
     results = response.get('results', no_data)
 
+    # When the number of pages can be told from the first one, request the
+    # remaining pages concurrently.
+    num_pages = _get_num_pages(response)
+    if response.get('next') and num_pages is not None and num_pages > 2 and settings.EDX_API_MAX_CONCURRENT_PAGES > 1:
+        for page_results in _get_page_pool().map(
+                lambda page: endpoint.get(**dict(querystring, page=page)).get('results', no_data),
+                range(2, num_pages + 1),
+        ):
+            results += page_results
+        return results
+
     page = 1
     next_page = response.get('next')
     while next_page:
@@ -103,3 +151,26 @@ def _traverse_pagination(response, endpoint, querystring, no_data):
         next_page = response.get('next')
 
     return results
+
+
+def _get_num_pages(response):
+    """
+    Returns the number of pages of the collection of which the given response
+    is the first page, or None if not known.
+    """
+    count = response.get('count')
+    page_size = len(response.get('results') or [])
+    if count is None or not page_size:
+        return None
+    return int(math.ceil(float(count) / page_size))
+
+
+def _get_page_pool():
+    """
+    Returns the pool of threads for fetching pages, creating it if needed.
+    """
+    global _page_pool  # pylint: disable=global-statement
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ThreadPool(settings.EDX_API_MAX_CONCURRENT_PAGES)
+        return _page_pool
@@ -5,6 +5,7 @@ import json
 import httpretty
 import mock
 from django.core.cache import cache
+from django.test.utils import override_settings
 from nose.plugins.attrib import attr
 
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
@@ -96,6 +97,31 @@ class TestGetEdxApiData(CatalogIntegrationMixin, CredentialsApiConfigMixin, Cach
 
         self._assert_num_requests(len(expected_collection))
 
+    @override_settings(EDX_API_MAX_CONCURRENT_PAGES=3)
+    def test_get_paginated_data_concurrently(self):
+        """Verify that the pages after the first are retrieved concurrently, and in order."""
+        catalog_integration = self.create_catalog_integration()
+        api = create_catalog_api_client(self.user)
+
+        expected_collection = ['some', 'test', 'paginated', 'data']
+        url = CatalogIntegration.current().get_internal_api_url().strip('/') + '/programs/'
+
+        def page_body(request, uri, headers):  # pylint: disable=unused-argument
+            page = int(request.querystring.get('page', ['1'])[0])
+            data = {
+                'count': len(expected_collection),
+                'next': '{}?page={}'.format(url, page + 1) if page < len(expected_collection) else None,
+                'results': [expected_collection[page - 1]],
+            }
+            return 200, headers, json.dumps(data)
+
+        httpretty.register_uri(httpretty.GET, url, body=page_body, content_type='application/json')
+
+        actual_collection = get_edx_api_data(catalog_integration, 'programs', api=api)
+        self.assertEqual(actual_collection, expected_collection)
+
+        self._assert_num_requests(len(expected_collection))
+
     def test_get_paginated_data_do_not_traverse_pagination(self):
         """
         Verify that pagination is not traversed if traverse_pagination=False is passed as argument.
@@ -222,6 +248,41 @@ class TestGetEdxApiData(CatalogIntegrationMixin, CredentialsApiConfigMixin, Cach
         # Verify that only two requests were made, not four.
         self._assert_num_requests(2)
 
+    @override_settings(EDX_API_STALE_CACHE_TTL=60)
+    @mock.patch(UTILITY_MODULE + '.time')
+    def test_stale_cache_refreshed_by_single_worker(self, mock_time):
+        """Verify that stale cached data is returned while another worker refreshes it."""
+        catalog_integration = self.create_catalog_integration(cache_ttl=5)
+        api = create_catalog_api_client(self.user)
+        cache_key = CatalogIntegration.current().CACHE_KEY
+
+        def get_programs():
+            return get_edx_api_data(catalog_integration, 'programs', api=api, cache_key=cache_key)
+
+        self._mock_catalog_api([
+            httpretty.Response(body=json.dumps({'next': None, 'results': results}), content_type='application/json')
+            for results in (['stale', 'data'], ['fresh', 'data'])
+        ])
+
+        mock_time.time.return_value = 1000
+        self.assertEqual(get_programs(), ['stale', 'data'])
+
+        # Once the data is stale, it is returned while another worker is refreshing it.
+        mock_time.time.return_value = 1010
+        refresh_lock_key = cache_key + '.stamped.zpickled.refreshing'
+        cache.set(refresh_lock_key, True)
+        self.assertEqual(get_programs(), ['stale', 'data'])
+        self._assert_num_requests(1)
+
+        # Otherwise, this worker refreshes it.
+        cache.delete(refresh_lock_key)
+        self.assertEqual(get_programs(), ['fresh', 'data'])
+        self._assert_num_requests(2)
+        self.assertIsNone(cache.get(refresh_lock_key))
+
+        self.assertEqual(get_programs(), ['fresh', 'data'])
+        self._assert_num_requests(2)
+
     @mock.patch(UTILITY_MODULE + '.log.warning')
     def test_api_config_disabled(self, mock_warning):
         """Verify that no data is retrieved if the provided config model is disabled."""